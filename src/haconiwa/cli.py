@@ -17,7 +17,12 @@ from haconiwa.scan.cli import scan_app
 
 # Import new v1.0 components
 from haconiwa.core.crd.parser import CRDParser, CRDValidationError
+from haconiwa.core.crd.cache import CRDParseCache
+from haconiwa.core.applied_state import (
+    AppliedStateStore, CREATE as PLAN_CREATE, UPDATE as PLAN_UPDATE, DELETE as PLAN_DELETE, NOOP as PLAN_NOOP
+)
 from haconiwa.core.applier import CRDApplier
+from haconiwa.core.profiler import start_profiling, stop_profiling, span
 from haconiwa.core.policy.engine import PolicyEngine
 from haconiwa.space.manager import SpaceManager
 
@@ -95,6 +100,126 @@ def init(
     
     typer.echo(f"✅ Haconiwa設定を初期化しました: {config_file}")
 
+def _print_apply_plan(plan_items) -> None:
+    """Print apply plan (create/update/delete/no-op per resource)"""
+    symbols = {
+        PLAN_CREATE: "+",
+        PLAN_UPDATE: "~",
+        PLAN_DELETE: "-",
+        PLAN_NOOP: "=",
+    }
+    counts = {action: 0 for action in symbols}
+    
+    typer.echo("📋 適用プラン:")
+    # plan_items may be a generator; items are printed as they are computed
+    for item in plan_items:
+        counts[item.action] += 1
+        reason = f" ({item.reason})" if item.reason else ""
+        typer.echo(f"  {symbols[item.action]} {item.action:<7} {item.key}{reason}")
+    
+    typer.echo(
+        f"\nプラン: {counts[PLAN_CREATE]} 作成, {counts[PLAN_UPDATE]} 更新, "
+        f"{counts[PLAN_DELETE]} 削除, {counts[PLAN_NOOP]} 変更なし"
+    )
+
+def _finish_apply_profile(profile_path: Optional[str], top_n: int = 10) -> None:
+    """Stop profiling, write Chrome trace and print the slowest operations"""
+    profiler = stop_profiling()
+    if profiler is None or not profile_path:
+        return
+    
+    import time
+    from rich.console import Console
+    from rich.table import Table
+    
+    profiler.record("haconiwa apply", "cli", profiler.started_at, time.perf_counter() - profiler.started_at)
+    profiler.write_chrome_trace(Path(profile_path))
+    
+    table = Table(title=f"⏱️ 処理時間トップ{top_n}", show_header=True, header_style="bold magenta")
+    table.add_column("操作", style="cyan")
+    table.add_column("種類", style="dim")
+    table.add_column("回数", justify="right")
+    table.add_column("自身(s)", justify="right", style="green")
+    table.add_column("合計(s)", justify="right")
+    table.add_column("最大(s)", justify="right")
+    for entry in profiler.summary(top_n + 1):
+        if entry["name"] == "haconiwa apply":
+            continue
+        table.add_row(entry["name"], entry["category"], str(entry["count"]),
+                      f"{entry['self']:.3f}", f"{entry['total']:.3f}", f"{entry['max']:.3f}")
+    
+    console = Console()
+    console.print()
+    console.print(table)
+    typer.echo(f"📈 トレースを出力しました: {profile_path} (chrome://tracing または ui.perfetto.dev で表示)")
+
+def _space_session_name(crd) -> str:
+    """Get tmux session name (first company) of a Space CRD"""
+    return crd.spec.nations[0].cities[0].villages[0].companies[0].name
+
+def _apply_streaming(file_path: Path, parser: CRDParser, applier: CRDApplier, created_sessions: List[str],
+                     plan: bool = False, dry_run: bool = False, full: bool = False) -> bool:
+    """Parse and apply a multi-document file lazily; returns False when only a plan was shown"""
+    source = str(file_path.resolve())
+    state_store = AppliedStateStore(source=source)
+    
+    def _plan_items():
+        seen_keys = set()
+        for crd in parser.iter_multi_file(file_path):
+            item = state_store.plan_resource(crd)
+            seen_keys.add(item.key)
+            yield item
+        yield from state_store.plan_deletes(seen_keys, source)
+    
+    if plan:
+        _print_apply_plan(_plan_items())
+        return False
+    
+    if dry_run:
+        count = 0
+        for crd in parser.iter_multi_file(file_path):
+            count += 1
+            typer.echo(f"  - {crd.kind}: {crd.metadata.name}")
+            if crd.kind == "Space":
+                created_sessions.append(_space_session_name(crd))
+        typer.echo(f"📄 {file_path} に {count} 個の設定を発見しました")
+        return True
+    
+    skipped = []
+    
+    def _changed_crds():
+        for item in _plan_items():
+            if item.action == PLAN_DELETE:
+                state_store.forget(item.key)
+                typer.echo(f"🗑️ {item.key} は設定ファイルから削除されたため適用状態から外しました")
+            elif item.action == PLAN_NOOP and not full:
+                skipped.append(item.key)
+                # Agents are never looked up by other resources
+                if item.crd.kind != "Agent":
+                    applier.register_unchanged(item.crd)
+                if item.crd.kind == "Space":
+                    created_sessions.append(_space_session_name(item.crd))
+            else:
+                yield item.crd
+    
+    def _on_result(crd, result):
+        if result:
+            state_store.record(crd, source, applier.get_resource_outputs(crd))
+            if crd.kind == "Space":
+                created_sessions.append(_space_session_name(crd))
+    
+    try:
+        success_count, total_count = applier.apply_stream(_changed_crds(), on_result=_on_result)
+    finally:
+        # Keep progress of a partially applied file
+        if state_store.dirty:
+            state_store.save()
+    
+    if skipped:
+        typer.echo(f"⏭️ {len(skipped)} 個の設定は前回の適用から変更がないためスキップしました (--full で全適用)")
+    typer.echo(f"✅ {success_count}/{total_count} 個の設定を正常に適用しました")
+    return True
+
 @app.command()
 def apply(
     file: str = typer.Option(..., "-f", "--file", help="YAML ファイルパス"),
@@ -103,6 +228,12 @@ def apply(
     no_attach: bool = typer.Option(False, "--no-attach", help="適用後にセッションにアタッチしない"),
     room: str = typer.Option("room-01", "-r", "--room", help="アタッチするルーム"),
     env: List[str] = typer.Option([], "--env", help="環境変数ファイル（複数指定可）"),
+    max_workers: int = typer.Option(4, "-j", "--max-workers", help="依存関係のない設定を並列適用するワーカー数"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="パースキャッシュ (~/.haconiwa/cache) を使用しない"),
+    plan: bool = typer.Option(False, "--plan", help="前回の適用状態との差分 (create/update/delete/no-op) を表示のみ"),
+    full: bool = typer.Option(False, "--full", help="変更の有無に関わらず全設定を適用"),
+    stream: bool = typer.Option(False, "--stream", help="大きなファイルを読み込みながら順次適用 (メモリ使用量を抑制)"),
+    profile: Optional[str] = typer.Option(None, "--profile", help="適用処理のトレースを Chrome/Perfetto 形式で出力するファイル"),
 ):
     """CRD定義ファイルを適用"""
     file_path = Path(file)
@@ -114,7 +245,7 @@ def apply(
     # By default, attach unless --no-attach is specified
     should_attach = not no_attach
     
-    parser = CRDParser()
+    parser = CRDParser(cache=None if no_cache else CRDParseCache())
     applier = CRDApplier()
     
     # Register applier in __main__ for TaskManager to access
@@ -124,6 +255,9 @@ def apply(
     # Set force_clone flag in applier
     applier.force_clone = force_clone
     
+    # Set worker pool size for concurrent apply
+    applier.max_workers = max(1, max_workers)
+    
     # Set env files in applier
     if env:
         applier.env_files = env
@@ -139,53 +273,94 @@ def apply(
     
     created_sessions = []  # Track created sessions for attach
     
+    if profile:
+        start_profiling()
+    
     try:
-        # Check if file contains multiple documents
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        if '---' in content:
-            # Multi-document YAML
-            crds = parser.parse_multi_yaml(content)
-            typer.echo(f"📄 {file} に {len(crds)} 個の設定を発見しました")
+        if stream:
+            if not _apply_streaming(file_path, parser, applier, created_sessions, plan=plan, dry_run=dry_run, full=full):
+                return
+        else:
+            # Check if file contains multiple documents
+            with open(file_path, 'r') as f:
+                content = f.read()
             
-            if not dry_run:
-                results = applier.apply_multiple(crds)
-                success_count = sum(results)
-                typer.echo(f"✅ {success_count}/{len(crds)} 個の設定を正常に適用しました")
-                
-                # Extract session names from applied Space CRDs
-                for i, (crd, result) in enumerate(zip(crds, results)):
-                    if result and crd.kind == "Space":
-                        session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
-                        created_sessions.append(session_name)
+            if '---' in content:
+                # Multi-document YAML
+                with span("parse", "cli", documents="multi"):
+                    crds = parser.parse_multi_yaml(content)
+                typer.echo(f"📄 {file} に {len(crds)} 個の設定を発見しました")
+                if parser.cache is not None:
+                    stats = parser.cache_stats()
+                    typer.echo(f"📦 パースキャッシュ: {stats['hits']} ヒット / {stats['misses']} ミス")
             else:
-                for crd in crds:
-                    typer.echo(f"  - {crd.kind}: {crd.metadata.name}")
-                    if crd.kind == "Space":
-                        session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
-                        created_sessions.append(session_name)
-        else:
-            # Single document
-            crd = parser.parse_file(file_path)
-            typer.echo(f"📄 設定を発見: {crd.kind}/{crd.metadata.name}")
+                # Single document
+                crds = [parser.parse_file(file_path)]
+                typer.echo(f"📄 設定を発見: {crds[0].kind}/{crds[0].metadata.name}")
+            
+            # Compare against the last-applied state for this file
+            source = str(file_path.resolve())
+            state_store = AppliedStateStore(source=source)
+            plan_items = state_store.plan(crds, source)
+            
+            if plan:
+                _print_apply_plan(plan_items)
+                return
             
             if not dry_run:
-                success = applier.apply(crd)
-                if success:
-                    typer.echo("✅ 1個の設定を正常に適用しました")
-                    
-                    # Extract session name for Space CRD
-                    if crd.kind == "Space":
-                        session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
-                        created_sessions.append(session_name)
+                if full:
+                    to_apply = crds
                 else:
+                    to_apply = [item.crd for item in plan_items if item.action in (PLAN_CREATE, PLAN_UPDATE)]
+                    unchanged = [item.crd for item in plan_items if item.action == PLAN_NOOP]
+                    for crd in unchanged:
+                        applier.register_unchanged(crd)
+                        if crd.kind == "Space":
+                            created_sessions.append(crd.spec.nations[0].cities[0].villages[0].companies[0].name)
+                    if unchanged:
+                        typer.echo(f"⏭️ {len(unchanged)} 個の設定は前回の適用から変更がないためスキップします (--full で全適用)")
+            
+                if len(crds) > 1:
+                    results = applier.apply_multiple(to_apply) if to_apply else []
+                    success_count = sum(results)
+                    typer.echo(f"✅ {success_count}/{len(to_apply)} 個の設定を正常に適用しました")
+                elif to_apply:
+                    success = applier.apply(to_apply[0])
+                    if success:
+                        typer.echo("✅ 1個の設定を正常に適用しました")
+                    results = [success]
+                else:
+                    results = []
+            
+                # Record applied resources and extract session names from applied Space CRDs
+                for crd, result in zip(to_apply, results):
+                    if result:
+                        state_store.record(crd, source, applier.get_resource_outputs(crd))
+                        if crd.kind == "Space":
+                            session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
+                            created_sessions.append(session_name)
+            
+                for item in plan_items:
+                    if item.action == PLAN_DELETE:
+                        state_store.forget(item.key)
+                        typer.echo(f"🗑️ {item.key} は設定ファイルから削除されたため適用状態から外しました")
+            
+                if state_store.dirty:
+                    state_store.save()
+            
+                if len(crds) == 1 and to_apply and not results[0]:
                     typer.echo("❌ 設定の適用に失敗しました", err=True)
                     raise typer.Exit(1)
             else:
-                if crd.kind == "Space":
-                    session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
-                    created_sessions.append(session_name)
+                for crd in crds:
+                    if len(crds) > 1:
+                        typer.echo(f"  - {crd.kind}: {crd.metadata.name}")
+                    if crd.kind == "Space":
+                        session_name = crd.spec.nations[0].cities[0].villages[0].companies[0].name
+                        created_sessions.append(session_name)
+
+        # Write profile before attach replaces this process
+        _finish_apply_profile(profile)
         
         # Auto-attach to session if requested
         if should_attach and created_sessions and not dry_run:
@@ -236,6 +411,8 @@ def apply(
     except Exception as e:
         typer.echo(f"❌ エラー: {e}", err=True)
         raise typer.Exit(1)
+    finally:
+        _finish_apply_profile(profile)
 
 # =====================================================================
 # Space コマンド（company のリネーム・拡張）
@@ -762,11 +939,14 @@ monitor_app = typer.Typer(name="monitor", help="tmux multi-agent environment mon
 @monitor_app.callback(invoke_without_command=True)
 def monitor_main(
     ctx: typer.Context,
-    company: str = typer.Option(..., "-c", "--company", help="Company name (tmux session name)"),
+    company: Optional[List[str]] = typer.Option(None, "-c", "--company", help="Company name (tmux session name); repeat for a multi-company dashboard"),
+    all_companies: bool = typer.Option(False, "--all", help="Dashboard of all haconiwa companies on the tmux server"),
     window: Optional[str] = typer.Option(None, "-w", "--window", help="Specific window number or name (default: all)"),
     columns: Optional[List[str]] = typer.Option(None, "--columns", help="Columns to display"),
     refresh: float = typer.Option(2.0, "-r", "--refresh", help="Refresh interval in seconds"),
     japanese: bool = typer.Option(False, "-j", "--japanese", help="Display in Japanese"),
+    history: int = typer.Option(60, "--history", min=1, help="Number of samples kept per pane for trends"),
+    record: Optional[Path] = typer.Option(None, "--record", help="Record samples to a .csv or .parquet file"),
 ):
     """
     Monitor tmux multi-agent development environment in real-time.
@@ -779,18 +959,25 @@ def monitor_main(
       haconiwa monitor -c my-company
       haconiwa monitor -c my-company -w frontend --japanese  
       haconiwa monitor -c my-company --columns pane agent cpu status
+      haconiwa monitor -c my-company --record samples.csv
+      haconiwa monitor --all
+      haconiwa monitor -c company-a -c company-b
     """
     
     # If a subcommand was invoked, let it handle the execution
     if ctx.invoked_subcommand is not None:
         return
     
+    if not company and not all_companies:
+        typer.echo("❌ 監視する会社を --company で指定するか --all を使用してください", err=True)
+        raise typer.Exit(1)
+    
     # Default columns if not specified
     if columns is None:
-        columns = ["room", "pane", "title", "task", "claude", "agent", "cpu", "status"]
+        columns = ["room", "pane", "title", "task", "claude", "agent", "cpu", "trend", "activity", "status"]
     
     # Validate columns
-    valid_columns = ["room", "window", "pane", "title", "task", "parent", "claude", "agent", "cpu", "memory", "uptime", "status"]
+    valid_columns = ["room", "window", "pane", "title", "task", "parent", "claude", "agent", "cpu", "memory", "uptime", "trend", "activity", "turns", "tools", "tokens", "status"]
     for col in columns:
         if col not in valid_columns:
             typer.echo(f"❌ Invalid column: {col}", err=True)
@@ -805,6 +992,40 @@ def monitor_main(
         else:
             window_param = window
     
+    # Multi-company dashboard with one shared collector
+    if all_companies or len(company) > 1:
+        if record is not None or window is not None:
+            typer.echo("❌ --record と --window は単一の会社の監視でのみ使用できます", err=True)
+            raise typer.Exit(1)
+        from haconiwa.monitor.dashboard import CompanyDashboard
+        
+        dashboard = CompanyDashboard(
+            companies=None if all_companies else company,
+            japanese=japanese,
+            columns=columns,
+            history_size=history
+        )
+        target = "全会社" if all_companies else ", ".join(company)
+        typer.echo(f"🚀 {target} の監視を開始します (1-9: 会社を表示, 0: 一覧に戻る)")
+        typer.echo("停止するにはCtrl+Cを押してください")
+        dashboard.run(refresh_rate=refresh)
+        return
+    
+    company = company[0]
+    
+    # Validate record file format
+    if record is not None:
+        if record.suffix.lower() not in (".csv", ".parquet"):
+            typer.echo(f"❌ 記録ファイルは .csv または .parquet を指定してください: {record}", err=True)
+            raise typer.Exit(1)
+        if record.suffix.lower() == ".parquet":
+            try:
+                import pyarrow
+            except ImportError:
+                typer.echo("❌ Parquet形式での記録には pyarrow が必要です", err=True)
+                typer.echo("インストールするには: pip install pyarrow", err=True)
+                raise typer.Exit(1)
+    
     # Check if tmux session exists
     import subprocess
     try:
@@ -834,7 +1055,9 @@ def monitor_main(
             session_name=company,
             japanese=japanese,
             columns=columns,
-            window=window_param
+            window=window_param,
+            history_size=history,
+            record_path=record
         )
         
         # Display startup message
@@ -842,6 +1065,8 @@ def monitor_main(
         window_info = f" (ウィンドウ: {window})" if window else " (全ウィンドウ)"
         typer.echo(f"🚀 {company}{window_info}{lang_info} の監視を開始します")
         typer.echo("停止するにはCtrl+Cを押してください")
+        if record is not None:
+            typer.echo(f"📝 サンプルを記録します: {record}")
         
         # Run monitoring
         monitor.run_monitor(refresh_rate=refresh)
@@ -852,6 +1077,123 @@ def monitor_main(
         typer.echo(f"\n❌ エラー: {e}", err=True)
         raise typer.Exit(1)
 
+@monitor_app.command("export")
+def monitor_export(
+    listen: str = typer.Option(":9100", "--listen", help="Address to serve Prometheus metrics on ([HOST]:PORT, host defaults to 127.0.0.1)"),
+    companies: Optional[List[str]] = typer.Option(None, "-c", "--company", help="Company to export (repeatable, default: all tmux sessions)"),
+    interval: float = typer.Option(5.0, "-i", "--interval", help="Collection interval in seconds"),
+):
+    """
+    Export per-agent metrics for Prometheus without a terminal UI.
+    
+    Examples:
+      haconiwa monitor export --listen :9100
+      haconiwa monitor export --listen 0.0.0.0:9100 -c company-a -c company-b
+    """
+    import time
+    from haconiwa.monitor.exporter import AgentMetricsExporter, parse_listen_address
+    
+    try:
+        parse_listen_address(listen)
+    except ValueError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+    
+    exporter = AgentMetricsExporter(companies=companies, interval=interval)
+    try:
+        addr, port = exporter.start(listen)
+    except OSError as e:
+        typer.echo(f"❌ メトリクスサーバーを起動できません ({listen}): {e}", err=True)
+        raise typer.Exit(1)
+    
+    target = ", ".join(companies) if companies else "全セッション"
+    typer.echo(f"📈 {target} のメトリクスを http://{addr}:{port}/metrics で公開しています")
+    typer.echo("停止するにはCtrl+Cを押してください")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        typer.echo("\n✅ エクスポートを停止しました")
+    finally:
+        exporter.stop()
+
+@monitor_app.command("usage")
+def monitor_usage(
+    companies: Optional[List[str]] = typer.Option(None, "-c", "--company", help="Company whose live panes to summarize (repeatable, default: all tmux sessions)"),
+    path: Optional[Path] = typer.Option(None, "--path", help="Company directory to summarize from tasks/ instead of live panes"),
+    output_format: str = typer.Option("table", "--format", help="Output format: table, json or csv"),
+    output: Optional[Path] = typer.Option(None, "-o", "--output", help="Write the summary to a file"),
+):
+    """
+    Summarize turns, tool calls and tokens per agent from Claude transcripts.
+    
+    Examples:
+      haconiwa monitor usage -c my-company
+      haconiwa monitor usage --path ./my-company --format json
+    """
+    import csv
+    import io
+    import json
+    from haconiwa.monitor.tmux_monitor import list_haconiwa_sessions
+    from haconiwa.monitor.transcripts import (
+        DEFAULT_STATE_PATH, TranscriptIndexer, find_task_dir, find_task_dirs, format_tokens
+    )
+    
+    if output_format not in ("table", "json", "csv"):
+        typer.echo(f"❌ 不明な出力形式です: {output_format} (table, json, csv)", err=True)
+        raise typer.Exit(1)
+    if output is not None and output_format == "table":
+        typer.echo("❌ --output には --format json または csv を指定してください", err=True)
+        raise typer.Exit(1)
+    
+    if path is not None:
+        task_dirs = find_task_dirs(path)
+    else:
+        task_dirs = []
+        for session in companies or list_haconiwa_sessions():
+            for pane in TmuxMonitor(session, columns=["pane"]).get_tmux_panes_info():
+                task_dir = find_task_dir(pane.get('current_path', ''))
+                if task_dir is not None and task_dir not in task_dirs:
+                    task_dirs.append(task_dir)
+    
+    indexer = TranscriptIndexer(state_path=DEFAULT_STATE_PATH)
+    rows = indexer.summarize(task_dirs)
+    indexer.save()
+    
+    if output_format == "json":
+        text = json.dumps(rows, indent=2, ensure_ascii=False)
+    elif output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=rows[0].keys() if rows else ["company", "agent", "task"])
+        writer.writeheader()
+        writer.writerows(rows)
+        text = buffer.getvalue()
+    else:
+        if not rows:
+            typer.echo("ℹ️ 集計対象のタスクが見つかりません")
+            return
+        from rich.console import Console
+        from rich.table import Table
+        table = Table(title="🧮 エージェント別作業量", show_header=True, header_style="bold magenta")
+        for header in ("会社", "エージェント", "タスク", "プロンプト", "ターン", "ツール呼出", "入力", "出力"):
+            table.add_column(header, justify="right" if header not in ("会社", "エージェント", "タスク") else "left")
+        for row in rows:
+            table.add_row(
+                row["company"] or "-", row["agent"] or "-", row["task"],
+                str(row["prompts"]), str(row["turns"]), str(row["tool_calls"]),
+                format_tokens(row["input_tokens"] + row["cache_read_tokens"] + row["cache_creation_tokens"]),
+                format_tokens(row["output_tokens"]),
+            )
+        Console().print(table)
+        return
+    
+    if output is not None:
+        output.write_text(text, encoding="utf-8")
+        typer.echo(f"✅ {len(rows)}件の集計を書き出しました: {output}")
+    else:
+        typer.echo(text)
+
 @monitor_app.command("help")
 def monitor_help():
     """Show detailed help for monitor command"""
@@ -861,9 +1203,12 @@ def monitor_help():
 USAGE:
   haconiwa monitor -c <company> [OPTIONS]
   haconiwa mon -c <company> [OPTIONS]     # Short alias
+  haconiwa monitor --all [OPTIONS]        # All companies
 
 BASIC EXAMPLES:
   haconiwa monitor -c my-company                    # Monitor all windows
+  haconiwa monitor --all                            # Dashboard of all companies
+  haconiwa monitor -c company-a -c company-b        # Dashboard of selected companies
   haconiwa monitor -c my-company --japanese         # Japanese UI
   haconiwa monitor -c my-company -w 0               # Monitor window 0 only
   haconiwa monitor -c my-company -w frontend        # Monitor "frontend" window
@@ -887,8 +1232,28 @@ AVAILABLE COLUMNS:
   cpu      - CPU usage with visual bar
   memory   - Memory usage
   uptime   - Process uptime
+  trend    - CPU sparkline with rolling average (--history samples)
+  activity - Pane output activity (出力中/アイドル/要対応)
+  turns    - Claude responses in the task's transcripts
+  tools    - Tool calls in the task's transcripts
+  tokens   - Transcript tokens (input incl. cache / output)
   status   - Agent status (仕事待ち/作業中/多忙)
 
+PROMETHEUS EXPORT:
+  haconiwa monitor export --listen :9100                    # All tmux sessions
+  haconiwa monitor export --listen :9100 -c my-company      # Selected companies
+  haconiwa monitor export --listen 0.0.0.0:9100             # All interfaces (default: 127.0.0.1)
+
+AGENT USAGE:
+  haconiwa monitor -c my-company --columns pane agent turns tools tokens status
+  haconiwa monitor usage -c my-company                      # Per-agent summary
+  haconiwa monitor usage --path ./my-company --format csv -o usage.csv
+
+RECORDING:
+  haconiwa monitor -c my-company --record samples.csv       # CSV
+  haconiwa monitor -c my-company --record samples.parquet   # Parquet (requires pyarrow)
+  haconiwa monitor -c my-company --history 300              # Longer trend window
+
 TIPS:
   • Use --columns to customize display
   • Use -w to focus on specific room/window
@@ -0,0 +1,186 @@
+"""
+Last-applied state store for Haconiwa v1.0
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = Path.home() / ".haconiwa" / "state"
+
+STATE_FORMAT_VERSION = 1
+
+# Plan actions
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+NOOP = "no-op"
+
+
+def state_file_for(source: str) -> Path:
+    """Get the state file of a YAML source, keyed by its resolved path"""
+    resolved = str(Path(source).expanduser().resolve())
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+    return DEFAULT_STATE_DIR / f"applied-{Path(resolved).stem}-{digest}.json"
+
+
+def resource_key(crd: Any) -> str:
+    """Get store key for a CRD (Kind/name)"""
+    return f"{crd.kind}/{crd.metadata.name}"
+
+
+def spec_hash(crd: Any) -> Optional[str]:
+    """Hash the full CRD content; None if the CRD cannot be serialized"""
+    try:
+        data = crd.model_dump(mode="json", by_alias=True)
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    except Exception:
+        return None
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanItem:
+    """Planned action for a single resource"""
+
+    def __init__(self, key: str, action: str, crd: Any = None, reason: str = ""):
+        self.key = key
+        self.action = action
+        self.crd = crd
+        self.reason = reason
+
+    def __repr__(self):
+        return f"PlanItem({self.key!r}, {self.action!r})"
+
+
+class AppliedStateStore:
+    """Persistent record of what the last `haconiwa apply` produced.
+
+    Each entry holds the spec hash, timestamps, the source YAML file and
+    outputs such as tmux session names, base paths and worktree paths.
+    By default each source YAML has its own state file under
+    ``~/.haconiwa/state``, so the working directory does not matter.
+    Entries are also scoped by source file so applying a second file never
+    plans deletes for resources defined elsewhere.
+    """
+
+    def __init__(self, state_file: Optional[Path] = None, source: Optional[str] = None):
+        if state_file:
+            self.state_file = Path(state_file)
+        elif source:
+            self.state_file = state_file_for(source)
+        else:
+            raise ValueError("AppliedStateStore needs a state_file or a source")
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Load state from disk (missing or unreadable files start empty)"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get("version") == STATE_FORMAT_VERSION:
+                self.resources = dict(data.get("resources", {}))
+        except FileNotFoundError:
+            self.resources = {}
+        except Exception as e:
+            logger.warning(f"Could not read applied state {self.state_file}: {e}")
+            self.resources = {}
+
+    def save(self) -> None:
+        """Write state to disk atomically"""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_file.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": STATE_FORMAT_VERSION, "resources": self.resources},
+                      f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+        self.dirty = False
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get stored entry for a resource key"""
+        return self.resources.get(key)
+
+    def record(self, crd: Any, source: str, outputs: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a successfully applied CRD (skipped if it cannot be hashed)"""
+        current_hash = spec_hash(crd)
+        if current_hash is None:
+            return False
+        key = resource_key(crd)
+        now = datetime.now().isoformat()
+        previous = self.resources.get(key, {})
+        self.resources[key] = {
+            "kind": crd.kind,
+            "name": crd.metadata.name,
+            "spec_hash": current_hash,
+            "source": source,
+            "created_at": previous.get("created_at", now),
+            "applied_at": now,
+            "outputs": outputs or {},
+        }
+        self.dirty = True
+        return True
+
+    def forget(self, key: str) -> bool:
+        """Remove a resource from the store"""
+        removed = self.resources.pop(key, None) is not None
+        self.dirty = self.dirty or removed
+        return removed
+
+    def plan(self, crds: List[Any], source: str) -> List[PlanItem]:
+        """Compute create/update/delete/no-op for CRDs loaded from source"""
+        items = [self.plan_resource(crd) for crd in crds]
+        items.extend(self.plan_deletes({item.key for item in items}, source))
+        return items
+
+    def plan_resource(self, crd: Any) -> PlanItem:
+        """Compute create/update/no-op for a single CRD"""
+        key = resource_key(crd)
+        entry = self.resources.get(key)
+        current_hash = spec_hash(crd)
+
+        if entry is None:
+            return PlanItem(key, CREATE, crd)
+        if current_hash is None or entry.get("spec_hash") != current_hash:
+            return PlanItem(key, UPDATE, crd, "spec changed")
+        drift = self._detect_drift(entry)
+        if drift:
+            return PlanItem(key, UPDATE, crd, drift)
+        return PlanItem(key, NOOP, crd)
+
+    def plan_deletes(self, desired_keys: Set[str], source: str) -> List[PlanItem]:
+        """Get deletes for resources from source that are no longer desired"""
+        return [
+            PlanItem(key, DELETE)
+            for key, entry in self.resources.items()
+            if entry.get("source") == source and key not in desired_keys
+        ]
+
+    def _detect_drift(self, entry: Dict[str, Any]) -> str:
+        """Check that recorded outputs still exist; returns a reason or ''"""
+        outputs = entry.get("outputs", {})
+
+        for path_key in ("base_path", "worktree_path"):
+            path = outputs.get(path_key)
+            if path and not Path(path).exists():
+                return f"{path_key} missing"
+
+        session_name = outputs.get("session_name")
+        if session_name:
+            try:
+                result = subprocess.run(['tmux', 'has-session', '-t', session_name],
+                                        capture_output=True, text=True)
+                if result.returncode != 0:
+                    return "tmux session missing"
+            except FileNotFoundError:
+                return "tmux not available"
+
+        return ""
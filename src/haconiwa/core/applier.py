@@ -2,7 +2,7 @@
 CRD Applier for Haconiwa v1.0
 """
 
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Any, Callable, Iterable, Optional, Tuple
 from pathlib import Path
 import logging
 import sys
@@ -10,6 +10,8 @@ import sys
 from .crd.models import (
     SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD
 )
+from .apply_graph import ApplyGraph
+from .profiler import span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -27,32 +29,36 @@ class CRDApplier:
         self.force_clone = False  # Default to False
         self.env_files = []  # List of environment files to copy
         self.ai_code_configs = {}  # AICodeConfig by targetCompany
+        self.max_workers = 4  # Concurrent workers for independent CRDs
+        self._in_batch = False  # True while apply_multiple/apply_stream is running
     
     def apply(self, crd: Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]) -> bool:
         """Apply CRD to the system"""
-        try:
-            if isinstance(crd, SpaceCRD):
-                return self._apply_space_crd(crd)
-            elif isinstance(crd, AgentCRD):
-                return self._apply_agent_crd(crd)
-            elif isinstance(crd, TaskCRD):
-                return self._apply_task_crd(crd)
-            elif isinstance(crd, PathScanCRD):
-                return self._apply_pathscan_crd(crd)
-            elif isinstance(crd, DatabaseCRD):
-                return self._apply_database_crd(crd)
-            elif isinstance(crd, CommandPolicyCRD):
-                return self._apply_commandpolicy_crd(crd)
-            elif isinstance(crd, OrganizationCRD):
-                return self._apply_organization_crd(crd)
-            elif isinstance(crd, AICodeConfigCRD):
-                return self._apply_aicode_config_crd(crd)
-            else:
-                raise CRDApplierError(f"Unknown CRD type: {type(crd)}")
-        except Exception as e:
-            logger.error(f"Failed to apply CRD {crd.metadata.name}: {e}")
-            raise CRDApplierError(f"Failed to apply CRD {crd.metadata.name}: {e}")
+        with span(f"apply {crd.kind}/{crd.metadata.name}", "crd"):
+            try:
+                if isinstance(crd, SpaceCRD):
+                    return self._apply_space_crd(crd)
+                elif isinstance(crd, AgentCRD):
+                    return self._apply_agent_crd(crd)
+                elif isinstance(crd, TaskCRD):
+                    return self._apply_task_crd(crd)
+                elif isinstance(crd, PathScanCRD):
+                    return self._apply_pathscan_crd(crd)
+                elif isinstance(crd, DatabaseCRD):
+                    return self._apply_database_crd(crd)
+                elif isinstance(crd, CommandPolicyCRD):
+                    return self._apply_commandpolicy_crd(crd)
+                elif isinstance(crd, OrganizationCRD):
+                    return self._apply_organization_crd(crd)
+                elif isinstance(crd, AICodeConfigCRD):
+                    return self._apply_aicode_config_crd(crd)
+                else:
+                    raise CRDApplierError(f"Unknown CRD type: {type(crd)}")
+            except Exception as e:
+                logger.error(f"Failed to apply CRD {crd.metadata.name}: {e}")
+                raise CRDApplierError(f"Failed to apply CRD {crd.metadata.name}: {e}")
     
+    @traced("CRDApplier.apply_multiple")
     def apply_multiple(self, crds: List[Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]]) -> List[bool]:
         """Apply multiple CRDs to the system"""
         from rich.console import Console
@@ -60,7 +66,6 @@ class CRDApplier:
         from rich.panel import Panel
         from rich.text import Text
         from rich.table import Table
-        import time
         import logging
         
         # Store current applier instance for SpaceManager access (workaround)
@@ -71,18 +76,8 @@ class CRDApplier:
         space_sessions = []  # Track space sessions for post-processing
         
         # Temporarily adjust log levels to reduce noise during Rich display
-        original_log_levels = {}
-        loggers_to_quiet = [
-            'haconiwa.task.manager', 
-            'haconiwa.space.manager', 
-            'haconiwa.core.applier',
-            'haconiwa.agent.claude_integration',
-            'haconiwa.legal.framework'
-        ]
-        for logger_name in loggers_to_quiet:
-            log = logging.getLogger(logger_name)
-            original_log_levels[logger_name] = log.level
-            log.setLevel(logging.WARNING)  # Only show warnings and errors
+        original_log_levels = self._quiet_apply_loggers()
+        self._in_batch = True
         
         try:
             # Display header
@@ -126,6 +121,11 @@ class CRDApplier:
             console.print(summary_table)
             console.print()
             
+            # Build dependency graph so independent CRDs can be applied concurrently
+            graph = ApplyGraph(crds)
+            logger.info(f"Apply graph: {len(crds)} nodes, critical path {graph.critical_path_length()}, "
+                        f"max_workers={self.max_workers}")
+
             # Apply CRDs with progress tracking
             with Progress(
                 SpinnerColumn(),
@@ -135,101 +135,274 @@ class CRDApplier:
                 TimeElapsedColumn(),
                 console=console
             ) as progress:
-                
+
                 main_task = progress.add_task("[cyan]設定適用中...", total=len(crds))
-                
-                for i, crd in enumerate(crds):
+                running_tasks = {}
+
+                def _describe(crd) -> str:
                     crd_type = type(crd).__name__.replace("CRD", "")
-                    task_desc = f"[{crd_type}] {crd.metadata.name}"
-                    
-                    current_task = progress.add_task(f"{task_desc} を適用中", total=1)
-                    
-                    try:
-                        start_time = time.time()
-                        result = self.apply(crd)
-                        end_time = time.time()
-                        
-                        results.append(result)
-                        
-                        # Track Space CRDs for later pane updates
-                        if isinstance(crd, SpaceCRD) and result:
-                            company = crd.spec.nations[0].cities[0].villages[0].companies[0]
-                            space_sessions.append({
-                                "session_name": company.name,
-                                "space_ref": company.name
-                            })
-                        
-                        # Update progress
-                        progress.update(current_task, completed=1)
-                        progress.update(main_task, advance=1)
-                        
+                    return f"[{crd_type}] {crd.metadata.name}"
+
+                def _on_start(index, crd):
+                    running_tasks[index] = progress.add_task(f"{_describe(crd)} を適用中", total=1)
+
+                def _on_complete(index, crd, result, elapsed, error):
+                    current_task = running_tasks.pop(index)
+                    progress.update(current_task, completed=1)
+                    progress.update(main_task, advance=1)
+
+                    if error is not None:
+                        logger.error(f"Failed to apply CRD {crd.metadata.name}: {error}")
+                        console.print(f"  ❌ {_describe(crd)} [red]失敗: {str(error)[:50]}...[/red]")
+                    else:
                         # Display result
                         status_icon = "✅" if result else "❌"
-                        elapsed = f"{end_time - start_time:.1f}s"
-                        console.print(f"  {status_icon} {task_desc} [dim]({elapsed})[/dim]")
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to apply CRD {crd.metadata.name}: {e}")
-                        results.append(False)
-                        progress.update(current_task, completed=1)
-                        progress.update(main_task, advance=1)
-                        console.print(f"  ❌ {task_desc} [red]失敗: {str(e)[:50]}...[/red]")
-                    
+                        console.print(f"  {status_icon} {_describe(crd)} [dim]({elapsed:.1f}s)[/dim]")
+
                     progress.remove_task(current_task)
+
+                results = graph.run(
+                    self.apply,
+                    max_workers=self.max_workers,
+                    on_start=_on_start,
+                    on_complete=_on_complete
+                )
+
+            self._save_task_registry()
             
-            # Post-processing phase
-            if space_sessions:
-                console.print()
-                console.print(Panel.fit(
-                    "[bold yellow]🔄 後処理フェーズ[/bold yellow]\n"
-                    "[dim]タスクブランチ割り当てとエージェントデスクを更新中...[/dim]",
-                    style="yellow"
-                ))
-                
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=console
-                ) as progress:
-                    
-                    # Task assignment updates
-                    task1 = progress.add_task("[yellow]タスクブランチ割り当てを再更新中...")
-                    self._update_all_space_task_assignments(space_sessions)
-                    progress.update(task1, completed=1)
-                    console.print("  ✅ タスクブランチ割り当てを更新しました")
-                    
-                    # Agent pane updates  
-                    task2 = progress.add_task("[yellow]エージェントデスクディレクトリを更新中...")
-                    updated_panes = self._update_all_agent_pane_directories(space_sessions)
-                    progress.update(task2, completed=1)
-                    console.print(f"  ✅ {updated_panes} 個のエージェントデスクを更新しました")
-            
-            # Final summary
-            console.print()
-            success_count = sum(results)
-            total_count = len(results)
+            # Track Spaces (and Spaces of applied Tasks) for later pane updates (in file order)
+            for crd, result in zip(crds, results):
+                if result:
+                    self._track_space_session(space_sessions, crd)
             
-            if success_count == total_count:
-                summary_style = "green"
-                summary_icon = "🎉"
-                summary_text = "全設定の適用が成功しました！"
-            else:
-                summary_style = "red"
-                summary_icon = "⚠️"
-                summary_text = f"{success_count}/{total_count} 個の設定の適用が成功しました"
+            self._run_post_processing(console, space_sessions)
+            self._print_apply_summary(console, sum(results), len(results))
             
+        finally:
+            self._in_batch = False
+            # Restore original log levels
+            for logger_name, original_level in original_log_levels.items():
+                logging.getLogger(logger_name).setLevel(original_level)
+        
+        return results
+    
+    @traced("CRDApplier.apply_stream")
+    def apply_stream(self, crds: Iterable[Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]],
+                     on_result: Optional[Callable[[Any, bool], None]] = None,
+                     batch_size: int = 64) -> Tuple[int, int]:
+        """Apply CRDs as they arrive from an iterator.
+        
+        CRDs are applied in small batches through the dependency graph, so the
+        first resources take effect while the rest of the file is still being
+        parsed. Tasks and Agents whose Space has not been seen yet are buffered
+        until it arrives (or until the end of the stream). Task and Agent
+        models are released after they are applied; ``on_result`` is called
+        with each CRD and its result. Returns (success_count, total_count).
+        """
+        from rich.console import Console
+        from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+        from rich.panel import Panel
+        
+        # Store current applier instance for SpaceManager access (workaround)
+        sys.modules['__main__']._current_applier = self
+        
+        console = Console()
+        space_sessions = []
+        pending: Dict[str, List[Any]] = {}  # spaceRef -> CRDs waiting for their Space
+        known_companies = self._applied_company_names()
+        batch: List[Any] = []
+        counts = {"success": 0, "total": 0}
+        batch_size = max(1, batch_size)
+        
+        original_log_levels = self._quiet_apply_loggers()
+        self._in_batch = True
+        
+        try:
+            console.print("\n")
             console.print(Panel.fit(
-                f"[bold {summary_style}]{summary_icon} {summary_text}[/bold {summary_style}]",
-                style=summary_style
+                "[bold cyan]🚀 Haconiwa CRD設定適用 (ストリーミング)[/bold cyan]\n"
+                "[dim]ファイルを読み込みながら順次適用中...[/dim]",
+                style="cyan"
             ))
+            console.print()
+            
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TimeElapsedColumn(),
+                console=console
+            ) as progress:
+                main_task = progress.add_task("[cyan]設定適用中... (0 件完了)", total=None)
+                
+                def _on_complete(index, crd, result, elapsed, error):
+                    crd_type = type(crd).__name__.replace("CRD", "")
+                    if error is not None:
+                        logger.error(f"Failed to apply CRD {crd.metadata.name}: {error}")
+                        console.print(f"  ❌ [{crd_type}] {crd.metadata.name} [red]失敗: {str(error)[:50]}...[/red]")
+                    else:
+                        status_icon = "✅" if result else "❌"
+                        console.print(f"  {status_icon} [{crd_type}] {crd.metadata.name} [dim]({elapsed:.1f}s)[/dim]")
+                
+                def _flush():
+                    if not batch:
+                        return
+                    graph = ApplyGraph(batch)
+                    results = graph.run(self.apply, max_workers=self.max_workers, on_complete=_on_complete)
+                    for crd, result in zip(batch, results):
+                        counts["total"] += 1
+                        counts["success"] += int(result)
+                        if result:
+                            self._track_space_session(space_sessions, crd)
+                        if on_result:
+                            on_result(crd, result)
+                        if isinstance(crd, (TaskCRD, AgentCRD)):
+                            # Nothing looks up tasks/agents by key; keep memory flat
+                            self.applied_resources.pop(f"{crd.kind}/{crd.metadata.name}", None)
+                    progress.update(main_task, description=f"[cyan]設定適用中... ({counts['total']} 件完了)")
+                    batch.clear()
+                
+                for crd in crds:
+                    space_ref = crd.spec.spaceRef if isinstance(crd, (TaskCRD, AgentCRD)) else None
+                    if space_ref and space_ref not in known_companies:
+                        # Spaces may have been registered since the stream started
+                        known_companies |= self._applied_company_names()
+                    if space_ref and space_ref not in known_companies:
+                        pending.setdefault(space_ref, []).append(crd)
+                        continue
+                    
+                    batch.append(crd)
+                    if isinstance(crd, SpaceCRD):
+                        for company in ApplyGraph.iter_companies(crd):
+                            known_companies.add(company.name)
+                            batch.extend(pending.pop(company.name, []))
+                    
+                    if len(batch) >= batch_size:
+                        _flush()
+                
+                # Resources whose Space never appeared are applied last, as before
+                for space_ref, waiting in pending.items():
+                    logger.warning(f"Space for '{space_ref}' not found in stream; applying {len(waiting)} resources anyway")
+                    batch.extend(waiting)
+                pending.clear()
+                _flush()
             
+            self._save_task_registry()
+            self._run_post_processing(console, space_sessions)
+            self._print_apply_summary(console, counts["success"], counts["total"])
+        
         finally:
-            # Restore original log levels
+            self._in_batch = False
             for logger_name, original_level in original_log_levels.items():
                 logging.getLogger(logger_name).setLevel(original_level)
         
-        return results
+        return counts["success"], counts["total"]
+    
+    @traced("CRDApplier.save_task_registry")
+    def _save_task_registry(self):
+        """Persist TaskManager registry indexes of changed spaces"""
+        try:
+            from ..task.manager import TaskManager
+            TaskManager().save_registry()
+        except Exception as e:
+            logger.warning(f"Failed to save task registry: {e}")
+    
+    def _track_space_session(self, space_sessions: List[Dict[str, str]], crd) -> None:
+        """Add the session of an applied Space, or of the Space a Task belongs to.
+        
+        Under delta apply a Space may be unchanged while its Tasks changed; the
+        post-processing still has to move its panes into the new worktrees.
+        """
+        space = crd if isinstance(crd, SpaceCRD) else None
+        if isinstance(crd, TaskCRD) and crd.spec.spaceRef:
+            for resource_key, resource in list(self.applied_resources.items()):
+                if resource_key.startswith("Space/") and isinstance(resource, SpaceCRD) and any(
+                        company.name == crd.spec.spaceRef for company in ApplyGraph.iter_companies(resource)):
+                    space = resource
+                    break
+        if space is None:
+            return
+        company = space.spec.nations[0].cities[0].villages[0].companies[0]
+        session = {"session_name": company.name, "space_ref": company.name}
+        if session not in space_sessions:
+            space_sessions.append(session)
+    
+    def _applied_company_names(self) -> set:
+        """Get company names defined by applied Space CRDs"""
+        names = set()
+        for resource_key, resource in list(self.applied_resources.items()):
+            if resource_key.startswith("Space/") and isinstance(resource, SpaceCRD):
+                names.update(company.name for company in ApplyGraph.iter_companies(resource))
+        return names
+    
+    def _quiet_apply_loggers(self) -> Dict[str, int]:
+        """Temporarily raise log levels to reduce noise during Rich display"""
+        original_log_levels = {}
+        for logger_name in [
+            'haconiwa.task.manager',
+            'haconiwa.space.manager',
+            'haconiwa.core.applier',
+            'haconiwa.agent.claude_integration',
+            'haconiwa.legal.framework'
+        ]:
+            log = logging.getLogger(logger_name)
+            original_log_levels[logger_name] = log.level
+            log.setLevel(logging.WARNING)  # Only show warnings and errors
+        return original_log_levels
+    
+    @traced("CRDApplier.run_post_processing")
+    def _run_post_processing(self, console, space_sessions: List[Dict[str, str]]):
+        """Re-update task assignments and agent desks after all CRDs are applied"""
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+        from rich.panel import Panel
+        
+        if not space_sessions:
+            return
+        
+        console.print()
+        console.print(Panel.fit(
+            "[bold yellow]🔄 後処理フェーズ[/bold yellow]\n"
+            "[dim]タスクブランチ割り当てとエージェントデスクを更新中...[/dim]",
+            style="yellow"
+        ))
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            
+            # Task assignment updates
+            task1 = progress.add_task("[yellow]タスクブランチ割り当てを再更新中...")
+            self._update_all_space_task_assignments(space_sessions)
+            progress.update(task1, completed=1)
+            console.print("  ✅ タスクブランチ割り当てを更新しました")
+            
+            # Agent pane updates  
+            task2 = progress.add_task("[yellow]エージェントデスクディレクトリを更新中...")
+            updated_panes = self._update_all_agent_pane_directories(space_sessions)
+            progress.update(task2, completed=1)
+            console.print(f"  ✅ {updated_panes} 個のエージェントデスクを更新しました")
+    
+    def _print_apply_summary(self, console, success_count: int, total_count: int):
+        """Print final apply summary panel"""
+        from rich.panel import Panel
+        
+        console.print()
+        if success_count == total_count:
+            summary_style = "green"
+            summary_icon = "🎉"
+            summary_text = "全設定の適用が成功しました！"
+        else:
+            summary_style = "red"
+            summary_icon = "⚠️"
+            summary_text = f"{success_count}/{total_count} 個の設定の適用が成功しました"
+        
+        console.print(Panel.fit(
+            f"[bold {summary_style}]{summary_icon} {summary_text}[/bold {summary_style}]",
+            style=summary_style
+        ))
     
+    @traced("CRDApplier.update_all_agent_pane_directories")
     def _update_all_agent_pane_directories(self, space_sessions: List[Dict[str, str]]):
         """Update agent pane directories for all space sessions"""
         if not space_sessions:
@@ -282,6 +455,7 @@ class CRDApplier:
             logger.error(f"Failed to coordinate agent pane directories: {e}")
             return 0
     
+    @traced("CRDApplier.update_all_space_task_assignments")
     def _update_all_space_task_assignments(self, space_sessions: List[Dict[str, str]]):
         """Re-update task assignments for all space sessions after all CRDs are applied"""
         try:
@@ -295,16 +469,10 @@ class CRDApplier:
                 space_ref = space_info["space_ref"]
                 
                 # Get all task assignments for this space
-                task_assignments = {}
-                for task_name, task_data in task_manager.tasks.items():
-                    assignee = task_data["config"].get("assignee")
-                    task_space_ref = task_data["config"].get("space_ref")
-                    if assignee and task_space_ref == space_ref:
-                        task_assignments[assignee] = {
-                            "name": task_name,
-                            "worktree_path": f"tasks/{task_name}",
-                            "config": task_data["config"]
-                        }
+                base_path = self._get_company_base_path(space_ref)
+                task_assignments = task_manager.get_space_assignments(
+                    space_ref, Path(base_path) if base_path else None
+                )
                 
                 logger.info(f"Re-updating task assignments for space {space_ref}: {len(task_assignments)} tasks")
                 for assignee, task_info in task_assignments.items():
@@ -352,23 +520,15 @@ class CRDApplier:
             from ..task.manager import TaskManager
             task_manager = TaskManager()
             
-            # Set default branch from Space configuration
-            if config.get("git_repo") and config["git_repo"].get("defaultBranch"):
-                default_branch = config["git_repo"]["defaultBranch"]
-                task_manager.set_default_branch(default_branch)
-                logger.info(f"Set TaskManager default branch to: {default_branch}")
-            
-            # Pass task assignments to SpaceManager
-            task_assignments = {}
-            for task_name, task_data in task_manager.tasks.items():
-                assignee = task_data["config"].get("assignee")
-                space_ref = task_data["config"].get("space_ref")
-                if assignee and space_ref == config['name']:
-                    task_assignments[assignee] = {
-                        "name": task_name,
-                        "worktree_path": f"tasks/{task_name}",
-                        "config": task_data["config"]
-                    }
+            # Task workers share the TaskManager singleton; hold its lock while reading assignments
+            # (the default branch is pinned per task config, not set on the shared manager)
+            with task_manager.lock:
+                # Pass task assignments to SpaceManager
+                # Falls back to the persisted registry when no task of this space is in memory
+                base_path = self._get_company_base_path(config['name'])
+                task_assignments = task_manager.get_space_assignments(
+                    config['name'], Path(base_path) if base_path else None
+                )
             
             # Display task assignments if any exist
             if task_assignments:
@@ -417,6 +577,7 @@ class CRDApplier:
             logger.error(f"Space CRD {crd.metadata.name} 適用中に例外が発生: {e}")
             return False
     
+    @traced("CRDApplier.apply_hierarchical_legal_framework")
     def _apply_hierarchical_legal_framework(self, crd: SpaceCRD, config: dict) -> bool:
         """Apply Hierarchical Legal Framework from Space CRD"""
         try:
@@ -486,6 +647,8 @@ class CRDApplier:
             
             if success:
                 console.print(f"    ✅ リーガルフレームワークを作成しました: {len(framework.created_directories)} ディレクトリ")
+                if framework.skipped_files:
+                    console.print(f"    ⏭️  変更なしのファイルをスキップ: {framework.skipped_files}/{framework.written_files + framework.skipped_files}")
                 logger.info(f"✅ 階層リーガルフレームワークの作成が成功しました")
                 logger.info(f"   📁 法務ディレクトリ: {len(framework.created_directories)}")
                 logger.info(f"   🏛️ フレームワーク基準ディレクトリ: {base_path}")
@@ -739,15 +902,25 @@ class CRDApplier:
         from ..task.manager import TaskManager
         task_manager = TaskManager()  # This will get the singleton instance
         
-        # Get company agent defaults and git config from applied Space CRD
-        company_agent_defaults = self._get_company_agent_defaults(crd.spec.spaceRef)
+        # Get git config from applied Space CRD; its default branch is pinned in the task config
         git_config = self._get_company_git_config(crd.spec.spaceRef)
         
-        # Set default branch if found in git config
-        if git_config and git_config.get("defaultBranch"):
-            default_branch = git_config["defaultBranch"]
-            task_manager.set_default_branch(default_branch)
-            logger.info(f"Set TaskManager default branch to: {default_branch} (from Space config)")
+        task_config = self._task_config(crd, git_config)
+        
+        # Apply task configuration
+        result = task_manager.create_task(task_config)
+        
+        # Batch applies persist the registry once at the end
+        if not self._in_batch:
+            self._save_task_registry()
+        
+        logger.info(f"Task CRD {crd.metadata.name} applied successfully: {result}")
+        return result
+    
+    def _task_config(self, crd: TaskCRD, git_config: Optional[dict] = None) -> dict:
+        """Build the TaskManager configuration of a Task CRD"""
+        # Get company agent defaults from applied Space CRD
+        company_agent_defaults = self._get_company_agent_defaults(crd.spec.spaceRef)
         
         # Create task configuration
         task_config = {
@@ -761,6 +934,10 @@ class CRDApplier:
             "company_agent_defaults": company_agent_defaults
         }
         
+        # Pin the default branch per task; TaskManager is shared across workers
+        if git_config and git_config.get("defaultBranch"):
+            task_config["default_branch"] = git_config["defaultBranch"]
+        
         # Add env_files from task spec or from applier instance
         task_env_files = crd.spec.envFiles if hasattr(crd.spec, 'envFiles') and crd.spec.envFiles else []
         applier_env_files = self.env_files if self.env_files else []
@@ -774,17 +951,13 @@ class CRDApplier:
         if combined_env_files:
             task_config["env_files"] = combined_env_files
         
-        # Apply task configuration
-        result = task_manager.create_task(task_config)
-        
-        logger.info(f"Task CRD {crd.metadata.name} applied successfully: {result}")
-        return result
+        return task_config
     
     def _get_company_agent_defaults(self, space_ref: str) -> dict:
         """Get company agent defaults from applied Space CRD"""
         try:
             # Find the Space CRD for this space_ref
-            for resource_key, resource in self.applied_resources.items():
+            for resource_key, resource in list(self.applied_resources.items()):
                 if resource_key.startswith("Space/") and hasattr(resource, 'metadata'):
                     space_crd = resource
                     # Find the company in the Space CRD
@@ -808,7 +981,7 @@ class CRDApplier:
         """Get company git config from applied Space CRD"""
         try:
             # Find the Space CRD for this space_ref
-            for resource_key, resource in self.applied_resources.items():
+            for resource_key, resource in list(self.applied_resources.items()):
                 if resource_key.startswith("Space/") and hasattr(resource, 'metadata'):
                     space_crd = resource
                     # Find the company in the Space CRD
@@ -1041,7 +1214,7 @@ class CRDApplier:
         """Get Organization base path for the given space_ref"""
         try:
             # Find Organization CRD that matches the space_ref company
-            for resource_key, resource in self.applied_resources.items():
+            for resource_key, resource in list(self.applied_resources.items()):
                 if resource_key.startswith("Organization/") and hasattr(resource, 'spec'):
                     # Check if this organization references the space
                     # For now, use a simple naming convention match
@@ -1052,6 +1225,57 @@ class CRDApplier:
             logger.error(f"Error getting organization base path: {e}")
             return None
     
+    def register_unchanged(self, crd) -> None:
+        """Register a CRD that is unchanged since the last apply without re-applying it"""
+        if isinstance(crd, TaskCRD):
+            # Re-applied Spaces read desk assignments from TaskManager; no worktree is touched
+            from ..task.manager import TaskManager
+            git_config = self._get_company_git_config(crd.spec.spaceRef)
+            TaskManager().register_task(self._task_config(crd, git_config))
+            return
+        self.applied_resources[f"{crd.kind}/{crd.metadata.name}"] = crd
+        if isinstance(crd, AICodeConfigCRD):
+            self.ai_code_configs[crd.spec.targetCompany] = crd
+    
+    def get_resource_outputs(self, crd) -> dict:
+        """Get outputs of an applied CRD (session names, paths) for the state store"""
+        outputs = {}
+        try:
+            if isinstance(crd, SpaceCRD):
+                company = crd.spec.nations[0].cities[0].villages[0].companies[0]
+                base_path = Path(company.basePath or f"./{crd.metadata.name}").resolve()
+                outputs["session_name"] = company.name
+                if base_path.exists():
+                    outputs["base_path"] = str(base_path)
+            elif isinstance(crd, TaskCRD):
+                outputs["branch"] = crd.spec.branch
+                if crd.spec.spaceRef:
+                    outputs["space_ref"] = crd.spec.spaceRef
+                    base_path = self._get_company_base_path(crd.spec.spaceRef)
+                    if crd.spec.worktree and base_path:
+                        worktree_path = Path(base_path).resolve() / "tasks" / crd.metadata.name
+                        if worktree_path.exists():
+                            outputs["worktree_path"] = str(worktree_path)
+            elif isinstance(crd, OrganizationCRD):
+                base_path = Path(crd.spec.basePath or f"./{crd.metadata.name}").resolve()
+                if base_path.exists():
+                    outputs["base_path"] = str(base_path)
+        except Exception as e:
+            logger.debug(f"Could not collect outputs for {crd.metadata.name}: {e}")
+        return outputs
+    
+    def _get_company_base_path(self, space_ref: str) -> str:
+        """Get company base path from applied Space CRD"""
+        for resource_key, resource in list(self.applied_resources.items()):
+            if resource_key.startswith("Space/") and isinstance(resource, SpaceCRD):
+                for nation in resource.spec.nations:
+                    for city in nation.cities:
+                        for village in city.villages:
+                            for company in village.companies:
+                                if company.name == space_ref:
+                                    return company.basePath or f"./{resource.metadata.name}"
+        return None
+    
     def get_applied_resources(self) -> dict:
         """Get list of applied resources"""
         return self.applied_resources.copy()
@@ -0,0 +1,183 @@
+"""
+Dependency graph for concurrent CRD apply in Haconiwa v1.0
+"""
+
+import contextvars
+import heapq
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .crd.models import (
+    SpaceCRD, AgentCRD, TaskCRD, OrganizationCRD, AICodeConfigCRD
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ApplyGraphError(Exception):
+    """Apply graph error"""
+    pass
+
+
+class ApplyGraph:
+    """DAG of CRDs built from their references.
+
+    Edges (dependent → dependency):
+      - Space → Organization referenced by a company's ``organizationRef``
+      - Space → previous Space (SpaceManager is a process-wide singleton)
+      - Task/Agent → Space that defines the company named by ``spaceRef``
+      - Task → AICodeConfig whose ``targetCompany`` is the task's ``spaceRef``
+      - Task → previous Task of the same ``spaceRef`` (shared ``tasks/main`` repo)
+
+    References to resources that are not part of the graph are ignored, so a
+    Task whose Space was applied earlier does not block.
+    """
+
+    def __init__(self, crds: List[Any]):
+        self.crds = list(crds)
+        self.dependencies: Dict[int, Set[int]] = {i: set() for i in range(len(self.crds))}
+        self.dependents: Dict[int, Set[int]] = {i: set() for i in range(len(self.crds))}
+        self._build()
+
+    def _add_edge(self, node: int, dependency: int):
+        if node != dependency:
+            self.dependencies[node].add(dependency)
+            self.dependents[dependency].add(node)
+
+    def _build(self):
+        organizations: Dict[str, int] = {}
+        company_spaces: Dict[str, int] = {}
+        aicode_configs: Dict[str, List[int]] = {}
+
+        for index, crd in enumerate(self.crds):
+            if isinstance(crd, OrganizationCRD):
+                organizations[crd.metadata.name] = index
+            elif isinstance(crd, SpaceCRD):
+                for company in self.iter_companies(crd):
+                    company_spaces.setdefault(company.name, index)
+            elif isinstance(crd, AICodeConfigCRD):
+                aicode_configs.setdefault(crd.spec.targetCompany, []).append(index)
+
+        previous_space = None
+        previous_task_by_space: Dict[str, int] = {}
+
+        for index, crd in enumerate(self.crds):
+            if isinstance(crd, SpaceCRD):
+                for company in self.iter_companies(crd):
+                    org_ref = getattr(company, 'organizationRef', None)
+                    if org_ref and org_ref in organizations:
+                        self._add_edge(index, organizations[org_ref])
+                if previous_space is not None:
+                    self._add_edge(index, previous_space)
+                previous_space = index
+
+            elif isinstance(crd, TaskCRD):
+                space_ref = crd.spec.spaceRef
+                if space_ref:
+                    if space_ref in company_spaces:
+                        self._add_edge(index, company_spaces[space_ref])
+                    for config_index in aicode_configs.get(space_ref, []):
+                        self._add_edge(index, config_index)
+                    if space_ref in previous_task_by_space:
+                        self._add_edge(index, previous_task_by_space[space_ref])
+                    previous_task_by_space[space_ref] = index
+
+            elif isinstance(crd, AgentCRD):
+                space_ref = crd.spec.spaceRef
+                if space_ref and space_ref in company_spaces:
+                    self._add_edge(index, company_spaces[space_ref])
+
+    @staticmethod
+    def iter_companies(crd: SpaceCRD):
+        """Yield every company defined in a Space CRD"""
+        for nation in crd.spec.nations:
+            for city in nation.cities:
+                for village in city.villages:
+                    for company in village.companies:
+                        yield company
+
+    def topological_order(self) -> List[int]:
+        """Node indices with every dependency before its dependents.
+
+        Ties keep file order. Nodes on a dependency cycle are left out;
+        ``run`` reports the cycle.
+        """
+        remaining = {i: len(self.dependencies[i]) for i in range(len(self.crds))}
+        ready = [i for i in range(len(self.crds)) if remaining[i] == 0]
+        heapq.heapify(ready)
+        order: List[int] = []
+        while ready:
+            index = heapq.heappop(ready)
+            order.append(index)
+            for dependent in self.dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+        return order
+
+    def critical_path_length(self) -> int:
+        """Number of nodes on the longest dependency chain"""
+        depth: Dict[int, int] = {}
+        for index in self.topological_order():
+            depth[index] = 1 + max((depth[d] for d in self.dependencies[index]), default=0)
+        return max(depth.values(), default=0)
+
+    def run(
+        self,
+        apply_fn: Callable[[Any], bool],
+        max_workers: int = 4,
+        on_start: Optional[Callable[[int, Any], None]] = None,
+        on_complete: Optional[Callable[[int, Any, bool, float, Optional[Exception]], None]] = None,
+    ) -> List[bool]:
+        """Apply all CRDs, running independent nodes concurrently.
+
+        ``on_start`` and ``on_complete`` are invoked on the calling thread, so
+        they may safely drive Rich progress displays. A failed node does not
+        cancel its dependents; they are still applied, as in sequential mode.
+        """
+        total = len(self.crds)
+        results: List[bool] = [False] * total
+        remaining = {i: len(self.dependencies[i]) for i in range(total)}
+        ready = [i for i in range(total) if remaining[i] == 0]
+        heapq.heapify(ready)
+        running = {}
+        started_at = {}
+        completed = 0
+
+        def _run_node(node_index: int) -> bool:
+            return apply_fn(self.crds[node_index])
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            while completed < total:
+                # Start ready nodes in file order while workers are free
+                while ready and len(running) < max(1, max_workers):
+                    index = heapq.heappop(ready)
+                    if on_start:
+                        on_start(index, self.crds[index])
+                    started_at[index] = time.time()
+                    # Copy the context so profiler spans of the node nest under the caller's span
+                    context = contextvars.copy_context()
+                    running[executor.submit(context.run, _run_node, index)] = index
+
+                if not running:
+                    raise ApplyGraphError("Dependency cycle detected between CRDs")
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    error = future.exception()
+                    result = bool(future.result()) if error is None else False
+                    results[index] = result
+                    completed += 1
+
+                    if on_complete:
+                        on_complete(index, self.crds[index], result, time.time() - started_at[index], error)
+
+                    for dependent in sorted(self.dependents[index]):
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            heapq.heappush(ready, dependent)
+
+        return results
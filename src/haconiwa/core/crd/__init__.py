@@ -6,8 +6,9 @@ from .models import (
     SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD
 )
 from .parser import CRDParser, CRDValidationError
+from .cache import CRDParseCache
 
 __all__ = [
     'SpaceCRD', 'AgentCRD', 'TaskCRD', 'PathScanCRD', 'DatabaseCRD', 'CommandPolicyCRD',
-    'CRDParser', 'CRDValidationError'
+    'CRDParser', 'CRDValidationError', 'CRDParseCache'
 ] 
\ No newline at end of file
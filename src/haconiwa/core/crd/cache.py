@@ -0,0 +1,167 @@
+"""
+Content-hash cache for parsed CRD documents
+"""
+
+import hashlib
+import io
+import logging
+import os
+import pickle
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached representation or CRD models change incompatibly
+CACHE_FORMAT_VERSION = "1"
+
+DEFAULT_CACHE_DIR = Path.home() / ".haconiwa" / "cache" / "crd"
+
+# A document separator is a line starting with "---" followed by whitespace or EOL
+_DOCUMENT_SEPARATOR = re.compile(r"^---(?=[ \t]|\r?$)", re.MULTILINE)
+
+
+def _is_directive(line: str) -> bool:
+    return line.startswith("%")
+
+
+def _is_blank_or_comment(line: str) -> bool:
+    stripped = line.strip()
+    return not stripped or stripped.startswith("#")
+
+
+def split_yaml_documents(yaml_content: str) -> List[str]:
+    """Split multi-document YAML text into per-document chunks without parsing"""
+    return list(iter_yaml_documents(io.StringIO(yaml_content)))
+
+
+def iter_yaml_documents(lines: Iterable[str]) -> Iterator[str]:
+    """Yield documents from an iterable of lines (e.g. an open file) one at a time.
+
+    A document starts at a ``---`` line; directive lines (``%YAML``, ``%TAG``)
+    directly before it belong to that document. Content after the marker
+    (``--- |``, ``--- !tag``) stays on the marker line. Joining the chunks
+    gives back the input, and only one document is held in memory.
+    """
+    buffer: List[str] = []
+    prelude: List[str] = []  # directives (and blank/comment lines) awaiting their "---"
+    for line in lines:
+        if prelude:
+            if _DOCUMENT_SEPARATOR.match(line):
+                if buffer:
+                    yield "".join(buffer)
+                buffer = prelude + [line]
+                prelude = []
+            elif _is_directive(line) or _is_blank_or_comment(line):
+                prelude.append(line)
+            else:
+                # Not followed by a document marker, so not a directive block
+                buffer.extend(prelude)
+                buffer.append(line)
+                prelude = []
+        elif _is_directive(line):
+            prelude.append(line)
+        elif buffer and _DOCUMENT_SEPARATOR.match(line):
+            yield "".join(buffer)
+            buffer = [line]
+        else:
+            buffer.append(line)
+    buffer.extend(prelude)
+    if buffer:
+        yield "".join(buffer)
+
+
+def is_empty_yaml_document(document: str) -> bool:
+    """Whether a document chunk holds only markers, directives, comments or whitespace"""
+    for line in document.splitlines():
+        if _is_blank_or_comment(line) or _is_directive(line) or line.rstrip() == "...":
+            continue
+        if _DOCUMENT_SEPARATOR.match(line) and _is_blank_or_comment(line[3:]):
+            continue
+        return False
+    return True
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("haconiwa")
+    except Exception:
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def _source_fingerprint() -> str:
+    """Hash of the model and parser sources, so editable installs never reuse stale entries"""
+    digest = hashlib.sha256()
+    for name in ("models.py", "parser.py"):
+        try:
+            digest.update((Path(__file__).parent / name).read_bytes())
+        except OSError:
+            digest.update(name.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CRDParseCache:
+    """Stores validated CRD models keyed by the SHA-256 of the document text.
+
+    Entries are pickled model objects under ``~/.haconiwa/cache/crd`` so a
+    cache hit skips both YAML parsing and pydantic validation.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+        self._salt = f"{CACHE_FORMAT_VERSION}:{_package_version()}:{_source_fingerprint()}:"
+
+    def key_for(self, document: str) -> str:
+        """Get cache key for a YAML document"""
+        return hashlib.sha256((self._salt + document).encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Any:
+        """Get cached CRD for key, or None on miss"""
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as f:
+                crd = pickle.load(f)
+            self.hits += 1
+            return crd
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, crd: Any) -> None:
+        """Store CRD for key (atomic replace, errors are non-fatal)"""
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(crd, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Could not write cache entry {path}: {e}")
+
+    def clear(self) -> int:
+        """Remove all cache entries, returning the number removed"""
+        removed = 0
+        if self.cache_dir.exists():
+            for entry in self.cache_dir.glob("*/*.pkl"):
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        """Get hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
@@ -4,12 +4,19 @@ CRD Parser for Haconiwa v1.0
 
 import yaml
 from pathlib import Path
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional, Iterator
 from pydantic import ValidationError
 
 from .models import (
     SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD
 )
+from .cache import CRDParseCache, is_empty_yaml_document, split_yaml_documents, iter_yaml_documents
+
+# Use libyaml bindings when available
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
 
 
 class CRDValidationError(Exception):
@@ -20,7 +27,8 @@ class CRDValidationError(Exception):
 class CRDParser:
     """CRD Parser for YAML to CRD objects"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[CRDParseCache] = None):
+        self.cache = cache
         self.crd_classes = {
             "Space": SpaceCRD,
             "Agent": AgentCRD,
@@ -36,7 +44,12 @@ class CRDParser:
     def parse_yaml(self, yaml_content: str) -> Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]:
         """Parse single YAML document to CRD object"""
         try:
-            data = yaml.safe_load(yaml_content)
+            if self.cache is not None:
+                crd = self._parse_document(yaml_content)
+                if crd is None:
+                    raise CRDValidationError("CRD must be a dictionary")
+                return crd
+            data = yaml.load(yaml_content, Loader=YAMLLoader)
             return self._parse_crd_data(data)
         except yaml.YAMLError as e:
             raise CRDValidationError(f"Invalid YAML: {e}")
@@ -46,7 +59,16 @@ class CRDParser:
     def parse_multi_yaml(self, yaml_content: str) -> List[Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]]:
         """Parse multi-document YAML to list of CRD objects"""
         try:
-            documents = yaml.safe_load_all(yaml_content)
+            if self.cache is not None:
+                # Per-document cache lookup; unchanged documents skip parse and validation
+                crds = []
+                for document in split_yaml_documents(yaml_content):
+                    crd = self._parse_document(document)
+                    if crd is not None:
+                        crds.append(crd)
+                return crds
+            
+            documents = yaml.load_all(yaml_content, Loader=YAMLLoader)
             crds = []
             for data in documents:
                 if data:  # Skip empty documents
@@ -79,6 +101,50 @@ class CRDParser:
         except Exception as e:
             raise CRDValidationError(f"Error reading file {file_path}: {e}")
     
+    def iter_multi_file(self, file_path: Path) -> Iterator[Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD, AICodeConfigCRD]]:
+        """Lazily parse a multi-document YAML file, yielding one CRD at a time"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for index, document in enumerate(iter_yaml_documents(f)):
+                    try:
+                        if self.cache is not None:
+                            crd = self._parse_document(document)
+                        else:
+                            data = yaml.load(document, Loader=YAMLLoader)
+                            crd = self._parse_crd_data(data) if data else None
+                    except yaml.YAMLError as e:
+                        raise CRDValidationError(f"Invalid YAML in document {index + 1}: {e}")
+                    except ValidationError as e:
+                        raise CRDValidationError(f"Validation error in document {index + 1}: {e}")
+                    if crd is not None:
+                        yield crd
+        except FileNotFoundError:
+            raise CRDValidationError(f"File not found: {file_path}")
+    
+    def _parse_document(self, document: str):
+        """Parse one YAML document through the cache (None for empty documents)"""
+        if is_empty_yaml_document(document):
+            return None
+        
+        key = self.cache.key_for(document)
+        crd = self.cache.get(key)
+        if crd is not None:
+            return crd
+        
+        data = yaml.load(document, Loader=YAMLLoader)
+        if not data:  # Skip empty documents
+            return None
+        
+        crd = self._parse_crd_data(data)
+        self.cache.put(key, crd)
+        return crd
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Get parse cache hit/miss counts"""
+        if self.cache is None:
+            return {"hits": 0, "misses": 0}
+        return self.cache.stats()
+    
     def _parse_crd_data(self, data: Dict[str, Any]) -> Union[SpaceCRD, AgentCRD, TaskCRD, PathScanCRD, DatabaseCRD, CommandPolicyCRD, OrganizationCRD]:
         """Parse CRD data dictionary to CRD object"""
         # Validate required fields
@@ -0,0 +1,184 @@
+"""
+Compiled gitignore-style path filter shared by the scanners
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob (``*``, ``?``, ``[...]``, ``**``) to regex source"""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                i += 2
+                if i < n and pattern[i] == "/":
+                    out.append("(?:.*/)?")  # "**/" - zero or more directories
+                    i += 1
+                else:
+                    out.append(".+" if i == n else ".*")  # trailing "/**" - everything inside
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_rule(line: str) -> Optional[Tuple[str, bool]]:
+    """Parse one gitignore line into (regex source, negated); None for blanks and comments"""
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the root
+    anchored = "/" in line
+    line = line.lstrip("/")
+    source = ("" if anchored else "(?:.*/)?") + translate_glob(line) + ("/" if dir_only else "/?")
+    return source, negated
+
+
+class RuleSet:
+    """Ordered rules compiled into one regex; the last matching rule wins.
+
+    Alternatives are emitted in reverse order, so the first alternative the
+    regex engine accepts is the last rule that matches.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns = [pattern for pattern in patterns if pattern is not None]
+        rules = [rule for rule in map(parse_rule, self.patterns) if rule is not None]
+        self.negated = [negated for _, negated in rules]
+        if rules:
+            alternatives = [f"(?P<r{i}>{source})" for i, (source, _) in reversed(list(enumerate(rules)))]
+            self.regex = re.compile("|".join(alternatives))
+        else:
+            self.regex = None
+
+    def __bool__(self) -> bool:
+        return self.regex is not None
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True if a rule selects path, False if a negated rule does, None if no rule matches"""
+        if self.regex is None:
+            return None
+        m = self.regex.fullmatch(path + "/" if is_dir else path)
+        if m is None:
+            return None
+        return not self.negated[int(m.lastgroup[1:])]
+
+
+class PathFilter:
+    """Ignore and include (whitelist) rules for paths relative to a scan root.
+
+    Both rule sets use gitignore syntax: ``*``/``?``/``[]`` globs, ``**``,
+    ``!`` negation, a leading or inner ``/`` to anchor, and a trailing ``/``
+    for directories only. Ignored directories are pruned, so their contents
+    are never visited. When include rules are given, a file is kept only if
+    it or one of its directories matches them.
+    """
+
+    def __init__(self, ignore: Iterable[str] = (), include: Iterable[str] = ()):
+        self.ignore = RuleSet(ignore)
+        self.include = RuleSet(include)
+        self._included_dirs: Dict[str, bool] = {}
+
+    @classmethod
+    def from_file(cls, path, include: Iterable[str] = ()) -> "PathFilter":
+        """Build a filter from a .gitignore-style file (missing file → no ignore rules)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(f.read().splitlines(), include)
+        except OSError:
+            return cls((), include)
+
+    def key(self) -> str:
+        """Stable description of the rules (for cache keys)"""
+        return repr((self.ignore.patterns, self.include.patterns))
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """Check path itself against ignore rules (parents are assumed already pruned)"""
+        return bool(self.ignore.match(path, is_dir))
+
+    def dir_included(self, path: str) -> bool:
+        """Check whether include rules select a directory or one of its parents"""
+        if not self.include:
+            return True
+        if path in ("", "."):
+            return False
+        cached = self._included_dirs.get(path)
+        if cached is None:
+            parent = os.path.dirname(path)
+            selected = self.include.match(path, True)
+            cached = selected if selected is not None else self.dir_included(parent)
+            self._included_dirs[path] = cached
+        return cached
+
+    def accepts_file(self, path: str, dir_included: Optional[bool] = None) -> bool:
+        """Check a file whose directory was not pruned"""
+        if self.is_ignored(path):
+            return False
+        if not self.include:
+            return True
+        selected = self.include.match(path, False)
+        if selected is not None:
+            return selected
+        if dir_included is None:
+            dir_included = self.dir_included(os.path.dirname(path))
+        return dir_included
+
+    def excludes(self, path: str, is_dir: bool = False) -> bool:
+        """Check an arbitrary relative path, including its parent directories"""
+        path = path.strip("/")
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            if self.is_ignored("/".join(parts[:depth]), True):
+                return True
+        if is_dir:
+            return self.is_ignored(path, True)
+        return not self.accepts_file(path)
+
+    def walk(self, root, relative_to: str = "") -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk with ignored directories pruned before descending and files filtered.
+
+        ``relative_to`` is root's path relative to the directory the rules
+        apply to, for walking a subtree of that directory.
+        """
+        root = os.fspath(root)
+        base = relative_to.strip("/")
+        for dirpath, dirnames, filenames in os.walk(root):
+            relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            if relative == ".":
+                relative = base
+            elif base:
+                relative = base + "/" + relative
+            prefix = relative + "/" if relative else ""
+            dirnames[:] = [name for name in dirnames if not self.is_ignored(prefix + name, True)]
+            included = self.dir_included(relative)
+            filenames = [name for name in filenames if self.accepts_file(prefix + name, included)]
+            yield dirpath, dirnames, filenames
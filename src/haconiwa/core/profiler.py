@@ -0,0 +1,221 @@
+"""
+Apply profiler for Haconiwa v1.0 - spans and Chrome trace export
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Child intervals of the innermost open span; copy the context into worker threads to keep nesting
+_parent_span: contextvars.ContextVar[Optional[List[tuple]]] = contextvars.ContextVar("haconiwa_parent_span", default=None)
+
+
+class Profiler:
+    """Collects timed spans from any thread.
+
+    Spans are stored as Chrome trace "complete" events, so the output of
+    ``write_chrome_trace`` opens directly in chrome://tracing or Perfetto.
+    Each span also gets a self time: its duration minus the wall time
+    covered by spans nested in it, including spans of worker threads that
+    run in a copied context.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.self_times: List[float] = []  # seconds, parallel to events
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self._thread_names: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, span_name: str, category: str = "haconiwa", **args):
+        """Time the enclosed block as one span"""
+        parent = _parent_span.get()
+        children: List[tuple] = []
+        token = _parent_span.set(children)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield args
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end = time.perf_counter()
+            _parent_span.reset(token)
+            if parent is not None:
+                parent.append((start, end))
+            if error is not None:
+                args["error"] = f"{type(error).__name__}: {error}"
+            self_time = max(0.0, end - start - _covered_time(children))
+            self.record(span_name, category, start, end - start, args, self_time)
+
+    def record(self, name: str, category: str, start: float, duration: float,
+               args: Optional[Dict[str, Any]] = None, self_time: Optional[float] = None) -> None:
+        """Record a finished span (start is a perf_counter value; self time defaults to duration)"""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.started_at) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {key: _jsonable(value) for key, value in args.items()}
+        with self._lock:
+            self.events.append(event)
+            self.self_times.append(duration if self_time is None else self_time)
+            self._thread_names[thread.ident] = thread.name
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Get trace in Chrome trace event format"""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._thread_names.items()
+            ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write trace JSON to path"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+    def summary(self, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Aggregate spans by name, sorted by self time (seconds)
+
+        Wrapper spans whose time is spent in nested spans rank by their own
+        work only; ``total`` still includes the nested time.
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(zip(self.events, self.self_times))
+        for event, self_time in events:
+            entry = totals.setdefault(event["name"], {
+                "name": event["name"], "category": event["cat"], "count": 0,
+                "self": 0.0, "total": 0.0, "max": 0.0
+            })
+            seconds = event["dur"] / 1e6
+            entry["count"] += 1
+            entry["self"] += self_time
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+        return sorted(totals.values(), key=lambda entry: entry["self"], reverse=True)[:top_n]
+
+    def slowest(self, top_n: int = 10, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the slowest individual spans"""
+        with self._lock:
+            events = [event for event in self.events if category is None or event["cat"] == category]
+        return sorted(events, key=lambda event: event["dur"], reverse=True)[:top_n]
+
+
+def _covered_time(intervals: List[tuple]) -> float:
+    """Wall time covered by possibly overlapping (start, end) intervals"""
+    covered = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return str(value)
+
+
+_active_profiler: Optional[Profiler] = None
+
+
+def start_profiling() -> Profiler:
+    """Start collecting spans process-wide"""
+    global _active_profiler
+    _active_profiler = Profiler()
+    return _active_profiler
+
+
+def stop_profiling() -> Optional[Profiler]:
+    """Stop collecting spans and return the profiler"""
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    return profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Get the active profiler (None when profiling is off)"""
+    return _active_profiler
+
+
+@contextmanager
+def span(span_name: str, category: str = "haconiwa", **args):
+    """Time the enclosed block if profiling is active"""
+    profiler = _active_profiler
+    if profiler is None:
+        yield args
+        return
+    with profiler.span(span_name, category, **args) as span_args:
+        yield span_args
+
+
+def traced(name: Optional[str] = None, category: str = "haconiwa") -> Callable:
+    """Decorator recording each call as a span if profiling is active"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_profiler is None:
+                return func(*args, **kwargs)
+            with _active_profiler.span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _command_name(argv: List[str]) -> str:
+    """Name a command by program and subcommand ("git clone", "tmux send-keys")"""
+    program = os.path.basename(argv[0]) if argv else "?"
+    rest = argv[1:]
+    if len(rest) >= 2 and rest[0] in ("-C", "-c"):
+        rest = rest[2:]  # git -C <path> <subcommand>
+    if rest and not rest[0].startswith("-"):
+        return f"{program} {rest[0]}"
+    return program
+
+
+def run_subprocess(args, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run that records argv, return code and duration when profiling"""
+    profiler = _active_profiler
+    if profiler is None:
+        return subprocess.run(args, **kwargs)
+
+    argv = [str(arg) for arg in args] if isinstance(args, (list, tuple)) else [str(args)]
+    with profiler.span(_command_name(argv), "subprocess", argv=argv) as span_args:
+        result = subprocess.run(args, **kwargs)
+        span_args["returncode"] = getattr(result, "returncode", None)
+        return result
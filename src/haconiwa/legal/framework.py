@@ -6,12 +6,20 @@ Hierarchical Legal Framework Module
 各階層レベルで適切な法的文書、システムプロンプト、権限ファイルを生成します。
 """
 
+import hashlib
+import json
 import os
+import tempfile
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from string import Template
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from ..core.profiler import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +33,14 @@ class HierarchicalLegalFramework:
         """
         self.base_path = Path(base_path)
         self.created_directories = []
-
+        self.written_files = 0
+        self.skipped_files = 0
+        self.max_workers = 8  # ファイル書き込みの並列数
+        self.manifest_file = self.base_path / ".haconiwa" / "legal-framework-manifest.json"
+        self._planned_directories: List[Path] = []
+        self._planned_files: List[Tuple[Path, str]] = []
+
+    @traced("HierarchicalLegalFramework.create_framework_from_yaml")
     def create_framework_from_yaml(self, yaml_spec: Dict[str, Any]) -> bool:
         """
         YAML設定から階層的法的フレームワークを作成
@@ -43,8 +58,12 @@ class HierarchicalLegalFramework:
             nations = yaml_spec.get('spec', {}).get('nations', [])
             for nation in nations:
                 self._create_nation_framework(nation)
+            
+            # 収集したディレクトリとファイルをまとめて書き込み
+            self._write_planned_files()
                 
             logger.info(f"階層的法的フレームワークの作成が完了しました。作成されたディレクトリ数: {len(self.created_directories)}")
+            logger.info(f"書き込みファイル数: {self.written_files}, 変更なしでスキップ: {self.skipped_files}")
             return True
             
         except Exception as e:
@@ -231,12 +250,12 @@ class HierarchicalLegalFramework:
 
     def _create_law_directory(self, path: Path, legal_framework: Dict[str, Any], 
                             level: str, name: str, description: str) -> None:
-        """法ディレクトリとその内容を作成"""
+        """法ディレクトリとその内容を作成予定に追加"""
         law_dir = legal_framework.get('lawDirectory', 'law')
         law_path = path / law_dir
         
-        # ディレクトリ作成
-        law_path.mkdir(parents=True, exist_ok=True)
+        # ディレクトリ作成 (実際の作成は _write_planned_files でまとめて行う)
+        self._planned_directories.append(law_path)
         self.created_directories.append(str(law_path))
         
         # 規則文書作成
@@ -250,84 +269,161 @@ class HierarchicalLegalFramework:
 
     def _create_rules_document(self, law_path: Path, legal_framework: Dict[str, Any], 
                              level: str, name: str, description: str) -> None:
-        """規則文書を作成"""
+        """規則文書を作成予定に追加"""
         # レベル別の規則ファイル名を取得
-        rules_mapping = {
-            'nation': 'globalRules',
-            'city': 'regionalRules', 
-            'village': 'localRules',
-            'company': 'projectRules',
-            'building': 'buildingRules',
-            'floor': 'floorRules',
-            'room': 'teamRules',
-            'desk': 'agentRules'
-        }
-        
-        rules_key = rules_mapping.get(level, 'rules')
+        rules_key = RULES_FILE_KEYS.get(level, 'rules')
         rules_filename = legal_framework.get(rules_key, f"{level}-rules.md")
-        rules_file = law_path / rules_filename
-        
-        # 規則文書内容作成
-        content = self._generate_rules_content(level, name, description)
         
-        with open(rules_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._planned_files.append((law_path / rules_filename, self._generate_rules_content(level, name, description)))
 
     def _create_system_prompts(self, law_path: Path, legal_framework: Dict[str, Any], 
                              level: str, name: str) -> None:
-        """システムプロンプトを作成"""
+        """システムプロンプトを作成予定に追加"""
         prompts_dir = legal_framework.get('systemPrompts', 'system-prompts')
         prompts_path = law_path / prompts_dir
-        prompts_path.mkdir(parents=True, exist_ok=True)
-        
-        prompt_file = prompts_path / f"{level}-agent-prompt.md"
-        content = self._generate_prompt_content(level, name)
+        self._planned_directories.append(prompts_path)
         
-        with open(prompt_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._planned_files.append((prompts_path / f"{level}-agent-prompt.md", self._generate_prompt_content(level, name)))
 
     def _create_permissions(self, law_path: Path, legal_framework: Dict[str, Any], 
                           level: str, name: str) -> None:
-        """権限ファイルを作成"""
+        """権限ファイルを作成予定に追加"""
         permissions_dir = legal_framework.get('permissions', 'permissions')
         permissions_path = law_path / permissions_dir
-        permissions_path.mkdir(parents=True, exist_ok=True)
+        self._planned_directories.append(permissions_path)
+        
+        # コード権限ファイル・ファイル権限ファイル (レベルと名前ごとに一度だけシリアライズ)
+        code_yaml, file_yaml = _render_permissions(level, name)
+        self._planned_files.append((permissions_path / "code-permissions.yaml", code_yaml))
+        self._planned_files.append((permissions_path / "file-permissions.yaml", file_yaml))
+
+    @traced("HierarchicalLegalFramework.write_planned_files")
+    def _write_planned_files(self) -> None:
+        """予定されたディレクトリとファイルを並列に作成 (内容が変わらないファイルはスキップ)"""
+        manifest = self._load_manifest()
+        directories = sorted(set(self._planned_directories))
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda directory: directory.mkdir(parents=True, exist_ok=True), directories))
+            results = list(executor.map(
+                lambda planned: self._write_if_changed(planned[0], planned[1], manifest),
+                self._planned_files
+            ))
+        
+        for key, entry, written in results:
+            manifest[key] = entry
+            if written:
+                self.written_files += 1
+            else:
+                self.skipped_files += 1
         
-        # コード権限ファイル
-        code_permissions = self._generate_code_permissions(level, name)
-        with open(permissions_path / "code-permissions.yaml", 'w', encoding='utf-8') as f:
-            yaml.dump(code_permissions, f, default_flow_style=False, allow_unicode=True)
+        if self.written_files:
+            self._save_manifest(manifest)
         
-        # ファイル権限ファイル
-        file_permissions = self._generate_file_permissions(level, name)
-        with open(permissions_path / "file-permissions.yaml", 'w', encoding='utf-8') as f:
-            yaml.dump(file_permissions, f, default_flow_style=False, allow_unicode=True)
+        self._planned_directories = []
+        self._planned_files = []
+
+    def _write_if_changed(self, file_path: Path, content: str,
+                          manifest: Dict[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any], bool]:
+        """内容ハッシュがマニフェストと一致し、ファイルが未変更ならスキップ"""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        key = self._manifest_key(file_path)
+        entry = manifest.get(key)
+        
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            stat = None
+        
+        if (entry and stat and entry.get("sha256") == digest
+                and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns):
+            return key, entry, False
+        
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        stat = file_path.stat()
+        return key, {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, True
+
+    def _manifest_key(self, file_path: Path) -> str:
+        try:
+            return str(file_path.relative_to(self.base_path))
+        except ValueError:
+            return str(file_path)
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """生成済みファイルのマニフェストを読み込み"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"マニフェストを読み込めませんでした {self.manifest_file}: {e}")
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """マニフェストをアトミックに保存"""
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.manifest_file.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.manifest_file)
+        except Exception as e:
+            logger.warning(f"マニフェストを保存できませんでした {self.manifest_file}: {e}")
 
     def _generate_rules_content(self, level: str, name: str, description: str) -> str:
         """規則文書の内容を生成"""
-        level_mapping = {
-            'nation': ('グローバル規則', 'Global Rules', 'Universal principles'),
-            'city': ('地域規則', 'Regional Rules', 'Regional guidelines'),
-            'village': ('ローカル規則', 'Local Rules', 'Local practices'),
-            'company': ('プロジェクト規則', 'Project Rules', 'Project policies'),
-            'building': ('建物規則', 'Building Rules', 'Building procedures'),
-            'floor': ('階層規則', 'Floor Rules', 'Floor coordination'),
-            'room': ('チーム規則', 'Team Rules', 'Team procedures'),
-            'desk': ('エージェント規則', 'Agent Rules', 'Agent behavior')
-        }
-        
-        japanese_title, english_title, english_desc = level_mapping.get(level, ('規則', 'Rules', 'Guidelines'))
-        
-        return f"""# {japanese_title} ({english_title})
+        return _render_rules(level, name, description)
+
+    def _generate_prompt_content(self, level: str, name: str) -> str:
+        """システムプロンプトの内容を生成"""
+        return _render_prompt(level, name)
+
+    def _generate_code_permissions(self, level: str, name: str) -> Dict[str, Any]:
+        """コード権限設定を生成"""
+        return _code_permissions(level, name)
+
+    def _generate_file_permissions(self, level: str, name: str) -> Dict[str, Any]:
+        """ファイル権限設定を生成"""
+        return _file_permissions(level, name)
+
+
+# レベル別の規則ファイル名キー
+RULES_FILE_KEYS = {
+    'nation': 'globalRules',
+    'city': 'regionalRules', 
+    'village': 'localRules',
+    'company': 'projectRules',
+    'building': 'buildingRules',
+    'floor': 'floorRules',
+    'room': 'teamRules',
+    'desk': 'agentRules'
+}
+
+# レベル別の規則タイトル (日本語, 英語, 英語説明)
+LEVEL_TITLES = {
+    'nation': ('グローバル規則', 'Global Rules', 'Universal principles'),
+    'city': ('地域規則', 'Regional Rules', 'Regional guidelines'),
+    'village': ('ローカル規則', 'Local Rules', 'Local practices'),
+    'company': ('プロジェクト規則', 'Project Rules', 'Project policies'),
+    'building': ('建物規則', 'Building Rules', 'Building procedures'),
+    'floor': ('階層規則', 'Floor Rules', 'Floor coordination'),
+    'room': ('チーム規則', 'Team Rules', 'Team procedures'),
+    'desk': ('エージェント規則', 'Agent Rules', 'Agent behavior')
+}
+
+_RULES_TEMPLATE = Template("""# ${japanese_title} (${english_title})
 
 ## 概要 (Overview)
-{description}
-{english_desc} for {name}
+${description}
+${english_desc} for ${name}
 
 ## 階層レベル (Hierarchy Level)
-- **レベル**: {level.title()}
-- **名前**: {name}
-- **適用範囲**: {level}レベルのすべてのエージェント
+- **レベル**: ${level_title}
+- **名前**: ${name}
+- **適用範囲**: ${level}レベルのすべてのエージェント
 
 ## 基本原則 (Basic Principles)
 
@@ -347,21 +443,19 @@ class HierarchicalLegalFramework:
 - システムプロンプト: system-prompts/ 参照
 
 ## 改訂履歴 (Revision History)
-- 初版: {level}レベル法的フレームワーク作成
+- 初版: ${level}レベル法的フレームワーク作成
 
 ---
 *このドキュメントは階層的法的フレームワークの一部です*
-"""
+""")
 
-    def _generate_prompt_content(self, level: str, name: str) -> str:
-        """システムプロンプトの内容を生成"""
-        return f"""# {level.title()} Level Agent System Prompt
+_PROMPT_TEMPLATE = Template("""# ${level_title} Level Agent System Prompt
 
 ## エージェント役割 (Agent Role)
-あなたは{name}の{level}レベルエージェントです。
+あなたは${name}の${level}レベルエージェントです。
 
 ## 基本行動指針 (Basic Guidelines)
-1. **規則遵守**: {level}レベルの規則を厳密に遵守する
+1. **規則遵守**: ${level}レベルの規則を厳密に遵守する
 2. **階層認識**: 自分の階層レベルと権限範囲を理解する
 3. **継承遵守**: 上位階層の規則をすべて継承し従う
 4. **連携協力**: 同階層および隣接階層との協力体制維持
@@ -380,69 +474,101 @@ class HierarchicalLegalFramework:
 
 ---
 *この指示は階層的法的フレームワークに基づいています*
-"""
-
-    def _generate_code_permissions(self, level: str, name: str) -> Dict[str, Any]:
-        """コード権限設定を生成"""
-        return {
-            f"{level}_level": {
-                "name": name,
-                "level": level,
-                "code_access": {
-                    "read": True,
-                    "write": True,
-                    "execute": True,
-                    "delete": False
-                },
-                "restricted_operations": [
-                    "system_level_changes",
-                    "security_modifications",
-                    "cross_hierarchy_access"
-                ],
-                "allowed_languages": [
-                    "python",
-                    "javascript", 
-                    "typescript",
-                    "bash",
-                    "yaml",
-                    "markdown"
-                ],
-                "inheritance": {
-                    "inherits_from_parent": True,
-                    "can_override": False
-                }
+""")
+
+
+@lru_cache(maxsize=None)
+def _render_rules(level: str, name: str, description: str) -> str:
+    """規則文書をレンダリング (レベル・名前ごとにメモ化)"""
+    japanese_title, english_title, english_desc = LEVEL_TITLES.get(level, ('規則', 'Rules', 'Guidelines'))
+    return _RULES_TEMPLATE.substitute(
+        japanese_title=japanese_title,
+        english_title=english_title,
+        english_desc=english_desc,
+        description=description,
+        name=name,
+        level=level,
+        level_title=level.title()
+    )
+
+
+@lru_cache(maxsize=None)
+def _render_prompt(level: str, name: str) -> str:
+    """システムプロンプトをレンダリング (レベル・名前ごとにメモ化)"""
+    return _PROMPT_TEMPLATE.substitute(name=name, level=level, level_title=level.title())
+
+
+@lru_cache(maxsize=None)
+def _render_permissions(level: str, name: str) -> Tuple[str, str]:
+    """権限YAML (コード権限, ファイル権限) をシリアライズ (レベル・名前ごとにメモ化)"""
+    return (
+        yaml.dump(_code_permissions(level, name), default_flow_style=False, allow_unicode=True),
+        yaml.dump(_file_permissions(level, name), default_flow_style=False, allow_unicode=True)
+    )
+
+
+def _code_permissions(level: str, name: str) -> Dict[str, Any]:
+    """コード権限設定を生成"""
+    return {
+        f"{level}_level": {
+            "name": name,
+            "level": level,
+            "code_access": {
+                "read": True,
+                "write": True,
+                "execute": True,
+                "delete": False
+            },
+            "restricted_operations": [
+                "system_level_changes",
+                "security_modifications",
+                "cross_hierarchy_access"
+            ],
+            "allowed_languages": [
+                "python",
+                "javascript", 
+                "typescript",
+                "bash",
+                "yaml",
+                "markdown"
+            ],
+            "inheritance": {
+                "inherits_from_parent": True,
+                "can_override": False
             }
         }
-
-    def _generate_file_permissions(self, level: str, name: str) -> Dict[str, Any]:
-        """ファイル権限設定を生成"""
-        return {
-            f"{level}_level": {
-                "name": name,
-                "level": level,
-                "file_access": {
-                    "read": True,
-                    "write": True,
-                    "create": True,
-                    "delete": False
-                },
-                "allowed_directories": [
-                    f"/{level}/**",
-                    "/tasks/**",
-                    "/standby/**"
-                ],
-                "restricted_directories": [
-                    "/system/**",
-                    "/config/**",
-                    "/../**"
-                ],
-                "file_types": {
-                    "allowed": [".md", ".py", ".js", ".ts", ".yaml", ".yml", ".json", ".txt"],
-                    "restricted": [".exe", ".sh", ".bat", ".env"]
-                },
-                "inheritance": {
-                    "inherits_from_parent": True,
-                    "can_override": False
-                }
+    }
+
+
+def _file_permissions(level: str, name: str) -> Dict[str, Any]:
+    """ファイル権限設定を生成"""
+    return {
+        f"{level}_level": {
+            "name": name,
+            "level": level,
+            "file_access": {
+                "read": True,
+                "write": True,
+                "create": True,
+                "delete": False
+            },
+            "allowed_directories": [
+                f"/{level}/**",
+                "/tasks/**",
+                "/standby/**"
+            ],
+            "restricted_directories": [
+                "/system/**",
+                "/config/**",
+                "/../**"
+            ],
+            "file_types": {
+                "allowed": [".md", ".py", ".js", ".ts", ".yaml", ".yml", ".json", ".txt"],
+                "restricted": [".exe", ".sh", ".bat", ".env"]
+            },
+            "inheritance": {
+                "inherits_from_parent": True,
+                "can_override": False
             }
-        } 
\ No newline at end of file
+        }
+    }
@@ -0,0 +1,139 @@
+"""
+Pane activity detection for the tmux monitor
+"""
+
+import hashlib
+import re
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ACTIVE, IDLE, NEEDS_HUMAN, UNKNOWN = "active", "idle", "needs_human", "unknown"
+
+# Printed between captures so one tmux call can capture many panes
+_MARKER = "@@haconiwa-pane@@"
+
+# Prompts where the agent is blocked on a person (checked against the last lines)
+NEEDS_HUMAN_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"do you want to (proceed|make this edit|create|run|allow)",
+        r"❯\s*1\.\s*yes",
+        r"\(y/n\)|\[y/n\]|\[Y/n\]|\[y/N\]",
+        r"press enter to continue",
+        r"permission (required|request)",
+        r"waiting for (your )?(approval|confirmation|input)",
+    )
+]
+
+
+@dataclass(frozen=True)
+class PaneActivity:
+    """Activity state of one pane"""
+    state: str
+    idle_seconds: float
+
+
+class _PaneState:
+    __slots__ = ("digest", "changed_at", "next_poll", "interval", "needs_human")
+
+    def __init__(self, now: float, interval: float):
+        self.digest = None
+        self.changed_at = now
+        self.next_poll = now
+        self.interval = interval
+        self.needs_human = False
+
+
+class PaneActivityDetector:
+    """Tracks when each pane's visible output last changed.
+
+    Every due pane is captured with a single chained ``tmux capture-pane``
+    call and the text is hashed. A pane whose output is unchanged is polled
+    less often (the interval doubles up to ``max_interval``); any change
+    resets it to ``min_interval``.
+    """
+
+    def __init__(self, session_name: str, min_interval: float = 1.0, max_interval: float = 16.0,
+                 idle_after: float = 10.0, tail_lines: int = 15,
+                 clock: Callable[[], float] = time.monotonic):
+        self.session_name = session_name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_after = idle_after
+        self.tail_lines = tail_lines
+        self.clock = clock
+        self.captures = 0
+        self._panes: Dict[Tuple[int, int], _PaneState] = {}
+
+    def update(self, panes: Iterable) -> Dict[Tuple[int, int], PaneActivity]:
+        """Capture panes that are due and return activity for every pane"""
+        now = self.clock()
+        keys = [(pane['window'], pane['index']) for pane in panes]
+
+        for key in self._panes.keys() - set(keys):
+            del self._panes[key]
+        for key in keys:
+            if key not in self._panes:
+                self._panes[key] = _PaneState(now, self.min_interval)
+
+        due = [key for key in keys if self._panes[key].next_poll <= now]
+        if due:
+            for key, text in self.capture(due).items():
+                self._observe(self._panes[key], text, now)
+
+        return {key: self._activity(self._panes[key], now) for key in keys}
+
+    def capture(self, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+        """Capture the visible region of several panes with one tmux process"""
+        args = ['tmux']
+        for i, (window, index) in enumerate(keys):
+            if i:
+                args.append(';')
+            args += ['display-message', '-p', f"{_MARKER} {window}.{index}", ';',
+                     'capture-pane', '-p', '-t', f"{self.session_name}:{window}.{index}"]
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, timeout=2)
+        except Exception:
+            return {}
+        self.captures += 1
+        # On error tmux stops at the failing command; keep what was captured
+        return self._split_captures(result.stdout or "")
+
+    @staticmethod
+    def _split_captures(output: str) -> Dict[Tuple[int, int], str]:
+        captures: Dict[Tuple[int, int], List[str]] = {}
+        current: Optional[List[str]] = None
+        for line in output.split("\n"):
+            if line.startswith(_MARKER):
+                window, _, index = line[len(_MARKER):].strip().partition(".")
+                current = captures.setdefault((int(window), int(index)), [])
+            elif current is not None:
+                current.append(line)
+        return {key: "\n".join(lines) for key, lines in captures.items()}
+
+    def _observe(self, state: _PaneState, text: str, now: float) -> None:
+        digest = hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=16).digest()
+        if digest != state.digest:
+            if state.digest is not None:
+                state.changed_at = now
+            state.digest = digest
+            state.interval = self.min_interval
+            state.needs_human = self.needs_human(text)
+        else:
+            state.interval = min(state.interval * 2, self.max_interval)
+        state.next_poll = now + state.interval
+
+    def needs_human(self, text: str) -> bool:
+        """Check the last lines of a capture for a prompt waiting on a person"""
+        lines = [line for line in text.rstrip().split("\n") if line.strip()][-self.tail_lines:]
+        tail = "\n".join(lines)
+        return any(pattern.search(tail) for pattern in NEEDS_HUMAN_PATTERNS)
+
+    def _activity(self, state: _PaneState, now: float) -> PaneActivity:
+        idle_seconds = now - state.changed_at
+        if state.digest is None:
+            return PaneActivity(UNKNOWN, idle_seconds)
+        if state.needs_human:
+            return PaneActivity(NEEDS_HUMAN, idle_seconds)
+        return PaneActivity(IDLE if idle_seconds >= self.idle_after else ACTIVE, idle_seconds)
@@ -0,0 +1,95 @@
+"""
+Background snapshot collection for the tmux monitor
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class MonitorSnapshot:
+    """Everything one monitor frame needs, collected in a single pass"""
+    windows: Mapping[int, str]
+    panes: Tuple[Mapping[str, Any], ...]
+    claude_processes: Mapping[int, Mapping[str, Any]]
+    pane_processes: Mapping[int, Mapping[str, Any]]
+    agents: Mapping[Tuple[int, int], str]
+    cpu_history: Mapping[Tuple[int, int], Tuple[float, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    activity: Mapping[Tuple[int, int], Any] = field(default_factory=lambda: MappingProxyType({}))
+    transcripts: Mapping[Tuple[int, int], Any] = field(default_factory=lambda: MappingProxyType({}))
+    taken_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def create(cls, windows, panes, claude_processes, pane_processes, agents,
+               cpu_history=None) -> "MonitorSnapshot":
+        """Build a snapshot with read-only views so renderers cannot mutate it"""
+        return cls(
+            windows=MappingProxyType(dict(windows)),
+            panes=tuple(MappingProxyType(dict(pane)) for pane in panes),
+            claude_processes=MappingProxyType(dict(claude_processes)),
+            pane_processes=MappingProxyType(dict(pane_processes)),
+            agents=MappingProxyType(dict(agents)),
+            cpu_history=MappingProxyType(dict(cpu_history or {})),
+        )
+
+
+class SnapshotCollector:
+    """Runs a collect function on a daemon thread at a fixed interval.
+
+    The render loop only reads ``latest`` (or waits for the next one), so a
+    slow collection never blocks rendering.
+    """
+
+    def __init__(self, collect: Callable[[], MonitorSnapshot], interval: float):
+        self.collect = collect
+        self.interval = interval
+        self.latest: Optional[MonitorSnapshot] = None
+        self.error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._updated = threading.Condition()
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SnapshotCollector":
+        self._thread = threading.Thread(target=self._run, name="monitor-collector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        with self._updated:
+            self._updated.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                snapshot = self.collect()
+                self.error = None
+            except Exception as e:
+                snapshot = None
+                self.error = e
+            with self._updated:
+                if snapshot is not None:
+                    self.latest = snapshot
+                self._generation += 1
+                self._updated.notify_all()
+            # Keep a steady rate regardless of collection cost
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def wait_for_next(self, generation: int, timeout: Optional[float] = None) -> int:
+        """Block until a collection newer than generation finishes; returns the new generation"""
+        with self._updated:
+            self._updated.wait_for(lambda: self._generation > generation or self._stop.is_set(), timeout)
+            return self._generation
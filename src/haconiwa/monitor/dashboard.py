@@ -0,0 +1,184 @@
+"""
+Multi-company dashboard for tmux multi-agent environments
+"""
+
+import os
+import select
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from rich.console import Console
+from rich.layout import Layout
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from .activity import NEEDS_HUMAN
+from .collector import SnapshotCollector
+from .history import STATUS_BUSY, STATUS_WAITING, STATUS_WORKING, classify_cpu
+from .multi import MultiCompanyCollector
+from .tmux_monitor import TRANSCRIPT_COLUMNS, TmuxMonitor
+from .transcripts import DEFAULT_STATE_PATH, TranscriptIndexer
+
+
+def summarize_snapshot(snapshot) -> Dict[str, float]:
+    """Aggregate one company's snapshot into summary figures"""
+    summary = {"panes": len(snapshot.panes), "claude": 0, "cpu_total": 0.0, "memory_mb": 0.0,
+               "waiting": 0, "working": 0, "busy": 0, "needs_human": 0}
+    for pane in snapshot.panes:
+        process = snapshot.pane_processes.get(pane['pid'])
+        if process:
+            summary["claude"] += 1
+            summary["cpu_total"] += process['cpu_percent']
+            summary["memory_mb"] += process['memory_info'].rss / 1024 / 1024
+            status = classify_cpu(process['cpu_percent'])
+            summary["waiting"] += status == STATUS_WAITING
+            summary["working"] += status == STATUS_WORKING
+            summary["busy"] += status == STATUS_BUSY
+        activity = snapshot.activity.get((pane['window'], pane['index']))
+        if activity is not None and activity.state == NEEDS_HUMAN:
+            summary["needs_human"] += 1
+    summary["cpu_avg"] = summary["cpu_total"] / summary["claude"] if summary["claude"] else 0.0
+    return summary
+
+
+class CompanyDashboard:
+    """Summary of every company with drill-down into one company's table.
+
+    All companies are collected by one background MultiCompanyCollector, so
+    overhead stays one process scan per frame however many companies run.
+    Keys: 1-9 open a company, Tab/n next company, 0/Esc back to the summary.
+    """
+
+    def __init__(self, companies=None, japanese=False, columns=None, history_size=60):
+        self.japanese = japanese
+        self.columns = columns
+        self.console = Console()
+        self.collector = MultiCompanyCollector(companies, self._create_monitor)
+        self.history_size = history_size
+        # One indexer for every company; separate ones would overwrite each other's state file
+        self.transcripts = (TranscriptIndexer(state_path=DEFAULT_STATE_PATH)
+                            if columns and any(col in columns for col in TRANSCRIPT_COLUMNS) else None)
+        self.selected: Optional[str] = None
+        self._redraw = threading.Event()
+
+    def _create_monitor(self, company: str) -> TmuxMonitor:
+        return TmuxMonitor(company, japanese=self.japanese, columns=self.columns,
+                           history_size=self.history_size, transcripts=self.transcripts)
+
+    def text(self, english: str, japanese: str) -> str:
+        return japanese if self.japanese else english
+
+    def create_summary_table(self, snapshots) -> Table:
+        """One row per company"""
+        table = Table(title=self.text("🏢 Companies", "🏢 会社一覧"), header_style="bold magenta", expand=True)
+        table.add_column("#", style="dim", width=3)
+        table.add_column(self.text("Company", "会社名"), style="bold green")
+        table.add_column(self.text("Desks", "デスク"), justify="right")
+        table.add_column(self.text("Claude", "Claude"), justify="right")
+        table.add_column(self.text("Avg CPU", "平均稼働率"), justify="right")
+        table.add_column(self.text("Memory", "メモリ"), justify="right")
+        table.add_column(self.text("Waiting/Working/Busy", "仕事待ち/作業中/多忙"), justify="center")
+        table.add_column(self.text("Needs human", "要対応"), justify="center")
+        table.add_column(self.text("Collect", "収集"), justify="right", style="dim")
+
+        durations = self.collector.durations
+        for number, (company, snapshot) in enumerate(snapshots.items(), 1):
+            summary = summarize_snapshot(snapshot)
+            needs_human = summary["needs_human"]
+            table.add_row(
+                str(number) if number <= 9 else "",
+                company,
+                str(summary["panes"]),
+                f"{summary['claude']}/{summary['panes']}",
+                f"{summary['cpu_avg']:.1f}%",
+                f"{summary['memory_mb']:.0f}MB",
+                f"[magenta]{summary['waiting']}[/magenta]/[yellow]{summary['working']}[/yellow]/[red]{summary['busy']}[/red]",
+                f"[bold red]⚠ {needs_human}[/bold red]" if needs_human else "[dim]0[/dim]",
+                f"{durations.get(company, 0.0) * 1000:.0f}ms",
+            )
+        return table
+
+    def render(self, snapshots) -> Layout:
+        layout = Layout()
+        if self.selected is not None and self.selected in snapshots:
+            monitor = self.collector.monitors[self.selected]
+            snapshot = snapshots[self.selected]
+            layout.split_column(
+                Layout(monitor.create_summary_panel(snapshot), size=8),
+                Layout(monitor.create_monitoring_table(snapshot)),
+                Layout(Panel(self.text("0/Esc: back  Tab: next company", "0/Esc: 一覧に戻る  Tab: 次の会社"),
+                             style="dim"), size=3),
+            )
+        else:
+            self.selected = None
+            body = self.create_summary_table(snapshots) if snapshots else Panel(
+                self.text("No tmux sessions found", "tmuxセッションが見つかりません"), title="Status")
+            layout.split_column(
+                Layout(body),
+                Layout(Panel(self.text("1-9: open company  Ctrl+C: quit", "1-9: 会社を表示  Ctrl+C: 終了"),
+                             style="dim"), size=3),
+            )
+        return layout
+
+    def handle_key(self, key: str, companies: List[str]) -> None:
+        """Change the drill-down selection for a key press"""
+        if key in ("0", "\x1b", "q"):
+            self.selected = None
+        elif key.isdigit() and 0 < int(key) <= len(companies):
+            self.selected = companies[int(key) - 1]
+        elif key in ("\t", "n") and companies:
+            index = companies.index(self.selected) + 1 if self.selected in companies else 0
+            self.selected = companies[index % len(companies)]
+        else:
+            return
+        self._redraw.set()
+
+    def _read_keys(self, stop: threading.Event, collector: SnapshotCollector) -> None:
+        """Read single key presses from a terminal (no-op when stdin is not a tty)"""
+        try:
+            import termios
+            import tty
+        except ImportError:
+            return
+        if not sys.stdin.isatty():
+            return
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            while not stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.2)
+                if ready:
+                    key = os.read(fd, 1).decode(errors="ignore")
+                    latest = collector.latest or {}
+                    self.handle_key(key, list(latest))
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+    def run(self, refresh_rate: float = 2.0) -> None:
+        stop = threading.Event()
+        keys = None
+        try:
+            with SnapshotCollector(self.collector.collect, refresh_rate) as collector, \
+                    Live(console=self.console, refresh_per_second=max(1, 1 / refresh_rate)) as live:
+                keys = threading.Thread(target=self._read_keys, args=(stop, collector), daemon=True)
+                keys.start()
+                generation = 0
+                while True:
+                    new_generation = collector.wait_for_next(generation, timeout=0.2)
+                    if new_generation == generation and not self._redraw.is_set():
+                        continue
+                    generation = new_generation
+                    self._redraw.clear()
+                    if collector.latest is not None:
+                        live.update(self.render(collector.latest))
+        except KeyboardInterrupt:
+            self.console.print(f"\n[yellow]{self.text('Monitoring stopped by user', 'ユーザーによりモニタリングが停止されました')}[/yellow]")
+        finally:
+            stop.set()
+            if keys is not None:
+                keys.join(1.0)  # Restore terminal mode before exiting
+            if self.transcripts is not None:
+                self.transcripts.save()
@@ -0,0 +1,154 @@
+"""
+Prometheus exporter for per-agent tmux monitor metrics
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from .collector import SnapshotCollector
+from .history import STATUS_NAMES, classify_cpu
+from .multi import MultiCompanyCollector
+from .tmux_monitor import TmuxMonitor
+
+logger = logging.getLogger(__name__)
+
+AGENT_LABELS = ["company", "room", "pane", "agent"]
+
+
+def parse_listen_address(listen: str) -> Tuple[str, int]:
+    """Parse ":9100", "0.0.0.0:9100" or "9100" into (addr, port).
+
+    Without a host only the loopback interface is bound; pass 0.0.0.0
+    explicitly to expose the metrics (agent names, tasks) on the network.
+    """
+    host, _, port = listen.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid listen address '{listen}' (expected [HOST]:PORT)")
+    return host or "127.0.0.1", int(port)
+
+
+class AgentMetricsExporter:
+    """Publishes per-company, per-room, per-agent metrics for Prometheus.
+
+    One background collector scans processes once per cycle and builds a
+    snapshot per company; scrapes only format the latest snapshots. Metric
+    families are rebuilt from those snapshots on every scrape, so series for
+    closed panes disappear and label cardinality stays bounded by the live
+    panes.
+    """
+
+    def __init__(self, companies: Optional[Iterable[str]] = None, interval: float = 5.0,
+                 monitor_factory=TmuxMonitor):
+        self.interval = interval
+        self.companies_collector = MultiCompanyCollector(companies, monitor_factory)
+        self.snapshots: Dict[str, object] = {}
+        self.restarts: Dict[Tuple[str, int, int], int] = {}
+        self._last_pids: Dict[Tuple[str, int, int], Tuple[int, Optional[int]]] = {}
+        self.registry = CollectorRegistry()
+        self.registry.register(self)
+        self._collector: Optional[SnapshotCollector] = None
+
+    @property
+    def companies(self) -> List[str]:
+        return self.companies_collector.companies
+
+    @companies.setter
+    def companies(self, companies: Iterable[str]) -> None:
+        self.companies_collector.companies = list(companies)
+
+    @property
+    def monitors(self) -> Dict[str, TmuxMonitor]:
+        return self.companies_collector.monitors
+
+    @property
+    def durations(self) -> Dict[str, float]:
+        return self.companies_collector.durations
+
+    def collect_once(self) -> Dict[str, object]:
+        """Collect one snapshot per company, sharing a single process scan"""
+        snapshots = self.companies_collector.collect()
+        self._update_restarts(snapshots)
+        self.snapshots = snapshots
+        return snapshots
+
+    def _update_restarts(self, snapshots) -> None:
+        """Count pane shell or Claude process replacements per pane"""
+        seen = set()
+        for company, snapshot in snapshots.items():
+            for pane in snapshot.panes:
+                key = (company, pane['window'], pane['index'])
+                seen.add(key)
+                process = snapshot.pane_processes.get(pane['pid'])
+                claude_pid = process.get('pid') if process else None
+                previous = self._last_pids.get(key)
+                if previous is not None:
+                    pane_restarted = previous[0] != pane['pid']
+                    claude_restarted = previous[1] is not None and claude_pid is not None and previous[1] != claude_pid
+                    if pane_restarted or claude_restarted:
+                        self.restarts[key] = self.restarts.get(key, 0) + 1
+                self.restarts.setdefault(key, 0)
+                self._last_pids[key] = (pane['pid'], claude_pid)
+
+        for key in self._last_pids.keys() - seen:
+            del self._last_pids[key]
+            self.restarts.pop(key, None)
+
+    def collect(self):
+        """prometheus_client collector protocol: build metric families from latest snapshots"""
+        snapshots = self.snapshots
+        cpu = GaugeMetricFamily("haconiwa_agent_cpu_percent", "Claude process CPU usage", labels=AGENT_LABELS)
+        rss = GaugeMetricFamily("haconiwa_agent_rss_bytes", "Claude process resident memory", labels=AGENT_LABELS)
+        present = GaugeMetricFamily("haconiwa_agent_claude_present", "1 if a Claude process runs in the pane",
+                                    labels=AGENT_LABELS)
+        status = GaugeMetricFamily("haconiwa_agent_status", "Agent status (1 for the current state)",
+                                   labels=AGENT_LABELS + ["status"])
+        task = GaugeMetricFamily("haconiwa_agent_task_info", "Task branch checked out in the pane",
+                                 labels=AGENT_LABELS + ["task"])
+        restarts = CounterMetricFamily("haconiwa_pane_restarts", "Pane shell or Claude process restarts",
+                                       labels=AGENT_LABELS)
+        panes = GaugeMetricFamily("haconiwa_company_panes", "Panes in the company session", labels=["company"])
+        duration = GaugeMetricFamily("haconiwa_collect_duration_seconds", "Time to collect a company snapshot",
+                                     labels=["company"])
+
+        for company, snapshot in snapshots.items():
+            monitor = self.monitors.get(company)
+            panes.add_metric([company], len(snapshot.panes))
+            duration.add_metric([company], self.durations.get(company, 0.0))
+            for pane in snapshot.panes:
+                window, index = pane['window'], pane['index']
+                labels = [
+                    company,
+                    snapshot.windows.get(window, f"Window-{window}"),
+                    f"{window}.{index}",
+                    snapshot.agents.get((window, index), ""),
+                ]
+                process = snapshot.pane_processes.get(pane['pid'])
+                present.add_metric(labels, 1 if process else 0)
+                if process:
+                    cpu.add_metric(labels, process['cpu_percent'])
+                    rss.add_metric(labels, process['memory_info'].rss)
+                current = STATUS_NAMES[classify_cpu(process['cpu_percent'] if process else None)]
+                for name in STATUS_NAMES:
+                    status.add_metric(labels + [name], 1 if name == current else 0)
+                branch = monitor.get_task_for_pane(pane) if monitor else None
+                if branch:
+                    task.add_metric(labels + [branch], 1)
+                restarts.add_metric(labels, self.restarts.get((company, window, index), 0))
+
+        return [cpu, rss, present, status, task, restarts, panes, duration]
+
+    def start(self, listen: str) -> Tuple[str, int]:
+        """Start background collection and the HTTP endpoint"""
+        addr, port = parse_listen_address(listen)
+        self._collector = SnapshotCollector(self.collect_once, self.interval).start()
+        start_http_server(port, addr=addr, registry=self.registry)
+        logger.info(f"Exporting agent metrics on {addr}:{port}")
+        return addr, port
+
+    def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.stop()
+            self._collector = None
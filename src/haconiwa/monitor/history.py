@@ -0,0 +1,204 @@
+"""
+Per-agent metrics history and sample recording for the tmux monitor
+"""
+
+import csv
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Status codes stored in the ring buffers
+STATUS_NONE, STATUS_WAITING, STATUS_WORKING, STATUS_BUSY = range(4)
+STATUS_NAMES = ("none", "waiting", "working", "busy")
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+RECORD_FIELDS = ["timestamp", "session", "window", "pane", "agent", "pid", "cpu_percent", "rss_mb", "status"]
+
+
+def classify_cpu(cpu_percent: Optional[float]) -> int:
+    """Get status code for a CPU usage (None when no process)"""
+    if cpu_percent is None:
+        return STATUS_NONE
+    if cpu_percent <= 2.0:
+        return STATUS_WAITING
+    if cpu_percent <= 20.0:
+        return STATUS_WORKING
+    return STATUS_BUSY
+
+
+def sparkline(values, maximum: float = 100.0) -> str:
+    """Render values (0..maximum) as a block-character sparkline"""
+    top = len(SPARK_CHARS) - 1
+    return "".join(
+        SPARK_CHARS[min(top, max(0, int(value / maximum * top + 0.5)))] for value in values
+    )
+
+
+class MetricsRing:
+    """Fixed-size ring buffer of CPU, RSS and status samples backed by ``array``"""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.cpu = array('d', [0.0]) * capacity
+        self.rss_mb = array('d', [0.0]) * capacity
+        self.status = array('b', [STATUS_NONE]) * capacity
+        self._next = 0
+        self.count = 0
+
+    def append(self, cpu_percent: float, rss_mb: float, status: int) -> None:
+        self.cpu[self._next] = cpu_percent
+        self.rss_mb[self._next] = rss_mb
+        self.status[self._next] = status
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _ordered(self, buffer) -> List:
+        """Get samples oldest first"""
+        if self.count < self.capacity:
+            return buffer[:self.count].tolist()
+        return (buffer[self._next:] + buffer[:self._next]).tolist()
+
+    def cpu_values(self) -> List[float]:
+        return self._ordered(self.cpu)
+
+    def rss_values(self) -> List[float]:
+        return self._ordered(self.rss_mb)
+
+    def status_values(self) -> List[int]:
+        return self._ordered(self.status)
+
+    def mean_cpu(self) -> float:
+        return sum(self.cpu_values()) / self.count if self.count else 0.0
+
+    def mean_rss(self) -> float:
+        return sum(self.rss_values()) / self.count if self.count else 0.0
+
+
+class MetricsHistory:
+    """Ring buffers per pane, keyed by (window, pane).
+
+    Panes that disappear from the session are dropped, so memory is bounded
+    by ``panes × capacity`` however long the monitor runs.
+    """
+
+    def __init__(self, capacity: int = 60):
+        self.capacity = capacity
+        self.rings: Dict[Tuple[int, int], MetricsRing] = {}
+
+    def record(self, snapshot) -> None:
+        """Append one sample per pane from a monitor snapshot"""
+        seen = set()
+        for pane in snapshot.panes:
+            key = (pane['window'], pane['index'])
+            seen.add(key)
+            ring = self.rings.get(key)
+            if ring is None:
+                ring = self.rings[key] = MetricsRing(self.capacity)
+            process = snapshot.pane_processes.get(pane['pid'])
+            if process:
+                ring.append(process['cpu_percent'], process['memory_info'].rss / 1024 / 1024,
+                            classify_cpu(process['cpu_percent']))
+            else:
+                ring.append(0.0, 0.0, STATUS_NONE)
+
+        for key in self.rings.keys() - seen:
+            del self.rings[key]
+
+    def cpu_series(self) -> Dict[Tuple[int, int], Tuple[float, ...]]:
+        """Get CPU samples per pane, oldest first"""
+        return {key: tuple(ring.cpu_values()) for key, ring in self.rings.items()}
+
+
+class MetricsRecorder:
+    """Appends per-pane samples to a CSV or Parquet file.
+
+    Parquet output needs ``pyarrow``; rows are written in row groups of
+    ``batch_size`` so memory stays bounded.
+    """
+
+    def __init__(self, path, session_name: str, batch_size: int = 1024):
+        self.path = Path(path)
+        self.session_name = session_name
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._rows: List[Dict] = []
+        self._csv_file = None
+        self._csv_writer = None
+        self._parquet_writer = None
+        self._schema = None
+
+        suffix = self.path.suffix.lower()
+        if suffix == ".parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet recording requires pyarrow (pip install pyarrow)")
+            self._pa, self._pq = pa, pq
+            self._schema = pa.schema([
+                ("timestamp", pa.float64()), ("session", pa.string()), ("window", pa.int32()),
+                ("pane", pa.int32()), ("agent", pa.string()), ("pid", pa.int64()),
+                ("cpu_percent", pa.float64()), ("rss_mb", pa.float64()), ("status", pa.string()),
+            ])
+        elif suffix == ".csv":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._csv_file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=RECORD_FIELDS)
+            self._csv_writer.writeheader()
+        else:
+            raise ValueError(f"Unsupported record format '{self.path.suffix}' (use .csv or .parquet)")
+
+    def write(self, snapshot) -> None:
+        """Record one row per pane of a snapshot"""
+        timestamp = getattr(snapshot, 'taken_at', time.time())
+        for pane in snapshot.panes:
+            process = snapshot.pane_processes.get(pane['pid'])
+            cpu = process['cpu_percent'] if process else None
+            self._rows.append({
+                "timestamp": timestamp,
+                "session": self.session_name,
+                "window": pane['window'],
+                "pane": pane['index'],
+                "agent": snapshot.agents.get((pane['window'], pane['index']), ""),
+                "pid": pane['pid'],
+                "cpu_percent": cpu if cpu is not None else 0.0,
+                "rss_mb": process['memory_info'].rss / 1024 / 1024 if process else 0.0,
+                "status": STATUS_NAMES[classify_cpu(cpu)],
+            })
+
+        if self._csv_writer is not None or len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        if self._csv_writer is not None:
+            self._csv_writer.writerows(self._rows)
+            self._csv_file.flush()
+        else:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+            if self._parquet_writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._parquet_writer = self._pq.ParquetWriter(str(self.path), self._schema)
+            self._parquet_writer.write_table(table)
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,53 @@
+"""
+Shared collection for monitoring several companies at once
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .tmux_monitor import TmuxMonitor, list_all_pane_pids, list_haconiwa_sessions
+
+
+class MultiCompanyCollector:
+    """Builds one snapshot per company from a single shared process scan.
+
+    Without an explicit company list, haconiwa sessions are rediscovered from
+    the tmux server on every collection, so new sessions appear automatically.
+    """
+
+    def __init__(self, companies: Optional[Iterable[str]] = None,
+                 monitor_factory: Callable[[str], TmuxMonitor] = TmuxMonitor):
+        self.companies = list(companies or [])
+        self.monitor_factory = monitor_factory
+        self.monitors: Dict[str, TmuxMonitor] = {}
+        self.durations: Dict[str, float] = {}
+
+    def discover_companies(self) -> List[str]:
+        """Configured companies, or every running haconiwa session"""
+        return self.companies or list_haconiwa_sessions()
+
+    def collect(self) -> Dict[str, object]:
+        """Collect one snapshot per company"""
+        companies = self.discover_companies()
+        for company in list(self.monitors):
+            if company not in companies:
+                del self.monitors[company]
+        for company in companies:
+            if company not in self.monitors:
+                self.monitors[company] = self.monitor_factory(company)
+
+        snapshots = {}
+        durations = {}
+        if companies:
+            # One process scan for every pane on the server
+            scanner = self.monitors[companies[0]]
+            claude_processes = scanner.get_claude_processes(pane_pids=list_all_pane_pids())
+            for company in companies:
+                monitor = self.monitors[company]
+                monitor.process_parents = scanner.process_parents
+                started = time.perf_counter()
+                snapshots[company] = monitor.collect_snapshot(claude_processes=claude_processes)
+                durations[company] = time.perf_counter() - started
+
+        self.durations = durations
+        return snapshots
@@ -0,0 +1,186 @@
+"""
+Linux /proc fast path for Claude process collection
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+MemoryInfo = namedtuple("MemoryInfo", ["rss", "vms"])
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def procfs_available() -> bool:
+    """Check that /proc can be used (Linux only)"""
+    return sys.platform.startswith("linux") and os.path.exists("/proc/self/stat")
+
+
+def read_stat(pid: int, proc_root: str = "/proc") -> Optional[Tuple]:
+    """Read (comm, ppid, cpu_ticks, starttime, vsize, rss_pages) from /proc/<pid>/stat"""
+    try:
+        with open(f"{proc_root}/{pid}/stat", "rb") as f:
+            data = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses; it ends at the last ")"
+    open_paren, close_paren = data.find("("), data.rfind(")")
+    fields = data[close_paren + 2:].split()
+    if len(fields) < 22:
+        return None
+    return (
+        data[open_paren + 1:close_paren],
+        int(fields[1]),                     # ppid
+        int(fields[11]) + int(fields[12]),  # utime + stime
+        int(fields[19]),                    # starttime
+        int(fields[20]),                    # vsize (bytes)
+        int(fields[21]),                    # rss (pages)
+    )
+
+
+class ProcfsScanner:
+    """Collects Claude processes below tmux pane PIDs by reading /proc directly.
+
+    Only descendants of the pane PIDs are visited, found through
+    ``/proc/<pid>/task/<tid>/children`` (falling back to scanning every
+    ``/proc/<pid>/stat`` for the parent pid when the kernel lacks it).
+    Cmdlines never change, so each process's classification is cached
+    by ``(pid, starttime)`` and later frames only read ``stat``.
+    """
+
+    def __init__(self, is_claude: Callable[[str, str], bool], proc_root: str = "/proc",
+                 clock: Callable[[], float] = time.monotonic):
+        self.is_claude = is_claude
+        self.proc_root = proc_root
+        self.clock = clock
+        self.cmdline_reads = 0
+        self._classified: Dict[int, Tuple[int, str, List[str], bool]] = {}
+        self._cpu: Dict[int, Tuple[int, float]] = {}
+        self._children_supported: Optional[bool] = None
+        self._total_memory = self._read_total_memory()
+
+    def _read_total_memory(self) -> int:
+        try:
+            with open(f"{self.proc_root}/meminfo", "r") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def _children(self, pid: int) -> List[int]:
+        children = []
+        try:
+            tids = os.listdir(f"{self.proc_root}/{pid}/task")
+        except OSError:
+            return children
+        for tid in tids:
+            try:
+                with open(f"{self.proc_root}/{pid}/task/{tid}/children", "r") as f:
+                    children.extend(int(child) for child in f.read().split())
+            except FileNotFoundError:
+                if self._children_supported is None and os.path.exists(f"{self.proc_root}/{pid}/task/{tid}"):
+                    self._children_supported = False
+                    return children
+            except OSError:
+                continue
+        if self._children_supported is None:
+            self._children_supported = True
+        return children
+
+    def _descendant_stats(self, pane_pids: Iterable[int]) -> Dict[int, Tuple]:
+        """Read stat for pane PIDs and all their descendants"""
+        stats = {}
+        pending = [pid for pid in pane_pids if pid]
+        while pending:
+            pid = pending.pop()
+            if pid in stats:
+                continue
+            stat = read_stat(pid, self.proc_root)
+            if stat is None:
+                continue
+            stats[pid] = stat
+            if self._children_supported is not False:
+                pending.extend(self._children(pid))
+
+        if self._children_supported is False:
+            stats = self._descendants_by_scan(set(stats))
+        return stats
+
+    def _descendants_by_scan(self, roots) -> Dict[int, Tuple]:
+        """Fallback: read every /proc/<pid>/stat and keep the subtrees under roots"""
+        all_stats = {}
+        for entry in os.listdir(self.proc_root):
+            if entry.isdigit():
+                stat = read_stat(int(entry), self.proc_root)
+                if stat is not None:
+                    all_stats[int(entry)] = stat
+        children: Dict[int, List[int]] = {}
+        for pid, stat in all_stats.items():
+            children.setdefault(stat[1], []).append(pid)
+        stats = {}
+        pending = [pid for pid in roots if pid in all_stats]
+        while pending:
+            pid = pending.pop()
+            if pid not in stats:
+                stats[pid] = all_stats[pid]
+                pending.extend(children.get(pid, ()))
+        return stats
+
+    def _classify(self, pid: int, comm: str, starttime: int) -> Tuple[int, str, List[str], bool]:
+        cached = self._classified.get(pid)
+        if cached is not None and cached[0] == starttime:
+            return cached
+        # New process (or reused pid): drop stale CPU sample
+        self._cpu.pop(pid, None)
+        try:
+            with open(f"{self.proc_root}/{pid}/cmdline", "rb") as f:
+                raw = f.read()
+        except OSError:
+            raw = b""
+        self.cmdline_reads += 1
+        cmdline = [part.decode("utf-8", "replace") for part in raw.split(b"\0") if part]
+        cached = (starttime, comm, cmdline, self.is_claude(comm, " ".join(cmdline)))
+        self._classified[pid] = cached
+        return cached
+
+    def scan(self, pane_pids: Iterable[int]) -> Tuple[Dict[int, Dict], Dict[int, int]]:
+        """Get (claude processes, pid → ppid) for the subtrees under pane_pids"""
+        now = self.clock()
+        stats = self._descendant_stats(pane_pids)
+        process_parents = {pid: stat[1] for pid, stat in stats.items()}
+        claude_processes = {}
+
+        for pid, (comm, ppid, cpu_ticks, starttime, vsize, rss_pages) in stats.items():
+            _, name, cmdline, is_claude = self._classify(pid, comm, starttime)
+            if not is_claude:
+                continue
+
+            # CPU% since the previous frame (0 on the first sample, never sleeps)
+            previous = self._cpu.get(pid)
+            cpu_percent = 0.0
+            if previous is not None and now > previous[1] and cpu_ticks >= previous[0]:
+                cpu_percent = (cpu_ticks - previous[0]) / _CLOCK_TICKS / (now - previous[1]) * 100
+            self._cpu[pid] = (cpu_ticks, now)
+
+            rss = rss_pages * _PAGE_SIZE
+            claude_processes[pid] = {
+                'pid': pid,
+                'ppid': ppid,
+                'cpu_percent': cpu_percent,
+                'memory_percent': rss / self._total_memory * 100 if self._total_memory else 0.0,
+                'memory_info': MemoryInfo(rss=rss, vms=vsize),
+                'name': name,
+                'cmdline': cmdline,
+            }
+
+        # Forget processes that exited
+        for cache in (self._classified, self._cpu):
+            for pid in cache.keys() - stats.keys():
+                del cache[pid]
+
+        return claude_processes, process_parents
@@ -0,0 +1,40 @@
+"""
+Non-blocking process sampler for the tmux monitor
+"""
+
+import psutil
+
+
+class ProcessSampler:
+    """Keeps psutil.Process handles across frames.
+
+    ``cpu_percent()`` without an interval returns the usage since the previous
+    call on the same handle, so reusing handles gives per-frame CPU deltas
+    without ever sleeping. A pid's first sample reports 0.0 CPU.
+    """
+
+    def __init__(self):
+        self._handles = {}
+
+    def sample(self, pid):
+        """Sample CPU and memory of a process (raises psutil errors for dead processes)"""
+        process = self._handles.get(pid)
+        if process is None or not process.is_running():
+            # New pid, or pid reused by a different process
+            process = psutil.Process(pid)
+            self._handles[pid] = process
+
+        with process.oneshot():
+            return {
+                'cpu_percent': process.cpu_percent(),
+                'memory_percent': process.memory_percent(),
+                'memory_info': process.memory_info(),
+            }
+
+    def evict(self, live_pids):
+        """Drop handles for pids not seen in the latest scan"""
+        for pid in self._handles.keys() - set(live_pids):
+            del self._handles[pid]
+
+    def __len__(self):
+        return len(self._handles)
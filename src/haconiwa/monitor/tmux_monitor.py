@@ -4,7 +4,6 @@ Uses rich library for colorful display
 """
 
 import subprocess
-import time
 import psutil
 import json
 from pathlib import Path
@@ -16,18 +15,87 @@ from rich.layout import Layout
 from rich.text import Text
 from datetime import datetime
 import re
+from dataclasses import replace
+from types import MappingProxyType
+
+from .activity import ACTIVE, IDLE, NEEDS_HUMAN, PaneActivityDetector
+from .collector import MonitorSnapshot, SnapshotCollector
+from .history import (
+    STATUS_BUSY, STATUS_WAITING, STATUS_WORKING, MetricsHistory, MetricsRecorder, classify_cpu, sparkline
+)
+from .procfs import ProcfsScanner, procfs_available
+from .sampler import ProcessSampler
+from .transcripts import DEFAULT_STATE_PATH, TranscriptIndexer, format_tokens
+
+# トランスクリプトの集計を使う列
+TRANSCRIPT_COLUMNS = ("turns", "tools", "tokens")
+
+# classify_cpu のステータスコード → 表示テキストのキー
+STATUS_TEXT_KEYS = {STATUS_WAITING: 'waiting_for_work', STATUS_WORKING: 'working', STATUS_BUSY: 'busy'}
+
+
+def list_tmux_sessions():
+    """起動中のtmuxセッション名（会社名）一覧を取得"""
+    try:
+        result = subprocess.run(['tmux', 'list-sessions', '-F', '#{session_name}'],
+                                capture_output=True, text=True, timeout=1)
+    except Exception:
+        return []
+    if result.returncode != 0:
+        return []
+    return [line for line in result.stdout.splitlines() if line.strip()]
+
+
+def list_haconiwa_sessions():
+    """起動中のtmuxセッションのうち、haconiwaの会社セッションだけを取得"""
+    from ..space.manager import SpaceManager
+    space_manager = SpaceManager()
+    return [session for session in list_tmux_sessions() if space_manager._is_haconiwa_session(session)]
+
+
+def list_all_pane_pids():
+    """全セッションのデスクのPID一覧を取得"""
+    try:
+        result = subprocess.run(['tmux', 'list-panes', '-a', '-F', '#{pane_pid}'],
+                                capture_output=True, text=True, timeout=1)
+    except Exception:
+        return []
+    if result.returncode != 0:
+        return []
+    return [int(line) for line in result.stdout.split() if line.isdigit()]
 
 
 class TmuxMonitor:
     """tmux multi-agent environment monitor"""
     
-    def __init__(self, session_name, japanese=False, columns=None, window=None):
+    def __init__(self, session_name, japanese=False, columns=None, window=None, history_size=60, record_path=None,
+                 transcripts=None):
         self.session_name = session_name
         self.window = window
         self.console = Console()
         self.japanese = japanese
         self.columns = columns if columns else ["pane", "title", "task", "claude", "agent", "cpu", "memory", "status"]
         self.agent_mappings = self.load_agent_mappings()
+        # 最新スキャン時の pid → ppid インデックス（フレームごとに再構築）
+        self.process_parents = {}
+        # フレーム間で psutil.Process を保持してCPU使用率の差分を計算
+        self.sampler = ProcessSampler()
+        # Linuxでは /proc からデスク配下のプロセスだけを読む（それ以外は psutil）
+        self.procfs = ProcfsScanner(self.is_claude_process_fast) if procfs_available() else None
+        # デスクごとのメトリクス履歴（リングバッファ）とサンプル記録先
+        self.history = MetricsHistory(history_size)
+        self.record_path = record_path
+        self.recorder = None
+        # 出力変化によるアクティビティ検出（列が表示される場合のみ tmux capture-pane を実行）
+        self.activity_detector = PaneActivityDetector(session_name) if "activity" in self.columns else None
+        # Claude トランスクリプトの追記分だけを読む集計（列が表示される場合のみ）
+        # 複数会社を監視する場合は状態ファイルを上書きし合わないよう共有の indexer を受け取る
+        if not any(col in self.columns for col in TRANSCRIPT_COLUMNS):
+            self.transcripts = None
+        elif transcripts is not None:
+            self.transcripts = transcripts
+        else:
+            self.transcripts = TranscriptIndexer(state_path=DEFAULT_STATE_PATH)
         
         # 日本語テキスト
         self.texts = {
@@ -42,6 +110,14 @@ class TmuxMonitor:
                 'cpu': 'CPU%',
                 'memory': 'Memory',
                 'uptime': 'Uptime',
+                'trend': 'CPU Trend (avg)',
+                'activity': 'Activity',
+                'active': 'Active',
+                'idle': 'Idle',
+                'needs_human': 'Needs human',
+                'turns': 'Turns',
+                'tools': 'Tool Calls',
+                'tokens': 'Tokens (in/out)',
                 'status': 'Status',
                 'window': 'Window',
                 'no_claude': 'No Claude',
@@ -72,6 +148,14 @@ class TmuxMonitor:
                 'cpu': '稼働率',
                 'memory': 'メモリ',
                 'uptime': '稼働時間',
+                'trend': '稼働率推移 (平均)',
+                'activity': 'アクティビティ',
+                'active': '出力中',
+                'idle': 'アイドル',
+                'needs_human': '要対応',
+                'turns': 'ターン',
+                'tools': 'ツール呼出',
+                'tokens': 'トークン (入力/出力)',
                 'status': 'ステータス',
                 'window': 'ウィンドウ',
                 'no_claude': 'Claude無し',
@@ -143,14 +227,21 @@ class TmuxMonitor:
         """言語に応じたテキストを取得"""
         return self.texts[self.lang].get(key, key)
     
+    def format_activity(self, activity):
+        """出力変化ベースのアクティビティ表示（要対応 / アイドル / 出力中）"""
+        if activity is None or activity.state not in (ACTIVE, IDLE, NEEDS_HUMAN):
+            return "[dim]-[/dim]"
+        if activity.state == NEEDS_HUMAN:
+            return f"[bold red]⚠ {self.get_text('needs_human')}[/bold red]"
+        if activity.state == IDLE:
+            minutes, seconds = divmod(int(activity.idle_seconds), 60)
+            idle_for = f"{minutes}m" if minutes else f"{seconds}s"
+            return f"[magenta]{self.get_text('idle')} {idle_for}[/magenta]"
+        return f"[green]{self.get_text('active')}[/green]"
+    
     def get_status_by_cpu(self, cpu_percent):
-        """CPU使用率に基づいてステータスを決定"""
-        if cpu_percent <= 2.0:
-            return self.get_text('waiting_for_work')
-        elif cpu_percent <= 20.0:
-            return self.get_text('working')
-        else:
-            return self.get_text('busy')
+        """CPU使用率に基づいてステータスを決定（閾値は history.classify_cpu に従う）"""
+        return self.get_text(STATUS_TEXT_KEYS[classify_cpu(cpu_percent)])
     
     def extract_task_name(self, pane_title):
         """デスクタイトルからタスクブランチ名を抽出"""
@@ -297,36 +388,41 @@ class TmuxMonitor:
         except Exception:
             return []
 
-    def get_claude_processes(self):
-        """Claudeプロセス情報を高速取得（psutil使用・CPU測定改良版）"""
+    def get_claude_processes(self, pane_pids=None):
+        """Claudeプロセス情報を高速取得（psutil使用・CPU測定改良版）
+        
+        同じスキャンで全プロセスの pid → ppid インデックスも構築する。
+        pane_pids を渡すと Linux ではデスク配下のプロセスのみ /proc から読み込む
+        """
+        if pane_pids is not None and self.procfs is not None:
+            try:
+                claude_processes, self.process_parents = self.procfs.scan(pane_pids)
+                return claude_processes
+            except Exception:
+                # 読み込みに失敗した場合は psutil にフォールバック
+                self.procfs = None
+        
         try:
             claude_processes = {}
+            process_parents = {}
             
             # 全プロセスを高速スキャン
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            for proc in psutil.process_iter(['pid', 'ppid', 'name', 'cmdline']):
                 try:
                     proc_info = proc.info
                     pid = proc_info['pid']
-                    name = proc_info['name']
+                    name = proc_info['name'] or ''
+                    process_parents[pid] = proc_info['ppid']
                     cmdline = proc_info['cmdline'] or []
                     cmdline_str = ' '.join(cmdline)
                     
                     # Claudeプロセスの判定
                     if self.is_claude_process_fast(name, cmdline_str):
-                        # プロセス詳細情報を取得
-                        process = psutil.Process(pid)
-                        
-                        # CPU使用率を取得（interval=Noneで前回からの差分を使用）
-                        cpu_percent = process.cpu_percent()
-                        
-                        # 初回は0が返ってくるので、0の場合は瞬間的な測定
-                        if cpu_percent == 0.0:
-                            cpu_percent = process.cpu_percent(interval=0.1)
-                        
+                        # CPU使用率は前フレームからの差分（スリープしない、初回は0）
                         claude_processes[pid] = {
-                            'cpu_percent': cpu_percent,
-                            'memory_percent': process.memory_percent(),
-                            'memory_info': process.memory_info(),
+                            'pid': pid,
+                            'ppid': proc_info['ppid'],
+                            **self.sampler.sample(pid),
                             'name': name,
                             'cmdline': cmdline
                         }
@@ -334,6 +430,9 @@ class TmuxMonitor:
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                     continue
             
+            # 終了したプロセスのハンドルを破棄
+            self.sampler.evict(claude_processes)
+            self.process_parents = process_parents
             return claude_processes
             
         except Exception:
@@ -374,11 +473,47 @@ class TmuxMonitor:
         percentage_text = f"{cpu_percent:5.1f}%"
         return f"{percentage_text} [{color}]{bar}[/{color}]"
     
-    def create_monitoring_table(self):
-        """単一のモニタリングテーブルを作成（部屋名を列として表示）"""
+    def get_task_for_pane(self, pane):
+        """デスクのタスクブランチ名を取得（タイトル優先、無ければパスから抽出）"""
+        return self.extract_task_name(pane.get('title', '')) or self.extract_task_id_from_path(pane.get('current_path', ''))
+    
+    def collect_snapshot(self, claude_processes=None):
+        """1フレーム分の情報（ウィンドウ、デスク、プロセス、割り当て）を一度だけ収集
+        
+        claude_processes を渡すと（複数会社で共有したスキャン結果など）プロセススキャンを省略する
+        """
         windows_info = self.get_tmux_windows_info()
         panes = self.get_tmux_panes_info()
-        claude_processes = self.get_claude_processes()
+        if claude_processes is None:
+            claude_processes = self.get_claude_processes(pane_pids=[pane['pid'] for pane in panes])
+        pane_processes = self.map_claude_processes_to_panes(panes, claude_processes)
+        agents = {
+            (pane['window'], pane['index']): self.get_agent_id_for_pane(pane['window'], pane['index'])
+            for pane in panes
+        }
+        snapshot = MonitorSnapshot.create(windows_info, panes, claude_processes, pane_processes, agents)
+        
+        # 履歴を更新し、スナップショットに履歴のコピーを添付
+        self.history.record(snapshot)
+        snapshot = replace(snapshot, cpu_history=MappingProxyType(self.history.cpu_series()))
+        
+        if self.activity_detector is not None:
+            snapshot = replace(snapshot, activity=MappingProxyType(self.activity_detector.update(panes)))
+        
+        if self.transcripts is not None:
+            snapshot = replace(snapshot, transcripts=MappingProxyType(self.transcripts.usage_for_panes(panes)))
+        
+        if self.recorder is not None:
+            self.recorder.write(snapshot)
+        return snapshot
+    
+    def create_monitoring_table(self, snapshot=None):
+        """単一のモニタリングテーブルを作成（部屋名を列として表示）"""
+        if snapshot is None:
+            snapshot = self.collect_snapshot()
+        windows_info = snapshot.windows
+        panes = snapshot.panes
+        pane_processes = snapshot.pane_processes
         
         # 会社名をタイトルに含める
         title_text = f"💼  会社名: [bold green]{self.session_name}[/bold green]"
@@ -397,6 +532,11 @@ class TmuxMonitor:
             'cpu': {"header": self.get_text('cpu'), "justify": "left", "width": 60},
             'memory': {"header": self.get_text('memory'), "justify": "right", "width": 10},
             'uptime': {"header": self.get_text('uptime'), "justify": "center", "width": 10},
+            'trend': {"header": self.get_text('trend'), "justify": "left", "width": 32},
+            'activity': {"header": self.get_text('activity'), "justify": "center", "width": 16},
+            'turns': {"header": self.get_text('turns'), "justify": "right", "width": 8},
+            'tools': {"header": self.get_text('tools'), "justify": "right", "width": 10},
+            'tokens': {"header": self.get_text('tokens'), "justify": "right", "width": 16},
             'status': {"header": self.get_text('status'), "justify": "center", "width": 10}
         }
         
@@ -416,13 +556,8 @@ class TmuxMonitor:
             pane_current_path = pane.get('current_path', '')
             window_name = windows_info.get(window_index, f"Window-{window_index}")
             
-            # そのデスクのPIDに対応するClaudeプロセスを探す
-            claude_process = None
-            for pid, proc_info in claude_processes.items():
-                # デスクのPIDまたは子プロセスをチェック
-                if pid == pane_pid or self.is_child_of_pane(pid, pane_pid):
-                    claude_process = proc_info
-                    break
+            # そのデスクのPIDに対応するClaudeプロセス
+            claude_process = pane_processes.get(pane_pid)
             
             row_data = []
             
@@ -435,7 +570,7 @@ class TmuxMonitor:
                     row_data.append(str(pane_index))
                 elif col_name == 'title':
                     # エージェント名とカレントディレクトリを表示
-                    agent_id = self.get_agent_id_for_pane(window_index, pane_index)
+                    agent_id = snapshot.agents.get((window_index, pane_index)) or self.get_agent_id_for_pane(window_index, pane_index)
                     
                     # パスから最後のディレクトリ名を取得
                     if pane_current_path:
@@ -451,13 +586,8 @@ class TmuxMonitor:
                     display_title = f"{agent_id} - {dir_name}"
                     row_data.append(display_title)
                 elif col_name == 'task':
-                    # まずデスクタイトルからタスクブランチ名を抽出を試みる
-                    task_name = self.extract_task_name(pane_title)
-                    
-                    # デスクタイトルにタスクブランチ名がない場合は、パスから抽出
-                    if not task_name:
-                        task_id = self.extract_task_id_from_path(pane_current_path)
-                        task_name = task_id
+                    # デスクタイトル、無ければパスからタスクブランチ名を抽出
+                    task_name = self.get_task_for_pane(pane)
                     
                     if task_name:
                         row_data.append(f"[bright_yellow]{task_name}[/bright_yellow]")
@@ -472,7 +602,7 @@ class TmuxMonitor:
                         row_data.append(f"[red]✗[/red] {self.get_text('no_claude')}")
                 elif col_name == 'agent':
                     # カスタムエージェントIDを表示
-                    agent_id = self.get_agent_id_for_pane(window_index, pane_index)
+                    agent_id = snapshot.agents.get((window_index, pane_index)) or self.get_agent_id_for_pane(window_index, pane_index)
                     row_data.append(f"[bright_cyan]{agent_id}[/bright_cyan]")
                 elif col_name == 'cpu':
                     if claude_process:
@@ -488,6 +618,28 @@ class TmuxMonitor:
                         row_data.append("N/A")
                 elif col_name == 'uptime':
                     row_data.append("N/A")  # uptimeは簡略化
+                elif col_name == 'activity':
+                    row_data.append(self.format_activity(snapshot.activity.get((window_index, pane_index))))
+                elif col_name in TRANSCRIPT_COLUMNS:
+                    usage = snapshot.transcripts.get((window_index, pane_index))
+                    if usage is None or not (usage.turns or usage.prompts):
+                        row_data.append("[dim]-[/dim]")
+                    elif col_name == 'turns':
+                        row_data.append(str(usage.turns))
+                    elif col_name == 'tools':
+                        row_data.append(str(usage.tool_calls))
+                    else:
+                        row_data.append(f"{format_tokens(usage.input_tokens + usage.cache_read_tokens + usage.cache_creation_tokens)}"
+                                        f"/{format_tokens(usage.output_tokens)}")
+                elif col_name == 'trend':
+                    # 直近のCPU推移（スパークライン）と移動平均
+                    cpu_values = snapshot.cpu_history.get((window_index, pane_index), ())
+                    if cpu_values:
+                        average = sum(cpu_values) / len(cpu_values)
+                        color = self.get_cpu_color(average)
+                        row_data.append(f"[{color}]{sparkline(cpu_values[-24:])}[/{color}] {average:5.1f}%")
+                    else:
+                        row_data.append("N/A")
                 elif col_name == 'status':
                     if claude_process:
                         status_text = self.get_status_by_cpu(claude_process['cpu_percent'])
@@ -505,8 +657,42 @@ class TmuxMonitor:
         
         return table
 
+    def iter_ancestors(self, pid):
+        """pid → ppid インデックスを辿って祖先PIDを順に返す"""
+        seen = set()
+        parent = self.process_parents.get(pid)
+        while parent and parent not in seen:
+            yield parent
+            seen.add(parent)
+            parent = self.process_parents.get(parent)
+    
+    def map_claude_processes_to_panes(self, panes, claude_processes):
+        """各デスクのPIDに、そのデスク自身または子孫（深さ任意）のClaudeプロセスを対応付け
+        
+        pid → ppid インデックスを使うので、psutil呼び出しはプロセススキャン1回のみ
+        """
+        pane_pids = {pane['pid'] for pane in panes}
+        pane_processes = {}
+        
+        for pid, proc_info in claude_processes.items():
+            if pid in pane_pids:
+                pane_processes.setdefault(pid, proc_info)
+                continue
+            for ancestor in self.iter_ancestors(pid):
+                if ancestor in pane_pids:
+                    pane_processes.setdefault(ancestor, proc_info)
+                    break
+        
+        # デスク自身がClaudeプロセスの場合を優先
+        for pane_pid in pane_pids & claude_processes.keys():
+            pane_processes[pane_pid] = claude_processes[pane_pid]
+        
+        return pane_processes
+    
     def is_child_of_pane(self, process_pid, pane_pid):
-        """プロセスがデスクの子プロセスかチェック（psutil高速版）"""
+        """プロセスがデスクの子孫プロセスかチェック（インデックスがあれば psutil 呼び出し無し）"""
+        if process_pid in self.process_parents:
+            return pane_pid in self.iter_ancestors(process_pid)
         try:
             process = psutil.Process(process_pid)
             # 直接の親をチェック
@@ -520,24 +706,24 @@ class TmuxMonitor:
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return False
     
-    def create_summary_panel(self):
+    def create_summary_panel(self, snapshot=None):
         """サマリーパネルを作成"""
-        panes = self.get_tmux_panes_info()
-        claude_processes = self.get_claude_processes()
+        if snapshot is None:
+            snapshot = self.collect_snapshot()
+        panes = snapshot.panes
+        pane_processes = snapshot.pane_processes
         
         active_count = 0
         total_cpu = 0
         total_memory = 0
         
         for pane in panes:
-            pane_pid = pane['pid']
-            # デスクに関連するClaudeプロセスを探す
-            for pid, proc_info in claude_processes.items():
-                if pid == pane_pid or self.is_child_of_pane(pid, pane_pid):
-                    active_count += 1
-                    total_cpu += proc_info['cpu_percent']
-                    total_memory += proc_info['memory_info'].rss / 1024 / 1024
-                    break
+            # デスクに関連するClaudeプロセス
+            proc_info = pane_processes.get(pane['pid'])
+            if proc_info:
+                active_count += 1
+                total_cpu += proc_info['cpu_percent']
+                total_memory += proc_info['memory_info'].rss / 1024 / 1024
         
         avg_cpu = total_cpu / active_count if active_count > 0 else 0
         
@@ -545,40 +731,59 @@ class TmuxMonitor:
         {self.get_text('active_panes')}: {active_count}/{len(panes)}
         {self.get_text('average_cpu')}: {avg_cpu:.1f}%
         {self.get_text('total_memory')}: {total_memory:.1f}MB
-        {self.get_text('last_update')}: {datetime.now().strftime('%H:%M:%S')}
+        {self.get_text('last_update')}: {datetime.fromtimestamp(snapshot.taken_at).strftime('%H:%M:%S')}
         """
         
         company_title = f"💼  会社名: [bold green]{self.session_name}[/bold green]"
         return Panel(summary_text, title=company_title, border_style="blue")
     
     def run_monitor(self, refresh_rate=2):
-        """モニタリングを実行"""
+        """モニタリングを実行（収集はバックグラウンドスレッド、描画は最新スナップショットのみ）"""
+        collector = SnapshotCollector(self.collect_snapshot, refresh_rate)
         try:
+            if self.record_path:
+                self.recorder = MetricsRecorder(self.record_path, self.session_name)
+            collector.start()
             with Live(refresh_per_second=1/refresh_rate) as live:
+                generation = 0
                 while True:
+                    # 次のスナップショットを待機
+                    generation = collector.wait_for_next(generation, timeout=refresh_rate * 2)
+                    snapshot = collector.latest
+                    if snapshot is None:
+                        continue
+                    
                     # レイアウト作成
                     layout = Layout()
                     
                     # 単一テーブルを取得
-                    table = self.create_monitoring_table()
+                    table = self.create_monitoring_table(snapshot)
                     
                     if table is None:
                         # テーブルがない場合
                         layout.split_column(
-                            Layout(self.create_summary_panel(), size=8),
+                            Layout(self.create_summary_panel(snapshot), size=8),
                             Layout(Panel("No data available", title="Status"))
                         )
                     else:
                         # テーブルがある場合
                         layout.split_column(
-                            Layout(self.create_summary_panel(), size=8),
+                            Layout(self.create_summary_panel(snapshot), size=8),
                             Layout(table)
                         )
                     
                     live.update(layout)
-                    time.sleep(refresh_rate)
                     
         except KeyboardInterrupt:
             self.console.print(f"\n[yellow]{self.get_text('monitoring_stopped')}[/yellow]")
         except Exception as e:
-            self.console.print(f"[red]Error: {e}[/red]") 
\ No newline at end of file
+            self.console.print(f"[red]Error: {e}[/red]")
+        finally:
+            # 収集スレッドの終了を待ってから保存・記録を閉じる（書き込み中に閉じない）
+            collector.stop(timeout=None)
+            if self.transcripts is not None:
+                self.transcripts.save()
+            if self.recorder is not None:
+                recorder, self.recorder = self.recorder, None
+                recorder.close()
+                self.console.print(f"[green]{recorder.rows_written} samples recorded to {recorder.path}[/green]") 
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+Incremental indexer for Claude Code session transcripts
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROJECTS_DIR = Path.home() / ".claude" / "projects"
+DEFAULT_STATE_PATH = Path.home() / ".haconiwa" / "transcript-index.json"
+
+INDEX_FORMAT_VERSION = 1
+
+ASSIGNMENT_LOG = Path(".haconiwa") / "agent_assignment.json"
+
+# 新規分のみを読むので1回の読み込みはこのサイズ単位
+_READ_BLOCK = 4 * 1024 * 1024
+
+
+def project_dir_name(cwd: str) -> str:
+    """Claude Code がトランスクリプトを置くディレクトリ名（英数字以外を - に置換）"""
+    return re.sub(r"[^A-Za-z0-9]", "-", str(cwd))
+
+
+@dataclass
+class TranscriptUsage:
+    """トランスクリプトから集計したエージェントの作業量"""
+    prompts: int = 0
+    turns: int = 0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    last_activity: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens + self.cache_read_tokens + self.cache_creation_tokens
+
+    def add(self, other: "TranscriptUsage") -> None:
+        for item in fields(self):
+            if item.name == "last_activity":
+                self.last_activity = max(self.last_activity, other.last_activity)
+            else:
+                setattr(self, item.name, getattr(self, item.name) + getattr(other, item.name))
+
+
+class _FileState:
+    __slots__ = ("inode", "offset", "last_message_id", "usage")
+
+    def __init__(self, inode: int = 0, offset: int = 0, last_message_id: Optional[str] = None,
+                 usage: Optional[TranscriptUsage] = None):
+        self.inode = inode
+        self.offset = offset
+        self.last_message_id = last_message_id
+        self.usage = usage or TranscriptUsage()
+
+
+def load_assignment(task_dir: Path) -> Optional[Dict[str, Any]]:
+    """agent_assignment.json の最新の割り当て（agent/task/company）を取得"""
+    try:
+        with open(Path(task_dir) / ASSIGNMENT_LOG, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    entries = data if isinstance(data, list) else [data]
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    if not entries:
+        return None
+    latest = entries[-1]
+    return {
+        "agent": latest.get("agent_id"),
+        "task": latest.get("task_name"),
+        "company": latest.get("space_session"),
+    }
+
+
+def find_task_dir(path: str) -> Optional[Path]:
+    """path 自身または祖先のうち agent_assignment.json を持つタスクディレクトリ"""
+    if not path:
+        return None
+    current = Path(path)
+    for candidate in (current, *current.parents):
+        if (candidate / ASSIGNMENT_LOG).is_file():
+            return candidate
+    return None
+
+
+def find_task_dirs(base_path: Path) -> List[Path]:
+    """会社ディレクトリの tasks/ 配下（tasks/<name> と tasks/<category>/<name>）のタスクディレクトリ"""
+    # トランスクリプトのディレクトリ名は絶対パスから作られる
+    tasks_dir = Path(base_path).resolve() / "tasks"
+    if not tasks_dir.is_dir():
+        return []
+    found = []
+    for entry in sorted(tasks_dir.iterdir()):
+        if not entry.is_dir():
+            continue
+        if (entry / ASSIGNMENT_LOG).is_file():
+            found.append(entry)
+            continue
+        found.extend(child for child in sorted(entry.iterdir())
+                     if child.is_dir() and (child / ASSIGNMENT_LOG).is_file())
+    return found
+
+
+class TranscriptIndexer:
+    """Claude Code の JSONL トランスクリプトをバイトオフセット付きで追跡して集計する。
+
+    各ファイルは前回読み終えた位置から新しい完結行だけを読むので、数百MBの
+    トランスクリプトでも2回目以降のコストはファイルの stat と追記分のみ。
+    オフセットと集計値は ``state_path`` に保存され、再起動後も再読込しない。
+    """
+
+    def __init__(self, projects_dir: Optional[Path] = None, state_path: Optional[Path] = None,
+                 refresh_interval: float = 5.0, save_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.projects_dir = Path(projects_dir) if projects_dir else DEFAULT_PROJECTS_DIR
+        self.state_path = state_path
+        self.refresh_interval = refresh_interval
+        self.save_interval = save_interval
+        self.clock = clock
+        self.files: Dict[str, _FileState] = {}
+        self.bytes_read = 0
+        self._checked_at: Dict[str, float] = {}
+        self._usage_cache: Dict[str, TranscriptUsage] = {}
+        self._dirty = False
+        self._saved_at = clock()
+        if state_path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not read transcript index {self.state_path}: {e}")
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_FORMAT_VERSION:
+            return
+        for path, entry in data.get("files", {}).items():
+            try:
+                self.files[path] = _FileState(entry["inode"], entry["offset"], entry.get("last_message_id"),
+                                              TranscriptUsage(**entry["usage"]))
+            except (KeyError, TypeError):
+                continue
+
+    def save(self) -> None:
+        """オフセットと集計値をアトミックに保存（変更がある場合のみ）"""
+        if self.state_path is None or not self._dirty:
+            return
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "files": {
+                path: {"inode": state.inode, "offset": state.offset,
+                       "last_message_id": state.last_message_id, "usage": asdict(state.usage)}
+                for path, state in self.files.items()
+            },
+        }
+        try:
+            state_path = Path(self.state_path)
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=state_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, state_path)
+            self._dirty = False
+            self._saved_at = self.clock()
+        except Exception as e:
+            logger.warning(f"Could not write transcript index {self.state_path}: {e}")
+
+    def _consume(self, state: _FileState, line: bytes) -> None:
+        # 対象外の行（summary 等）は JSON を解析しない
+        if b'"message"' not in line:
+            return
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        message = entry.get("message") if isinstance(entry, dict) else None
+        if not isinstance(message, dict):
+            return
+        content = message.get("content")
+        blocks = content if isinstance(content, list) else []
+
+        if entry.get("type") == "user":
+            if not entry.get("isMeta") and (isinstance(content, str) or
+                                            any(block.get("type") == "text" for block in blocks
+                                                if isinstance(block, dict))):
+                state.usage.prompts += 1
+            return
+        if entry.get("type") != "assistant":
+            return
+
+        state.usage.tool_calls += sum(1 for block in blocks
+                                      if isinstance(block, dict) and block.get("type") == "tool_use")
+        # 1つの応答はコンテンツブロックごとに同じ message.id・usage の行に分かれて書かれる
+        message_id = message.get("id")
+        if message_id is not None and message_id == state.last_message_id:
+            return
+        state.last_message_id = message_id
+        state.usage.turns += 1
+        usage = message.get("usage") or {}
+        state.usage.input_tokens += usage.get("input_tokens") or 0
+        state.usage.output_tokens += usage.get("output_tokens") or 0
+        state.usage.cache_read_tokens += usage.get("cache_read_input_tokens") or 0
+        state.usage.cache_creation_tokens += usage.get("cache_creation_input_tokens") or 0
+
+    def update_file(self, path: Path) -> TranscriptUsage:
+        """1ファイルの追記分を読み込み、そのファイルの累計を返す"""
+        key = str(path)
+        state = self.files.get(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if self.files.pop(key, None) is not None:
+                self._dirty = True
+            return TranscriptUsage()
+        if state is None or state.inode != stat.st_ino or stat.st_size < state.offset:
+            # 新規・置き換え・切り詰められたファイルは先頭から
+            state = self.files[key] = _FileState(stat.st_ino)
+            self._dirty = True
+        state.usage.last_activity = max(state.usage.last_activity, stat.st_mtime)
+        if stat.st_size == state.offset:
+            return state.usage
+
+        with open(path, "rb") as f:
+            f.seek(state.offset)
+            remaining = stat.st_size - state.offset
+            pending = b""
+            while remaining > 0:
+                block = f.read(min(_READ_BLOCK, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                self.bytes_read += len(block)
+                data = pending + block
+                end = data.rfind(b"\n")
+                if end < 0:
+                    pending = data
+                    continue
+                for line in data[:end].split(b"\n"):
+                    if line:
+                        self._consume(state, line)
+                state.offset += end + 1
+                pending = data[end + 1:]
+        # 書き込み途中の最終行は次回に持ち越す（offset は完結行の末尾まで）
+        self._dirty = True
+        return state.usage
+
+    def usage_for_directory(self, cwd: str) -> TranscriptUsage:
+        """作業ディレクトリで起動されたセッションの合計（refresh_interval ごとに更新）"""
+        key = project_dir_name(cwd)
+        now = self.clock()
+        if key in self._usage_cache and now - self._checked_at[key] < self.refresh_interval:
+            return self._usage_cache[key]
+
+        total = TranscriptUsage()
+        project_dir = self.projects_dir / key
+        try:
+            entries = [entry.path for entry in os.scandir(project_dir)
+                       if entry.name.endswith(".jsonl") and entry.is_file()]
+        except FileNotFoundError:
+            entries = []
+        prefix = str(project_dir) + os.sep
+        for path in set(entries) | {path for path in self.files if path.startswith(prefix)}:
+            total.add(self.update_file(Path(path)))
+
+        self._usage_cache[key] = total
+        self._checked_at[key] = now
+        if self._dirty and now - self._saved_at >= self.save_interval:
+            self.save()
+        return total
+
+    def usage_for_panes(self, panes: Iterable[Dict[str, Any]]) -> Dict[tuple, TranscriptUsage]:
+        """デスク (window, pane) ごとの集計（タスクディレクトリ、無ければカレントパス基準）"""
+        usage = {}
+        for pane in panes:
+            path = pane.get("current_path")
+            if not path:
+                continue
+            task_dir = find_task_dir(path)
+            usage[(pane["window"], pane["index"])] = self.usage_for_directory(str(task_dir or path))
+        return usage
+
+    def summarize(self, task_dirs: Iterable[Path]) -> List[Dict[str, Any]]:
+        """タスクディレクトリごとに会社・エージェント・タスクへ帰属させた集計行"""
+        rows = []
+        for task_dir in task_dirs:
+            task_dir = Path(task_dir).resolve()
+            assignment = load_assignment(task_dir) or {}
+            usage = self.usage_for_directory(str(task_dir))
+            rows.append({
+                "company": assignment.get("company"),
+                "agent": assignment.get("agent"),
+                "task": assignment.get("task") or task_dir.name,
+                "task_directory": str(task_dir),
+                **asdict(usage),
+                "total_tokens": usage.total_tokens,
+            })
+        return rows
+
+
+def format_tokens(count: int) -> str:
+    """トークン数の短縮表示 (1234 → 1.2k)"""
+    for unit, scale in (("M", 1_000_000), ("k", 1_000)):
+        if count >= scale:
+            return f"{count / scale:.1f}{unit}"
+    return str(count)
@@ -2,13 +2,21 @@
 Organization Manager for Haconiwa v1.0
 """
 
+import hashlib
+import json
+import os
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 import logging
 
+from ..core.profiler import traced
+
 logger = logging.getLogger(__name__)
 
+ORGANIZATION_MANIFEST_VERSION = 1
+
 
 class OrganizationManagerError(Exception):
     """Organization manager error"""
@@ -20,7 +28,14 @@ class OrganizationManager:
     
     def __init__(self):
         self.created_organizations = {}
+        self.last_changes: Dict[str, Any] = {}
+        # Manifest state for the organization being created
+        self._org_path: Optional[Path] = None
+        self._previous_units: Dict[str, Dict[str, Any]] = {}
+        self._units: Dict[str, Dict[str, Any]] = {}
+        self._written_files: Dict[str, Dict[str, Any]] = {}
     
+    @traced("OrganizationManager.create_organization")
     def create_organization(self, config: Dict[str, Any]) -> bool:
         """Create organization structure with departments and roles"""
         try:
@@ -38,8 +53,14 @@ class OrganizationManager:
             org_path = base_path / "organization"
             org_path.mkdir(parents=True, exist_ok=True)
             
+            # Load manifest of the previously generated tree
+            manifest_file = self._get_manifest_file(base_path, org_name)
+            previous_manifest = self._load_manifest(manifest_file)
+            self._begin_sync(org_path, previous_manifest)
+            
             # Create company metadata file
-            self._create_company_metadata(org_path, config)
+            self._sync_unit("company", {key: config.get(key) for key in ("name", "company_name", "industry")},
+                            lambda: self._create_company_metadata(org_path, config))
             
             # Create organizational hierarchy
             departments_created = 0
@@ -53,17 +74,28 @@ class OrganizationManager:
             
             # Apply organization-level legal framework
             if legal_framework:
-                self._apply_organization_legal_framework(org_path, legal_framework)
+                self._sync_unit("legal", legal_framework,
+                                lambda: self._apply_organization_legal_framework(org_path, legal_framework))
             
-            # Display organization structure
-            self._display_organization_structure(org_path, config, departments_created, roles_created)
+            # Remove departments and roles no longer in the configuration
+            changes = self._finish_sync()
+            if changes["added"] or changes["changed"] or changes["removed"] or not previous_manifest:
+                self._save_manifest(manifest_file, self._units)
+            self.last_changes = changes
+            
+            # Display organization structure (full tree only on first creation)
+            if previous_manifest:
+                self._display_organization_changes(config, changes)
+            else:
+                self._display_organization_structure(org_path, config, departments_created, roles_created)
             
             # Store organization configuration
             self.created_organizations[org_name] = {
                 "config": config,
                 "path": str(org_path),
                 "departments": departments_created,
-                "roles": roles_created
+                "roles": roles_created,
+                "changes": changes
             }
             
             logger.info(f"✅ 組織 '{company_name}' の作成が成功しました")
@@ -101,9 +133,9 @@ This directory contains the organizational structure and role definitions for {c
 Use the department directories to access specific team configurations and role assignments.
 """
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_generated(metadata_file, content)
     
+    @traced("OrganizationManager.create_department")
     def _create_department(self, org_path: Path, dept_config: Dict[str, Any]) -> bool:
         """Create department structure with roles"""
         try:
@@ -112,27 +144,35 @@ Use the department directories to access specific team configurations and role a
             dept_description = dept_config.get("description", "")
             roles = dept_config.get("roles", [])
             
-            # Create department directory
             dept_path = org_path / "departments" / dept_id
-            dept_path.mkdir(parents=True, exist_ok=True)
+            roles_path = dept_path / "roles"
+            dept_legal_framework = dept_config.get("legal_framework")
             
-            # Create department README
-            self._create_department_readme(dept_path, dept_config)
+            def build_department():
+                # Create department directory and README
+                dept_path.mkdir(parents=True, exist_ok=True)
+                self._create_department_readme(dept_path, dept_config)
+                roles_path.mkdir(exist_ok=True)
+                
+                # Apply department-level legal framework
+                if dept_legal_framework:
+                    self._apply_department_legal_framework(dept_path, dept_legal_framework)
             
-            # Create roles directory
-            roles_path = dept_path / "roles"
-            roles_path.mkdir(exist_ok=True)
+            # README lists role titles, so only those role fields affect the department
+            dept_key = {key: value for key, value in dept_config.items() if key != "roles"}
+            dept_key["roles"] = [(role.get("title"), role.get("role_type")) for role in roles]
+            dept_changed = self._sync_unit(f"department/{dept_id}", dept_key, build_department)
             
             # Create each role
             for role_config in roles:
-                self._create_role(roles_path, role_config, dept_name)
-            
-            # Apply department-level legal framework
-            dept_legal_framework = dept_config.get("legal_framework")
-            if dept_legal_framework:
-                self._apply_department_legal_framework(dept_path, dept_legal_framework)
+                self._sync_unit(
+                    f"role/{dept_id}/{self._role_dir_name(role_config['title'])}",
+                    {"dept_name": dept_name, "role": role_config},
+                    lambda role_config=role_config: self._create_role(roles_path, role_config, dept_name)
+                )
             
-            logger.info(f"部門を作成しました: {dept_name} ({dept_id}) {len(roles)} 役職")
+            if dept_changed:
+                logger.info(f"部門を作成しました: {dept_name} ({dept_id}) {len(roles)} 役職")
             return True
             
         except Exception as e:
@@ -147,9 +187,8 @@ Use the department directories to access specific team configurations and role a
         reports_to = role_config.get("reports_to")
         
         # Create role directory (sanitize title for directory name)
-        role_dir_name = title.lower().replace(" ", "-").replace("/", "-")
-        role_path = roles_path / role_dir_name
-        role_path.mkdir(exist_ok=True)
+        role_path = roles_path / self._role_dir_name(title)
+        role_path.mkdir(parents=True, exist_ok=True)
         
         # Create role definition file
         role_file = role_path / "role_definition.md"
@@ -182,8 +221,12 @@ Role-specific legal framework and permissions are defined in the `law/` subdirec
 *Generated on: {self._get_timestamp()}*
 """
         
-        with open(role_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_generated(role_file, content)
+    
+    @staticmethod
+    def _role_dir_name(title: str) -> str:
+        """Get role directory name from role title"""
+        return title.lower().replace(" ", "-").replace("/", "-")
     
     def _create_department_readme(self, dept_path: Path, dept_config: Dict[str, Any]) -> None:
         """Create department README file"""
@@ -220,9 +263,9 @@ This department contains the following roles:
 *Generated on: {self._get_timestamp()}*
 """
         
-        with open(readme_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_generated(readme_file, content)
     
+    @traced("OrganizationManager.apply_organization_legal_framework")
     def _apply_organization_legal_framework(self, org_path: Path, legal_framework: Dict[str, Any]) -> None:
         """Apply legal framework to organization level"""
         try:
@@ -237,8 +280,7 @@ This department contains the following roles:
             
             # Create organization-level rules
             org_rules_file = law_path / "organization-rules.md"
-            with open(org_rules_file, 'w', encoding='utf-8') as f:
-                f.write(f"""# Organization Legal Framework
+            self._write_generated(org_rules_file, f"""# Organization Legal Framework
 
 ## Company-Wide Rules
 This document defines the legal framework and compliance rules for the entire organization.
@@ -274,8 +316,7 @@ These rules apply to all departments, roles, and activities within the organizat
             
             # Create department-level rules
             dept_rules_file = law_path / "department-rules.md"
-            with open(dept_rules_file, 'w', encoding='utf-8') as f:
-                f.write(f"""# Department Legal Framework
+            self._write_generated(dept_rules_file, f"""# Department Legal Framework
 
 ## Department-Specific Rules
 This document defines the legal framework and compliance rules specific to this department.
@@ -344,6 +385,160 @@ These rules apply to all roles and activities within this department.
         ))
         console.print()
     
+    def _display_organization_changes(self, config: Dict[str, Any], changes: Dict[str, Any]) -> None:
+        """Display summary of what changed on re-apply"""
+        from rich.console import Console
+        
+        console = Console()
+        company_name = config["company_name"]
+        
+        if not (changes["added"] or changes["changed"] or changes["removed"]):
+            console.print(f"🏢 [cyan]{company_name}[/cyan]: 組織構造に変更はありません ({changes['unchanged']} 項目)")
+            return
+        
+        console.print(f"🏢 [bold cyan]{company_name}[/bold cyan] の組織構造を更新しました: "
+                      f"[green]+{len(changes['added'])}[/green] "
+                      f"[yellow]~{len(changes['changed'])}[/yellow] "
+                      f"[red]-{len(changes['removed'])}[/red] "
+                      f"[dim](変更なし {changes['unchanged']})[/dim]")
+        for symbol, style, key in (("+", "green", "added"), ("~", "yellow", "changed"), ("-", "red", "removed")):
+            for unit in changes[key]:
+                console.print(f"   [{style}]{symbol} {unit}[/{style}]")
+    
+    def _get_manifest_file(self, base_path: Path, org_name: str) -> Path:
+        """Get manifest file recording the generated organization tree"""
+        return base_path / ".haconiwa" / "organizations" / f"{org_name}.json"
+    
+    def _load_manifest(self, manifest_file: Path) -> Dict[str, Dict[str, Any]]:
+        """Load generated units (unit id → config hash and files) from manifest"""
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"組織マニフェストを読み込めませんでした {manifest_file}: {e}")
+            return {}
+        
+        if not isinstance(data, dict) or data.get("version") != ORGANIZATION_MANIFEST_VERSION:
+            return {}
+        return data.get("units", {})
+    
+    def _save_manifest(self, manifest_file: Path, units: Dict[str, Dict[str, Any]]) -> None:
+        """Save manifest atomically"""
+        try:
+            manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=manifest_file.parent, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": ORGANIZATION_MANIFEST_VERSION, "units": units}, f,
+                          indent=2, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, manifest_file)
+        except Exception as e:
+            logger.warning(f"組織マニフェストを保存できませんでした {manifest_file}: {e}")
+    
+    def _begin_sync(self, org_path: Path, previous_units: Dict[str, Dict[str, Any]]) -> None:
+        """Start tracking generated units for an organization"""
+        self._org_path = org_path
+        self._previous_units = previous_units
+        self._units = {}
+        self._written_files = {}
+        self.last_changes = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+    
+    def _sync_unit(self, unit_id: str, unit_config: Any, build: Callable[[], None]) -> bool:
+        """Generate a unit (department, role, ...) only if its config changed or files are missing.
+        
+        Returns True if the unit was (re)generated.
+        """
+        unit_hash = hashlib.sha256(
+            json.dumps(unit_config, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()
+        previous = self._previous_units.get(unit_id)
+        
+        if previous and previous.get("hash") == unit_hash and self._files_intact(previous.get("files", {})):
+            self._units[unit_id] = previous
+            self.last_changes["unchanged"] += 1
+            return False
+        
+        self._written_files = {}
+        build()
+        files = self._written_files
+        self._written_files = {}
+        
+        # Remove files the previous version generated but this one did not
+        if previous:
+            self._remove_files(set(previous.get("files", {})) - set(files))
+        
+        self._units[unit_id] = {"hash": unit_hash, "files": files}
+        self.last_changes["changed" if previous else "added"].append(unit_id)
+        return True
+    
+    def _finish_sync(self) -> Dict[str, Any]:
+        """Remove units no longer configured and return change summary"""
+        # Keep files still owned by another unit (e.g. role re-added under a new id)
+        owned = {rel for unit in self._units.values() for rel in unit.get("files", {})}
+        for unit_id, previous in self._previous_units.items():
+            if unit_id in self._units:
+                continue
+            self._remove_files(set(previous.get("files", {})) - owned)
+            if unit_id.startswith("department/"):
+                self._remove_files([f"departments/{unit_id.split('/', 1)[1]}/roles"])
+            self.last_changes["removed"].append(unit_id)
+        return self.last_changes
+    
+    def _files_intact(self, files: Dict[str, Dict[str, Any]]) -> bool:
+        """Check generated files still exist with their recorded content.
+        
+        Size and mtime matching the manifest is trusted; otherwise the file is
+        hashed, so same-size edits are detected.
+        """
+        for rel, entry in files.items():
+            file_path = self._org_path / rel
+            try:
+                stat = file_path.stat()
+                if stat.st_size != entry.get("size"):
+                    return False
+                if stat.st_mtime_ns == entry.get("mtime_ns"):
+                    continue
+                if hashlib.sha256(file_path.read_bytes()).hexdigest() != entry.get("sha256"):
+                    return False
+            except OSError:
+                return False
+        return True
+    
+    def _write_generated(self, file_path: Path, content: str) -> None:
+        """Write a generated file and record it for the manifest"""
+        data = content.encode('utf-8')
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        rel = file_path.relative_to(self._org_path).as_posix() if self._org_path else str(file_path)
+        self._written_files[rel] = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data),
+                                    "mtime_ns": os.stat(file_path).st_mtime_ns}
+    
+    def _remove_files(self, rel_paths) -> None:
+        """Remove generated files and prune directories left empty"""
+        for rel in sorted(rel_paths):
+            file_path = self._org_path / rel
+            try:
+                if file_path.is_dir():
+                    file_path.rmdir()
+                else:
+                    file_path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                if file_path.is_dir():
+                    continue  # Directory still holds other files
+                logger.warning(f"ファイルを削除できませんでした {file_path}: {e}")
+                continue
+            
+            parent = file_path.parent
+            while parent != self._org_path and self._org_path in parent.parents:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break  # Not empty (user files or other units)
+                parent = parent.parent
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
         from datetime import datetime
@@ -11,7 +11,7 @@ from fnmatch import fnmatch
 from typing import Dict, List, Optional, Set, Any
 import logging
 
-from ..core.config import Config
+from ..core.path_filter import PathFilter
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +31,7 @@ class PathScanner:
     _configs = {}
     
     def __init__(self):
-        pass
+        self._filters: Dict[str, tuple] = {}
     
     @classmethod
     def register_config(cls, name: str, config: Dict[str, Any]):
@@ -39,35 +39,45 @@ class PathScanner:
         cls._configs[name] = config
         logger.info(f"Registered PathScan config: {name}")
     
-    def scan(self, config_name: str) -> List[str]:
+    def scan(self, config_name: str, root_path: str = ".") -> List[str]:
         """Scan files using configuration"""
         config = self._configs.get(config_name)
         if not config:
             logger.error(f"PathScan config not found: {config_name}")
             return []
         
-        # Mock implementation - would use actual file scanning
-        include_patterns = config.get("include", [])
-        exclude_patterns = config.get("exclude", [])
+        logger.info(f"Scanning with patterns - include: {config.get('include', [])}, exclude: {config.get('exclude', [])}")
         
-        logger.info(f"Scanning with patterns - include: {include_patterns}, exclude: {exclude_patterns}")
-        
-        # Return mock results
-        return ["src/main.py", "src/utils.py", "src/config.py"]
-
-    def _load_gitignore(self, config: Config):
-        gitignore_path = pathlib.Path(".gitignore")
-        if gitignore_path.exists():
-            with open(gitignore_path) as f:
-                config.ignore_patterns = {line.strip() for line in f if line.strip() and not line.startswith("#")}
-
-    def _should_ignore(self, path: str, config: Config) -> bool:
-        path_parts = pathlib.Path(path).parts
-        return any(
-            any(fnmatch(part, pattern) for part in path_parts)
-            for pattern in config.ignore_patterns
+        root = pathlib.Path(root_path)
+        return sorted(
+            os.path.relpath(metadata.path, root).replace(os.sep, "/")
+            for metadata in self.scan_with_config(root_path, config_name, parallel=False)
+            if not metadata.is_dir
         )
 
+    def _load_gitignore(self, root: pathlib.Path) -> List[str]:
+        gitignore_path = root / ".gitignore"
+        if not gitignore_path.exists():
+            return []
+        with open(gitignore_path) as f:
+            return f.read().splitlines()
+
+    def _path_filter(self, config: Dict[str, Any], root: pathlib.Path) -> PathFilter:
+        """Compiled filter for a config: .gitignore and exclude rules, include as whitelist"""
+        key = f"{id(config)}:{root}"
+        cached = self._filters.get(key)
+        if cached is None or cached[0] is not config:
+            ignore = self._load_gitignore(root) + list(config.get("exclude", []))
+            cached = (config, PathFilter(ignore=ignore, include=config.get("include", [])))
+            self._filters[key] = cached
+        return cached[1]
+
+    def _should_ignore(self, path: str, config: Dict[str, Any], root: Optional[pathlib.Path] = None) -> bool:
+        root = pathlib.Path(root) if root is not None else pathlib.Path(".")
+        entry = pathlib.Path(path)
+        relative = os.path.relpath(entry, root).replace(os.sep, "/")
+        return self._path_filter(config, root).excludes(relative, entry.is_dir())
+
     def _get_metadata(self, path: pathlib.Path) -> FileMetadata:
         stat = path.stat()
         return FileMetadata(
@@ -78,18 +88,22 @@ class PathScanner:
             is_dir=path.is_dir()
         )
 
-    def _scan_directory(self, directory: pathlib.Path, config: Config) -> List[FileMetadata]:
+    def _scan_directory(self, directory: pathlib.Path, config: Dict[str, Any],
+                        root: Optional[pathlib.Path] = None) -> List[FileMetadata]:
+        """Scan a directory, pruning ignored subdirectories before descending"""
+        root = root if root is not None else directory
+        path_filter = self._path_filter(config, root)
+        relative = os.path.relpath(directory, root).replace(os.sep, "/")
         results = []
-        try:
-            for entry in directory.iterdir():
-                if self._should_ignore(str(entry), config):
-                    continue
-                metadata = self._get_metadata(entry)
-                results.append(metadata)
-                if metadata.is_dir:
-                    results.extend(self._scan_directory(entry, config))
-        except PermissionError:
-            pass
+        for dirpath, _, filenames in path_filter.walk(directory, "" if relative == "." else relative):
+            current = pathlib.Path(dirpath)
+            try:
+                if current != directory:
+                    results.append(self._get_metadata(current))
+                for name in filenames:
+                    results.append(self._get_metadata(current / name))
+            except OSError:
+                continue
         return results
 
     def scan_with_config(self, root_path: str, config_name: str, pattern: Optional[str] = None, parallel: bool = True) -> List[FileMetadata]:
@@ -105,10 +119,19 @@ class PathScanner:
         if not parallel:
             results = self._scan_directory(root, config)
         else:
+            path_filter = self._path_filter(config, root)
+            results = []
+            first_level = []
+            for entry in sorted(root.iterdir()):
+                if entry.is_dir() and not entry.is_symlink():
+                    if not path_filter.is_ignored(entry.name, True):
+                        results.append(self._get_metadata(entry))
+                        first_level.append(entry)
+                elif path_filter.accepts_file(entry.name):
+                    results.append(self._get_metadata(entry))
             with ThreadPoolExecutor() as executor:
-                first_level = [d for d in root.iterdir() if d.is_dir() and not self._should_ignore(str(d), config)]
-                results = []
-                for subdir_results in executor.map(self._scan_directory, first_level, [config] * len(first_level)):
+                for subdir_results in executor.map(self._scan_directory, first_level,
+                                                   [config] * len(first_level), [root] * len(first_level)):
                     results.extend(subdir_results)
 
         if pattern:
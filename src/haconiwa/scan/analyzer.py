@@ -5,13 +5,34 @@ Analyzes AI model directory structures, categorization,
 and provides insights about model organization.
 """
 
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 from collections import defaultdict
 import json
 import yaml
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Bump when cached model_info or hash entries change incompatibly
+ANALYSIS_CACHE_VERSION = "1"
+
+# Changed directories are analyzed in threads once there are this many
+PARALLEL_MIN_DIRECTORIES = 32
+ANALYZE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Duplicate detection: files below this size are not reported, and files
+# are compared by hashing this many bytes at the start, middle and end
+DUPLICATE_MIN_SIZE = 1024 * 1024
+HASH_SAMPLE_BYTES = 256 * 1024
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
 class ModelAnalyzer:
     """Analyzes AI model directory structures and metadata"""
     
@@ -39,6 +60,12 @@ class ModelAnalyzer:
             '.gguf': 'GGUF (llama.cpp)',
             '.ggml': 'GGML'
         }
+        
+        self._index = None
+        self._models: Optional[List[Dict[str, Any]]] = None
+        self._cache: Dict[str, Any] = {}
+        self._hashes: Dict[str, Tuple[int, int, int, str]] = {}
+        self._cache_dirty = False
     
     def analyze_all(self) -> Dict[str, Any]:
         """Analyze entire directory structure"""
@@ -48,31 +75,27 @@ class ModelAnalyzer:
             'categories': defaultdict(list),
             'providers': defaultdict(list),
             'model_formats': defaultdict(int),
+            'format_sizes': defaultdict(int),
             'total_models': 0,
             'total_size': 0,
             'insights': []
         }
         
-        # Scan directory structure
-        for root, dirs, files in os.walk(self.base_path):
-            root_path = Path(root)
+        # Per-directory results, cached by directory mtime
+        for model_info in self._model_infos():
+            category = model_info['category']
+            provider = model_info['provider']
             
-            # Check if this is a model directory
-            if self._is_model_directory(root_path, files):
-                model_info = self._analyze_model_directory(root_path, files)
-                
-                if model_info:
-                    category = model_info['category']
-                    provider = model_info['provider']
-                    
-                    analysis['categories'][category].append(model_info)
-                    analysis['providers'][provider].append(model_info['name'])
-                    analysis['total_models'] += 1
-                    analysis['total_size'] += model_info.get('size', 0)
-                    
-                    # Track model formats
-                    for fmt in model_info.get('formats', []):
-                        analysis['model_formats'][fmt] += 1
+            analysis['categories'][category].append(model_info)
+            analysis['providers'][provider].append(model_info['name'])
+            analysis['total_models'] += 1
+            analysis['total_size'] += model_info.get('size', 0)
+            
+            # Track model formats
+            for fmt in model_info.get('formats', []):
+                analysis['model_formats'][fmt] += 1
+            for file_info in model_info.get('files', []):
+                analysis['format_sizes'][file_info['format']] += file_info['size']
         
         # Generate insights
         analysis['insights'] = self._generate_insights(analysis)
@@ -81,9 +104,119 @@ class ModelAnalyzer:
         analysis['categories'] = dict(analysis['categories'])
         analysis['providers'] = dict(analysis['providers'])
         analysis['model_formats'] = dict(analysis['model_formats'])
+        analysis['format_sizes'] = dict(analysis['format_sizes'])
         
         return analysis
     
+    def _scan_index(self):
+        """Scan index shared with ModelScanner (default ignore patterns, refreshed once per analyzer)"""
+        if self._index is None:
+            from .scanner import ModelScanner
+            self._index = ModelScanner(self.base_path).index
+            self._load_cache()
+        return self._index
+    
+    def _cache_path(self) -> Optional[Path]:
+        index = self._scan_index()
+        if index.index_path is None:
+            return None
+        return index.index_dir / f"analysis-{index.index_path.stem}.pkl"
+    
+    def _load_cache(self) -> None:
+        path = self._cache_path()
+        if path is None:
+            return
+        try:
+            with open(path, 'rb') as f:
+                version, cache, hashes = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"Discarding unreadable analysis cache {path}: {e}")
+            return
+        if version == ANALYSIS_CACHE_VERSION:
+            self._cache, self._hashes = cache, hashes
+    
+    def _save_cache(self) -> None:
+        path = self._cache_path()
+        if path is None or not self._cache_dirty:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((ANALYSIS_CACHE_VERSION, self._cache, self._hashes), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._cache_dirty = False
+        except Exception as e:
+            logger.debug(f"Could not write analysis cache {path}: {e}")
+    
+    def _directory_stamp(self, root_path: Path, listing) -> tuple:
+        """Cache validator: directory mtime, file entries, and fresh stats of config files.
+        
+        Config files can be edited in place without touching the directory
+        mtime, so they are stat'ed again; weights only count by size.
+        """
+        config_stamps = []
+        for file in listing.files:
+            if file.name in self.config_files:
+                try:
+                    stat = os.stat(root_path / file.name)
+                    config_stamps.append((file.name, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    pass
+        return (listing.mtime_ns, listing.files, tuple(config_stamps))
+    
+    def _analyze_listing(self, root_path: Path, listing) -> Optional[Dict[str, Any]]:
+        files = [file.name for file in listing.files]
+        if not self._is_model_directory(root_path, files):
+            return None
+        sizes = {file.name: file.size for file in listing.files}
+        return self._analyze_model_directory(root_path, files, sizes)
+    
+    def _model_infos(self) -> List[Dict[str, Any]]:
+        """Model information of every model directory, in walk order.
+        
+        Results are cached per directory and reused while its stamp is
+        unchanged; changed directories are analyzed in a thread pool.
+        """
+        if self._models is not None:
+            return self._models
+        
+        index = self._scan_index()
+        cache: Dict[str, Any] = {}
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending = []
+        for relative, listing in index.directories.items():
+            root_path = self.base_path / relative if relative else self.base_path
+            stamp = self._directory_stamp(root_path, listing)
+            cached = self._cache.get(relative)
+            if cached is not None and cached[0] == stamp:
+                cache[relative] = cached
+                results[relative] = cached[1]
+            else:
+                pending.append((relative, root_path, listing, stamp))
+        
+        if pending:
+            analyze = lambda item: self._analyze_listing(item[1], item[2])
+            if len(pending) >= PARALLEL_MIN_DIRECTORIES:
+                with ThreadPoolExecutor(max_workers=ANALYZE_WORKERS) as executor:
+                    analyzed = list(executor.map(analyze, pending))
+            else:
+                analyzed = [analyze(item) for item in pending]
+            for (relative, _, _, stamp), model_info in zip(pending, analyzed):
+                cache[relative] = (stamp, model_info)
+                results[relative] = model_info
+        
+        if pending or len(cache) != len(self._cache):
+            self._cache_dirty = True
+        self._cache = cache
+        self._save_cache()
+        
+        self._models = [results[relative] for relative in index.directories if results[relative]]
+        return self._models
+    
     def analyze_category(self, category: str) -> Dict[str, Any]:
         """Analyze models in a specific category"""
         analysis = {
@@ -95,19 +228,17 @@ class ModelAnalyzer:
             'providers': defaultdict(int)
         }
         
-        all_analysis = self.analyze_all()
+        # Answered from the per-directory cache, without a full analysis
+        models = [model for model in self._model_infos() if model['category'] == category]
+        analysis['models'] = models
+        analysis['total_count'] = len(models)
         
-        if category in all_analysis['categories']:
-            models = all_analysis['categories'][category]
-            analysis['models'] = models
-            analysis['total_count'] = len(models)
+        for model in models:
+            analysis['total_size'] += model.get('size', 0)
+            analysis['providers'][model.get('provider', 'unknown')] += 1
             
-            for model in models:
-                analysis['total_size'] += model.get('size', 0)
-                analysis['providers'][model.get('provider', 'unknown')] += 1
-                
-                for fmt in model.get('formats', []):
-                    analysis['common_formats'][fmt] += 1
+            for fmt in model.get('formats', []):
+                analysis['common_formats'][fmt] += 1
         
         # Convert defaultdicts
         analysis['common_formats'] = dict(analysis['common_formats'])
@@ -115,6 +246,110 @@ class ModelAnalyzer:
         
         return analysis
     
+    def find_duplicates(self,
+                        min_size: int = DUPLICATE_MIN_SIZE,
+                        all_files: bool = False,
+                        verify: bool = False,
+                        max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Find identical weight files wasting disk.
+        
+        Files are grouped by size first; only same-size files are read, and
+        only HASH_SAMPLE_BYTES at the start, middle and end of each
+        (``verify`` confirms groups with a full hash). Hard links to one
+        file are not counted as waste.
+        """
+        by_size: Dict[int, List[Path]] = defaultdict(list)
+        for file_path, entry in self._scan_index().iter_files():
+            if entry.size < min_size:
+                continue
+            if not all_files and os.path.splitext(entry.name)[1] not in self.model_extensions:
+                continue
+            by_size[entry.size].append(file_path)
+        candidates = [path for paths in by_size.values() if len(paths) > 1 for path in paths]
+        
+        groups: Dict[Tuple[int, str], List[Tuple[Path, tuple]]] = defaultdict(list)
+        with ThreadPoolExecutor(max_workers=max_workers or ANALYZE_WORKERS) as executor:
+            for path, result in zip(candidates, executor.map(self._sampled_hash, candidates)):
+                if result is not None:
+                    size, digest, inode = result
+                    groups[(size, digest)].append((path, inode))
+            
+            if verify:
+                to_verify = [(size, path, inode) for (size, _), members in groups.items() if len(members) > 1
+                             for path, inode in members]
+                digests = executor.map(self._full_hash, [path for _, path, _ in to_verify])
+                groups = defaultdict(list)
+                for (size, path, inode), digest in zip(to_verify, digests):
+                    if digest is not None:
+                        groups[(size, digest)].append((path, inode))
+        
+        # Forget hashes of files that are gone or no longer share a size
+        compared = {str(path.relative_to(self.base_path)) for path in candidates}
+        stale = [relative for relative in self._hashes if relative not in compared]
+        for relative in stale:
+            del self._hashes[relative]
+        self._cache_dirty = self._cache_dirty or bool(stale)
+        self._save_cache()
+        
+        report = []
+        for (size, digest), members in groups.items():
+            copies = len({inode for _, inode in members})
+            if copies < 2:
+                continue
+            report.append({
+                'size': size,
+                'hash': digest,
+                'files': sorted(str(path.relative_to(self.base_path)) for path, _ in members),
+                'copies': copies,
+                'wasted': size * (copies - 1)
+            })
+        report.sort(key=lambda group: (-group['wasted'], group['files']))
+        
+        return {
+            'groups': report,
+            'total_wasted': sum(group['wasted'] for group in report),
+            'files_compared': len(candidates),
+            'verified': verify
+        }
+    
+    def _sampled_hash(self, path: Path) -> Optional[Tuple[int, str, tuple]]:
+        """Get (size, sampled digest, inode) of a file; digests are cached by size, mtime and sample size"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        inode = (stat.st_dev, stat.st_ino)
+        relative = str(path.relative_to(self.base_path))
+        stamp = (stat.st_size, stat.st_mtime_ns, HASH_SAMPLE_BYTES)
+        cached = self._hashes.get(relative)
+        if cached is not None and cached[:3] == stamp:
+            return stat.st_size, cached[3], inode
+        
+        digest = hashlib.blake2b(str(stat.st_size).encode(), digest_size=16)
+        try:
+            with open(path, 'rb') as f:
+                if stat.st_size <= 3 * HASH_SAMPLE_BYTES:
+                    digest.update(f.read())
+                else:
+                    for offset in (0, stat.st_size // 2 - HASH_SAMPLE_BYTES // 2, stat.st_size - HASH_SAMPLE_BYTES):
+                        digest.update(os.pread(f.fileno(), HASH_SAMPLE_BYTES, offset))
+        except OSError:
+            return None
+        self._hashes[relative] = stamp + (digest.hexdigest(),)
+        self._cache_dirty = True
+        return stat.st_size, digest.hexdigest(), inode
+    
+    def _full_hash(self, path: Path) -> Optional[str]:
+        """Get the digest of a whole file"""
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+    
     def get_directory_structure(self) -> Dict[str, Any]:
         """Get hierarchical directory structure"""
         structure = {}
@@ -157,8 +392,9 @@ class ModelAnalyzer:
         
         return has_config or has_model or has_pattern
     
-    def _analyze_model_directory(self, path: Path, files: List[str]) -> Optional[Dict[str, Any]]:
-        """Analyze a single model directory"""
+    def _analyze_model_directory(self, path: Path, files: List[str],
+                                 sizes: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Analyze a single model directory (sizes from the index avoid a stat per file)"""
         model_info = {
             'path': str(path.relative_to(self.base_path)),
             'name': self._extract_model_name(path),
@@ -175,8 +411,7 @@ class ModelAnalyzer:
             file_path = path / file
             
             try:
-                file_stat = file_path.stat()
-                file_size = file_stat.st_size
+                file_size = sizes[file] if sizes and file in sizes else file_path.stat().st_size
                 model_info['size'] += file_size
                 
                 # Check for model files
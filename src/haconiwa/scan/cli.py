@@ -10,7 +10,7 @@ import yaml
 
 from .scanner import ModelScanner
 from .analyzer import ModelAnalyzer
-from .formatter import OutputFormatter
+from .formatter import OutputFormatter, take
 from .comparator import ModelComparator
 from .guide_generator import GuideGenerator
 from .generate_parallel import ParallelYAMLGenerator
@@ -47,20 +47,50 @@ def content(
     path: Optional[Path] = typer.Option(None, "--path", "-p", help="Base path to search in"),
     type: Optional[List[str]] = typer.Option(None, "--type", "-t", help="File types to search (e.g., .py)"),
     context: int = typer.Option(2, "--context", "-c", help="Number of context lines"),
-    ignore: Optional[List[str]] = typer.Option(None, "--ignore", "-i", help="Patterns to ignore")
+    ignore: Optional[List[str]] = typer.Option(None, "--ignore", "-i", help="Patterns to ignore"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-j", help="Worker processes (default: CPU count)"),
+    trigrams: bool = typer.Option(False, "--trigrams", "-T", help="Narrow candidate files with the trigram index"),
+    format: str = typer.Option("text", "--format", "-f", help="Output format (text/json/yaml/jsonl)"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", help="Stop searching after this many matches")
 ):
     """Search for patterns in file contents"""
+    import os
+    import re
+    import sys
+    
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        typer.echo(f"Error: Invalid regex pattern: {e}", err=True)
+        raise typer.Exit(1)
+    
     scanner = ModelScanner(
         base_path=path or Path.cwd(),
-        ignore_patterns=ignore
+        ignore_patterns=ignore,
+        use_trigrams=trigrams
     )
+    matches = scanner.iter_content_matches(pattern, file_types=type, context_lines=context, max_workers=workers)
+    formatter = OutputFormatter()
     
-    results = scanner.search_content(pattern, file_types=type, context_lines=context)
+    if format == "jsonl":
+        # One match per line as it is found; memory stays constant
+        try:
+            formatter.write_jsonl(matches, sys.stdout, limit)
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`): the scan is already stopped
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
     
-    # Format output
-    typer.echo(f"pattern: {results['pattern']}")
+    if format in ("json", "yaml"):
+        collected = list(take(matches, limit))
+        results = {'pattern': pattern, 'matches': collected, 'total_matches': len(collected)}
+        typer.echo(formatter.format(results, format))
+        return
+    
+    # Format output (matches are printed as they are found)
+    typer.echo(f"pattern: {pattern}")
     typer.echo("matches:")
-    for match in results['matches']:
+    for match in take(matches, limit):
         typer.echo(f"  file: {match['file']}")
         typer.echo(f"  line_number: {match['line_number']}")
         typer.echo(f"  line: {match['line']}")
@@ -152,10 +182,67 @@ def list_models(
     output = formatter.format_model_list(models, output_format)
     typer.echo(output)
 
+@scan_app.command("index")
+def index(
+    path: Optional[Path] = typer.Option(None, "--path", "-p", help="Base path to index"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Discard the stored index and list every directory again"),
+    ignore: Optional[List[str]] = typer.Option(None, "--ignore", "-i", help="Patterns to ignore"),
+    trigrams: bool = typer.Option(False, "--trigrams", "-T", help="Also build the trigram index used by 'scan content --trigrams'")
+):
+    """Build or refresh the persistent scan index (~/.haconiwa/cache/scan)"""
+    import time
+    
+    scanner = ModelScanner(base_path=path or Path.cwd(), ignore_patterns=ignore)
+    started = time.perf_counter()
+    scan_index = scanner.refresh_index(rebuild=rebuild)
+    stats = scan_index.stats()
+    elapsed = (time.perf_counter() - started) * 1000
+    
+    typer.echo(f"📇 Index: {scan_index.index_path}")
+    typer.echo(f"Directories: {stats['directories']} ({stats['rescanned']} listed)")
+    typer.echo(f"Files: {stats['files']} ({stats['bytes'] / (1024 ** 2):.1f} MB)")
+    if trigrams:
+        trigram_stats = scanner.refresh_trigrams(rebuild=rebuild).stats()
+        typer.echo(f"Trigrams: {trigram_stats['trigrams']} in {trigram_stats['files']} files "
+                   f"({trigram_stats['reindexed']} indexed, {trigram_stats['binary']} binary, "
+                   f"{trigram_stats['unindexed']} not indexed)")
+        elapsed = (time.perf_counter() - started) * 1000
+    typer.echo(f"Time: {elapsed:.1f} ms")
+
+@scan_app.command("duplicates")
+def duplicates(
+    path: Optional[Path] = typer.Option(None, "--path", "-p", help="Base path to search in"),
+    min_size: float = typer.Option(1.0, "--min-size", help="Ignore files smaller than this (MB)"),
+    all_files: bool = typer.Option(False, "--all-files", help="Compare all files, not only model weight formats"),
+    verify: bool = typer.Option(False, "--verify", help="Confirm duplicates with a full-content hash"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-j", help="Hashing threads"),
+    output_format: str = typer.Option("text", "--format", "-f", help="Output format (text/json)")
+):
+    """Find identical model weight files wasting disk space"""
+    analyzer = ModelAnalyzer(base_path=path or Path.cwd())
+    report = analyzer.find_duplicates(
+        min_size=int(min_size * 1024 * 1024),
+        all_files=all_files,
+        verify=verify,
+        max_workers=workers
+    )
+    
+    if output_format == "json":
+        typer.echo(json.dumps(report, indent=2))
+        return
+    
+    typer.echo(f"Duplicate weights: {len(report['groups'])} groups, "
+               f"{report['total_wasted'] / (1024 ** 3):.2f} GB reclaimable "
+               f"({report['files_compared']} files compared{', verified' if verify else ''})")
+    for group in report['groups']:
+        typer.echo(f"\n  {group['size'] / (1024 ** 2):.1f} MB x{group['copies']}  [{group['hash'][:12]}]")
+        for file in group['files']:
+            typer.echo(f"    {file}")
+
 @scan_app.command("generate-parallel-config")
 def generate_parallel_config(
     source: Optional[str] = typer.Option(None, "--source", "-s", 
-                                        help="Source: 'last-search', 'model:name', or file path"),
+                                        help="Source: 'last-search', 'model:name', file path, or '-' for JSONL on stdin"),
     action: str = typer.Option("refactor", "--action", "-a",
                               help="Action type: refactor, add_type_hints, add_tests, etc."),
     max_files: int = typer.Option(10, "--max-files", "-m", help="Maximum number of files"),
@@ -235,6 +322,15 @@ def generate_parallel_config(
             model_name = source[6:]
             scanner = ModelScanner(base_path=Path.cwd())
             scan_results = scanner.search_by_model_name(model_name)
+        elif source == '-' or (source and source.endswith('.jsonl') and Path(source).exists()):
+            # Read `scan content --format jsonl` output, stopping once enough files are found
+            import sys
+            if source == '-':
+                files = generator.files_from_jsonl(sys.stdin, max_files)
+            else:
+                with open(source, 'r') as f:
+                    files = generator.files_from_jsonl(f, max_files)
+            scan_results = {'matches': {'content': [{'path': file} for file in files]}}
         elif source and Path(source).exists():
             # Load from file
             source_path = Path(source)
@@ -294,6 +390,8 @@ COMMANDS:
   analyze       Analyze directory structure and categorization
   compare       Compare multiple AI models
   guide         Generate development guide for specific model
+  index         Build or refresh the persistent scan index
+  duplicates    Find identical model weight files
   generate-parallel-config  Generate parallel development configuration YAML
 
 EXAMPLES:
@@ -305,6 +403,8 @@ EXAMPLES:
   
   # Search content
   haconiwa scan content "model.forward" --type .py --context 5
+  haconiwa scan content "rope_theta" --workers 8   # Binary weight files are skipped
+  haconiwa scan content "TODO" --format jsonl --limit 100 | jq -r .file
   
   # List models by provider
   haconiwa scan list --provider openai --format json
@@ -318,10 +418,17 @@ EXAMPLES:
   # Generate guide
   haconiwa scan guide gpt-4 --type quickstart --output guide.md
   
+  # Refresh the scan index (all scan commands use ~/.haconiwa/cache/scan)
+  haconiwa scan index --rebuild
+  
+  # Find duplicate checkpoints (same size, then sampled hash)
+  haconiwa scan duplicates --min-size 100 --verify
+  
   # Generate parallel development configuration YAML
   haconiwa scan generate-parallel-config --source model:gpt-4 --action add_tests
   haconiwa scan generate-parallel-config --example
   haconiwa scan generate-parallel-config --migration gpt-3.5:gpt-4 --max-files 20
+  haconiwa scan content "deprecated_api" -f jsonl | haconiwa scan generate-parallel-config --source -
   haconiwa scan generate-parallel-config --project-wide "*.py" --action add_type_hints
 
 For more information on a specific command, use:
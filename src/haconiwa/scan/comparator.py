@@ -28,23 +28,19 @@ class ModelComparator:
             'metadata': self._compare_metadata
         }
     
-    def compare(self, models: List[str], aspects: List[str]) -> Dict[str, Any]:
-        """Compare multiple models across specified aspects"""
+    def compare(self, models: List[str], aspects: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Compare multiple models across specified aspects (all aspects by default)"""
         comparison = {
             'models': models,
             'timestamp': self._get_timestamp(),
             'results': {}
         }
         
-        # Load model information
-        model_data = {}
-        for model in models:
-            model_info = self._load_model_info(model)
-            if model_info:
-                model_data[model] = model_info
+        # Load model information (one walk for all models)
+        model_data = self._load_models(models)
         
         # Compare across requested aspects
-        for aspect in aspects:
+        for aspect in aspects or list(self.aspects):
             if aspect in self.aspects:
                 comparison['results'][aspect] = self.aspects[aspect](model_data)
         
@@ -53,13 +49,26 @@ class ModelComparator:
     # Alias for CLI compatibility
     compare_models = compare
     
-    def _load_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
-        """Load information about a specific model"""
+    def _load_models(self, model_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Load information about several models from a single scan"""
         from .scanner import ModelScanner
         
         scanner = ModelScanner(self.base_path)
-        search_results = scanner.search_by_model_name(model_name)
+        search_results = scanner.search_by_model_names(model_names)
         
+        model_data = {}
+        for model_name in model_names:
+            model_info = self._build_model_info(model_name, search_results[model_name])
+            if model_info:
+                model_data[model_name] = model_info
+        return model_data
+    
+    def _load_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Load information about a specific model"""
+        return self._load_models([model_name]).get(model_name)
+    
+    def _build_model_info(self, model_name: str, search_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Collect files, size and config of a model from its search results"""
         if not search_results['matches']:
             return None
         
@@ -77,7 +86,7 @@ class ModelComparator:
                 model_info['files'].append(file_info)
                 model_info['size'] += file_info.get('size', 0)
                 
-                # Try to load config
+                # Try to load config (the only file contents a comparison needs)
                 file_path = self.base_path / file_info['path']
                 if file_path.name in ['config.json', 'model_config.json']:
                     try:
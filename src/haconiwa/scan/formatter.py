@@ -6,8 +6,23 @@ including text, JSON, YAML, and summary formats.
 """
 
 import json
+import sys
 import yaml
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+def take(items: Iterable[Any], limit: Optional[int] = None) -> Iterator[Any]:
+    """Yield at most limit items, then close the source so a scan generator stops early"""
+    iterator = iter(items)
+    try:
+        # islice stops without pulling (and computing) one item past the limit
+        yield from iterator if limit is None else islice(iterator, limit)
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
 
 class OutputFormatter:
     """Formats scan results for different output types"""
@@ -19,7 +34,8 @@ class OutputFormatter:
             'yaml': self._format_yaml,
             'summary': self._format_summary,
             'table': self._format_table,
-            'tree': self._format_tree
+            'tree': self._format_tree,
+            'jsonl': self._format_jsonl
         }
     
     def format(self, data: Any, output_format: str) -> str:
@@ -73,6 +89,31 @@ class OutputFormatter:
         """Format as JSON"""
         return json.dumps(data, indent=2, default=str)
     
+    def write_jsonl(self, items: Iterable[Any], stream: Optional[TextIO] = None,
+                    limit: Optional[int] = None) -> int:
+        """Write items as JSON Lines while they are produced; returns the number written.
+        
+        Each line is flushed so a downstream reader (jq, generate-parallel-config)
+        sees it immediately; only one item is held in memory at a time.
+        """
+        stream = stream or sys.stdout
+        written = 0
+        for item in take(items, limit):
+            stream.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+            stream.flush()
+            written += 1
+        return written
+    
+    def _format_jsonl(self, data: Any) -> str:
+        """Format as JSON Lines (one line per match or list item)"""
+        if isinstance(data, dict) and isinstance(data.get('matches'), list):
+            items = data['matches']
+        elif isinstance(data, list):
+            items = data
+        else:
+            items = [data]
+        return "\n".join(json.dumps(item, ensure_ascii=False, default=str) for item in items)
+    
     def _format_yaml(self, data: Any) -> str:
         """Format as YAML"""
         return yaml.dump(data, default_flow_style=False, allow_unicode=True)
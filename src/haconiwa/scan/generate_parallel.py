@@ -5,9 +5,10 @@ Generates parallel-dev.yaml files for Claude Code SDK based on
 AI model search results and analysis.
 """
 
+import json
 import yaml
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime
 
 class ParallelYAMLGenerator:
@@ -270,6 +271,26 @@ class ParallelYAMLGenerator:
         
         return files
     
+    def files_from_jsonl(self, lines: Iterable[str], max_files: int) -> List[str]:
+        """Collect distinct file paths from JSON Lines scan output, reading only as far as needed"""
+        files: List[str] = []
+        seen = set()
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            file_path = record.get('file') or record.get('path') if isinstance(record, dict) else None
+            if file_path and file_path not in seen:
+                seen.add(file_path)
+                files.append(file_path)
+                if len(files) >= max_files:
+                    break
+        return files
+    
     def _generate_prompt_for_file(self, 
                                 file_path: str, 
                                 action: str,
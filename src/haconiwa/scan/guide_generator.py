@@ -39,13 +39,11 @@ class GuideGenerator:
     def _load_model_info(self, model_name: str) -> Optional[Dict[str, Any]]:
         """Load comprehensive information about a model"""
         from .scanner import ModelScanner
-        from .analyzer import ModelAnalyzer
         
         scanner = ModelScanner(self.base_path)
-        analyzer = ModelAnalyzer(self.base_path)
         
-        # Search for model
-        search_results = scanner.search_by_model_name(model_name, include_content=True)
+        # Search for model, reading only the files the guides quote
+        search_results = scanner.search_by_model_name(model_name, include_content=self._uses_content)
         
         if not search_results['matches']:
             return None
@@ -96,6 +94,16 @@ class GuideGenerator:
         
         return model_info
     
+    @staticmethod
+    def _uses_content(file_name: str) -> bool:
+        """Check whether a guide shows the contents of a file (config, README, examples, requirements)"""
+        lower_name = file_name.lower()
+        return (
+            file_name in ['config.json', 'model_config.json', 'requirements.txt', 'requirements.yml']
+            or lower_name in ['readme.md', 'readme.txt']
+            or 'example' in lower_name
+        )
+    
     def _generate_development_guide(self, model_info: Dict[str, Any]) -> str:
         """Generate a development guide"""
         lines = [
@@ -0,0 +1,232 @@
+"""
+Persistent Scan Index
+
+Keeps a per-directory listing of the scanned tree under
+``~/.haconiwa/cache/scan/<hash of base path>`` so repeated scan commands
+do not re-walk the whole model tree. The cache lives outside the scanned
+tree, whose contents may not be trusted with pickled data. Only directories whose mtime changed are listed
+again; unchanged directories cost a single stat.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.path_filter import PathFilter
+
+logger = logging.getLogger(__name__)
+
+# Bump when IndexedDirectory / IndexedFile change incompatibly
+INDEX_FORMAT_VERSION = "1"
+
+INDEX_CACHE_DIR = Path.home() / ".haconiwa" / "cache" / "scan"
+
+# Changed directories on one level are listed in threads once there are
+# this many; scandir and stat release the GIL, which pays off on large or
+# network-backed stores
+PARALLEL_MIN_DIRECTORIES = 16
+LIST_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directories modified this close to their listing may have changed again
+# within the same mtime tick, so they are listed again on the next refresh
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def index_dir_for(base_path: Path) -> Path:
+    """Get the cache directory of a base path, keyed by its resolved path"""
+    resolved = str(Path(base_path).resolve())
+    return INDEX_CACHE_DIR / hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+
+
+class IndexedFile(NamedTuple):
+    name: str
+    size: int
+    mtime_ns: int
+    type: str
+
+
+class IndexedDirectory(NamedTuple):
+    mtime_ns: int
+    listed_at_ns: int
+    subdirs: Tuple[str, ...]
+    files: Tuple[IndexedFile, ...]
+    category: str
+    provider: str
+
+    def is_current(self, mtime_ns: int) -> bool:
+        return mtime_ns == self.mtime_ns and self.listed_at_ns - self.mtime_ns > RACY_WINDOW_NS
+
+
+class ScanIndex:
+    """Directory listings of a base path, refreshed incrementally.
+
+    ``path_filter`` prunes directories and files exactly as the scanner's
+    filters do, so the index holds only what a scan would visit; ignored
+    directories are never listed. Listings
+    are stored in walk order (top-down, like ``os.walk``).
+    """
+
+    def __init__(self,
+                 base_path: Path,
+                 path_filter: PathFilter,
+                 derive: Callable[[Path], Tuple[str, str]],
+                 file_type: Callable[[str], str],
+                 key: str = "",
+                 persist: bool = True):
+        self.base_path = Path(base_path)
+        self.path_filter = path_filter
+        self.derive = derive
+        self.file_type = file_type
+        self.index_dir = index_dir_for(self.base_path)
+        digest = hashlib.sha256(f"{INDEX_FORMAT_VERSION}:{key}".encode("utf-8")).hexdigest()[:16]
+        self.index_path = self.index_dir / f"{digest}.pkl" if persist else None
+        self.directories: Dict[str, IndexedDirectory] = {}
+        self.rescanned = 0
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.index_path is None:
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                version, directories = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"Discarding unreadable scan index {self.index_path}: {e}")
+            return
+        if version == INDEX_FORMAT_VERSION:
+            self.directories = directories
+
+    def _save(self) -> None:
+        if self.index_path is None:
+            return
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((INDEX_FORMAT_VERSION, self.directories), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            # Without a writable cache the tree is just listed every time
+            logger.debug(f"Could not write scan index {self.index_path}: {e}")
+
+    def _list_directory(self, path: Path, relative: str, mtime_ns: int) -> IndexedDirectory:
+        listed_at_ns = time.time_ns()
+        subdirs: List[str] = []
+        files: List[IndexedFile] = []
+        path_filter = self.path_filter
+        prefix = relative.replace(os.sep, "/") + "/" if relative else ""
+        included = path_filter.dir_included(prefix.rstrip("/"))
+        try:
+            entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            entry_relative = prefix + entry.name
+            try:
+                if entry.is_dir():
+                    # Like os.walk: symlinked directories are not followed
+                    if not entry.is_symlink() and not path_filter.is_ignored(entry_relative, True):
+                        subdirs.append(entry.name)
+                    continue
+                if not path_filter.accepts_file(entry_relative, included):
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append(IndexedFile(entry.name, stat.st_size, stat.st_mtime_ns, self.file_type(entry.name)))
+        category, provider = self.derive(path)
+        return IndexedDirectory(mtime_ns, listed_at_ns, tuple(subdirs), tuple(files), category, provider)
+
+    def _refresh_directory(self, relative: str, previous: Optional[IndexedDirectory]):
+        """Get (listing, listed again?) for a directory; listing is None if it vanished"""
+        path = self.base_path / relative if relative else self.base_path
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, False
+        if previous is not None and previous.is_current(mtime_ns):
+            return previous, False
+        return self._list_directory(path, relative, mtime_ns), True
+
+    def refresh(self) -> "ScanIndex":
+        """Bring the index up to date, listing only directories that changed.
+
+        The tree is refreshed level by level; large levels are listed in a
+        thread pool.
+        """
+        if not self._loaded:
+            self._load()
+        previous = self.directories
+        listed: Dict[str, IndexedDirectory] = {}
+        self.rescanned = 0
+        executor: Optional[ThreadPoolExecutor] = None
+        frontier = [""]
+        try:
+            while frontier:
+                args = (frontier, [previous.get(relative) for relative in frontier])
+                if len(frontier) >= PARALLEL_MIN_DIRECTORIES:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=LIST_WORKERS)
+                    results = executor.map(self._refresh_directory, *args)
+                else:
+                    results = map(self._refresh_directory, *args)
+                next_frontier = []
+                for relative, (listing, rescanned) in zip(frontier, results):
+                    if listing is None:
+                        continue
+                    listed[relative] = listing
+                    self.rescanned += rescanned
+                    next_frontier.extend(os.path.join(relative, name) if relative else name
+                                         for name in listing.subdirs)
+                frontier = next_frontier
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Store in walk order (top-down, depth first like os.walk)
+        current: Dict[str, IndexedDirectory] = {}
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            listing = listed.get(relative)
+            if listing is None:
+                continue
+            current[relative] = listing
+            stack.extend(os.path.join(relative, name) if relative else name for name in reversed(listing.subdirs))
+        self.directories = current
+        if self.rescanned or len(current) != len(previous):
+            self._save()
+        return self
+
+    def walk(self) -> Iterator[Tuple[Path, IndexedDirectory]]:
+        """Yield (directory path, listing) in top-down order"""
+        for relative, listing in self.directories.items():
+            yield (self.base_path / relative if relative else self.base_path), listing
+
+    def iter_files(self) -> Iterator[Tuple[Path, IndexedFile]]:
+        """Yield (file path, file entry) for every indexed file"""
+        for root_path, listing in self.walk():
+            for file in listing.files:
+                yield root_path / file.name, file
+
+    def stats(self) -> Dict[str, int]:
+        """Get directory, file and byte counts"""
+        files = sum(len(listing.files) for listing in self.directories.values())
+        size = sum(file.size for listing in self.directories.values() for file in listing.files)
+        return {"directories": len(self.directories), "files": files, "bytes": size, "rescanned": self.rescanned}
+
+    def clear(self) -> None:
+        """Forget all listings and remove the stored index"""
+        self.directories = {}
+        self._loaded = True
+        if self.index_path is not None:
+            self.index_path.unlink(missing_ok=True)
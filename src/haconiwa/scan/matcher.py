@@ -0,0 +1,71 @@
+"""
+Multi-Pattern Matcher
+
+Aho–Corasick automaton for finding which of many substrings occur in a
+name, in one pass over the name regardless of the number of patterns.
+"""
+
+from collections import deque
+from typing import Dict, Hashable, List, Set
+
+
+class MultiPatternMatcher:
+    """Maps substring patterns to values; ``match`` returns the values whose patterns occur in a text"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+        # Values of empty patterns match every text
+        self._always: Set[Hashable] = set()
+        self._built = False
+
+    def add(self, pattern: str, value: Hashable) -> None:
+        """Add a pattern (must be called before the first match)"""
+        if not pattern:
+            self._always.add(value)
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(value)
+        self._built = False
+
+    def _build(self) -> None:
+        # Breadth-first: a state's failure link points to a shallower state,
+        # whose outputs are already complete when they are merged in
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+        self._built = True
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Get values of all patterns occurring in text"""
+        if not self._built:
+            self._build()
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set(self._always)
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
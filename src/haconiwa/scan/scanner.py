@@ -7,12 +7,16 @@ and directory traversal with filtering.
 """
 
 import os
-import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-import fnmatch
+from typing import Any, Callable, Dict, List, Optional, Union
 from collections import defaultdict
 
+from ..core.path_filter import PathFilter
+from .index import ScanIndex
+from .matcher import MultiPatternMatcher
+from .search import ContentSearcher
+from .trigram import TrigramIndex
+
 class ModelScanner:
     """Core scanner for AI model directories"""
     
@@ -20,14 +24,24 @@ class ModelScanner:
                  base_path: Path,
                  strip_prefix: bool = True,
                  ignore_patterns: Optional[List[str]] = None,
-                 whitelist: Optional[List[str]] = None):
+                 whitelist: Optional[List[str]] = None,
+                 use_index: bool = True,
+                 use_trigrams: bool = False):
         self.base_path = Path(base_path)
+        self.use_index = use_index
+        self.use_trigrams = use_trigrams
+        self._index: Optional[ScanIndex] = None
+        self._trigrams: Optional[TrigramIndex] = None
+        # Files left out of the last content search by the trigram index
+        self.files_pruned = 0
+        self._searcher: Optional[ContentSearcher] = None
         self.strip_prefix = strip_prefix
         self.ignore_patterns = ignore_patterns or [
             "*.pyc", "__pycache__", ".git", ".venv", 
             "node_modules", "*.egg-info", ".pytest_cache"
         ]
         self.whitelist = whitelist or []
+        self.path_filter = PathFilter(ignore=self.ignore_patterns, include=self.whitelist)
         
         # Common model name prefixes to strip
         self.model_prefixes = [
@@ -52,28 +66,52 @@ class ModelScanner:
             '.conf': 'config'
         }
     
+    @property
+    def index(self) -> ScanIndex:
+        """Scan index of base_path (refreshed once per scanner)"""
+        if self._index is None:
+            self.refresh_index()
+        return self._index
+    
+    def refresh_index(self, rebuild: bool = False) -> ScanIndex:
+        """Refresh the scan index, or list everything again when rebuild is set"""
+        self._index = ScanIndex(
+            self.base_path,
+            path_filter=self.path_filter,
+            derive=lambda path: (self._determine_category(path), self._extract_provider(path)),
+            file_type=lambda name: self.file_type_mappings.get(os.path.splitext(name)[1], 'other'),
+            key=self.path_filter.key(),
+            persist=self.use_index
+        )
+        if rebuild:
+            self._index.clear()
+        self._trigrams = None
+        return self._index.refresh()
+    
+    @property
+    def trigrams(self) -> TrigramIndex:
+        """Trigram index over the scan index (updated once per scanner)"""
+        if self._trigrams is None:
+            self.refresh_trigrams()
+        return self._trigrams
+    
+    def refresh_trigrams(self, rebuild: bool = False) -> TrigramIndex:
+        """Update the trigram index for changed files, or read every file again when rebuild is set"""
+        self._trigrams = TrigramIndex(self.index, persist=self.use_index)
+        if rebuild:
+            self._trigrams.clear()
+        return self._trigrams.update()
+    
     def _should_ignore(self, path: Path) -> bool:
-        """Check if path should be ignored"""
-        path_str = str(path)
-        
-        # Check whitelist first
-        if self.whitelist:
-            whitelisted = any(
-                fnmatch.fnmatch(path_str, pattern) or 
-                pattern in path_str 
-                for pattern in self.whitelist
-            )
-            if not whitelisted:
-                return True
-        
-        # Check ignore patterns
-        for pattern in self.ignore_patterns:
-            if fnmatch.fnmatch(path.name, pattern):
-                return True
-            if pattern in path_str:
-                return True
-        
-        return False
+        """Check if path (or one of its parent directories) is filtered out"""
+        path = Path(path)
+        try:
+            relative = path.relative_to(self.base_path).as_posix()
+        except ValueError:
+            relative = path.as_posix()
+        if relative == ".":
+            return False
+        return self.path_filter.excludes(relative, path.is_dir())
     
     def _normalize_model_name(self, model_name: str) -> str:
         """Normalize model name by stripping common prefixes if enabled"""
@@ -88,107 +126,124 @@ class ModelScanner:
         
         return normalized
     
-    def search_by_model_name(self, 
-                           model_name: str, 
-                           include_content: bool = False) -> Dict[str, Any]:
-        """Search for files and directories related to a model name"""
+    def _model_patterns(self, model_name: str) -> List[str]:
+        """Lowercase substrings that identify a model in file and directory names"""
         normalized_name = self._normalize_model_name(model_name)
-        results = {
-            'model_name': model_name,
-            'normalized_name': normalized_name,
-            'matches': defaultdict(list),
-            'total_files': 0,
-            'categories': set()
-        }
-        
-        # Search patterns
         patterns = [
             normalized_name,
             model_name.lower(),
             model_name.replace('-', '_'),
             normalized_name.replace('-', '_')
         ]
+        # Names are compared lowercased, so mixed-case patterns never match
+        return list(dict.fromkeys(pattern for pattern in patterns if pattern == pattern.lower()))
+    
+    def search_by_model_name(self, 
+                           model_name: str, 
+                           include_content: Union[bool, Callable[[str], bool]] = False) -> Dict[str, Any]:
+        """Search for files and directories related to a model name"""
+        return self.search_by_model_names([model_name], include_content)[model_name]
+    
+    def search_by_model_names(self,
+                              model_names: List[str],
+                              include_content: Union[bool, Callable[[str], bool]] = False) -> Dict[str, Dict[str, Any]]:
+        """Search for several models in one walk of the index.
         
-        for root, dirs, files in os.walk(self.base_path):
-            root_path = Path(root)
-            
-            # Filter directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(root_path / d)]
-            
-            # Check directory names
-            for pattern in patterns:
-                if pattern in root_path.name.lower():
-                    category = self._determine_category(root_path)
-                    results['categories'].add(category)
-                    
-                    # Process files in matching directory
-                    for file in files:
-                        file_path = root_path / file
-                        if not self._should_ignore(file_path):
-                            file_info = self._get_file_info(file_path, include_content)
-                            results['matches'][category].append(file_info)
-                            results['total_files'] += 1
+        Files in a directory whose name matches a model, and files whose own
+        name matches, are reported once per model. ``include_content`` may be
+        a predicate on the file name to read only the files a caller uses.
+        """
+        matcher = MultiPatternMatcher()
+        results = {}
+        for model_name in model_names:
+            results[model_name] = {
+                'model_name': model_name,
+                'normalized_name': self._normalize_model_name(model_name),
+                'matches': defaultdict(list),
+                'total_files': 0,
+                'categories': set()
+            }
+            for pattern in self._model_patterns(model_name):
+                matcher.add(pattern, model_name)
+        
+        for root_path, listing in self.index.walk():
+            category = listing.category
+            directory_models = matcher.match(root_path.name.lower())
             
-            # Check file names
-            for file in files:
-                file_path = root_path / file
-                if self._should_ignore(file_path):
+            for file in listing.files:
+                models = directory_models | matcher.match(file.name.lower())
+                if not models:
                     continue
-                
-                for pattern in patterns:
-                    if pattern in file.lower():
-                        category = self._determine_category(root_path)
-                        results['categories'].add(category)
-                        file_info = self._get_file_info(file_path, include_content)
-                        results['matches'][category].append(file_info)
-                        results['total_files'] += 1
-                        break
+                file_path = root_path / file.name
+                wants_content = include_content(file.name) if callable(include_content) else include_content
+                file_info = self._get_file_info(file_path, wants_content, file)
+                for model_name in models:
+                    result = results[model_name]
+                    result['categories'].add(category)
+                    result['matches'][category].append(file_info)
+                    result['total_files'] += 1
         
-        results['categories'] = list(results['categories'])
-        results['matches'] = dict(results['matches'])
+        for result in results.values():
+            result['categories'] = list(result['categories'])
+            result['matches'] = dict(result['matches'])
         return results
     
     def search_content(self, 
                       pattern: str, 
                       file_types: Optional[List[str]] = None,
-                      context_lines: int = 2) -> Dict[str, Any]:
+                      context_lines: int = 2,
+                      max_workers: Optional[int] = None) -> Dict[str, Any]:
         """Search for pattern in file contents"""
+        files = self._content_files(file_types, pattern)
         results = {
             'pattern': pattern,
-            'matches': [],
+            'matches': list(self.iter_content_matches(pattern, file_types, context_lines, max_workers, files)),
             'total_matches': 0,
-            'files_searched': 0
+            'files_searched': len(files),
+            'files_skipped': self._searcher.skipped,
+            'files_pruned': self.files_pruned
         }
-        
-        regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
-        
-        for file_path in self._iter_files(file_types):
-            if self._should_ignore(file_path):
-                continue
-            
-            results['files_searched'] += 1
-            
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                lines = content.splitlines()
-                
-                for i, line in enumerate(lines):
-                    if regex.search(line):
-                        match_info = {
-                            'file': str(file_path.relative_to(self.base_path)),
-                            'line_number': i + 1,
-                            'line': line.strip(),
-                            'context': self._get_context(lines, i, context_lines)
-                        }
-                        results['matches'].append(match_info)
-                        results['total_matches'] += 1
-            
-            except Exception:
-                # Skip files that can't be read
-                continue
-        
+        results['total_matches'] = len(results['matches'])
         return results
     
+    def iter_content_matches(self,
+                             pattern: str,
+                             file_types: Optional[List[str]] = None,
+                             context_lines: int = 2,
+                             max_workers: Optional[int] = None,
+                             files: Optional[List[tuple]] = None):
+        """Yield matches one at a time as worker batches complete (binary files are skipped)"""
+        if files is None:
+            files = self._content_files(file_types, pattern)
+        self._searcher = ContentSearcher(max_workers)
+        for path, matches in self._searcher.iter_search(files, pattern, context_lines):
+            relative = os.path.relpath(path, self.base_path)
+            for line_number, line, context in matches:
+                yield {
+                    'file': relative,
+                    'line_number': line_number,
+                    'line': line,
+                    'context': context
+                }
+    
+    def _content_files(self, file_types: Optional[List[str]] = None, pattern: Optional[str] = None) -> List[tuple]:
+        """Get (path, size) of files to search, from the index (narrowed by trigrams when enabled)"""
+        files = [
+            (str(file_path), entry.size) for file_path, entry in self.index.iter_files()
+            if not file_types or file_path.suffix in file_types
+        ]
+        self.files_pruned = 0
+        if self.use_trigrams and pattern:
+            candidates = self.trigrams.candidates(pattern)
+            if candidates is not None:
+                narrowed = [
+                    (path, size) for path, size in files
+                    if os.path.relpath(path, self.base_path).replace(os.sep, '/') in candidates
+                ]
+                self.files_pruned = len(files) - len(narrowed)
+                files = narrowed
+        return files
+    
     def list_all_models(self, 
                        category: Optional[str] = None,
                        provider: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -196,29 +251,22 @@ class ModelScanner:
         models = []
         model_dirs = defaultdict(lambda: {'files': [], 'categories': set()})
         
-        for root, dirs, files in os.walk(self.base_path):
-            root_path = Path(root)
-            
-            # Filter directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(root_path / d)]
-            
+        for root_path, listing in self.index.walk():
             # Look for model-related directories
             if self._is_model_directory(root_path):
                 model_name = self._extract_model_name(root_path)
-                model_provider = self._extract_provider(root_path)
-                model_category = self._determine_category(root_path)
+                model_provider = listing.provider
+                model_category = listing.category
                 
                 if category and model_category != category:
                     continue
                 if provider and model_provider != provider:
                     continue
                 
-                for file in files:
-                    file_path = root_path / file
-                    if not self._should_ignore(file_path):
-                        model_dirs[model_name]['files'].append(str(file_path))
-                        model_dirs[model_name]['categories'].add(model_category)
-                        model_dirs[model_name]['provider'] = model_provider
+                for file in listing.files:
+                    model_dirs[model_name]['files'].append(str(root_path / file.name))
+                    model_dirs[model_name]['categories'].add(model_category)
+                    model_dirs[model_name]['provider'] = model_provider
         
         # Convert to list format
         for model_name, info in model_dirs.items():
@@ -234,28 +282,20 @@ class ModelScanner:
     
     def _iter_files(self, file_types: Optional[List[str]] = None):
         """Iterate through files with optional type filtering"""
-        for root, dirs, files in os.walk(self.base_path):
-            root_path = Path(root)
-            
-            # Filter directories
-            dirs[:] = [d for d in dirs if not self._should_ignore(root_path / d)]
+        for file_path, _ in self.index.iter_files():
+            if file_types:
+                if not any(file_path.suffix == ft for ft in file_types):
+                    continue
             
-            for file in files:
-                file_path = root_path / file
-                
-                if file_types:
-                    if not any(file_path.suffix == ft for ft in file_types):
-                        continue
-                
-                yield file_path
+            yield file_path
     
-    def _get_file_info(self, file_path: Path, include_content: bool = False) -> Dict[str, Any]:
-        """Get information about a file"""
+    def _get_file_info(self, file_path: Path, include_content: bool = False, indexed=None) -> Dict[str, Any]:
+        """Get information about a file (type and size from the index entry when given)"""
         info = {
             'path': str(file_path.relative_to(self.base_path)),
             'name': file_path.name,
-            'type': self.file_type_mappings.get(file_path.suffix, 'other'),
-            'size': file_path.stat().st_size
+            'type': indexed.type if indexed else self.file_type_mappings.get(file_path.suffix, 'other'),
+            'size': indexed.size if indexed else file_path.stat().st_size
         }
         
         if include_content and info['size'] < 1024 * 1024:  # Max 1MB
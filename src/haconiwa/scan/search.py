@@ -0,0 +1,208 @@
+"""
+Content Search Engine
+
+Runs a compiled regex over whole memory-mapped files, fanning batches of
+files out across a process pool. Line numbers are computed from match
+offsets, so files are never split into lines; binary files are skipped
+after a NUL-byte sniff of their first block.
+"""
+
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+SNIFF_BYTES = 8192
+
+# Below this much work a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+PARALLEL_MIN_FILES = 16
+
+# Target amount of data per worker task
+BATCH_BYTES = 8 * 1024 * 1024
+BATCH_MAX_FILES = 256
+
+FLAGS = re.IGNORECASE | re.MULTILINE
+
+# \w \d \s and \b are ASCII-only in bytes patterns
+_UNICODE_AT = {sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY}
+_OPCODE = type(sre_constants.CATEGORY)
+
+
+def _has_unicode_classes(node) -> bool:
+    """Whether a parsed regex node uses a character class or word boundary anywhere"""
+    if isinstance(node, tuple) and len(node) == 2 and isinstance(node[0], _OPCODE):
+        op, av = node
+        if op is sre_constants.CATEGORY or (op is sre_constants.AT and av in _UNICODE_AT):
+            return True
+        return _has_unicode_classes(av)
+    if isinstance(node, (tuple, list, sre_parse.SubPattern)):
+        return any(_has_unicode_classes(child) for child in node)
+    return False
+
+
+def needs_text(pattern: str) -> bool:
+    """Whether pattern must run on decoded text rather than raw bytes"""
+    if not pattern.isascii():
+        return True  # Case folding beyond ASCII
+    try:
+        return _has_unicode_classes(sre_parse.parse(pattern))
+    except Exception:
+        return False  # Let re.compile report the error
+
+
+def compile_pattern(pattern: str):
+    """Compile pattern for mmap buffers (bytes), or for text when it needs Unicode semantics"""
+    if needs_text(pattern):
+        return re.compile(pattern, FLAGS)
+    return re.compile(pattern.encode("utf-8"), FLAGS)
+
+
+def is_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+
+def _context(buffer, line_start: int, line_end: int, context_lines: int, decode) -> List[str]:
+    """Lines around [line_start, line_end), like lines[i - n:i + n + 1]"""
+    start = line_start
+    for _ in range(context_lines):
+        if start == 0:
+            break
+        start = buffer.rfind(b"\n" if decode else "\n", 0, start - 1) + 1
+    end = line_end
+    length = len(buffer)
+    for _ in range(context_lines):
+        if end >= length:
+            break
+        next_end = buffer.find(b"\n" if decode else "\n", end + 1)
+        end = length if next_end < 0 else next_end
+    segment = buffer[start:end]
+    return (decode(segment) if decode else segment).splitlines()
+
+
+def _scan_buffer(buffer, regex, context_lines: int, decode) -> List[Tuple[int, str, List[str]]]:
+    """Return (line number, line, context) for each line with a match"""
+    newline = b"\n" if decode else "\n"
+    found = []
+    line_number = 1
+    counted_to = 0
+    position = 0
+    length = len(buffer)
+    while position <= length:
+        match = regex.search(buffer, position)
+        if match is None:
+            break
+        start = match.start()
+        line_number += buffer[counted_to:start].count(newline)
+        counted_to = start
+        line_start = buffer.rfind(newline, 0, start) + 1
+        line_end = buffer.find(newline, start)
+        if line_end < 0:
+            line_end = length
+        line = buffer[line_start:line_end]
+        if match.end() > line_end and regex.search(line) is None:
+            # The match runs into the next line, which a line-by-line search never sees
+            position = line_end + 1
+            continue
+        found.append((
+            line_number,
+            (decode(line) if decode else line).strip(),
+            _context(buffer, line_start, line_end, context_lines, decode) or [""],
+        ))
+        # One result per line, like a line-by-line search
+        position = line_end + 1
+    return found
+
+
+def search_file(path: str, regex, context_lines: int) -> Optional[List[Tuple[int, str, List[str]]]]:
+    """Search one file; None when it is binary or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if is_binary(head):
+                return None
+            if not head:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if isinstance(regex.pattern, bytes):
+                    return _scan_buffer(buffer, regex, context_lines,
+                                        lambda data: data.decode("utf-8", errors="ignore"))
+                text = buffer[:].decode("utf-8", errors="ignore")
+                return _scan_buffer(text, regex, context_lines, None)
+    except (OSError, ValueError):
+        return None
+
+
+def _search_batch(paths: List[str], pattern: str, context_lines: int) -> List[Optional[list]]:
+    regex = compile_pattern(pattern)
+    return [search_file(path, regex, context_lines) for path in paths]
+
+
+def _batches(files: Iterable[Tuple[str, int]]) -> Iterator[List[str]]:
+    batch: List[str] = []
+    batch_bytes = 0
+    for path, size in files:
+        batch.append(path)
+        batch_bytes += size
+        if batch_bytes >= BATCH_BYTES or len(batch) >= BATCH_MAX_FILES:
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+class ContentSearcher:
+    """Searches many files for a regex, in parallel when the workload is large.
+
+    ``iter_search`` yields results file by file (in input order) as worker
+    batches complete, so callers can stream matches.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or _available_cpus()
+        # Binary or unreadable files in the last search
+        self.skipped = 0
+
+    def iter_search(self, files: List[Tuple[str, int]], pattern: str,
+                    context_lines: int = 2) -> Iterator[Tuple[str, List[Tuple[int, str, List[str]]]]]:
+        """Yield (path, matches) for each text file; files are (path, size) pairs"""
+        regex = compile_pattern(pattern)
+        total_bytes = sum(size for _, size in files)
+        self.skipped = 0
+
+        if self.max_workers <= 1 or len(files) < PARALLEL_MIN_FILES or total_bytes < PARALLEL_MIN_BYTES:
+            results = ((path, search_file(path, regex, context_lines)) for path, _ in files)
+            yield from self._filter(results)
+            return
+
+        batches = list(_batches(files))
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches)))
+        try:
+            batch_results = executor.map(_search_batch, batches, [pattern] * len(batches),
+                                         [context_lines] * len(batches))
+            for batch, results in zip(batches, batch_results):
+                yield from self._filter(zip(batch, results))
+        finally:
+            # A consumer that stops early (--limit, closed pipe) cancels pending batches
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _filter(self, results) -> Iterator[Tuple[str, list]]:
+        for path, matches in results:
+            if matches is None:
+                self.skipped += 1
+                continue
+            yield path, matches
@@ -0,0 +1,369 @@
+"""
+Trigram Index
+
+Optional inverted index from byte trigrams to the files that contain them,
+built on top of the scan index. A content query is planned into an
+AND/OR of literal strings taken from the regex; only files holding every
+trigram of those literals are searched, the regex then verifies them.
+Changed files are re-indexed incrementally on each update.
+"""
+
+import logging
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from .index import RACY_WINDOW_NS, ScanIndex
+from .search import SNIFF_BYTES, is_binary, needs_text
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored layout changes incompatibly
+TRIGRAM_FORMAT_VERSION = "2"
+
+# Larger files are not indexed and are always searched
+MAX_FILE_BYTES = 16 * 1024 * 1024
+
+# Rebuild postings once this share of file ids belongs to removed files,
+# or once postings added since the last merge outgrow this share of the rest
+COMPACT_RATIO = 0.5
+DELTA_RATIO = 0.25
+
+# With case folding, these ASCII letters also match non-ASCII characters
+# (e.g. "k" and KELVIN SIGN) in text patterns, so they cannot be trigrams
+_UNICODE_FOLDING = frozenset(map(ord, "iksIKS"))
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+
+def trigrams(data: bytes) -> Set[int]:
+    """Case-folded (ASCII) byte trigrams of data, packed into ints"""
+    data = data.lower()
+    return {a << 16 | b << 8 | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+class Segment(NamedTuple):
+    """Postings as three flat arrays: sorted trigrams, offsets into ids, file ids"""
+    grams: array
+    offsets: array
+    ids: array
+
+    @classmethod
+    def empty(cls) -> "Segment":
+        return cls(array("I"), array("Q", (0,)), array("I"))
+
+    @classmethod
+    def from_postings(cls, postings: Dict[int, Iterable[int]]) -> "Segment":
+        segment = cls.empty()
+        for gram in sorted(postings):
+            segment.grams.append(gram)
+            segment.ids.extend(postings[gram])
+            segment.offsets.append(len(segment.ids))
+        return segment
+
+    def get(self, gram: int) -> array:
+        i = bisect_left(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return self.ids[:0]
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def items(self) -> Iterable[Tuple[int, array]]:
+        for i, gram in enumerate(self.grams):
+            yield gram, self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+
+def _plan_sequence(items, text: bool):
+    """Query node for a parsed regex sequence, or None when it matches anything"""
+    clauses = []
+    run: List[int] = []
+
+    def flush():
+        if len(run) >= 3:
+            clauses.append(("lit", bytes(run)))
+        run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL and av < 128 and not (text and av in _UNICODE_FOLDING):
+            run.append(ord(chr(av).lower()))
+            continue
+        if op is sre_constants.AT:
+            continue  # Zero-width, the literal run continues
+        flush()
+        node = None
+        if op is sre_constants.SUBPATTERN:
+            node = _plan_sequence(av[-1], text)
+        elif op in _REPEATS and av[0] >= 1:
+            node = _plan_sequence(av[2], text)
+        elif op is sre_constants.BRANCH:
+            alternatives = [_plan_sequence(branch, text) for branch in av[1]]
+            if all(alternatives):
+                node = ("or", alternatives)
+        if node is not None:
+            clauses.append(node)
+    flush()
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else ("and", clauses)
+
+
+def plan_query(pattern: str):
+    """Plan a content regex into ("lit", bytes) / ("and", [...]) / ("or", [...]) nodes.
+
+    None means the pattern has no usable literal and every file is a candidate.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    return _plan_sequence(parsed, text=needs_text(pattern))
+
+
+class TrigramIndex:
+    """Trigram postings for the files of a scan index.
+
+    Each indexed file gets an id. Postings live in a merged ``Segment``
+    (loaded as three arrays, no per-trigram objects) plus a small delta of
+    files indexed since the last merge. A changed or removed file only
+    loses its id; postings are merged once the delta or the dead ids grow.
+    Files too large to index, or modified too recently to trust their
+    mtime, are always candidates; binary files never are (content search
+    skips them).
+    """
+
+    def __init__(self, scan_index: ScanIndex, persist: bool = True):
+        self.scan_index = scan_index
+        self.base_path = scan_index.base_path
+        self.index_path = None
+        if persist and scan_index.index_path is not None:
+            self.index_path = scan_index.index_dir / f"trigrams-{scan_index.index_path.stem}.pkl"
+        self.files: List[Optional[Tuple[str, int, int]]] = []
+        self.ids: Dict[str, int] = {}
+        self.segment = Segment.empty()
+        self.delta: Dict[int, array] = {}
+        self.binary: Dict[str, Tuple[int, int]] = {}
+        self.unindexed: Set[str] = set()
+        self.dead = 0
+        self.reindexed = 0
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.index_path is None:
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"Discarding unreadable trigram index {self.index_path}: {e}")
+            return
+        if state.get("version") != TRIGRAM_FORMAT_VERSION:
+            return
+        self.files = state["files"]
+        self.segment = Segment(*state["segment"])
+        self.delta = dict(Segment(*state["delta"]).items())
+        self.binary = state["binary"]
+        self.ids = {entry[0]: file_id for file_id, entry in enumerate(self.files) if entry is not None}
+        self.dead = len(self.files) - len(self.ids)
+
+    def _save(self) -> None:
+        if self.index_path is None:
+            return
+        state = {
+            "version": TRIGRAM_FORMAT_VERSION,
+            "files": self.files,
+            "segment": tuple(self.segment),
+            "delta": tuple(Segment.from_postings(self.delta)),
+            "binary": self.binary,
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.debug(f"Could not write trigram index {self.index_path}: {e}")
+
+    def _read_trigrams(self, path: str) -> Optional[Set[int]]:
+        """Trigrams of a text file; None for binary or unreadable files"""
+        try:
+            with open(path, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+                if is_binary(head):
+                    return None
+                data = head + f.read()
+        except OSError:
+            return None
+        return trigrams(data)
+
+    def _forget(self, relative: str) -> None:
+        file_id = self.ids.pop(relative, None)
+        if file_id is not None:
+            self.files[file_id] = None
+            self.dead += 1
+
+    def _add(self, relative: str, size: int, mtime_ns: int, grams: Iterable[int]) -> None:
+        file_id = len(self.files)
+        self.files.append((relative, size, mtime_ns))
+        self.ids[relative] = file_id
+        postings = self.delta
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("I", (file_id,))
+            else:
+                posting.append(file_id)
+
+    def compact(self) -> None:
+        """Merge the delta into the segment, dropping ids of changed and removed files"""
+        remap: Dict[int, int] = {}
+        files: List[Optional[Tuple[str, int, int]]] = []
+        for file_id, entry in enumerate(self.files):
+            if entry is not None:
+                remap[file_id] = len(files)
+                files.append(entry)
+        postings: Dict[int, array] = {}
+        for source in (self.segment.items(), self.delta.items()):
+            for gram, posting in source:
+                kept = [remap[file_id] for file_id in posting if file_id in remap]
+                if kept:
+                    postings.setdefault(gram, array("I")).extend(kept)
+        self.files = files
+        self.segment = Segment.from_postings(postings)
+        self.delta = {}
+        self.ids = {entry[0]: file_id for file_id, entry in enumerate(files)}
+        self.dead = 0
+
+    def _postings(self, gram: int) -> array:
+        posting = self.segment.get(gram)
+        added = self.delta.get(gram)
+        return posting + added if added else posting
+
+    def update(self) -> "TrigramIndex":
+        """Index new and changed files of the scan index, forget removed ones"""
+        if not self._loaded:
+            self._load()
+        self.reindexed = 0
+        changed = False
+        now_ns = time.time_ns()
+        seen: Set[str] = set()
+        unindexed: Set[str] = set()
+
+        for path, _ in self.scan_index.iter_files():
+            relative = os.path.relpath(path, self.base_path).replace(os.sep, "/")
+            # In-place edits do not touch the directory mtime, so the scan
+            # index may hold an older stat of the file
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen.add(relative)
+            stamp = (stat.st_size, stat.st_mtime_ns)
+            file_id = self.ids.get(relative)
+            if file_id is not None and self.files[file_id][1:] == stamp:
+                continue
+            if self.binary.get(relative) == stamp:
+                continue
+            if file_id is not None:
+                self._forget(relative)
+                changed = True
+            self.binary.pop(relative, None)
+            if stat.st_size > MAX_FILE_BYTES or now_ns - stat.st_mtime_ns <= RACY_WINDOW_NS:
+                unindexed.add(relative)
+                continue
+            grams = self._read_trigrams(str(path))
+            if grams is None:
+                self.binary[relative] = stamp
+            else:
+                self._add(relative, stat.st_size, stat.st_mtime_ns, grams)
+                self.reindexed += 1
+            changed = True
+
+        for relative in [relative for relative in self.ids if relative not in seen]:
+            self._forget(relative)
+            changed = True
+        for relative in [relative for relative in self.binary if relative not in seen]:
+            del self.binary[relative]
+            changed = True
+        self.unindexed = unindexed
+
+        delta_size = sum(len(posting) for posting in self.delta.values())
+        if ((self.files and self.dead / len(self.files) >= COMPACT_RATIO)
+                or delta_size > len(self.segment.ids) * DELTA_RATIO):
+            self.compact()
+        if changed:
+            self._save()
+        return self
+
+    def _evaluate(self, node) -> Optional[Set[int]]:
+        kind, value = node
+        if kind == "lit":
+            grams = trigrams(value)
+            postings = sorted((self._postings(gram) for gram in grams), key=len)
+            if not postings or not postings[0]:
+                return set()
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                ids.intersection_update(posting)
+                if not ids:
+                    break
+            return ids
+        results = [self._evaluate(child) for child in value]
+        if kind == "or":
+            if any(result is None for result in results):
+                return None
+            return set().union(*results)
+        narrowed = [result for result in results if result is not None]
+        if not narrowed:
+            return None
+        ids = narrowed[0]
+        for result in narrowed[1:]:
+            ids &= result
+        return ids
+
+    def candidates(self, pattern: str) -> Optional[Set[str]]:
+        """Relative paths of files that may match pattern (None: every file)"""
+        node = plan_query(pattern)
+        if node is None:
+            return None
+        ids = self._evaluate(node)
+        if ids is None:
+            return None
+        paths = {self.files[file_id][0] for file_id in ids if self.files[file_id] is not None}
+        return paths | self.unindexed
+
+    def clear(self) -> None:
+        """Forget all postings and remove the stored index"""
+        self.files, self.ids, self.delta, self.binary = [], {}, {}, {}
+        self.segment = Segment.empty()
+        self.unindexed = set()
+        self.dead = 0
+        self._loaded = True
+        if self.index_path is not None:
+            self.index_path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Get indexed file, trigram and posting counts"""
+        return {
+            "files": len(self.ids),
+            "trigrams": len(set(self.segment.grams).union(self.delta)),
+            "postings": len(self.segment.ids) + sum(len(posting) for posting in self.delta.values()),
+            "unindexed": len(self.unindexed),
+            "binary": len(self.binary),
+            "reindexed": self.reindexed,
+        }
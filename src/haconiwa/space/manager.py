@@ -10,6 +10,7 @@ import json
 import glob
 
 from ..core.crd.models import SpaceCRD
+from ..core.profiler import run_subprocess, traced
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +46,7 @@ class SpaceManager:
         """Get task assigned to specific agent"""
         return self.task_assignments.get(assignee)
     
+    @traced("SpaceManager.create_multiroom_session")
     def create_multiroom_session(self, config: Dict[str, Any]) -> bool:
         """Create multiroom tmux session with proper Room → Window mapping and task-centric directory structure"""
         try:
@@ -190,6 +192,7 @@ class SpaceManager:
             logger.error(f"会社 {config.get('name', 'unknown')} の作成に失敗: {e}")
             return False
     
+    @traced("SpaceManager.generate_desk_mappings")
     def generate_desk_mappings(self, organizations: List[Dict[str, Any]] = None, rooms: List[Dict[str, Any]] = None, grid: str = "8x4", base_path: Path = None) -> List[Dict[str, Any]]:
         """Generate desk mappings based on actual room configuration and grid size"""
         if not organizations:
@@ -512,6 +515,7 @@ class SpaceManager:
                 {"id": "01", "name": organization_ref or "default-org", "department_id": "default"}
             ]
     
+    @traced("SpaceManager.create_tmux_session")
     def _create_tmux_session(self, session_name: str, base_path: Path = None):
         """Create tmux session with optional working directory"""
         cmd = ["tmux", "new-session", "-d", "-s", session_name]
@@ -520,15 +524,16 @@ class SpaceManager:
             abs_path = str(base_path.absolute())
             cmd.extend(["-c", abs_path])
             logger.info(f"Creating tmux session with working directory: {abs_path}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_subprocess(cmd, capture_output=True, text=True)
         if result.returncode != 0:
             raise SpaceManagerError(f"Failed to create tmux session: {result.stderr}")
         
         # Also set default-path for the session to ensure new windows inherit it
         if base_path:
             set_cmd = ["tmux", "set-option", "-t", session_name, "default-path", str(base_path.absolute())]
-            subprocess.run(set_cmd, capture_output=True, text=True)
+            run_subprocess(set_cmd, capture_output=True, text=True)
     
+    @traced("SpaceManager.create_windows_for_rooms")
     def _create_windows_for_rooms(self, session_name: str, rooms: List[Dict[str, Any]], base_path: Path) -> bool:
         """Create tmux windows for each room"""
         try:
@@ -550,18 +555,18 @@ class SpaceManager:
                     # Create new window
                     cmd = ["tmux", "new-window", "-t", session_name, "-n", window_name]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.error(f"Failed to create window {i} ({window_name}): {result.stderr}")
                     return False
                 
                 # Apply pane border settings to the new window
-                subprocess.run(
+                run_subprocess(
                     ["tmux", "set-option", "-t", f"{session_name}:{i}", 
                      "pane-border-status", "top"],
                     capture_output=True, text=True
                 )
-                subprocess.run(
+                run_subprocess(
                     ["tmux", "set-option", "-t", f"{session_name}:{i}", 
                      "pane-border-format", "#{pane_title}"],
                     capture_output=True, text=True
@@ -628,6 +633,7 @@ class SpaceManager:
             logger.warning(f"Could not load room-window mapping: {e}")
             return None
     
+    @traced("SpaceManager.create_panes_in_window")
     def _create_panes_in_window(self, session_name: str, window_id: str, pane_count: int) -> bool:
         """Create panes in specific tmux window - supports different layouts"""
         try:
@@ -639,7 +645,7 @@ class SpaceManager:
             elif pane_count == 2:
                 # Split horizontally once
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split in window {window_id}: {result.stderr}")
                 logger.info(f"Created {pane_count} panes in window {window_id} (2x1 layout)")
@@ -648,12 +654,12 @@ class SpaceManager:
             elif pane_count == 3:
                 # 1x3 layout: Split horizontally twice
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split 1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.1"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split 2 in window {window_id}: {result.stderr}")
                 
@@ -664,17 +670,17 @@ class SpaceManager:
                 # 2x2 layout or 1x4 layout
                 # Split horizontally once, then split each vertically
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split 1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split 1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.2"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split 2 in window {window_id}: {result.stderr}")
                 
@@ -685,7 +691,7 @@ class SpaceManager:
                 # Alpha/Beta Room layout: 2x4 (8 panes)
                 # Split vertically once to create 2 rows
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split in window {window_id}: {result.stderr}")
                 
@@ -694,7 +700,7 @@ class SpaceManager:
                 for i in range(3):
                     target_pane = 0 if i == 0 else 1
                     cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.{target_pane}"]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_subprocess(cmd, capture_output=True, text=True)
                     if result.returncode != 0:
                         logger.warning(f"Failed to create horizontal split top-{i+1} in window {window_id}: {result.stderr}")
                 
@@ -702,13 +708,13 @@ class SpaceManager:
                 for i in range(3):
                     target_pane = 4 if i == 0 else 5
                     cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.{target_pane}"]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_subprocess(cmd, capture_output=True, text=True)
                     if result.returncode != 0:
                         logger.warning(f"Failed to create horizontal split bottom-{i+1} in window {window_id}: {result.stderr}")
                 
                 # Apply tiled layout for even distribution
                 cmd = ["tmux", "select-layout", "-t", f"{session_name}:{window_id}", "tiled"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to apply tiled layout to window {window_id}: {result.stderr}")
                 
@@ -719,88 +725,88 @@ class SpaceManager:
                 # Default 4x4 layout (16 panes) - existing logic
                 # Split vertically 3 times to create 4 rows
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split 1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split 2 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-v", "-t", f"{session_name}:{window_id}.1"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create vertical split 3 in window {window_id}: {result.stderr}")
                 
                 # Split each row horizontally 3 times to create 4 columns
                 # Row 1 (panes 0-3)
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row1-1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.0"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row1-2 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.1"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row1-3 in window {window_id}: {result.stderr}")
                 
                 # Row 2 (panes 4-7)
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.4"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row2-1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.4"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row2-2 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.5"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row2-3 in window {window_id}: {result.stderr}")
                 
                 # Row 3 (panes 8-11)
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.8"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row3-1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.8"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row3-2 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.9"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row3-3 in window {window_id}: {result.stderr}")
                 
                 # Row 4 (panes 12-15)
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.12"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row4-1 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.12"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row4-2 in window {window_id}: {result.stderr}")
                 
                 cmd = ["tmux", "split-window", "-h", "-t", f"{session_name}:{window_id}.13"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to create horizontal split row4-3 in window {window_id}: {result.stderr}")
                 
                 # Apply tiled layout for even distribution
                 cmd = ["tmux", "select-layout", "-t", f"{session_name}:{window_id}", "tiled"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to apply tiled layout to window {window_id}: {result.stderr}")
                 
@@ -815,13 +821,13 @@ class SpaceManager:
                 # Create 31 additional panes (we already have 1)
                 for i in range(31):
                     cmd = ["tmux", "split-window", "-t", f"{session_name}:{window_id}"]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_subprocess(cmd, capture_output=True, text=True)
                     if result.returncode != 0:
                         logger.warning(f"Failed to create pane {i+2} in window {window_id}: {result.stderr}")
                 
                 # Apply tiled layout to arrange them in a grid
                 cmd = ["tmux", "select-layout", "-t", f"{session_name}:{window_id}", "tiled"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to apply tiled layout to window {window_id}: {result.stderr}")
                 
@@ -833,18 +839,18 @@ class SpaceManager:
                 # For large pane counts, apply tiled layout periodically to make room
                 for i in range(pane_count - 1):
                     cmd = ["tmux", "split-window", "-t", f"{session_name}:{window_id}"]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_subprocess(cmd, capture_output=True, text=True)
                     if result.returncode != 0:
                         logger.warning(f"Failed to create pane {i+2} in window {window_id}: {result.stderr}")
                     
                     # Apply tiled layout every 4 panes to ensure we have space
                     if (i + 2) % 4 == 0:
                         cmd = ["tmux", "select-layout", "-t", f"{session_name}:{window_id}", "tiled"]
-                        subprocess.run(cmd, capture_output=True, text=True)
+                        run_subprocess(cmd, capture_output=True, text=True)
                 
                 # Final tiled layout
                 cmd = ["tmux", "select-layout", "-t", f"{session_name}:{window_id}", "tiled"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                result = run_subprocess(cmd, capture_output=True, text=True)
                 if result.returncode != 0:
                     logger.warning(f"Failed to apply tiled layout to window {window_id}: {result.stderr}")
                 
@@ -1012,12 +1018,12 @@ class SpaceManager:
             # Just change directory, don't start claude automatically
             cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
                    f"cd {standby_path}", "Enter"]
-            result1 = subprocess.run(cmd, capture_output=True, text=True)
+            result1 = run_subprocess(cmd, capture_output=True, text=True)
             
             # Set standby pane title with agent ID and standby directory
             standby_title = f"{agent_id} - standby"
             cmd = ["tmux", "select-pane", "-t", f"{session_name}:{window_id}.{pane_index}", "-T", standby_title]
-            result2 = subprocess.run(cmd, capture_output=True, text=True)
+            result2 = run_subprocess(cmd, capture_output=True, text=True)
             
             if result1.returncode == 0 and result2.returncode == 0:
                 logger.info(f"📍 Agent {agent_id} placed in standby location: {standby_path}")
@@ -1109,7 +1115,7 @@ class SpaceManager:
             # Update pane working directory to task directory
             # Check if claude is already running by checking the pane's current command
             check_cmd = ["tmux", "display-message", "-t", f"{session_name}:{window_id}.{pane_index}", "-p", "#{pane_current_command}"]
-            check_result = subprocess.run(check_cmd, capture_output=True, text=True)
+            check_result = run_subprocess(check_cmd, capture_output=True, text=True)
             
             if check_result.returncode == 0 and check_result.stdout.strip() == "node":
                 # Claude is already running, use /cwd command
@@ -1120,12 +1126,12 @@ class SpaceManager:
                 cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
                        f"cd {task_path} && claude", "Enter"]
             
-            result1 = subprocess.run(cmd, capture_output=True, text=True)
+            result1 = run_subprocess(cmd, capture_output=True, text=True)
             
             # Update pane title with agent ID and task directory
             new_title = f"{agent_id} - {task_name}"
             cmd = ["tmux", "select-pane", "-t", f"{session_name}:{window_id}.{pane_index}", "-T", new_title]
-            result2 = subprocess.run(cmd, capture_output=True, text=True)
+            result2 = run_subprocess(cmd, capture_output=True, text=True)
             
             if result1.returncode == 0 and result2.returncode == 0:
                 logger.info(f"✅ Moved agent {agent_id} to task directory: {task_path}")
@@ -1359,7 +1365,7 @@ class SpaceManager:
         """Update tmux pane title"""
         title = config.get("title", f"Pane {pane_index}")
         cmd = ["tmux", "select-pane", "-t", f"{session_name}:0.{pane_index}", "-T", title]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_subprocess(cmd, capture_output=True, text=True)
         return result.returncode == 0
     
     def create_task_worktree(self, task_config: Dict[str, Any]) -> bool:
@@ -1372,7 +1378,7 @@ class SpaceManager:
             worktree_path = Path(base_path) / "worktrees" / branch
             
             cmd = ["git", "worktree", "add", str(worktree_path), branch]
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=base_path)
+            result = run_subprocess(cmd, capture_output=True, text=True, cwd=base_path)
             
             if result.returncode == 0:
                 logger.info(f"Created worktree for branch {branch}")
@@ -1390,7 +1396,7 @@ class SpaceManager:
         try:
             window_id = self._get_window_id_for_room(room_id)
             cmd = ["tmux", "select-window", "-t", f"{session_name}:{window_id}"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
                 logger.info(f"Switched to {room_id} (window {window_id})")
@@ -1441,7 +1447,7 @@ class SpaceManager:
         try:
             # Kill tmux session
             cmd = ["tmux", "kill-session", "-t", session_name]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             # Remove from active sessions
             if session_name in self.active_sessions:
@@ -1462,7 +1468,7 @@ class SpaceManager:
             
             # Attach to session
             cmd = ["tmux", "attach-session", "-t", session_name]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             return result.returncode == 0
             
@@ -1476,7 +1482,7 @@ class SpaceManager:
         
         try:
             # Get actual tmux sessions
-            result = subprocess.run(['tmux', 'list-sessions', '-F', '#{session_name}:#{session_windows}'], 
+            result = run_subprocess(['tmux', 'list-sessions', '-F', '#{session_name}:#{session_windows}'], 
                                    capture_output=True, text=True)
             
             if result.returncode != 0:
@@ -1493,7 +1499,7 @@ class SpaceManager:
                     # Check if this looks like a haconiwa session
                     if self._is_haconiwa_session(session_name):
                         # Get pane count for this specific session only
-                        pane_result = subprocess.run(['tmux', 'list-panes', '-t', session_name, '-a', '-F', '#{session_name}:#{window_index}.#{pane_index}'], 
+                        pane_result = run_subprocess(['tmux', 'list-panes', '-t', session_name, '-a', '-F', '#{session_name}:#{window_index}.#{pane_index}'], 
                                                    capture_output=True, text=True)
                         
                         if pane_result.returncode == 0:
@@ -1544,7 +1550,7 @@ class SpaceManager:
                     # Send claude command to this pane
                     cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
                            "claude", "Enter"]
-                    result = subprocess.run(cmd, capture_output=True, text=True)
+                    result = run_subprocess(cmd, capture_output=True, text=True)
                     
                     if result.returncode == 0:
                         logger.debug(f"✅ Sent claude command to pane {window_id}.{pane_index}")
@@ -1571,13 +1577,13 @@ class SpaceManager:
         try:
             # Configure pane borders and titles at session level
             cmd1 = ["tmux", "set-option", "-t", session_name, "pane-border-status", "top"]
-            result1 = subprocess.run(cmd1, capture_output=True, text=True)
+            result1 = run_subprocess(cmd1, capture_output=True, text=True)
             
             cmd2 = ["tmux", "set-option", "-t", session_name, "pane-border-format", "#{pane_title}"]
-            result2 = subprocess.run(cmd2, capture_output=True, text=True)
+            result2 = run_subprocess(cmd2, capture_output=True, text=True)
             
             # Also set for each window to ensure it's applied
-            windows_result = subprocess.run(
+            windows_result = run_subprocess(
                 ["tmux", "list-windows", "-t", session_name, "-F", "#{window_index}"],
                 capture_output=True, text=True
             )
@@ -1586,12 +1592,12 @@ class SpaceManager:
                 for window_id in windows_result.stdout.strip().split('\n'):
                     if window_id:
                         # Set pane border options for each window
-                        subprocess.run(
+                        run_subprocess(
                             ["tmux", "set-option", "-t", f"{session_name}:{window_id}", 
                              "pane-border-status", "top"],
                             capture_output=True, text=True
                         )
-                        subprocess.run(
+                        run_subprocess(
                             ["tmux", "set-option", "-t", f"{session_name}:{window_id}", 
                              "pane-border-format", "#{pane_title}"],
                             capture_output=True, text=True
@@ -1605,6 +1611,7 @@ class SpaceManager:
         except Exception as e:
             logger.error(f"Failed to configure pane borders: {e}")
 
+    @traced("SpaceManager.clone_repository_to_tasks")
     def _clone_repository_to_tasks(self, git_config: Dict[str, Any], main_repo_path: Path, force_clone: bool) -> bool:
         """Clone repository to tasks/main/ with improved error handling and user confirmation"""
         try:
@@ -1673,7 +1680,7 @@ class SpaceManager:
             cmd = ["git", "clone", url, str(main_repo_path)]
             
             # Execute clone
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            result = run_subprocess(cmd, capture_output=True, text=True, timeout=300)
             
             if result.returncode == 0:
                 logger.info(f"✅ Successfully cloned repository from {url}")
@@ -1684,19 +1691,19 @@ class SpaceManager:
                 
                 # Fetch all branches first
                 fetch_cmd = ["git", "-C", str(main_repo_path), "fetch", "origin"]
-                fetch_result = subprocess.run(fetch_cmd, capture_output=True, text=True)
+                fetch_result = run_subprocess(fetch_cmd, capture_output=True, text=True)
                 if fetch_result.returncode != 0:
                     logger.warning(f"Failed to fetch branches: {fetch_result.stderr}")
                 
                 # Checkout the default branch
                 checkout_cmd = ["git", "-C", str(main_repo_path), "checkout", default_branch]
-                checkout_result = subprocess.run(checkout_cmd, capture_output=True, text=True)
+                checkout_result = run_subprocess(checkout_cmd, capture_output=True, text=True)
                 if checkout_result.returncode != 0:
                     logger.warning(f"Failed to checkout {default_branch}: {checkout_result.stderr}")
                 
                 # Pull latest changes
                 pull_cmd = ["git", "-C", str(main_repo_path), "pull", "origin", default_branch]
-                pull_result = subprocess.run(pull_cmd, capture_output=True, text=True)
+                pull_result = run_subprocess(pull_cmd, capture_output=True, text=True)
                 if pull_result.returncode != 0:
                     logger.warning(f"Failed to pull {default_branch}: {pull_result.stderr}")
                 else:
@@ -1722,6 +1729,7 @@ class SpaceManager:
             logger.error(f"❌ Error during git clone: {e}")
             return False
     
+    @traced("SpaceManager.update_all_panes_from_task_logs")
     def update_all_panes_from_task_logs(self, session_name: str, space_ref: str) -> int:
         """Update all panes in session based on task assignment logs"""
         try:
@@ -1751,7 +1759,7 @@ class SpaceManager:
             
             # Get all windows in the session
             cmd = ["tmux", "list-windows", "-t", session_name, "-F", "#{window_index}:#{window_name}"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             if result.returncode != 0:
                 logger.error(f"Failed to list windows: {result.stderr}")
@@ -1766,7 +1774,7 @@ class SpaceManager:
                 
                 # Get all panes in this window
                 cmd = ["tmux", "list-panes", "-t", f"{session_name}:{window_id}", "-F", "#{pane_index}"]
-                pane_result = subprocess.run(cmd, capture_output=True, text=True)
+                pane_result = run_subprocess(cmd, capture_output=True, text=True)
                 
                 if pane_result.returncode == 0:
                     for pane_line in pane_result.stdout.strip().split('\n'):
@@ -1822,7 +1830,7 @@ class SpaceManager:
             # Get current path of the pane
             cmd = ["tmux", "list-panes", "-t", f"{session_name}:{window_id}", 
                    "-F", "#{pane_index}:#{pane_current_path}"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
                 for line in result.stdout.strip().split('\n'):
@@ -1837,17 +1845,18 @@ class SpaceManager:
             logger.error(f"Error checking pane path: {e}")
             return False
     
+    @traced("SpaceManager.cleanup_existing_session")
     def _cleanup_existing_session(self, session_name: str):
         """Clean up existing tmux session"""
         try:
             # Check if session exists first
             check_cmd = ["tmux", "has-session", "-t", session_name]
-            check_result = subprocess.run(check_cmd, capture_output=True, text=True)
+            check_result = run_subprocess(check_cmd, capture_output=True, text=True)
             
             if check_result.returncode == 0:
                 # Session exists, kill it
                 kill_cmd = ["tmux", "kill-session", "-t", session_name]
-                kill_result = subprocess.run(kill_cmd, capture_output=True, text=True)
+                kill_result = run_subprocess(kill_cmd, capture_output=True, text=True)
                 
                 if kill_result.returncode == 0:
                     logger.debug(f"Cleaned up existing session: {session_name}")
@@ -2317,133 +2326,164 @@ class SpaceManager:
         
         return assignments
     
+    @traced("SpaceManager.update_panes_for_task_assignments")
     def update_panes_for_task_assignments(self, session_name: str, base_path: Path) -> int:
         """Update panes immediately after task assignments"""
         updated_count = 0
         
         try:
-            # Get all task assignments - support both flat and nested directory structures
-            task_dirs = []
-            tasks_base = base_path / "tasks"
-            
-            if tasks_base.exists():
-                # First level: tasks/task_name or tasks/main
-                for item in tasks_base.iterdir():
-                    if item.is_dir() and item.name != "main":
-                        task_dirs.append(item)
-                
-                # Second level: tasks/category/task_name (for feature/, bugfix/, etc.)
-                for category_dir in tasks_base.iterdir():
-                    if category_dir.is_dir() and category_dir.name != "main":
-                        for task_dir in category_dir.iterdir():
-                            if task_dir.is_dir():
-                                task_dirs.append(task_dir)
-            
-            logger.info(f"Found {len(task_dirs)} potential task directories")
-            
-            for task_dir in task_dirs:
-                
-                # Check for assignment log
-                assignment_log = task_dir / ".haconiwa" / "agent_assignment.json"
-                if not assignment_log.exists():
-                    logger.debug(f"No assignment log found in {task_dir}")
+            assignment_entries = self._collect_task_assignment_entries(session_name, base_path)
+            logger.info(f"Found {len(assignment_entries)} active task assignments")
+            
+            # Try to load desk mappings from state file if not in memory
+            desk_mappings = None
+            if hasattr(self, '_current_desk_mappings'):
+                desk_mappings = self._current_desk_mappings
+            else:
+                desk_mappings_file = base_path / ".haconiwa" / "desk_mappings.json"
+                if desk_mappings_file.exists():
+                    try:
+                        with open(desk_mappings_file, 'r') as f:
+                            desk_mappings = json.load(f)
+                    except Exception as e:
+                        logger.warning(f"Could not load desk mappings: {e}")
+            
+            # Index desk mappings by agent ID (first mapping wins)
+            desk_index = {}
+            for idx, mapping in enumerate(desk_mappings or []):
+                desk_index.setdefault(mapping.get('agent_id'), idx)
+            
+            for task_dir, assignment in assignment_entries:
+                agent_id = assignment["agent_id"]
+                
+                if not desk_mappings:
+                    logger.warning(f"No desk mappings available for agent assignment")
                     continue
                 
-                logger.info(f"Processing task directory: {task_dir} (assignment log found)")
+                idx = desk_index.get(agent_id)
+                if idx is None:
+                    logger.warning(f"Could not find pane for agent {agent_id}")
+                    continue
                 
                 try:
-                    with open(assignment_log, 'r') as f:
-                        assignments = json.load(f)
+                    # Calculate window and pane from index
+                    # First 16 panes (0-15) -> window 0 (Executive)
+                    # Next 16 panes (16-31) -> window 1 (Standby)
+                    if idx < 16:
+                        window_id = "0"
+                        pane_index = idx
+                    else:
+                        window_id = "1"
+                        pane_index = idx - 16
                     
-                    for assignment in assignments:
-                        if assignment.get("status") != "active":
-                            continue
-                        
-                        agent_id = assignment.get("agent_id")
-                        if not agent_id:
-                            continue
-                        
-                        # Find the pane with this agent ID
-                        pane_found = False
-                        
-                        # Try to load desk mappings from state file if not in memory
-                        desk_mappings = None
-                        if hasattr(self, '_current_desk_mappings'):
-                            desk_mappings = self._current_desk_mappings
-                        else:
-                            # Try to load from saved state
-                            desk_mappings_file = base_path / ".haconiwa" / "desk_mappings.json"
-                            if desk_mappings_file.exists():
-                                try:
-                                    with open(desk_mappings_file, 'r') as f:
-                                        desk_mappings = json.load(f)
-                                except Exception as e:
-                                    logger.warning(f"Could not load desk mappings: {e}")
-                        
-                        if desk_mappings:
-                            logger.debug(f"Checking desk mappings for agent {agent_id}")
-                            for idx, mapping in enumerate(desk_mappings):
-                                if mapping.get('agent_id') == agent_id:
-                                    # Calculate window and pane from index
-                                    # First 16 panes (0-15) -> window 0 (Executive)
-                                    # Next 16 panes (16-31) -> window 1 (Standby)
-                                    if idx < 16:
-                                        window_id = "0"
-                                        pane_index = idx
-                                    else:
-                                        window_id = "1"
-                                        pane_index = idx - 16
-                                    
-                                    # Move to task directory and start claude
-                                    task_path = task_dir.absolute()
-                                    home_path = str(Path.home())
-                                    
-                                    if str(task_path).startswith(home_path):
-                                        task_path_str = "~" + str(task_path)[len(home_path):]
-                                    else:
-                                        task_path_str = str(task_path)
-                                    
-                                    logger.info(f"Moving agent {agent_id} from pane {window_id}.{pane_index} to {task_path_str}")
-                                    
-                                    # Extract task branch name from task directory
-                                    task_branch_name = assignment.get("task_name", task_dir.name)
-                                    
-                                    # Update pane title to agent-taskbranch format
-                                    pane_title = f"{agent_id}-{task_branch_name}"
-                                    title_cmd = ["tmux", "select-pane", "-t", f"{session_name}:{window_id}.{pane_index}", 
-                                                "-T", pane_title]
-                                    title_result = subprocess.run(title_cmd, capture_output=True, text=True)
-                                    
-                                    if title_result.returncode == 0:
-                                        logger.info(f"✅ Updated pane title to: {pane_title}")
-                                    else:
-                                        logger.warning(f"⚠️ Failed to update pane title: {title_result.stderr}")
-                                    
-                                    cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
-                                           f"cd {task_path_str} && claude", "Enter"]
-                                    result = subprocess.run(cmd, capture_output=True, text=True)
-                                    
-                                    if result.returncode == 0:
-                                        logger.info(f"✅ Successfully moved agent {agent_id} to task directory: {task_path_str}")
-                                        updated_count += 1
-                                        pane_found = True
-                                        break
-                                    else:
-                                        logger.error(f"❌ Failed to move agent {agent_id}: tmux error: {result.stderr}")
-                        else:
-                            logger.warning(f"No desk mappings available for agent assignment")
-                        
-                        if not pane_found:
-                            logger.warning(f"Could not find pane for agent {agent_id}")
+                    # Move to task directory and start claude
+                    task_path = task_dir.absolute()
+                    home_path = str(Path.home())
+                    
+                    if str(task_path).startswith(home_path):
+                        task_path_str = "~" + str(task_path)[len(home_path):]
+                    else:
+                        task_path_str = str(task_path)
+                    
+                    logger.info(f"Moving agent {agent_id} from pane {window_id}.{pane_index} to {task_path_str}")
+                    
+                    # Extract task branch name from task directory
+                    task_branch_name = assignment.get("task_name", task_dir.name)
+                    
+                    # Update pane title to agent-taskbranch format
+                    pane_title = f"{agent_id}-{task_branch_name}"
+                    title_cmd = ["tmux", "select-pane", "-t", f"{session_name}:{window_id}.{pane_index}", 
+                                "-T", pane_title]
+                    title_result = run_subprocess(title_cmd, capture_output=True, text=True)
+                    
+                    if title_result.returncode == 0:
+                        logger.info(f"✅ Updated pane title to: {pane_title}")
+                    else:
+                        logger.warning(f"⚠️ Failed to update pane title: {title_result.stderr}")
+                    
+                    cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
+                           f"cd {task_path_str} && claude", "Enter"]
+                    result = run_subprocess(cmd, capture_output=True, text=True)
+                    
+                    if result.returncode == 0:
+                        logger.info(f"✅ Successfully moved agent {agent_id} to task directory: {task_path_str}")
+                        updated_count += 1
+                    else:
+                        logger.error(f"❌ Failed to move agent {agent_id}: tmux error: {result.stderr}")
                 
                 except Exception as e:
-                    logger.error(f"Error processing assignment log {assignment_log}: {e}")
+                    logger.error(f"Error processing assignment for {task_dir}: {e}")
         
         except Exception as e:
             logger.error(f"Error updating panes for task assignments: {e}")
         
         return updated_count
     
+    def _collect_task_assignment_entries(self, session_name: str, base_path: Path) -> List[tuple]:
+        """Get (task_dir, assignment) pairs for active agent assignments.
+        
+        Uses the TaskManager registry (merged with the persisted registry file)
+        first; task directories the registry does not know about fall back to
+        their agent_assignment.json logs (tasks created by another process
+        without a registry entry).
+        """
+        from ..task.manager import TaskManager
+        
+        entries = []
+        tasks_base = base_path / "tasks"
+        
+        for agent_id, task_info in TaskManager().get_space_assignments(session_name, base_path).items():
+            task_dir = tasks_base / task_info["name"]
+            if task_dir.is_dir():
+                entries.append((task_dir, {"agent_id": agent_id, "task_name": task_info["name"], "status": "active"}))
+        
+        if not tasks_base.exists():
+            return entries
+        known_dirs = {task_dir.resolve() for task_dir, _ in entries}
+        known_agents = {assignment["agent_id"] for _, assignment in entries}
+        
+        # Get all task assignments - support both flat and nested directory structures
+        task_dirs = []
+        
+        # First level: tasks/task_name or tasks/main
+        for item in tasks_base.iterdir():
+            if item.is_dir() and item.name != "main":
+                task_dirs.append(item)
+        
+        # Second level: tasks/category/task_name (for feature/, bugfix/, etc.)
+        for category_dir in tasks_base.iterdir():
+            if category_dir.is_dir() and category_dir.name != "main":
+                for task_dir in category_dir.iterdir():
+                    if task_dir.is_dir():
+                        task_dirs.append(task_dir)
+        
+        logger.info(f"Found {len(task_dirs)} potential task directories")
+        
+        for task_dir in task_dirs:
+            if task_dir.resolve() in known_dirs:
+                continue
+            assignment_log = task_dir / ".haconiwa" / "agent_assignment.json"
+            if not assignment_log.exists():
+                logger.debug(f"No assignment log found in {task_dir}")
+                continue
+            
+            try:
+                with open(assignment_log, 'r') as f:
+                    assignments = json.load(f)
+                if not isinstance(assignments, list):
+                    assignments = [assignments]
+                
+                for assignment in assignments:
+                    # The registry's assignment of an agent wins over older logs
+                    if (assignment.get("status") == "active" and assignment.get("agent_id")
+                            and assignment["agent_id"] not in known_agents):
+                        entries.append((task_dir, assignment))
+            
+            except Exception as e:
+                logger.error(f"Error processing assignment log {assignment_log}: {e}")
+        
+        return entries
+    
     def _get_organization_crd_for_display(self) -> Optional[Dict[str, Any]]:
         """Get Organization CRD data for display purposes"""
         try:
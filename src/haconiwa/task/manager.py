@@ -3,10 +3,13 @@ Task Manager for Haconiwa v1.0
 """
 
 import logging
-import subprocess
+import threading
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+from .registry import TaskRegistry, REGISTRY_FILE_NAME
+from ..core.profiler import run_subprocess, traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +22,11 @@ class TaskManager:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(TaskManager, cls).__new__(cls)
-            cls._instance.tasks = {}
+            cls._instance.tasks = TaskRegistry()
             cls._instance.default_branch = "main"  # Default value
+            cls._instance._dirty_spaces = set()  # Spaces whose registry file needs saving
+            cls._instance._deleted_tasks = {}  # space_ref -> task names to drop from its registry file
+            cls._instance.lock = threading.RLock()  # Guards registry and default branch across apply workers
             cls._initialized = True
         return cls._instance
     
@@ -28,11 +34,22 @@ class TaskManager:
         # Only initialize once
         pass
     
+    @property
+    def tasks(self) -> TaskRegistry:
+        """Tasks by name, indexed by space_ref, assignee and branch"""
+        return self._tasks
+    
+    @tasks.setter
+    def tasks(self, value: Dict[str, Any]):
+        self._tasks = value if isinstance(value, TaskRegistry) else TaskRegistry(value)
+    
     def set_default_branch(self, branch: str):
         """Set the default branch to use for creating new branches"""
-        self.default_branch = branch
+        with self.lock:
+            self.default_branch = branch
         logger.info(f"TaskManager default branch set to: {branch}")
     
+    @traced("TaskManager.create_task")
     def create_task(self, config: Dict[str, Any]) -> bool:
         """Create task from configuration with Git worktree"""
         try:
@@ -54,14 +71,7 @@ class TaskManager:
                     logger.warning(f"Failed to create worktree for task {name}, but continuing")
             
             # Store task info
-            self.tasks[name] = {
-                "config": config,
-                "status": "created",
-                "worktree_created": worktree and space_ref,
-                "assignee": assignee,
-                "description": description,
-                "agent_config": agent_config
-            }
+            self._store_task(config, dirty=True)
             
             # IMPORTANT: Create agent assignment log immediately after task creation
             if assignee and worktree and space_ref:
@@ -84,6 +94,27 @@ class TaskManager:
             logger.error(f"Failed to create task: {e}")
             return False
     
+    def register_task(self, config: Dict[str, Any]) -> None:
+        """Register a task applied earlier without touching its worktree"""
+        self._store_task(config, dirty=False)
+    
+    def _store_task(self, config: Dict[str, Any], dirty: bool) -> None:
+        """Store task info in the registry"""
+        space_ref = config.get("space_ref")
+        worktree = config.get("worktree", True)
+        with self.lock:
+            self.tasks[config.get("name")] = {
+                "config": config,
+                "status": "created",
+                "worktree_created": worktree and space_ref,
+                "assignee": config.get("assignee"),
+                "description": config.get("description", ""),
+                "agent_config": config.get("agent_config")
+            }
+            if dirty and space_ref:
+                self._dirty_spaces.add(space_ref)
+    
+    @traced("TaskManager.create_worktree")
     def _create_worktree(self, task_name: str, branch: str, space_ref: str, config: Dict[str, Any]) -> bool:
         """Create Git worktree in tasks directory"""
         try:
@@ -95,6 +126,9 @@ class TaskManager:
                 logger.error(f"Could not find base path for space: {space_ref}")
                 return False
             
+            # Prefer the branch pinned in the task config (set per Space by the applier)
+            default_branch = config.get("default_branch") or self.default_branch
+            
             tasks_path = base_path / "tasks"
             main_repo_path = tasks_path / "main"
             worktree_path = tasks_path / task_name
@@ -113,63 +147,63 @@ class TaskManager:
             logger.info(f"Creating worktree: {worktree_path} for branch: {branch}")
             
             # First, ensure we're on the default branch and it's up to date
-            logger.info(f"Fetching and syncing with origin/{self.default_branch}")
+            logger.info(f"Fetching and syncing with origin/{default_branch}")
             
             # Fetch all from origin to ensure we have latest refs
-            fetch_result = subprocess.run(['git', '-C', str(main_repo_path), 'fetch', 'origin'], 
+            fetch_result = run_subprocess(['git', '-C', str(main_repo_path), 'fetch', 'origin'], 
                                         capture_output=True, text=True)
             if fetch_result.returncode != 0:
                 logger.warning(f"Failed to fetch from origin: {fetch_result.stderr}")
             
             # Checkout default branch
-            checkout_result = subprocess.run(['git', '-C', str(main_repo_path), 'checkout', self.default_branch], 
+            checkout_result = run_subprocess(['git', '-C', str(main_repo_path), 'checkout', default_branch], 
                                            capture_output=True, text=True)
             if checkout_result.returncode != 0:
-                logger.warning(f"Failed to checkout {self.default_branch}: {checkout_result.stderr}")
+                logger.warning(f"Failed to checkout {default_branch}: {checkout_result.stderr}")
             
             # Hard reset to origin to ensure we're exactly at origin's state
-            reset_result = subprocess.run(['git', '-C', str(main_repo_path), 'reset', '--hard', f'origin/{self.default_branch}'], 
+            reset_result = run_subprocess(['git', '-C', str(main_repo_path), 'reset', '--hard', f'origin/{default_branch}'], 
                                         capture_output=True, text=True)
             if reset_result.returncode != 0:
-                logger.warning(f"Failed to reset to origin/{self.default_branch}: {reset_result.stderr}")
+                logger.warning(f"Failed to reset to origin/{default_branch}: {reset_result.stderr}")
             
             # Check if branch already exists
-            check_branch = subprocess.run(['git', '-C', str(main_repo_path), 'rev-parse', '--verify', branch], 
+            check_branch = run_subprocess(['git', '-C', str(main_repo_path), 'rev-parse', '--verify', branch], 
                                         capture_output=True, text=True)
             
             if check_branch.returncode == 0:
                 # Branch exists, check if it's based on the correct branch
-                merge_base = subprocess.run(['git', '-C', str(main_repo_path), 'merge-base', branch, f'origin/{self.default_branch}'], 
+                merge_base = run_subprocess(['git', '-C', str(main_repo_path), 'merge-base', branch, f'origin/{default_branch}'], 
                                           capture_output=True, text=True)
-                default_branch_commit = subprocess.run(['git', '-C', str(main_repo_path), 'rev-parse', f'origin/{self.default_branch}'], 
+                default_branch_commit = run_subprocess(['git', '-C', str(main_repo_path), 'rev-parse', f'origin/{default_branch}'], 
                                                      capture_output=True, text=True)
                 
                 if merge_base.stdout.strip() != default_branch_commit.stdout.strip():
                     # Branch exists but is based on wrong branch, delete and recreate
-                    logger.info(f"Branch {branch} exists but is based on wrong branch, recreating from {self.default_branch}")
-                    subprocess.run(['git', '-C', str(main_repo_path), 'branch', '-D', branch], 
+                    logger.info(f"Branch {branch} exists but is based on wrong branch, recreating from {default_branch}")
+                    run_subprocess(['git', '-C', str(main_repo_path), 'branch', '-D', branch], 
                                  capture_output=True, text=True)
                     # Create new branch from the default branch
-                    result1 = subprocess.run(['git', '-C', str(main_repo_path), 'checkout', '-b', branch, f'origin/{self.default_branch}'], 
+                    result1 = run_subprocess(['git', '-C', str(main_repo_path), 'checkout', '-b', branch, f'origin/{default_branch}'], 
                                            capture_output=True, text=True)
                 else:
                     # Branch exists and is based on correct branch, just checkout
-                    result1 = subprocess.run(['git', '-C', str(main_repo_path), 'checkout', branch], 
+                    result1 = run_subprocess(['git', '-C', str(main_repo_path), 'checkout', branch], 
                                            capture_output=True, text=True)
             else:
                 # Branch doesn't exist, create it from the default branch
-                result1 = subprocess.run(['git', '-C', str(main_repo_path), 'checkout', '-b', branch, f'origin/{self.default_branch}'], 
+                result1 = run_subprocess(['git', '-C', str(main_repo_path), 'checkout', '-b', branch, f'origin/{default_branch}'], 
                                        capture_output=True, text=True)
             
             if result1.returncode != 0:
                 logger.warning(f"Failed to create/checkout branch {branch}: {result1.stderr}")
             
             # Switch back to default branch
-            subprocess.run(['git', '-C', str(main_repo_path), 'checkout', self.default_branch], 
+            run_subprocess(['git', '-C', str(main_repo_path), 'checkout', default_branch], 
                          capture_output=True, text=True)
             
             # Create worktree (using absolute paths)
-            result2 = subprocess.run(['git', '-C', str(main_repo_path), 'worktree', 'add', 
+            result2 = run_subprocess(['git', '-C', str(main_repo_path), 'worktree', 'add', 
                                    str(worktree_path.absolute()), branch], 
                                    capture_output=True, text=True)
             
@@ -193,6 +227,7 @@ class TaskManager:
             logger.error(f"Error creating worktree: {e}")
             return False
     
+    @traced("TaskManager.copy_env_files_to_worktree")
     def _copy_env_files_to_worktree(self, worktree_path: Path, env_files: List[str]) -> None:
         """Copy .env files to the worktree directory"""
         try:
@@ -347,7 +382,7 @@ class TaskManager:
                             # Remove worktree
                             main_repo_path = base_path / "tasks" / "main"
                             if main_repo_path.exists():
-                                result = subprocess.run(['git', '-C', str(main_repo_path), 'worktree', 'remove', str(worktree_path)], 
+                                result = run_subprocess(['git', '-C', str(main_repo_path), 'worktree', 'remove', str(worktree_path)], 
                                                       capture_output=True, text=True)
                                 if result.returncode == 0:
                                     logger.info(f"✅ Removed worktree: {worktree_path}")
@@ -355,7 +390,11 @@ class TaskManager:
                                     logger.warning(f"Failed to remove worktree: {result.stderr}")
             
             # Remove from tasks
-            del self.tasks[name]
+            with self.lock:
+                del self.tasks[name]
+                if task["config"].get("space_ref"):
+                    self._dirty_spaces.add(task["config"]["space_ref"])
+                    self._deleted_tasks.setdefault(task["config"]["space_ref"], set()).add(name)
             logger.info(f"✅ Deleted task: {name}")
             return True
             
@@ -365,33 +404,85 @@ class TaskManager:
     
     def get_task_by_assignee(self, assignee: str) -> Dict[str, Any]:
         """Get task assigned to specific agent"""
-        for task_name, task_data in self.tasks.items():
-            if task_data["config"].get("assignee") == assignee:
-                return {
-                    "name": task_name,
-                    "worktree_path": f"tasks/{task_name}",
-                    "config": task_data["config"]
-                }
+        for task_name in self.tasks.names_for_assignee(assignee):
+            return {
+                "name": task_name,
+                "worktree_path": f"tasks/{task_name}",
+                "config": self.tasks[task_name]["config"]
+            }
         return None
     
+    def get_tasks_by_branch(self, branch: str) -> List[str]:
+        """Get names of tasks using a branch"""
+        return self.tasks.names_for_branch(branch)
+    
+    def get_space_assignments(self, space_ref: str, base_path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+        """Get {assignee: task info} for a space from the registry indexes.
+        
+        If base_path is given, the persisted registry of that space is merged
+        first, so tasks applied by other processes (or skipped as unchanged)
+        are included alongside those created in this process.
+        """
+        with self.lock:
+            if base_path is not None:
+                self.load_registry(base_path)
+            
+            assignments = {}
+            for task_name, task_data in self.tasks.iter_space(space_ref):
+                assignee = task_data["config"].get("assignee")
+                if assignee:
+                    assignments[assignee] = {
+                        "name": task_name,
+                        "worktree_path": f"tasks/{task_name}",
+                        "config": task_data["config"]
+                    }
+            return assignments
+    
     def get_agent_assignments(self, space_ref: str) -> Dict[str, str]:
         """Get mapping of agent IDs to task worktree paths"""
-        assignments = {}
-        for task_name, task_data in self.tasks.items():
-            config = task_data["config"]
-            if config.get("space_ref") == space_ref and config.get("assignee"):
-                assignee = config["assignee"]
-                assignments[assignee] = f"tasks/{task_name}"
-        return assignments
+        return {
+            assignee: task_info["worktree_path"]
+            for assignee, task_info in self.get_space_assignments(space_ref).items()
+        }
+    
+    @traced("TaskManager.save_registry")
+    def save_registry(self) -> int:
+        """Persist registry of spaces changed since the last save; returns number of files written"""
+        saved = 0
+        with self.lock:
+            for space_ref in sorted(self._dirty_spaces):
+                base_path = self._find_space_base_path(space_ref)
+                if not base_path:
+                    logger.debug(f"Not saving task registry for {space_ref}: base path not found")
+                    continue
+                try:
+                    # Merges into the file, so tasks this process never loaded are kept
+                    self.tasks.save_space(space_ref, Path(base_path) / ".haconiwa" / REGISTRY_FILE_NAME,
+                                          removed=self._deleted_tasks.pop(space_ref, ()))
+                    saved += 1
+                except Exception as e:
+                    logger.warning(f"Failed to save task registry for {space_ref}: {e}")
+            self._dirty_spaces.clear()
+        return saved
+    
+    def load_registry(self, base_path: Path) -> int:
+        """Load persisted registry from a space base path"""
+        with self.lock:
+            # Tasks deleted since the last save must not come back from the file
+            deleted = set().union(*self._deleted_tasks.values())
+            loaded = self.tasks.load_space(Path(base_path) / ".haconiwa" / REGISTRY_FILE_NAME, skip=deleted)
+        if loaded:
+            logger.info(f"Loaded {loaded} tasks from task registry in {base_path}")
+        return loaded
     
     def update_agent_pane_directories(self, space_ref: str, session_name: str) -> bool:
         """Update pane directories for agents assigned to tasks"""
         try:
             updated_count = 0
             
-            for task_name, task_data in self.tasks.items():
+            for task_name, task_data in self.tasks.iter_space(space_ref):
                 config = task_data["config"]
-                if config.get("space_ref") != space_ref or not config.get("assignee"):
+                if not config.get("assignee"):
                     continue
                 
                 assignee = config["assignee"]
@@ -495,7 +586,7 @@ class TaskManager:
             # Get all panes in the window
             cmd = ["tmux", "list-panes", "-t", f"{session_name}:{window_id}", 
                    "-F", "#{pane_index}:#{pane_current_path}:#{pane_title}"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = run_subprocess(cmd, capture_output=True, text=True)
             
             if result.returncode != 0:
                 logger.error(f"Failed to list panes: {result.stderr}")
@@ -587,14 +678,14 @@ class TaskManager:
             # Update pane working directory
             cmd = ["tmux", "send-keys", "-t", f"{session_name}:{window_id}.{pane_index}", 
                    f"cd {task_dir}", "Enter"]
-            result1 = subprocess.run(cmd, capture_output=True, text=True)
+            result1 = run_subprocess(cmd, capture_output=True, text=True)
             
             # Update pane title to include task info
             old_title = pane_info["title"]
             new_title = f"{old_title} [Task: {task_name}]"
             cmd = ["tmux", "select-pane", "-t", f"{session_name}:{window_id}.{pane_index}", 
                    "-T", new_title]
-            result2 = subprocess.run(cmd, capture_output=True, text=True)
+            result2 = run_subprocess(cmd, capture_output=True, text=True)
             
             if result1.returncode == 0 and result2.returncode == 0:
                 logger.debug(f"Updated pane {window_id}.{pane_index}: {task_dir}")
@@ -738,6 +829,7 @@ class TaskManager:
         except Exception:
             return "**役割**: 解析エラー"
     
+    @traced("TaskManager.create_agent_assignment_log")
     def _create_immediate_agent_assignment_log(self, task_name: str, assignee: str, space_ref: str, description: str) -> bool:
         """Create agent assignment log immediately when task is created"""
         try:
@@ -796,6 +888,7 @@ class TaskManager:
             logger.error(f"Failed to create immediate agent assignment log: {e}")
             return False
     
+    @traced("TaskManager.create_claude_code_settings")
     def _create_claude_code_settings(self, task_name: str, space_ref: str, company_agent_defaults: Dict[str, Any], agent_config: Dict[str, Any]) -> bool:
         """Create Claude Code settings file"""
         try:
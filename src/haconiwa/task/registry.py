@@ -0,0 +1,163 @@
+"""
+Indexed task registry for Haconiwa v1.0
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILE_NAME = "task_registry.json"
+
+REGISTRY_FORMAT_VERSION = 1
+
+
+class TaskRegistry(dict):
+    """Task dict (name → task data) with secondary indexes.
+
+    Indexes by ``space_ref``, ``assignee`` and ``branch`` are kept in sync on
+    every insert and delete, so lookups no longer scan all tasks. Index
+    buckets preserve insertion order, matching the order a scan of the dict
+    would have produced.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_space: Dict[str, Dict[str, None]] = {}
+        self._by_assignee: Dict[str, Dict[str, None]] = {}
+        self._by_branch: Dict[str, Dict[str, None]] = {}
+        self.update(*args, **kwargs)
+
+    @staticmethod
+    def _index_keys(task_data: Dict[str, Any]):
+        config = task_data.get("config") if isinstance(task_data, dict) else None
+        if not isinstance(config, dict):
+            return (None, None, None)
+        return (config.get("space_ref"), config.get("assignee"), config.get("branch"))
+
+    def _index(self, name: str, task_data: Dict[str, Any]) -> None:
+        for index, key in zip((self._by_space, self._by_assignee, self._by_branch), self._index_keys(task_data)):
+            if key:
+                index.setdefault(key, {})[name] = None
+
+    def _unindex(self, name: str, task_data: Dict[str, Any]) -> None:
+        for index, key in zip((self._by_space, self._by_assignee, self._by_branch), self._index_keys(task_data)):
+            if key and key in index:
+                index[key].pop(name, None)
+                if not index[key]:
+                    del index[key]
+
+    def __setitem__(self, name: str, task_data: Dict[str, Any]) -> None:
+        if name in self:
+            self._unindex(name, self[name])
+        super().__setitem__(name, task_data)
+        self._index(name, task_data)
+
+    def __delitem__(self, name: str) -> None:
+        self._unindex(name, self[name])
+        super().__delitem__(name)
+
+    def pop(self, name, *default):
+        if name in self:
+            self._unindex(name, self[name])
+        return super().pop(name, *default)
+
+    def popitem(self):
+        name, task_data = super().popitem()
+        self._unindex(name, task_data)
+        return name, task_data
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+    def update(self, *args, **kwargs) -> None:
+        for name, task_data in dict(*args, **kwargs).items():
+            self[name] = task_data
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_space.clear()
+        self._by_assignee.clear()
+        self._by_branch.clear()
+
+    def copy(self) -> "TaskRegistry":
+        return TaskRegistry(self)
+
+    def names_for_space(self, space_ref: str) -> List[str]:
+        """Get task names in a space"""
+        return list(self._by_space.get(space_ref, ()))
+
+    def names_for_assignee(self, assignee: str) -> List[str]:
+        """Get task names assigned to an agent"""
+        return list(self._by_assignee.get(assignee, ()))
+
+    def names_for_branch(self, branch: str) -> List[str]:
+        """Get task names using a branch"""
+        return list(self._by_branch.get(branch, ()))
+
+    def iter_space(self, space_ref: str) -> Iterator:
+        """Iterate (name, task data) for tasks in a space"""
+        for name in self.names_for_space(space_ref):
+            yield name, self[name]
+
+    def space_refs(self) -> List[str]:
+        """Get space refs that have tasks"""
+        return list(self._by_space)
+
+    def save_space(self, space_ref: str, registry_file: Path, removed: Iterable[str] = ()) -> None:
+        """Write tasks of a space to a registry file atomically.
+        
+        Tasks already in the file that this registry does not hold (created by
+        another process or not loaded yet) are kept, except names in
+        ``removed``; in-memory entries win.
+        """
+        registry_file = Path(registry_file)
+        removed = set(removed)
+        tasks = {
+            name: task_data for name, task_data in self._read_tasks(registry_file).items()
+            if name not in self and name not in removed
+        }
+        tasks.update(self.iter_space(space_ref))
+        registry_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": REGISTRY_FORMAT_VERSION,
+            "space_ref": space_ref,
+            "tasks": tasks,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=registry_file.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, registry_file)
+
+    def load_space(self, registry_file: Path, skip: Iterable[str] = ()) -> int:
+        """Merge tasks from a registry file (in-memory entries win); returns number loaded"""
+        skip = set(skip)
+        loaded = 0
+        for name, task_data in self._read_tasks(registry_file).items():
+            if name not in self and name not in skip:
+                self[name] = task_data
+                loaded += 1
+        return loaded
+
+    @staticmethod
+    def _read_tasks(registry_file: Path) -> Dict[str, Any]:
+        """Read the tasks of a registry file ({} when missing or unreadable)"""
+        try:
+            with open(registry_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not read task registry {registry_file}: {e}")
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != REGISTRY_FORMAT_VERSION:
+            return {}
+        tasks = data.get("tasks", {})
+        return tasks if isinstance(tasks, dict) else {}
@@ -1,31 +1,120 @@
+import time
+from pathlib import Path
+from typing import Optional
+
 import typer
-from haconiwa.watch.monitor import Monitor
 
-watch_app = typer.Typer(help="監視・モニタリング (開発中)")
+from haconiwa.watch.daemon import WatchClient
+
+watch_app = typer.Typer(help="監視・モニタリング")
+
+
+def _format_metrics(metrics: dict) -> str:
+    return "  ".join(f"{name}={value:.1f}" for name, value in sorted(metrics.items()))
+
 
 @watch_app.command()
-def start():
+def start(
+    config: Optional[Path] = typer.Option(None, "--config", "-f", help="監視設定YAML (intervals, thresholds, email)"),
+):
     """監視デーモンの起動"""
-    monitor = Monitor()
-    typer.echo("監視デーモンを起動しました。")
+    client = WatchClient()
+    pid = client.running_pid()
+    if pid:
+        typer.echo(f"ℹ️ 監視デーモンは既に起動しています (PID {pid})")
+        return
+    pid = client.start(config)
+    if pid is None:
+        typer.echo(f"❌ 監視デーモンの起動に失敗しました。ログを確認してください: {client.state_dir / 'watch.log'}", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"✅ 監視デーモンを起動しました (PID {pid})")
+
 
 @watch_app.command()
 def stop():
     """監視デーモンの停止"""
-    monitor = Monitor()
-    typer.echo("監視デーモンを停止しました。")
+    client = WatchClient()
+    if client.running_pid() is None:
+        typer.echo("ℹ️ 監視デーモンは起動していません")
+        return
+    if client.stop():
+        typer.echo("✅ 監視デーモンを停止しました")
+    else:
+        typer.echo("❌ 監視デーモンを停止できませんでした", err=True)
+        raise typer.Exit(1)
+
 
 @watch_app.command()
-def tail():
+def status():
+    """監視デーモンの状態と集計値"""
+    client = WatchClient()
+    if client.running_pid() is None:
+        typer.echo("⏹️ 監視デーモンは停止中です")
+        raise typer.Exit(1)
+    reply = client.request("status")
+    typer.echo(f"▶️ 監視デーモン稼働中 (PID {reply['pid']}, 稼働 {reply['uptime']:.0f}秒)")
+    for name, stats in reply["metrics"].items():
+        if stats:
+            typer.echo(f"  {name:<18} 最新 {stats['last']:7.1f}  平均 {stats['mean']:7.1f}  "
+                       f"最小 {stats['min']:7.1f}  最大 {stats['max']:7.1f}")
+    if reply["alerts"]:
+        typer.echo(f"🚨 発報中のアラート: {', '.join(reply['alerts'])}")
+
+
+@watch_app.command()
+def tail(
+    count: Optional[int] = typer.Option(None, "--count", "-n", help="表示するサンプル数 (省略時は無制限)"),
+):
     """リアルタイムメトリクス表示"""
-    monitor = Monitor()
-    typer.echo("メトリクス表示機能（実装予定）")
+    client = WatchClient()
+    if client.running_pid() is None:
+        typer.echo("❌ 監視デーモンが起動していません (haconiwa watch start)", err=True)
+        raise typer.Exit(1)
+    try:
+        for event in client.stream(count):
+            stamp = time.strftime("%H:%M:%S", time.localtime(event["time"]))
+            if event["type"] == "alert":
+                typer.echo(f"{stamp} 🚨 {event['message']}")
+            else:
+                typer.echo(f"{stamp} {_format_metrics(event['metrics'])}")
+    except KeyboardInterrupt:
+        pass
+
+
+@watch_app.command()
+def dashboard(
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="出力PNGパス"),
+):
+    """ダッシュボード画像の生成"""
+    client = WatchClient()
+    if client.running_pid() is None:
+        typer.echo("❌ 監視デーモンが起動していません (haconiwa watch start)", err=True)
+        raise typer.Exit(1)
+    reply = client.request("dashboard", timeout=30.0, output=str(output.resolve()) if output else None)
+    if not reply.get("ok"):
+        typer.echo(f"❌ ダッシュボード生成に失敗しました: {reply.get('error')}", err=True)
+        raise typer.Exit(1)
+    typer.echo(f"📊 ダッシュボードを生成しました: {reply['path']}")
+
 
 @watch_app.command()
 def health():
     """ヘルスチェックと診断"""
-    monitor = Monitor()
-    typer.echo("システムのヘルスステータス: OK（デモ）")
+    client = WatchClient()
+    pid = client.running_pid()
+    if pid is None:
+        typer.echo("⚠️ 監視デーモンが起動していません")
+        raise typer.Exit(1)
+    try:
+        reply = client.request("status", timeout=2.0)
+    except OSError as e:
+        typer.echo(f"❌ 監視デーモン (PID {pid}) が応答しません: {e}")
+        raise typer.Exit(1)
+    if reply["alerts"]:
+        typer.echo(f"🚨 システムのヘルスステータス: WARN ({', '.join(reply['alerts'])})")
+    else:
+        typer.echo("✅ システムのヘルスステータス: OK")
+
 
 if __name__ == "__main__":
-    watch_app()
\ No newline at end of file
+    watch_app()
@@ -0,0 +1,266 @@
+"""
+Watch daemon: pidfile, unix-socket control and live metric streaming
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from haconiwa.watch.monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = Path.home() / ".haconiwa" / "watch"
+
+PID_FILE_NAME = "watch.pid"
+SOCKET_FILE_NAME = "watch.sock"
+LOG_FILE_NAME = "watch.log"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """One JSON request line per connection; replies are JSON lines"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line or b"{}")
+        except json.JSONDecodeError:
+            self._send({"ok": False, "error": "invalid request"})
+            return
+        self.server.daemon_ref.handle_request(request, self._send)
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class _ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class WatchDaemon:
+    """Runs the sampling loop and serves status/stop/tail/dashboard on a unix socket"""
+
+    def __init__(self, state_dir: Optional[Path] = None, monitor: Optional[Monitor] = None):
+        self.state_dir = Path(state_dir) if state_dir else DEFAULT_STATE_DIR
+        self.pid_file = self.state_dir / PID_FILE_NAME
+        self.socket_path = self.state_dir / SOCKET_FILE_NAME
+        self.monitor = monitor or Monitor()
+        self.stop_event = threading.Event()
+        self.started_at: Optional[float] = None
+        self._server: Optional[_ControlServer] = None
+
+    def handle_request(self, request: Dict[str, Any], send) -> None:
+        command = request.get("cmd")
+        if command == "status":
+            send({
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime": time.time() - self.started_at if self.started_at else 0.0,
+                "metrics": self.monitor.summary(),
+                "alerts": [rule.metric for rule in self.monitor.alert_rules if rule.firing],
+            })
+        elif command == "stop":
+            send({"ok": True})
+            self.stop_event.set()
+        elif command == "dashboard":
+            output = request.get("output") or str(self.state_dir / "dashboard.png")
+            try:
+                send({"ok": True, "path": str(self.monitor.generate_dashboard(Path(output)))})
+            except Exception as e:
+                send({"ok": False, "error": str(e)})
+        elif command == "tail":
+            self._stream(send, request.get("count"))
+        else:
+            send({"ok": False, "error": f"unknown command: {command}"})
+
+    def _stream(self, send, count: Optional[int]) -> None:
+        """Forward sample and alert events to one client until it disconnects"""
+        events = []
+        ready = threading.Condition()
+
+        def subscriber(event):
+            with ready:
+                events.append(event)
+                ready.notify()
+
+        self.monitor.subscribers.append(subscriber)
+        sent = 0
+        try:
+            while not self.stop_event.is_set() and (count is None or sent < count):
+                with ready:
+                    ready.wait_for(lambda: events or self.stop_event.is_set(), timeout=1.0)
+                    pending, events[:] = list(events), []
+                for event in pending:
+                    send(event)
+                    if event["type"] == "sample":
+                        sent += 1
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.monitor.subscribers.remove(subscriber)
+
+    def _write_pid_file(self) -> None:
+        self.pid_file.write_text(str(os.getpid()))
+
+    def _cleanup(self) -> None:
+        for path in (self.socket_path, self.pid_file):
+            try:
+                if path == self.pid_file and path.read_text().strip() != str(os.getpid()):
+                    continue
+                path.unlink()
+            except (FileNotFoundError, ValueError):
+                pass
+
+    def serve_forever(self) -> None:
+        """Run in the foreground until stopped via socket or signal"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self._server = _ControlServer(str(self.socket_path), _ControlHandler)
+        self._server.daemon_ref = self
+        self._write_pid_file()
+        self.started_at = time.time()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+
+        server_thread = threading.Thread(target=self._server.serve_forever, name="watch-control", daemon=True)
+        server_thread.start()
+        logger.info(f"Watch daemon started (pid {os.getpid()}, socket {self.socket_path})")
+        try:
+            self.monitor.run(self.stop_event)
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            self._cleanup()
+            logger.info("Watch daemon stopped")
+
+
+class WatchClient:
+    """Talks to a running watch daemon"""
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self.state_dir = Path(state_dir) if state_dir else DEFAULT_STATE_DIR
+        self.pid_file = self.state_dir / PID_FILE_NAME
+        self.socket_path = self.state_dir / SOCKET_FILE_NAME
+
+    def running_pid(self) -> Optional[int]:
+        """Get the daemon pid, removing a stale pidfile"""
+        try:
+            pid = int(self.pid_file.read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+        if _pid_alive(pid):
+            return pid
+        self.pid_file.unlink(missing_ok=True)
+        return None
+
+    def _connect(self, request: Dict[str, Any], timeout: Optional[float]) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(str(self.socket_path))
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        return sock
+
+    def request(self, command: str, timeout: float = 5.0, **params) -> Dict[str, Any]:
+        """Send one command and return its reply"""
+        with self._connect({"cmd": command, **params}, timeout) as sock:
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        return json.loads(line) if line else {"ok": False, "error": "no reply"}
+
+    def stream(self, count: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield live sample/alert events"""
+        with self._connect({"cmd": "tail", "count": count}, None) as sock:
+            with sock.makefile("rb") as reader:
+                for line in reader:
+                    yield json.loads(line)
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if self.request("status", timeout=1.0).get("ok"):
+                    return True
+            except OSError:
+                pass
+            time.sleep(0.1)
+        return False
+
+    def start(self, config_file: Optional[Path] = None) -> Optional[int]:
+        """Start the daemon in a detached process; returns its pid"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        command = [sys.executable, "-m", "haconiwa.watch.daemon", "--state-dir", str(self.state_dir)]
+        if config_file:
+            command += ["--config", str(config_file)]
+        with open(self.state_dir / LOG_FILE_NAME, "ab") as log:
+            subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                             start_new_session=True, close_fds=True)
+        if not self.wait_ready():
+            return None
+        return self.running_pid()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Ask the daemon to stop, falling back to SIGTERM"""
+        pid = self.running_pid()
+        if pid is None:
+            return False
+        try:
+            self.request("stop")
+        except OSError:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and _pid_alive(pid):
+            time.sleep(0.1)
+        return not _pid_alive(pid)
+
+
+def load_config(config_file: Optional[Path]) -> Dict[str, Any]:
+    """Read watch settings (intervals, thresholds, window, email) from YAML"""
+    if not config_file:
+        return {}
+    import yaml
+    with open(config_file, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return data.get("watch", data)
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Haconiwa watch daemon")
+    parser.add_argument("--state-dir", type=Path, default=DEFAULT_STATE_DIR)
+    parser.add_argument("--config", type=Path)
+    parser.add_argument("--metrics-port", type=int)
+    parser.add_argument("--metrics-addr", default="127.0.0.1")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    monitor = Monitor(load_config(args.config))
+    if args.metrics_port:
+        monitor.start_metrics_server(args.metrics_port, addr=args.metrics_addr)
+    WatchDaemon(args.state_dir, monitor).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,285 @@
-import psutil
-from prometheus_client import Gauge, start_http_server
-import matplotlib.pyplot as plt
+"""
+Host metrics sampling, rolling aggregates and alerting for the watch daemon
+"""
+
+import heapq
+import logging
+import os
 import smtplib
-from email.mime.text import MIMEText
+import threading
+import time
+from collections import deque
 from email.mime.multipart import MIMEMultipart
-from haconiwa.core.config import Config
-from haconiwa.core.logging import get_logger
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import prometheus_client
+import psutil
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples per metric
+DEFAULT_INTERVALS = {
+    "cpu": 1.0,
+    "memory": 5.0,
+    "load": 5.0,
+    "disk": 60.0,
+    "claude_processes": 10.0,
+}
+
+# metric → (fire at or above, clear at or below)
+DEFAULT_THRESHOLDS = {
+    "cpu": (90.0, 75.0),
+    "memory": (90.0, 80.0),
+    "disk": (95.0, 90.0),
+}
+
+
+def _count_claude_processes() -> float:
+    count = 0
+    for proc in psutil.process_iter(['name', 'cmdline']):
+        try:
+            name = (proc.info['name'] or '').lower()
+            args = ' '.join(proc.info['cmdline'] or []).lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if 'claude' in name or ('node' in name and 'claude' in args):
+            count += 1
+    return float(count)
+
+
+# Non-blocking samplers (cpu_percent without interval reports usage since the last call)
+SAMPLERS: Dict[str, Callable[[], float]] = {
+    "cpu": lambda: psutil.cpu_percent(interval=None),
+    "memory": lambda: psutil.virtual_memory().percent,
+    "load": lambda: os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0,
+    "disk": lambda: psutil.disk_usage("/").percent,
+    "claude_processes": _count_claude_processes,
+}
+
+
+class RollingStats:
+    """Samples of one metric over a time window (bounded by window / interval)"""
+
+    def __init__(self, window: float = 300.0):
+        self.window = window
+        self.samples = deque()
+
+    def add(self, timestamp: float, value: float) -> None:
+        self.samples.append((timestamp, value))
+        cutoff = timestamp - self.window
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {}
+        values = [value for _, value in self.samples]
+        return {
+            "last": values[-1],
+            "min": min(values),
+            "max": max(values),
+            "mean": sum(values) / len(values),
+            "count": len(values),
+        }
+
+
+class AlertRule:
+    """Threshold alert with hysteresis and rate limiting.
+
+    Fires when the value reaches ``threshold`` and stays firing until it
+    drops to ``clear_threshold``. Repeat notifications for the same rule
+    are sent at most once per ``min_interval`` seconds.
+    """
+
+    def __init__(self, metric: str, threshold: float, clear_threshold: Optional[float] = None,
+                 min_interval: float = 300.0):
+        self.metric = metric
+        self.threshold = threshold
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.min_interval = min_interval
+        self.firing = False
+        self.notified = False
+        self.last_notified: Optional[float] = None
+
+    def evaluate(self, value: float, now: float) -> Optional[str]:
+        """Get "fire" or "clear" when the state changes and a notification is due"""
+        if not self.firing and value >= self.threshold:
+            self.firing = True
+            self.notified = self.last_notified is None or now - self.last_notified >= self.min_interval
+            if self.notified:
+                self.last_notified = now
+                return "fire"
+        elif self.firing and value <= self.clear_threshold:
+            self.firing = False
+            # Only announce recovery for alerts that were announced
+            return "clear" if self.notified else None
+        return None
+
+
+class SamplingScheduler:
+    """Runs each metric sampler at its own interval from a single loop"""
+
+    def __init__(self, intervals: Dict[str, float], samplers: Dict[str, Callable[[], float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.samplers = samplers or SAMPLERS
+        self.intervals = {name: interval for name, interval in intervals.items() if name in self.samplers}
+        self.clock = clock
+        now = clock()
+        self._queue = [(now, name) for name in sorted(self.intervals)]
+        heapq.heapify(self._queue)
+
+    def next_due(self) -> float:
+        """Clock time when the next metric is due"""
+        return self._queue[0][0] if self._queue else float("inf")
+
+    def run_due(self) -> List[tuple]:
+        """Sample every due metric; returns (name, value) pairs"""
+        now = self.clock()
+        results = []
+        while self._queue and self._queue[0][0] <= now:
+            due, name = heapq.heappop(self._queue)
+            try:
+                results.append((name, float(self.samplers[name]())))
+            except Exception as e:
+                logger.debug(f"Sampling {name} failed: {e}")
+            # Schedule from the due time to avoid drift, skipping missed slots
+            next_time = due + self.intervals[name]
+            if next_time <= now:
+                next_time = now + self.intervals[name]
+            heapq.heappush(self._queue, (next_time, name))
+        return results
+
 
 class Monitor:
-    def __init__(self):
-        self.config = Config()
-        self.logger = get_logger(__name__)
-        self.cpu_usage_gauge = Gauge('cpu_usage', 'CPU Usage')
-        self.memory_usage_gauge = Gauge('memory_usage', 'Memory Usage')
-        start_http_server(8000)
-
-    def collect_metrics(self):
-        cpu_usage = psutil.cpu_percent(interval=1)
-        memory_info = psutil.virtual_memory()
-        self.cpu_usage_gauge.set(cpu_usage)
-        self.memory_usage_gauge.set(memory_info.percent)
-        self.logger.info(f"CPU Usage: {cpu_usage}%, Memory Usage: {memory_info.percent}%")
-
-    def generate_dashboard(self):
-        cpu_usage = psutil.cpu_percent(interval=1, percpu=True)
-        plt.figure(figsize=(10, 5))
-        plt.plot(cpu_usage, label='CPU Usage')
-        plt.title('CPU Usage Over Time')
-        plt.xlabel('Time')
-        plt.ylabel('CPU Usage (%)')
-        plt.legend()
-        plt.savefig('cpu_usage_dashboard.png')
-        plt.close()
-
-    def send_alert(self, message):
-        email_config = self.config.get_email_config()
-        msg = MIMEMultipart()
-        msg['From'] = email_config['from']
-        msg['To'] = email_config['to']
-        msg['Subject'] = 'Alert: System Metrics'
-        msg.attach(MIMEText(message, 'plain'))
-        server = smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port'])
-        server.starttls()
-        server.login(email_config['from'], email_config['password'])
-        server.send_message(msg)
-        server.quit()
-
-    def check_alert_conditions(self):
-        cpu_usage = psutil.cpu_percent(interval=1)
-        if cpu_usage > self.config.get_alert_threshold('cpu'):
-            self.send_alert(f"High CPU usage detected: {cpu_usage}%")
-
-    def run(self):
-        while True:
-            self.collect_metrics()
-            self.check_alert_conditions()
-            self.generate_dashboard()
+    """Collects host metrics, keeps rolling aggregates and raises alerts"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        intervals = dict(DEFAULT_INTERVALS)
+        intervals.update(self.config.get("intervals", {}))
+        self.scheduler = SamplingScheduler(intervals)
+        window = float(self.config.get("window", 300.0))
+        self.stats = {name: RollingStats(window) for name in self.scheduler.intervals}
+
+        thresholds = dict(DEFAULT_THRESHOLDS)
+        thresholds.update({name: tuple(value) for name, value in self.config.get("thresholds", {}).items()})
+        min_interval = float(self.config.get("alert_min_interval", 300.0))
+        self.alert_rules = [
+            AlertRule(name, fire, clear, min_interval) for name, (fire, clear) in thresholds.items()
+        ]
+        self.alerts: deque = deque(maxlen=100)
+        self.subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._gauges: Dict[str, Any] = {}
+        self.registry = None
 
-if __name__ == "__main__":
-    monitor = Monitor()
-    monitor.run()
\ No newline at end of file
+    def start_metrics_server(self, port: int, addr: str = "127.0.0.1") -> None:
+        """Expose current values for Prometheus (opt-in, loopback unless addr is given)"""
+        self.registry = prometheus_client.CollectorRegistry()
+        for name in self.scheduler.intervals:
+            self._gauges[name] = prometheus_client.Gauge(
+                f"haconiwa_host_{name}", f"Host {name.replace('_', ' ')}", registry=self.registry
+            )
+        prometheus_client.start_http_server(port, addr=addr, registry=self.registry)
+
+    def collect_metrics(self) -> Dict[str, float]:
+        """Sample metrics that are due and update aggregates and alerts"""
+        samples = dict(self.scheduler.run_due())
+        if not samples:
+            return samples
+        now = time.time()
+        with self._lock:
+            for name, value in samples.items():
+                self.stats[name].add(now, value)
+                if name in self._gauges:
+                    self._gauges[name].set(value)
+        self.check_alert_conditions(samples, now)
+
+        self._publish({"type": "sample", "time": now, "metrics": samples})
+        return samples
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every subscriber; a failing subscriber does not stop the others"""
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber(event)
+            except Exception as e:
+                logger.error(f"Watch subscriber failed on {event['type']} event: {e}")
+
+    def check_alert_conditions(self, samples: Dict[str, float], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for rule in self.alert_rules:
+            if rule.metric not in samples:
+                continue
+            change = rule.evaluate(samples[rule.metric], now)
+            if change is None:
+                continue
+            value = samples[rule.metric]
+            if change == "fire":
+                message = f"{rule.metric} が閾値を超えました: {value:.1f} (閾値 {rule.threshold:.1f})"
+            else:
+                message = f"{rule.metric} が回復しました: {value:.1f}"
+            alert = {"type": "alert", "time": now, "metric": rule.metric, "state": change,
+                     "value": value, "message": message}
+            self.alerts.append(alert)
+            logger.warning(message) if change == "fire" else logger.info(message)
+            self._publish(alert)
+            if change == "fire":
+                self.send_alert(message)
+
+    def send_alert(self, message: str) -> None:
+        """Send alert email when email settings are configured"""
+        email_config = self.config.get("email")
+        if not email_config:
+            return
+        try:
+            msg = MIMEMultipart()
+            msg['From'] = email_config['from']
+            msg['To'] = email_config['to']
+            msg['Subject'] = 'Alert: System Metrics'
+            msg.attach(MIMEText(message, 'plain'))
+            server = smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port'])
+            server.starttls()
+            server.login(email_config['from'], email_config['password'])
+            server.send_message(msg)
+            server.quit()
+        except Exception as e:
+            logger.error(f"Failed to send alert email: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Rolling aggregates per metric"""
+        with self._lock:
+            return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def generate_dashboard(self, output_path: Path) -> Path:
+        """Render the rolling window to a PNG (on demand only)"""
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        with self._lock:
+            series = {name: list(stats.samples) for name, stats in self.stats.items() if stats.samples}
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fig, ax = plt.subplots(figsize=(10, 5))
+        for name, samples in series.items():
+            start = samples[0][0]
+            ax.plot([t - start for t, _ in samples], [value for _, value in samples], label=name)
+        ax.set_title('Haconiwa Watch Metrics')
+        ax.set_xlabel('Seconds')
+        ax.set_ylabel('Value')
+        ax.legend()
+        fig.savefig(output_path)
+        plt.close(fig)
+        return output_path
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Sample until stop_event is set, sleeping until the next metric is due"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.collect_metrics()
+            delay = self.scheduler.next_due() - self.scheduler.clock()
+            stop_event.wait(max(0.05, min(delay, 1.0)))
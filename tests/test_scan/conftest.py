@@ -0,0 +1,15 @@
+"""
+Shared fixtures for scan tests
+"""
+
+import pytest
+
+from haconiwa.scan import index as index_module
+
+
+@pytest.fixture(autouse=True)
+def scan_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep scan caches out of the real ~/.haconiwa/cache"""
+    cache_dir = tmp_path_factory.mktemp("scan-cache")
+    monkeypatch.setattr(index_module, "INDEX_CACHE_DIR", cache_dir)
+    return cache_dir
@@ -0,0 +1,96 @@
+"""
+Tests for cached model analysis and duplicate detection
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from haconiwa.scan import analyzer as analyzer_module
+from haconiwa.scan.analyzer import ModelAnalyzer
+from haconiwa.scan.cli import scan_app
+from haconiwa.scan.index import index_dir_for
+
+from .test_index import age
+
+
+class TestModelAnalyzer:
+    """Test cases for ModelAnalyzer caching and duplicates"""
+    
+    @pytest.fixture
+    def model_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir)
+            weights = os.urandom(2 * 1024 * 1024)
+            for category, name in [("llm", "llama-7b"), ("llm", "llama-7b-copy"), ("vision", "clip")]:
+                model_path = base_path / "models" / category / name
+                model_path.mkdir(parents=True)
+                (model_path / "config.json").write_text(json.dumps({"model_name": name}))
+                data = weights if "llama" in name else os.urandom(len(weights))
+                (model_path / "model.safetensors").write_bytes(data)
+            age(base_path)
+            yield base_path
+    
+    def test_analysis_is_cached_by_directory(self, model_dir):
+        first = ModelAnalyzer(model_dir).analyze_all()
+        assert first['total_models'] == 3
+        assert first['format_sizes'] == {'SafeTensors': 3 * 2 * 1024 * 1024}
+        
+        with patch.object(ModelAnalyzer, '_analyze_model_directory') as analyze:
+            second = ModelAnalyzer(model_dir).analyze_all()
+        analyze.assert_not_called()
+        assert second['categories'] == first['categories']
+        
+        # An in-place config edit invalidates only that directory
+        config = model_dir / "models" / "vision" / "clip" / "config.json"
+        config.write_text(json.dumps({"model_name": "clip-vit"}))
+        analyzer = ModelAnalyzer(model_dir)
+        vision = analyzer.analyze_category("vision")
+        assert [model['name'] for model in vision['models']] == ["clip-vit"]
+        assert vision['common_formats'] == {'SafeTensors': 1}
+        assert analyzer.analyze_category("llm")['total_count'] == 2
+    
+    def test_parallel_analysis_matches_serial(self, model_dir):
+        serial = ModelAnalyzer(model_dir).analyze_category("llm")
+        shutil.rmtree(index_dir_for(model_dir))
+        with patch.object(analyzer_module, "PARALLEL_MIN_DIRECTORIES", 1):
+            parallel = ModelAnalyzer(model_dir).analyze_category("llm")
+        assert parallel == serial
+    
+    def test_find_duplicates(self, model_dir):
+        llama = model_dir / "models" / "llm" / "llama-7b" / "model.safetensors"
+        os.link(llama, model_dir / "models" / "llm" / "llama-7b" / "hardlink.safetensors")
+        
+        report = ModelAnalyzer(model_dir).find_duplicates()
+        assert report['files_compared'] == 4
+        assert len(report['groups']) == 1
+        group = report['groups'][0]
+        assert group['copies'] == 2
+        assert group['wasted'] == 2 * 1024 * 1024
+        assert len(group['files']) == 3
+        
+        # Sampled hashes are cached; same size with a different middle is told apart by verify
+        copy = model_dir / "models" / "llm" / "llama-7b-copy" / "model.safetensors"
+        with open(copy, "r+b") as f:
+            f.seek(100_000)
+            f.write(b"changed")
+        analyzer = ModelAnalyzer(model_dir)
+        with patch.object(analyzer_module, "HASH_SAMPLE_BYTES", 4096):
+            assert len(analyzer.find_duplicates()['groups']) == 1
+            assert analyzer.find_duplicates(verify=True)['groups'] == []
+    
+    def test_duplicates_command(self, model_dir):
+        result = CliRunner().invoke(scan_app, ["duplicates", "--path", str(model_dir), "--format", "json"])
+        assert result.exit_code == 0
+        report = json.loads(result.stdout)
+        assert report['total_wasted'] == 2 * 1024 * 1024
+        
+        result = CliRunner().invoke(scan_app, ["duplicates", "--path", str(model_dir), "--min-size", "10"])
+        assert result.exit_code == 0
+        assert "0 groups" in result.stdout
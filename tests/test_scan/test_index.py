@@ -0,0 +1,106 @@
+"""
+Tests for the persistent scan index
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from haconiwa.scan.analyzer import ModelAnalyzer
+from haconiwa.scan.index import index_dir_for
+from haconiwa.scan.scanner import ModelScanner
+
+
+def age(path: Path, seconds: int = 60):
+    """Move mtimes into the past so listings are trusted (outside the racy window)"""
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            stamp = os.stat(Path(root) / name).st_mtime - seconds
+            os.utime(Path(root) / name, (stamp, stamp))
+    stamp = os.stat(path).st_mtime - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def warm_index(path: Path):
+    """Build the index and list once more after aging, as if earlier runs happened long ago"""
+    ModelScanner(path).index
+    age(path)
+    ModelScanner(path).index
+
+
+class TestScanIndex:
+    """Test cases for ScanIndex"""
+    
+    @pytest.fixture
+    def model_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir)
+            for provider, model in [("openai", "gpt-4"), ("anthropic", "claude-3-opus")]:
+                model_path = base_path / "models" / "llm" / provider / model
+                model_path.mkdir(parents=True)
+                (model_path / "config.json").write_text('{"model_name": "%s"}' % model)
+                (model_path / "model.safetensors").write_bytes(b"0" * 128)
+            (base_path / "models" / "__pycache__").mkdir()
+            (base_path / "models" / "__pycache__" / "gpt-4.pyc").touch()
+            age(base_path)
+            yield base_path
+    
+    def test_index_is_persisted_and_reused(self, model_dir):
+        first = ModelScanner(model_dir).index
+        assert first.rescanned == first.stats()['directories'] == 7
+        assert first.index_path.parent == index_dir_for(model_dir)
+        assert not (model_dir / ".haconiwa").exists()
+        
+        warm_index(model_dir)
+        second = ModelScanner(model_dir).index
+        assert second.rescanned == 0
+        assert second.stats()['files'] == 4
+        
+        # Different ignore patterns get their own index
+        other = ModelScanner(model_dir, ignore_patterns=["*.json", "__pycache__"]).index
+        assert other.index_path != first.index_path
+        assert other.stats()['files'] == 2
+    
+    def test_only_changed_directories_are_listed(self, model_dir):
+        warm_index(model_dir)
+        new_model = model_dir / "models" / "llm" / "openai" / "gpt-4o"
+        new_model.mkdir()
+        (new_model / "model.safetensors").write_bytes(b"1" * 64)
+        
+        scanner = ModelScanner(model_dir)
+        # The changed parent and the new directory are listed; the rest are only stat'ed
+        assert scanner.index.rescanned == 2
+        results = scanner.search_by_model_name("gpt-4o")
+        assert {f['size'] for f in results['matches']['llm']} == {64}
+        
+        (model_dir / "models" / "llm" / "anthropic" / "claude-3-opus" / "config.json").unlink()
+        results = ModelScanner(model_dir).search_by_model_name("claude-3-opus")
+        assert {f['name'] for files in results['matches'].values() for f in files} == {"model.safetensors"}
+    
+    def test_scan_commands_use_index(self, model_dir):
+        scanner = ModelScanner(model_dir)
+        
+        results = scanner.search_by_model_name("gpt-4")
+        assert results['total_files'] > 0
+        assert all(f['type'] in ('json', 'other') for files in results['matches'].values() for f in files)
+        assert not any(f['name'].endswith('.pyc') for files in results['matches'].values() for f in files)
+        
+        assert scanner.search_content("model_name", file_types=[".json"])['files_searched'] == 2
+        assert {m['provider'] for m in scanner.list_all_models()} == {'openai', 'anthropic'}
+        
+        analysis = ModelAnalyzer(model_dir).analyze_all()
+        assert analysis['total_models'] == 2
+        assert analysis['total_size'] == 2 * 128 + sum(
+            len('{"model_name": "%s"}' % m) for m in ("gpt-4", "claude-3-opus"))
+    
+    def test_rebuild_and_no_index(self, model_dir):
+        warm_index(model_dir)
+        scanner = ModelScanner(model_dir)
+        assert scanner.index.rescanned == 0
+        assert scanner.refresh_index(rebuild=True).rescanned == 7
+        
+        unindexed = ModelScanner(model_dir, use_index=False)
+        assert unindexed.index.rescanned == 7
+        assert unindexed.index.index_path is None
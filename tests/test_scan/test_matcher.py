@@ -0,0 +1,40 @@
+"""
+Tests for the Aho–Corasick multi-pattern matcher
+"""
+
+import random
+
+from haconiwa.scan.matcher import MultiPatternMatcher
+
+
+class TestMultiPatternMatcher:
+    """Test cases for MultiPatternMatcher"""
+    
+    def test_overlapping_patterns(self):
+        matcher = MultiPatternMatcher()
+        for pattern, value in [("gpt-4", "gpt-4"), ("4", "gpt-4"), ("gpt_4", "gpt-4"),
+                               ("claude-3", "claude"), ("3-opus", "claude"), ("he", "he"), ("she", "she")]:
+            matcher.add(pattern, value)
+        
+        assert matcher.match("gpt-4o-mini") == {"gpt-4"}
+        assert matcher.match("claude-3-opus") == {"claude"}
+        assert matcher.match("ushers") == {"he", "she"}
+        assert matcher.match("llama") == set()
+    
+    def test_empty_pattern_matches_everything(self):
+        matcher = MultiPatternMatcher()
+        matcher.add("", "any")
+        matcher.add("xyz", "xyz")
+        assert matcher.match("abc") == {"any"}
+        assert matcher.match("") == {"any"}
+    
+    def test_agrees_with_substring_search(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            patterns = ["".join(rng.choice("ab-") for _ in range(rng.randint(1, 4))) for _ in range(6)]
+            matcher = MultiPatternMatcher()
+            for i, pattern in enumerate(patterns):
+                matcher.add(pattern, i)
+            for _ in range(10):
+                text = "".join(rng.choice("ab-") for _ in range(rng.randint(0, 12)))
+                assert matcher.match(text) == {i for i, pattern in enumerate(patterns) if pattern in text}
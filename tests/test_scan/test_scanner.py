@@ -179,6 +179,37 @@ response = client.chat.completions.create(
         assert 'content' in example_file
         assert 'import openai' in example_file['content']
     
+    def test_search_by_model_names_single_walk(self, temp_model_dir):
+        """Test searching several models in one walk of the index"""
+        from unittest.mock import patch
+        from haconiwa.scan.comparator import ModelComparator
+        from haconiwa.scan.index import ScanIndex
+        
+        models = ["gpt-4", "claude-3-opus", "llama-2-70b", "mistral-7b"]
+        expected = {model: ModelScanner(temp_model_dir).search_by_model_name(model) for model in models}
+        
+        with patch.object(ScanIndex, "walk", autospec=True, side_effect=ScanIndex.walk) as walk:
+            results = ModelScanner(temp_model_dir).search_by_model_names(models)
+            comparison = ModelComparator(temp_model_dir).compare(models, ['size', 'metadata'])
+        
+        assert walk.call_count == 2
+        for model in models:
+            assert results[model]['total_files'] == expected[model]['total_files']
+            assert sorted(results[model]['categories']) == sorted(expected[model]['categories'])
+        assert results["mistral-7b"]['total_files'] == 0
+        assert set(comparison['size']) == {"gpt-4", "claude-3-opus", "llama-2-70b"}
+        assert comparison['metadata']["gpt-4"]['has_config'] is True
+    
+    def test_content_loaded_only_for_selected_files(self, temp_model_dir):
+        """Test include_content predicate"""
+        scanner = ModelScanner(temp_model_dir)
+        
+        results = scanner.search_by_model_name("gpt-4", include_content=lambda name: name == "config.json")
+        files = {f['name']: f for files in results['matches'].values() for f in files}
+        
+        assert '"parameters": "1.76T"' in files['config.json']['content']
+        assert 'content' not in files['example.py']
+    
     def test_model_name_normalization(self, temp_model_dir):
         """Test model name normalization"""
         scanner = ModelScanner(temp_model_dir)
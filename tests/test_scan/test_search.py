@@ -0,0 +1,161 @@
+"""
+Tests for the mmap-based content search engine
+"""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from haconiwa.scan import search
+from haconiwa.scan.scanner import ModelScanner
+from haconiwa.scan.search import ContentSearcher, compile_pattern, search_file
+
+
+class TestContentSearch:
+    """Test cases for ContentSearcher"""
+    
+    @pytest.fixture
+    def repo_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir)
+            (base_path / "model.py").write_text("import torch\n\nclass Model:\n    def forward(self, x):\n        return x  # forward pass\n")
+            (base_path / "weights.bin").write_bytes(b"forward\0\x01\x02" * 100)
+            (base_path / "README.md").write_text("Model card\r\nUses FORWARD hooks\r\n")
+            (base_path / "empty.txt").touch()
+            yield base_path
+    
+    def test_line_numbers_and_context_from_offsets(self, repo_dir):
+        matches = search_file(str(repo_dir / "model.py"), compile_pattern("forward"), 1)
+        
+        # One result per matching line, even with two matches on it
+        assert [(number, line) for number, line, _ in matches] == [
+            (4, "def forward(self, x):"),
+            (5, "return x  # forward pass"),
+        ]
+        assert matches[0][2] == ["class Model:", "    def forward(self, x):", "        return x  # forward pass"]
+        assert matches[1][2] == ["    def forward(self, x):", "        return x  # forward pass"]
+    
+    def test_binary_and_empty_files(self, repo_dir):
+        regex = compile_pattern("forward")
+        assert search_file(str(repo_dir / "weights.bin"), regex, 2) is None
+        assert search_file(str(repo_dir / "empty.txt"), regex, 2) == []
+        assert search_file(str(repo_dir / "README.md"), regex, 0) == [(2, "Uses FORWARD hooks", ["Uses FORWARD hooks"])]
+    
+    def test_unicode_pattern_case_folding(self, repo_dir):
+        path = repo_dir / "notes.md"
+        path.write_text("Über model\nüber weights\n", encoding="utf-8")
+        assert [number for number, _, _ in search_file(str(path), compile_pattern("über"), 0)] == [1, 2]
+    
+    def test_unicode_character_classes(self, repo_dir):
+        path = repo_dir / "notes.md"
+        path.write_text("日本語\nmixed 日本 text\n", encoding="utf-8")
+        assert [number for number, _, _ in search_file(str(path), compile_pattern(r"^\w+$"), 0)] == [1]
+        assert [number for number, _, _ in search_file(str(path), compile_pattern(r"\b日本\b"), 0)] == [2]
+    
+    def test_matches_do_not_cross_lines(self, repo_dir):
+        path = repo_dir / "layer.py"
+        path.write_text("x = 1\nfoo = 2\ny = 1  foo\n")
+        matches = search_file(str(path), compile_pattern(r"1\s+foo"), 0)
+        assert [(number, line) for number, line, _ in matches] == [(3, "y = 1  foo")]
+    
+    def test_process_pool_matches_serial(self, repo_dir):
+        for i in range(40):
+            (repo_dir / f"layer_{i:02d}.py").write_text("x = 1\n" * i + "def forward():\n    pass\n")
+        files = [(str(path), path.stat().st_size) for path in sorted(repo_dir.iterdir())]
+        
+        serial = list(ContentSearcher(max_workers=1).iter_search(files, "def forward", 0))
+        with patch.object(search, "PARALLEL_MIN_BYTES", 0), patch.object(search, "BATCH_MAX_FILES", 8):
+            searcher = ContentSearcher(max_workers=4)
+            parallel = list(searcher.iter_search(files, "def forward", 0))
+        
+        assert parallel == serial
+        assert searcher.skipped == 1
+        assert dict(parallel)[str(repo_dir / "layer_01.py")] == [(2, "def forward():", ["def forward():"])]
+    
+    def test_scanner_search_content(self, repo_dir):
+        results = ModelScanner(repo_dir).search_content("forward")
+        
+        assert results['files_searched'] == 4
+        assert results['files_skipped'] == 1
+        assert {m['file'] for m in results['matches']} == {"model.py", "README.md"}
+        assert results['total_matches'] == 3
+
+
+class TestStreamingOutput:
+    """Test cases for JSONL streaming and --limit"""
+    
+    @pytest.fixture
+    def many_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir)
+            for i in range(30):
+                (base_path / f"module_{i:02d}.py").write_text("# TODO: refactor\nx = 1\n# TODO: tests\n")
+            yield base_path
+    
+    def test_take_closes_source(self):
+        from haconiwa.scan.formatter import take
+        
+        closed = []
+        produced = []
+        
+        def produce():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                closed.append(True)
+        
+        assert list(take(produce(), 3)) == [0, 1, 2]
+        assert closed == [True]
+        # Nothing past the limit is computed
+        assert produced == [0, 1, 2]
+        assert list(take(range(4))) == [0, 1, 2, 3]
+    
+    def test_write_jsonl_limit(self, many_files):
+        import io
+        import json
+        from haconiwa.scan.formatter import OutputFormatter
+        
+        stream = io.StringIO()
+        matches = ModelScanner(many_files).iter_content_matches("todo", context_lines=0)
+        
+        assert OutputFormatter().write_jsonl(matches, stream, limit=5) == 5
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert len(records) == 5
+        assert records[0] == {'file': 'module_00.py', 'line_number': 1, 'line': '# TODO: refactor',
+                              'context': ['# TODO: refactor']}
+    
+    def test_early_stop_cancels_pool(self, many_files):
+        files = [(str(path), path.stat().st_size) for path in sorted(many_files.iterdir())]
+        with patch.object(search, "PARALLEL_MIN_BYTES", 0), patch.object(search, "BATCH_MAX_FILES", 2):
+            results = ContentSearcher(max_workers=2).iter_search(files, "todo", 0)
+            first = next(results)
+            results.close()
+        assert first[0] == files[0][0]
+    
+    def test_content_command_jsonl_and_generate_from_stdin(self, many_files, tmp_path):
+        import json
+        from typer.testing import CliRunner
+        from haconiwa.scan.cli import scan_app
+        
+        runner = CliRunner()
+        result = runner.invoke(scan_app, ["content", "TODO", "--path", str(many_files),
+                                          "--format", "jsonl", "--limit", "7", "--context", "0"])
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert len(lines) == 7
+        assert json.loads(lines[-1])['file'] == "module_03.py"
+        
+        result = runner.invoke(scan_app, ["content", "TODO", "--path", str(many_files), "-f", "json", "-n", "2"])
+        assert json.loads(result.stdout)['total_matches'] == 2
+        
+        output = tmp_path / "parallel-dev.yaml"
+        result = runner.invoke(scan_app, ["generate-parallel-config", "--source", "-", "--max-files", "3",
+                                          "--output", str(output)], input="\n".join(lines) + "\n")
+        assert result.exit_code == 0
+        config = yaml.safe_load(output.read_text())
+        assert [task['file'] for task in config['tasks']] == ["module_00.py", "module_01.py", "module_02.py"]
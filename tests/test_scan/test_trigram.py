@@ -0,0 +1,94 @@
+"""
+Tests for the trigram content index
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from haconiwa.scan.scanner import ModelScanner
+from haconiwa.scan.trigram import plan_query, trigrams
+
+from .test_index import age
+
+
+def write_old(path: Path, text: str, seconds: int = 60):
+    """Write a file with an mtime outside the racy window"""
+    path.write_text(text)
+    stamp = path.stat().st_mtime - seconds
+    os.utime(path, (stamp, stamp))
+
+
+class TestTrigramIndex:
+    """Test cases for TrigramIndex"""
+    
+    @pytest.fixture
+    def code_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir)
+            (base_path / "models").mkdir()
+            (base_path / "models" / "llama.py").write_text("class LlamaModel:\n    def forward(self):\n        pass\n")
+            (base_path / "models" / "gpt.py").write_text("class GPTModel:\n    def generate(self):\n        pass\n")
+            (base_path / "README.md").write_text("Supported: Llama and GPT\n")
+            (base_path / "weights.bin").write_bytes(b"LlamaModel\0" * 10)
+            for i in range(20):
+                (base_path / f"util_{i:02d}.py").write_text(f"VALUE_{i} = {i}\n")
+            age(base_path)
+            yield base_path
+    
+    def search(self, base_path, pattern):
+        scanner = ModelScanner(base_path, use_trigrams=True)
+        results = scanner.search_content(pattern, context_lines=0)
+        return scanner, sorted({match['file'] for match in results['matches']})
+    
+    def test_plan_query(self):
+        assert plan_query("def forward") == ("lit", b"def forward")
+        assert plan_query("Llama|GPT-4") == ("or", [("lit", b"llama"), ("lit", b"gpt-4")])
+        # \s and \w run on text, where "s" also folds "ſ"
+        assert plan_query(r"class\s+(\w+)Model") == ("and", [("lit", b"cla"), ("lit", b"model")])
+        assert plan_query("a.*b") is None
+        assert plan_query("ab|.*") is None
+        assert trigrams(b"AbCd") == {ord("a") << 16 | ord("b") << 8 | ord("c"), ord("b") << 16 | ord("c") << 8 | ord("d")}
+    
+    def test_candidates_narrow_search_without_losing_matches(self, code_dir):
+        scanner, files = self.search(code_dir, r"class\s+\w+Model")
+        assert files == ["models/gpt.py", "models/llama.py"]
+        assert scanner.files_pruned == 22
+        
+        brute = ModelScanner(code_dir).search_content(r"class\s+\w+Model", context_lines=0)
+        assert sorted({match['file'] for match in brute['matches']}) == files
+        
+        # Case folding matches the case-insensitive search
+        _, files = self.search(code_dir, "llama|FORWARD")
+        assert files == ["README.md", "models/llama.py"]
+        assert "weights.bin" not in scanner.trigrams.candidates("llamamodel")
+    
+    def test_incremental_update(self, code_dir):
+        scanner = ModelScanner(code_dir, use_trigrams=True)
+        assert scanner.trigrams.stats()["reindexed"] == 23
+        
+        write_old(code_dir / "models" / "gpt.py", "class MistralModel:\n    pass\n", seconds=30)
+        (code_dir / "README.md").unlink()
+        
+        scanner = ModelScanner(code_dir, use_trigrams=True)
+        assert scanner.trigrams.stats()["reindexed"] == 1
+        assert scanner.trigrams.candidates("GPTModel") == set()
+        assert scanner.trigrams.candidates("mistral") == {"models/gpt.py"}
+        assert scanner.trigrams.candidates("Supported") == set()
+    
+    def test_recently_modified_files_are_always_candidates(self, code_dir):
+        ModelScanner(code_dir, use_trigrams=True).trigrams
+        (code_dir / "models" / "llama.py").write_text("class MixtralModel:\n    pass\n")
+        
+        scanner, files = self.search(code_dir, "mixtral")
+        assert files == ["models/llama.py"]
+        assert "models/llama.py" in scanner.trigrams.unindexed
+    
+    def test_rebuild_and_persistence(self, code_dir):
+        ModelScanner(code_dir, use_trigrams=True).trigrams
+        scanner = ModelScanner(code_dir, use_trigrams=True)
+        assert scanner.trigrams.index_path.exists()
+        assert scanner.trigrams.stats()["reindexed"] == 0
+        assert scanner.refresh_trigrams(rebuild=True).stats()["reindexed"] == 23
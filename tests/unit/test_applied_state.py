@@ -0,0 +1,218 @@
+"""
+Test last-applied state store
+前回適用状態ストアのテストケース
+"""
+
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from haconiwa.core.applied_state import (
+    AppliedStateStore, CREATE, UPDATE, DELETE, NOOP, spec_hash, state_file_for
+)
+from haconiwa.core.applier import CRDApplier
+from haconiwa.core.crd.parser import CRDParser
+from haconiwa.task.manager import TaskManager
+
+
+TASKS_YAML = """
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: task-a
+spec:
+  branch: feature/a
+  spaceRef: company-a
+---
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: task-b
+spec:
+  branch: feature/b
+  spaceRef: company-a
+"""
+
+SPACE_YAML = """
+apiVersion: haconiwa.dev/v1
+kind: Space
+metadata:
+  name: world-a
+spec:
+  nations:
+  - id: jp
+    name: Japan
+    cities:
+    - id: tokyo
+      name: Tokyo
+      villages:
+      - id: v1
+        name: Village
+        companies:
+        - name: company-a
+"""
+
+
+class TestAppliedStateStore:
+    """前回適用状態ストアのテストクラス"""
+
+    def setup_method(self):
+        """各テストメソッドの前に実行される初期化"""
+        self.crds = CRDParser().parse_multi_yaml(TASKS_YAML)
+        self.source = "/work/tasks.yaml"
+
+    def actions(self, items):
+        return {item.key: item.action for item in items}
+
+    def test_plan_create_then_noop(self, tmp_path):
+        """初回は作成、記録後は変更なしになることをテスト"""
+        store = AppliedStateStore(tmp_path / "state.json")
+        assert self.actions(store.plan(self.crds, self.source)) == {
+            "Task/task-a": CREATE, "Task/task-b": CREATE
+        }
+
+        for crd in self.crds:
+            assert store.record(crd, self.source, {"branch": crd.spec.branch})
+        store.save()
+
+        reloaded = AppliedStateStore(tmp_path / "state.json")
+        assert self.actions(reloaded.plan(self.crds, self.source)) == {
+            "Task/task-a": NOOP, "Task/task-b": NOOP
+        }
+
+    def test_plan_update_on_spec_change(self, tmp_path):
+        """スペック変更時に更新となることをテスト"""
+        store = AppliedStateStore(tmp_path / "state.json")
+        for crd in self.crds:
+            store.record(crd, self.source)
+
+        changed = self.crds[0].model_copy(deep=True)
+        changed.spec.branch = "feature/a2"
+        items = store.plan([changed, self.crds[1]], self.source)
+
+        assert self.actions(items) == {"Task/task-a": UPDATE, "Task/task-b": NOOP}
+        assert items[0].reason == "spec changed"
+
+    def test_plan_delete_scoped_to_source(self, tmp_path):
+        """削除は同じソースファイルのリソースのみ対象となることをテスト"""
+        store = AppliedStateStore(tmp_path / "state.json")
+        store.record(self.crds[0], self.source)
+        store.record(self.crds[1], "/work/other.yaml")
+
+        assert self.actions(store.plan([], self.source)) == {"Task/task-a": DELETE}
+
+        assert store.forget("Task/task-a")
+        assert store.get("Task/task-a") is None
+        assert store.dirty
+
+    def test_plan_update_on_drift(self, tmp_path):
+        """記録した出力が失われた場合に更新となることをテスト"""
+        store = AppliedStateStore(tmp_path / "state.json")
+        store.record(self.crds[0], self.source, {"worktree_path": str(tmp_path / "missing")})
+
+        items = store.plan([self.crds[0]], self.source)
+        assert items[0].action == UPDATE
+        assert items[0].reason == "worktree_path missing"
+
+    @patch('haconiwa.core.applied_state.subprocess.run')
+    def test_plan_update_on_missing_session(self, mock_run, tmp_path):
+        """tmuxセッションが失われた場合に更新となることをテスト"""
+        mock_run.return_value = MagicMock(returncode=1)
+        store = AppliedStateStore(tmp_path / "state.json")
+        store.record(self.crds[0], self.source, {"session_name": "company-a"})
+
+        items = store.plan([self.crds[0]], self.source)
+        assert items[0].action == UPDATE
+        assert items[0].reason == "tmux session missing"
+
+    def test_unhashable_crd_is_not_recorded(self, tmp_path):
+        """シリアライズできないCRDは常に作成扱いで記録されないことをテスト"""
+        crd = MagicMock()
+        crd.kind = "Space"
+        crd.metadata.name = "mock-world"
+
+        store = AppliedStateStore(tmp_path / "state.json")
+        assert spec_hash(crd) is None
+        assert not store.record(crd, self.source)
+        assert not store.dirty
+        assert store.plan([crd], self.source)[0].action == CREATE
+
+    def test_unreadable_state_starts_empty(self, tmp_path):
+        """壊れた状態ファイルは空として扱われることをテスト"""
+        state_file = tmp_path / "state.json"
+        state_file.write_text("{not json")
+
+        store = AppliedStateStore(state_file)
+        assert store.resources == {}
+
+    def test_state_file_keyed_by_resolved_source(self, tmp_path, monkeypatch):
+        """状態ファイルがカレントディレクトリではなく解決済みパスで決まることをテスト"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "sub").mkdir()
+
+        assert state_file_for("tasks.yaml") == state_file_for(str(tmp_path / "tasks.yaml"))
+        assert state_file_for("sub/../tasks.yaml") == state_file_for("tasks.yaml")
+        assert state_file_for("tasks.yaml") != state_file_for("sub/tasks.yaml")
+        assert AppliedStateStore(source="tasks.yaml").state_file == state_file_for("tasks.yaml")
+
+
+class TestDeltaApplyRegistration:
+    """変更のないリソースの登録のテストクラス"""
+
+    def setup_method(self):
+        TaskManager._instance = None
+        self.applier = CRDApplier()
+
+    def teardown_method(self):
+        TaskManager._instance = None
+
+    def test_unchanged_tasks_reach_task_manager(self):
+        """変更のないTaskがワークツリーを作らずTaskManagerに登録されることをテスト"""
+        crds = CRDParser().parse_multi_yaml(TASKS_YAML)
+        crds[0].spec.assignee = "org01-pm-r1"
+
+        with patch.object(TaskManager, '_create_worktree') as mock_worktree:
+            for crd in crds:
+                self.applier.register_unchanged(crd)
+
+        mock_worktree.assert_not_called()
+        assignments = TaskManager().get_space_assignments("company-a")
+        assert assignments["org01-pm-r1"]["name"] == "task-a"
+        assert "Task/task-a" not in self.applier.applied_resources
+        # Nothing changed, so no registry file needs rewriting
+        assert TaskManager()._dirty_spaces == set()
+
+    def test_task_change_runs_post_processing_of_unchanged_space(self):
+        """Taskのみ変更された場合も所属Spaceの後処理が実行されることをテスト"""
+        space = CRDParser().parse_yaml(SPACE_YAML)
+        task = CRDParser().parse_multi_yaml(TASKS_YAML)[0]
+        self.applier.register_unchanged(space)
+        self.applier.apply = lambda crd: True
+        post_processed = []
+        self.applier._run_post_processing = lambda console, sessions: post_processed.extend(sessions)
+
+        for apply_changed in (self.applier.apply_multiple, self.applier.apply_stream):
+            post_processed.clear()
+            apply_changed([task])
+            assert post_processed == [{"session_name": "company-a", "space_ref": "company-a"}]
+
+    def test_outputs_use_absolute_paths(self, tmp_path, monkeypatch):
+        """出力のパスが絶対パスで記録されることをテスト"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "org-a").mkdir()
+        org = CRDParser().parse_yaml("""
+apiVersion: haconiwa.dev/v1
+kind: Organization
+metadata:
+  name: org-a
+spec:
+  companyName: Company A
+  industry: AI
+  hierarchy:
+    departments:
+    - id: dev
+      name: Development
+""")
+
+        outputs = self.applier.get_resource_outputs(org)
+        assert outputs["base_path"] == str(tmp_path.resolve() / "org-a")
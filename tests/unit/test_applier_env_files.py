@@ -134,6 +134,35 @@ class TestApplierEnvFiles(unittest.TestCase):
             # Verify no env_files key was added
             self.assertNotIn('env_files', task_config)
 
+    def test_default_branch_pinned_per_task(self):
+        """Test that the Space default branch goes into the task config, not the shared TaskManager"""
+        applier = CRDApplier()
+        
+        task_crd = TaskCRD(
+            apiVersion='haconiwa.dev/v1',
+            kind='Task',
+            metadata=Metadata(name='test-task'),
+            spec=TaskSpec(
+                branch='feature/test',
+                worktree=True,
+                assignee='test-agent',
+                spaceRef='test-space'
+            )
+        )
+        
+        git_config = {'url': 'https://example.com/repo.git', 'defaultBranch': 'develop'}
+        with patch('haconiwa.task.manager.TaskManager') as mock_tm_class, \
+             patch.object(applier, '_get_company_git_config', return_value=git_config):
+            mock_tm_instance = MagicMock()
+            mock_tm_class.return_value = mock_tm_instance
+            mock_tm_instance.create_task.return_value = True
+            
+            applier._apply_task_crd(task_crd)
+            
+            task_config = mock_tm_instance.create_task.call_args[0][0]
+            self.assertEqual(task_config['default_branch'], 'develop')
+            mock_tm_instance.set_default_branch.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
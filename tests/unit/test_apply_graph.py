@@ -0,0 +1,275 @@
+"""
+Unit tests for dependency-aware concurrent CRD apply
+"""
+import threading
+import time
+import unittest
+
+from haconiwa.core.apply_graph import ApplyGraph
+from haconiwa.core.applier import CRDApplier
+from haconiwa.core.crd.parser import CRDParser
+
+
+MULTI_COMPANY_YAML = """
+apiVersion: haconiwa.dev/v1
+kind: Organization
+metadata:
+  name: org-a
+spec:
+  companyName: Company A
+  industry: AI
+  hierarchy:
+    departments:
+    - id: dev
+      name: Development
+---
+apiVersion: haconiwa.dev/v1
+kind: Space
+metadata:
+  name: world-a
+spec:
+  nations:
+  - id: jp
+    name: Japan
+    cities:
+    - id: tokyo
+      name: Tokyo
+      villages:
+      - id: v1
+        name: Village
+        companies:
+        - name: company-a
+          organizationRef: org-a
+---
+apiVersion: haconiwa.dev/v1
+kind: Space
+metadata:
+  name: world-b
+spec:
+  nations:
+  - id: jp
+    name: Japan
+    cities:
+    - id: osaka
+      name: Osaka
+      villages:
+      - id: v2
+        name: Village
+        companies:
+        - name: company-b
+---
+apiVersion: haconiwa.dev/v1
+kind: AICodeConfig
+metadata:
+  name: claude-a
+spec:
+  provider: claude
+  targetCompany: company-a
+  claude:
+    settingsFile: settings.local.json
+    guidelinesFile: CLAUDE.md
+---
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: task-a1
+spec:
+  branch: feature/a1
+  spaceRef: company-a
+---
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: task-b1
+spec:
+  branch: feature/b1
+  spaceRef: company-b
+---
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: task-a2
+spec:
+  branch: feature/a2
+  spaceRef: company-a
+---
+apiVersion: haconiwa.dev/v1
+kind: PathScan
+metadata:
+  name: scan
+spec:
+  include: ["src/**/*.py"]
+"""
+
+
+class TestApplyGraph(unittest.TestCase):
+    """Test ApplyGraph dependency edges and scheduling"""
+
+    def setUp(self):
+        self.crds = CRDParser().parse_multi_yaml(MULTI_COMPANY_YAML)
+        self.graph = ApplyGraph(self.crds)
+        self.index = {crd.metadata.name: i for i, crd in enumerate(self.crds)}
+
+    def deps(self, name):
+        return {self.crds[i].metadata.name for i in self.graph.dependencies[self.index[name]]}
+
+    def test_dependency_edges(self):
+        self.assertEqual(self.deps("org-a"), set())
+        self.assertEqual(self.deps("world-a"), {"org-a"})
+        # Spaces share the SpaceManager singleton and are applied one at a time
+        self.assertEqual(self.deps("world-b"), {"world-a"})
+        self.assertEqual(self.deps("task-a1"), {"world-a", "claude-a"})
+        self.assertEqual(self.deps("task-b1"), {"world-b"})
+        # Tasks of the same company share tasks/main and stay ordered
+        self.assertEqual(self.deps("task-a2"), {"world-a", "claude-a", "task-a1"})
+        self.assertEqual(self.deps("scan"), set())
+
+    def test_critical_path_length(self):
+        # org-a → world-a → world-b → task-b1
+        self.assertEqual(self.graph.critical_path_length(), 4)
+
+    def test_critical_path_with_forward_references(self):
+        crds = CRDParser().parse_multi_yaml(MULTI_COMPANY_YAML)
+        by_name = {crd.metadata.name: crd for crd in crds}
+        # Task listed before its Space and AICodeConfig
+        graph = ApplyGraph([by_name[name] for name in ["task-a1", "world-a", "claude-a"]])
+
+        self.assertEqual(graph.dependencies[0], {1, 2})
+        self.assertEqual(graph.topological_order(), [1, 2, 0])
+        self.assertEqual(graph.critical_path_length(), 2)
+
+    def test_run_respects_dependencies(self):
+        finished = {}
+        lock = threading.Lock()
+
+        def apply_fn(crd):
+            for dep in self.graph.dependencies[self.index[crd.metadata.name]]:
+                self.assertIn(self.crds[dep].metadata.name, finished)
+            time.sleep(0.01)
+            with lock:
+                finished[crd.metadata.name] = time.time()
+            return True
+
+        results = self.graph.run(apply_fn, max_workers=4)
+
+        self.assertEqual(results, [True] * len(self.crds))
+        self.assertEqual(set(finished), set(self.index))
+
+    def test_run_executes_independent_nodes_concurrently(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def apply_fn(crd):
+            with lock:
+                active.append(crd.metadata.name)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(crd.metadata.name)
+            return True
+
+        self.graph.run(apply_fn, max_workers=4)
+        self.assertGreater(max(peak), 1)
+
+    def test_run_sequential_keeps_file_order(self):
+        order = []
+
+        def apply_fn(crd):
+            order.append(crd.metadata.name)
+            return True
+
+        self.graph.run(apply_fn, max_workers=1)
+        self.assertEqual(order, [crd.metadata.name for crd in self.crds])
+
+    def test_failures_are_reported_per_node(self):
+        def apply_fn(crd):
+            if crd.metadata.name == "world-b":
+                raise RuntimeError("boom")
+            return crd.metadata.name != "scan"
+
+        completed = []
+        results = self.graph.run(
+            apply_fn,
+            max_workers=2,
+            on_complete=lambda index, crd, result, elapsed, error: completed.append((crd.metadata.name, error))
+        )
+
+        self.assertFalse(results[self.index["world-b"]])
+        self.assertFalse(results[self.index["scan"]])
+        # Dependents of a failed node are still applied
+        self.assertTrue(results[self.index["task-b1"]])
+        errors = dict(completed)
+        self.assertIsInstance(errors["world-b"], RuntimeError)
+
+
+class TestApplyStream(unittest.TestCase):
+    """Test streaming apply through CRDApplier.apply_stream"""
+
+    def setUp(self):
+        self.applier = CRDApplier()
+        self.applier.max_workers = 1
+        self.order = []
+
+        def fake_apply(crd):
+            self.order.append(crd.metadata.name)
+            if crd.kind == "Space":
+                self.applier.applied_resources[f"Space/{crd.metadata.name}"] = crd
+            return True
+
+        self.applier.apply = fake_apply
+        self.applier._run_post_processing = lambda console, space_sessions: None
+
+    def test_tasks_wait_for_their_space(self):
+        crds = CRDParser().parse_multi_yaml(MULTI_COMPANY_YAML)
+        by_name = {crd.metadata.name: crd for crd in crds}
+        # Task of company-b arrives before the Space that defines it
+        stream = [by_name[name] for name in
+                  ["org-a", "task-b1", "world-a", "task-a1", "scan", "world-b"]]
+        results = []
+
+        success, total = self.applier.apply_stream(
+            iter(stream), on_result=lambda crd, result: results.append(crd.metadata.name), batch_size=2
+        )
+
+        self.assertEqual((success, total), (6, 6))
+        self.assertLess(self.order.index("world-b"), self.order.index("task-b1"))
+        self.assertEqual(sorted(results), sorted(self.order))
+        # Applied tasks are not retained
+        self.assertNotIn("Task/task-a1", self.applier.applied_resources)
+
+    def test_stream_is_consumed_lazily(self):
+        crds = CRDParser().parse_multi_yaml(MULTI_COMPANY_YAML)
+        pulled = []
+
+        def generate():
+            for crd in crds:
+                pulled.append(crd.metadata.name)
+                yield crd
+
+        first_applied_after = []
+        original_apply = self.applier.apply
+
+        def tracking_apply(crd):
+            if not first_applied_after:
+                first_applied_after.append(len(pulled))
+            return original_apply(crd)
+
+        self.applier.apply = tracking_apply
+        self.applier.apply_stream(generate(), batch_size=2)
+
+        # The first batch is applied before the whole stream is read
+        self.assertLess(first_applied_after[0], len(crds))
+
+    def test_unresolved_space_refs_are_applied_at_end(self):
+        crds = CRDParser().parse_multi_yaml(MULTI_COMPANY_YAML)
+        task = next(crd for crd in crds if crd.metadata.name == "task-b1")
+
+        success, total = self.applier.apply_stream(iter([task]))
+
+        self.assertEqual((success, total), (1, 1))
+        self.assertEqual(self.order, ["task-b1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
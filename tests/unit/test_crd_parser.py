@@ -382,4 +382,129 @@ spec:
         
         # Pydanticの検証でエラーになる
         with pytest.raises(Exception):  # ValidationError or similar
-            self.parser.parse_yaml(invalid_yaml) 
\ No newline at end of file
+            self.parser.parse_yaml(invalid_yaml) 
+
+class TestCRDParseCache:
+    """パースキャッシュのテストクラス"""
+    
+    MULTI_YAML = """
+apiVersion: haconiwa.dev/v1
+kind: Agent
+metadata:
+  name: pm-agent
+spec:
+  role: pm
+  model: gpt-4o
+---
+apiVersion: haconiwa.dev/v1
+kind: Task
+metadata:
+  name: feature-login
+spec:
+  branch: feature/login
+  spaceRef: test-company
+---
+"""
+    
+    def test_split_yaml_documents(self):
+        """ドキュメント分割をテスト"""
+        from haconiwa.core.crd.cache import split_yaml_documents
+        
+        chunks = split_yaml_documents(self.MULTI_YAML)
+        assert "".join(chunks) == self.MULTI_YAML
+        assert len([c for c in chunks if "kind:" in c]) == 2
+        # "----" や行中の "---" は区切りとして扱わない
+        assert len(split_yaml_documents("a: '---'\n----: x\n")) == 1
+    
+    def test_split_keeps_directives_with_their_document(self):
+        """%YAML/%TAG ディレクティブと "--- |" が次のドキュメントに含まれることをテスト"""
+        from haconiwa.core.crd.cache import iter_yaml_documents, split_yaml_documents
+        
+        content = "a: 1\n...\n%YAML 1.1\n# comment\n---\nb: 2\n--- |\n  text\n"
+        chunks = split_yaml_documents(content)
+        assert chunks == ["a: 1\n...\n", "%YAML 1.1\n# comment\n---\nb: 2\n", "--- |\n  text\n"]
+        assert [yaml.safe_load(c) for c in chunks] == list(yaml.safe_load_all(content))
+        assert list(iter_yaml_documents(content.splitlines(keepends=True))) == chunks
+        
+        # "---" が続かない "%" 行はディレクティブとして扱わない
+        assert split_yaml_documents("a: |\n%x\nb: 2\n---\n") == ["a: |\n%x\nb: 2\n", "---\n"]
+    
+    def test_empty_documents_skip_cache_lookup(self, tmp_path):
+        """空白・コメントのみのドキュメントはキャッシュを検索しないことをテスト"""
+        from haconiwa.core.crd.cache import CRDParseCache, is_empty_yaml_document
+        
+        assert is_empty_yaml_document("# header\n\n")
+        assert is_empty_yaml_document("--- # marker\n...\n")
+        assert not is_empty_yaml_document("--- |\n  text\n")
+        
+        parser = CRDParser(cache=CRDParseCache(tmp_path))
+        assert parser.parse_multi_yaml("# header\n---\n  \n---\n") == []
+        assert parser.cache_stats() == {"hits": 0, "misses": 0}
+    
+    def test_cache_hit_and_miss(self, tmp_path):
+        """同一ドキュメントの再パースでキャッシュがヒットすることをテスト"""
+        from haconiwa.core.crd.cache import CRDParseCache
+        
+        parser = CRDParser(cache=CRDParseCache(tmp_path))
+        first = parser.parse_multi_yaml(self.MULTI_YAML)
+        assert parser.cache_stats() == {"hits": 0, "misses": 2}  # 空ドキュメントは検索しない
+        
+        parser = CRDParser(cache=CRDParseCache(tmp_path))
+        second = parser.parse_multi_yaml(self.MULTI_YAML)
+        assert parser.cache_stats() == {"hits": 2, "misses": 0}
+        assert [c.model_dump() for c in first] == [c.model_dump() for c in second]
+        assert isinstance(second[0], AgentCRD)
+        assert isinstance(second[1], TaskCRD)
+    
+    def test_changed_document_is_reparsed(self, tmp_path):
+        """変更されたドキュメントのみ再パースされることをテスト"""
+        from haconiwa.core.crd.cache import CRDParseCache
+        
+        CRDParser(cache=CRDParseCache(tmp_path)).parse_multi_yaml(self.MULTI_YAML)
+        
+        parser = CRDParser(cache=CRDParseCache(tmp_path))
+        crds = parser.parse_multi_yaml(self.MULTI_YAML.replace("feature/login", "feature/signup"))
+        assert crds[1].spec.branch == "feature/signup"
+        assert parser.cache_stats()["hits"] == 1
+    
+    def test_cache_key_depends_on_model_sources(self, tmp_path):
+        """モデル・パーサーのソースが変わるとキャッシュキーが変わることをテスト"""
+        from haconiwa.core.crd import cache as cache_module
+        
+        key = cache_module.CRDParseCache(tmp_path).key_for(self.MULTI_YAML)
+        with patch.object(cache_module, "_source_fingerprint", return_value="edited"):
+            assert cache_module.CRDParseCache(tmp_path).key_for(self.MULTI_YAML) != key
+    
+    def test_invalid_document_is_not_cached(self, tmp_path):
+        """検証エラーのドキュメントはキャッシュされないことをテスト"""
+        from haconiwa.core.crd.cache import CRDParseCache
+        
+        cache = CRDParseCache(tmp_path)
+        parser = CRDParser(cache=cache)
+        invalid_yaml = "apiVersion: haconiwa.dev/v1\nkind: Agent\nmetadata:\n  name: x\nspec:\n  role: boss\n  model: m\n"
+        
+        with pytest.raises(CRDValidationError):
+            parser.parse_multi_yaml(invalid_yaml)
+        with pytest.raises(CRDValidationError):
+            parser.parse_multi_yaml(invalid_yaml)
+        assert cache.hits == 0
+        assert not list(tmp_path.glob("*/*.pkl"))
+    
+    def test_iter_multi_file_streams_documents(self, tmp_path):
+        """ファイルから1ドキュメントずつ遅延パースされることをテスト"""
+        from haconiwa.core.crd.cache import CRDParseCache
+        
+        yaml_file = tmp_path / "resources.yaml"
+        yaml_file.write_text(self.MULTI_YAML)
+        
+        # 全体パースと同じキャッシュキーを使う
+        CRDParser(cache=CRDParseCache(tmp_path / "cache")).parse_multi_yaml(self.MULTI_YAML)
+        parser = CRDParser(cache=CRDParseCache(tmp_path / "cache"))
+        
+        crds = parser.iter_multi_file(yaml_file)
+        assert isinstance(next(crds), AgentCRD)
+        assert isinstance(next(crds), TaskCRD)
+        assert list(crds) == []
+        assert parser.cache_stats()["hits"] == 2
+        
+        assert [c.metadata.name for c in CRDParser().iter_multi_file(yaml_file)] == ["pm-agent", "feature-login"]
@@ -0,0 +1,77 @@
+"""
+Unit tests for hierarchical legal framework generation
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from haconiwa.legal.framework import HierarchicalLegalFramework
+
+
+def make_spec(room_name="Room A"):
+    enabled = {"enabled": True}
+    return {"spec": {"nations": [{
+        "id": "jp", "name": "Japan", "legalFramework": enabled,
+        "cities": [{
+            "id": "tokyo", "name": "Tokyo", "legalFramework": enabled,
+            "villages": [{
+                "id": "v", "name": "Village", "legalFramework": enabled,
+                "companies": [{
+                    "name": "company", "legalFramework": enabled,
+                    "buildings": [{
+                        "id": "hq", "name": "HQ", "legalFramework": enabled,
+                        "floors": [{
+                            "id": "f1", "name": "Floor 1", "level": 1, "legalFramework": enabled,
+                            "rooms": [{"id": "room-a", "name": room_name, "legalFramework": enabled}]
+                        }]
+                    }]
+                }]
+            }]
+        }]
+    }]}}
+
+
+class TestLegalFrameworkWrites(unittest.TestCase):
+    """Test planned writes and content-hash skipping"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_second_run_skips_unchanged_files(self):
+        first = HierarchicalLegalFramework(self.base_path)
+        self.assertTrue(first.create_framework_from_yaml(make_spec()))
+        self.assertEqual(first.written_files, 28)
+        self.assertEqual(first.skipped_files, 0)
+        self.assertTrue(first.manifest_file.exists())
+
+        room_rules = self.base_path / "jp" / "tokyo" / "v" / "company" / "hq" / "floor-1" / "room-a" / "law" / "room-rules.md"
+        self.assertIn("Room A", room_rules.read_text(encoding="utf-8"))
+        code_permissions = room_rules.parent / "permissions" / "code-permissions.yaml"
+        self.assertIn("room_level:", code_permissions.read_text(encoding="utf-8"))
+
+        second = HierarchicalLegalFramework(self.base_path)
+        self.assertTrue(second.create_framework_from_yaml(make_spec()))
+        self.assertEqual(second.written_files, 0)
+        self.assertEqual(second.skipped_files, 28)
+        self.assertEqual(len(second.created_directories), 7)
+
+    def test_changed_or_edited_files_are_rewritten(self):
+        HierarchicalLegalFramework(self.base_path).create_framework_from_yaml(make_spec())
+        nation_rules = self.base_path / "jp" / "law" / "nation-rules.md"
+        nation_rules.write_text("edited by hand", encoding="utf-8")
+
+        framework = HierarchicalLegalFramework(self.base_path)
+        framework.create_framework_from_yaml(make_spec(room_name="Room B"))
+
+        # Room files whose content depends on the name plus the hand-edited file
+        self.assertEqual(framework.written_files, 5)
+        self.assertIn("Japan", nation_rules.read_text(encoding="utf-8"))
+
+
+if __name__ == '__main__':
+    unittest.main()
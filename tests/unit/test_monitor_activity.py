@@ -0,0 +1,77 @@
+"""
+Unit tests for pane output activity detection
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from haconiwa.monitor.activity import ACTIVE, IDLE, NEEDS_HUMAN, PaneActivityDetector
+
+
+class FakeTmux:
+    """Answers chained display-message/capture-pane calls from a dict of screens"""
+
+    def __init__(self, screens):
+        self.screens = screens
+        self.calls = []
+
+    def __call__(self, args, **kwargs):
+        self.calls.append(args)
+        output = []
+        for i, arg in enumerate(args):
+            if arg == 'display-message':
+                output.append(args[i + 2])
+            elif arg == '-t':
+                window, index = args[i + 1].split(":")[1].split(".")
+                output.append(self.screens[(int(window), int(index))])
+        return Mock(returncode=0, stdout="\n".join(output) + "\n")
+
+
+class TestPaneActivityDetector(unittest.TestCase):
+    """Test batched capture, hashing and adaptive polling"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.detector = PaneActivityDetector("company", min_interval=1.0, max_interval=4.0,
+                                             idle_after=10.0, clock=lambda: self.now)
+        self.panes = [{"window": 0, "index": 0}, {"window": 0, "index": 1}]
+        self.tmux = FakeTmux({
+            (0, 0): "$ pytest\n....",
+            (0, 1): "Edit file src/app.py\nDo you want to make this edit to app.py?\n❯ 1. Yes\n  2. No",
+        })
+
+    def update(self):
+        with patch('subprocess.run', self.tmux):
+            return self.detector.update(self.panes)
+
+    def test_one_capture_process_per_frame(self):
+        activity = self.update()
+
+        self.assertEqual(len(self.tmux.calls), 1)
+        self.assertEqual(activity[(0, 0)].state, ACTIVE)
+        self.assertEqual(activity[(0, 1)].state, NEEDS_HUMAN)
+
+    def test_unchanged_output_goes_idle_and_backs_off(self):
+        for _ in range(12):
+            activity = self.update()
+            self.now += 1.0
+
+        self.assertEqual(activity[(0, 0)].state, IDLE)
+        # Polled at t=0,1,3,7,11 instead of every frame
+        self.assertEqual(len(self.tmux.calls), 5)
+
+        self.tmux.screens[(0, 0)] += "\n1 passed"
+        self.now += 4.0
+        activity = self.update()
+        self.assertEqual(activity[(0, 0)].state, ACTIVE)
+        self.assertEqual(activity[(0, 0)].idle_seconds, 0.0)
+
+    def test_closed_panes_are_forgotten(self):
+        self.update()
+        self.panes = self.panes[:1]
+        self.assertEqual(list(self.update()), [(0, 0)])
+        self.assertEqual(len(self.detector._panes), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
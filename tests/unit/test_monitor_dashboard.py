@@ -0,0 +1,110 @@
+"""
+Unit tests for the multi-company monitor dashboard
+"""
+
+import unittest
+from dataclasses import replace
+from unittest.mock import Mock, patch
+
+from rich.console import Console
+
+from haconiwa.monitor.activity import NEEDS_HUMAN, PaneActivity
+from haconiwa.monitor.collector import MonitorSnapshot
+from haconiwa.monitor.dashboard import CompanyDashboard, summarize_snapshot
+from haconiwa.monitor.multi import MultiCompanyCollector
+
+
+def make_snapshot(cpus, needs_human=()):
+    panes = [{"window": 0, "index": i, "pid": 100 + i, "title": "", "current_path": ""} for i in range(len(cpus))]
+    processes = {
+        100 + i: {"pid": 200 + i, "cpu_percent": cpu, "memory_info": Mock(rss=64 * 1024 * 1024)}
+        for i, cpu in enumerate(cpus) if cpu is not None
+    }
+    snapshot = MonitorSnapshot.create({0: "room"}, panes, {}, processes, {})
+    return replace(snapshot, activity={(0, i): PaneActivity(NEEDS_HUMAN, 0.0) for i in needs_human})
+
+
+class TestMultiCompanyCollector(unittest.TestCase):
+    """Test one process scan shared by all companies"""
+
+    @patch('haconiwa.monitor.multi.list_all_pane_pids', return_value=[100, 101])
+    @patch('haconiwa.monitor.multi.list_haconiwa_sessions', return_value=["company-a", "company-b"])
+    def test_discovers_sessions_and_scans_once(self, mock_sessions, mock_pids):
+        monitors = {}
+
+        def factory(company):
+            monitor = Mock(process_parents={1: 0})
+            monitor.get_claude_processes.return_value = {"shared": True}
+            monitor.collect_snapshot.return_value = make_snapshot([5.0])
+            monitors[company] = monitor
+            return monitor
+
+        collector = MultiCompanyCollector(monitor_factory=factory)
+        snapshots = collector.collect()
+
+        self.assertEqual(list(snapshots), ["company-a", "company-b"])
+        monitors["company-a"].get_claude_processes.assert_called_once_with(pane_pids=[100, 101])
+        monitors["company-b"].get_claude_processes.assert_not_called()
+        monitors["company-b"].collect_snapshot.assert_called_once_with(claude_processes={"shared": True})
+
+        mock_sessions.return_value = ["company-b"]
+        collector.collect()
+        self.assertEqual(list(collector.monitors), ["company-b"])
+
+    @patch('haconiwa.monitor.tmux_monitor.list_tmux_sessions', return_value=["main", "alpha-company", "scratch"])
+    def test_discovery_skips_non_haconiwa_sessions(self, mock_sessions):
+        self.assertEqual(MultiCompanyCollector().discover_companies(), ["alpha-company"])
+        self.assertEqual(MultiCompanyCollector(companies=["main"]).discover_companies(), ["main"])
+
+
+class TestCompanyDashboard(unittest.TestCase):
+    """Test summary aggregation, drill-down and rendering"""
+
+    def test_summarize_snapshot(self):
+        summary = summarize_snapshot(make_snapshot([1.0, 10.0, 50.0, None], needs_human=[1]))
+        self.assertEqual(summary["panes"], 4)
+        self.assertEqual(summary["claude"], 3)
+        self.assertEqual((summary["waiting"], summary["working"], summary["busy"]), (1, 1, 1))
+        self.assertEqual(summary["needs_human"], 1)
+        self.assertAlmostEqual(summary["cpu_avg"], 61.0 / 3)
+
+    def test_companies_share_one_transcript_indexer(self):
+        dashboard = CompanyDashboard(companies=["a", "b"], columns=["pane", "turns"])
+        first = dashboard._create_monitor("a")
+        second = dashboard._create_monitor("b")
+        self.assertIsNotNone(dashboard.transcripts)
+        self.assertIs(first.transcripts, dashboard.transcripts)
+        self.assertIs(second.transcripts, dashboard.transcripts)
+
+        self.assertIsNone(CompanyDashboard(companies=["a"]).transcripts)
+
+    def test_drill_down_keys(self):
+        dashboard = CompanyDashboard(companies=["a", "b"])
+        dashboard.handle_key("2", ["a", "b"])
+        self.assertEqual(dashboard.selected, "b")
+        dashboard.handle_key("\t", ["a", "b"])
+        self.assertEqual(dashboard.selected, "a")
+        dashboard.handle_key("9", ["a", "b"])
+        self.assertEqual(dashboard.selected, "a")
+        dashboard.handle_key("\x1b", ["a", "b"])
+        self.assertIsNone(dashboard.selected)
+
+    def test_render_summary_and_company(self):
+        dashboard = CompanyDashboard(companies=["company-a"])
+        snapshots = {"company-a": make_snapshot([30.0], needs_human=[0])}
+        console = Console(width=160, record=True)
+
+        console.print(dashboard.render(snapshots))
+        self.assertIn("company-a", console.export_text())
+
+        monitor = Mock()
+        monitor.create_summary_panel.return_value = "summary"
+        monitor.create_monitoring_table.return_value = "table"
+        dashboard.collector.monitors["company-a"] = monitor
+        dashboard.selected = "company-a"
+        dashboard.render(snapshots)
+        monitor.create_monitoring_table.assert_called_once_with(snapshots["company-a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
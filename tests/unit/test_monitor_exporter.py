@@ -0,0 +1,96 @@
+"""
+Unit tests for the Prometheus agent metrics exporter
+"""
+
+import unittest
+from unittest.mock import Mock
+
+from prometheus_client import generate_latest
+
+from haconiwa.monitor.collector import MonitorSnapshot
+from haconiwa.monitor.exporter import AgentMetricsExporter, parse_listen_address
+
+
+class FakeMonitor:
+    """Stands in for TmuxMonitor with scripted snapshots"""
+
+    scans = 0
+
+    def __init__(self, company):
+        self.company = company
+        self.process_parents = {}
+        self.frames = []
+
+    def get_claude_processes(self, pane_pids=None):
+        FakeMonitor.scans += 1
+        return {}
+
+    def collect_snapshot(self, claude_processes=None):
+        return self.frames.pop(0)
+
+    def get_task_for_pane(self, pane):
+        return "feature/login" if pane['index'] == 0 else None
+
+
+def make_snapshot(pane_pid, claude_pid, cpu=30.0):
+    panes = [
+        {"window": 0, "index": 0, "pid": pane_pid, "title": "", "current_path": ""},
+        {"window": 0, "index": 1, "pid": 99, "title": "", "current_path": ""},
+    ]
+    process = {"pid": claude_pid, "cpu_percent": cpu, "memory_info": Mock(rss=2048)}
+    return MonitorSnapshot.create({0: "frontend"}, panes, {claude_pid: process}, {pane_pid: process},
+                                  {(0, 0): "agent-a", (0, 1): "agent-b"})
+
+
+class TestAgentMetricsExporter(unittest.TestCase):
+    """Test metric families and restart counting"""
+
+    def setUp(self):
+        FakeMonitor.scans = 0
+        self.exporter = AgentMetricsExporter(companies=["company-a", "company-b"], monitor_factory=FakeMonitor)
+
+    def script(self, company, *frames):
+        monitor = self.exporter.monitors.setdefault(company, FakeMonitor(company))
+        monitor.frames.extend(frames)
+
+    def test_metrics_and_single_process_scan(self):
+        self.script("company-a", make_snapshot(10, 11))
+        self.script("company-b", make_snapshot(20, 21, cpu=1.0))
+
+        self.exporter.collect_once()
+        output = generate_latest(self.exporter.registry).decode()
+
+        self.assertEqual(FakeMonitor.scans, 1)
+        self.assertIn('haconiwa_agent_cpu_percent{agent="agent-a",company="company-a",pane="0.0",room="frontend"} 30.0', output)
+        self.assertIn('haconiwa_agent_claude_present{agent="agent-b",company="company-a",pane="0.1",room="frontend"} 0.0', output)
+        self.assertIn('haconiwa_agent_status{agent="agent-a",company="company-b",pane="0.0",room="frontend",status="waiting"} 1.0', output)
+        self.assertIn('task="feature/login"', output)
+        self.assertIn('haconiwa_company_panes{company="company-b"} 2.0', output)
+
+    def test_restarts_counted_and_closed_panes_dropped(self):
+        self.exporter.companies = ["company-a"]
+        self.script("company-a", make_snapshot(10, 11), make_snapshot(10, 12), make_snapshot(13, 14))
+
+        for _ in range(3):
+            self.exporter.collect_once()
+        self.assertEqual(self.exporter.restarts[("company-a", 0, 0)], 2)
+        output = generate_latest(self.exporter.registry).decode()
+        self.assertIn('haconiwa_pane_restarts_total{agent="agent-a",company="company-a",pane="0.0",room="frontend"} 2.0', output)
+
+        self.exporter.companies = ["company-c"]
+        self.exporter.monitors["company-c"] = FakeMonitor("company-c")
+        self.exporter.monitors["company-c"].frames.append(MonitorSnapshot.create({}, [], {}, {}, {}))
+        self.exporter.collect_once()
+        self.assertEqual(self.exporter.restarts, {})
+        self.assertNotIn("company-a", generate_latest(self.exporter.registry).decode())
+
+    def test_parse_listen_address(self):
+        self.assertEqual(parse_listen_address(":9100"), ("127.0.0.1", 9100))
+        self.assertEqual(parse_listen_address("0.0.0.0:9200"), ("0.0.0.0", 9200))
+        self.assertEqual(parse_listen_address("9300"), ("127.0.0.1", 9300))
+        with self.assertRaises(ValueError):
+            parse_listen_address("localhost")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for monitor metrics history and recording
+"""
+
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from haconiwa.monitor.collector import MonitorSnapshot
+from haconiwa.monitor.history import (
+    MetricsHistory, MetricsRecorder, MetricsRing, STATUS_BUSY, STATUS_NONE, sparkline
+)
+
+
+def make_snapshot(cpu_by_pid, panes=((0, 0, 10), (0, 1, 20))):
+    pane_list = [{"window": window, "index": index, "pid": pid} for window, index, pid in panes]
+    pane_processes = {
+        pid: {"cpu_percent": cpu, "memory_info": Mock(rss=50 * 1024 * 1024)}
+        for pid, cpu in cpu_by_pid.items()
+    }
+    agents = {(window, index): f"agent-{index}" for window, index, _ in panes}
+    return MonitorSnapshot.create({}, pane_list, {}, pane_processes, agents)
+
+
+class TestMetricsRing(unittest.TestCase):
+    """Test fixed-size ring buffer"""
+
+    def test_wraps_and_keeps_order(self):
+        ring = MetricsRing(3)
+        for value in range(5):
+            ring.append(float(value), value * 10.0, STATUS_BUSY)
+
+        self.assertEqual(ring.cpu_values(), [2.0, 3.0, 4.0])
+        self.assertEqual(ring.rss_values(), [20.0, 30.0, 40.0])
+        self.assertEqual(ring.mean_cpu(), 3.0)
+        self.assertEqual(len(ring.cpu), 3)
+
+    def test_partial_fill(self):
+        ring = MetricsRing(4)
+        ring.append(8.0, 1.0, STATUS_NONE)
+        self.assertEqual(ring.cpu_values(), [8.0])
+        self.assertEqual(ring.status_values(), [STATUS_NONE])
+
+    def test_sparkline(self):
+        self.assertEqual(sparkline([0, 50, 100]), "▁▅█")
+        self.assertEqual(sparkline([]), "")
+
+
+class TestMetricsHistory(unittest.TestCase):
+    """Test per-pane history bookkeeping"""
+
+    def test_records_per_pane_and_drops_closed_panes(self):
+        history = MetricsHistory(capacity=2)
+        history.record(make_snapshot({10: 5.0}))
+        history.record(make_snapshot({10: 15.0, 20: 90.0}))
+        history.record(make_snapshot({10: 25.0, 20: 80.0}))
+
+        series = history.cpu_series()
+        self.assertEqual(series[(0, 0)], (15.0, 25.0))
+        self.assertEqual(series[(0, 1)], (90.0, 80.0))
+
+        history.record(make_snapshot({10: 1.0}, panes=((0, 0, 10),)))
+        self.assertEqual(list(history.rings), [(0, 0)])
+
+
+class TestMetricsRecorder(unittest.TestCase):
+    """Test sample export"""
+
+    def test_csv_rows(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "samples.csv"
+            with MetricsRecorder(path, "test-company") as recorder:
+                recorder.write(make_snapshot({10: 30.0}))
+                recorder.write(make_snapshot({10: 1.0, 20: 10.0}))
+
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(recorder.rows_written, 4)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["agent"], "agent-0")
+        self.assertEqual(rows[0]["status"], "busy")
+        self.assertEqual(rows[1]["status"], "none")
+        self.assertEqual(float(rows[0]["rss_mb"]), 50.0)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            MetricsRecorder("samples.txt", "test-company")
+
+
+if __name__ == '__main__':
+    unittest.main()
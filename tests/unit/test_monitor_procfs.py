@@ -0,0 +1,91 @@
+"""
+Unit tests for the Linux /proc process collector
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import psutil
+
+from haconiwa.monitor.procfs import ProcfsScanner, procfs_available, read_stat
+
+MARKER = "haconiwa-procfs-test"
+
+
+def write_stat(proc_root, pid, comm, ppid, ticks=0):
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(ticks), "0"] + ["0"] * 6 + ["100", "4096", "10"]
+    process_dir = Path(proc_root) / str(pid)
+    process_dir.mkdir(parents=True)
+    (process_dir / "stat").write_text(f"{pid} ({comm}) " + " ".join(fields))
+    return process_dir
+
+
+class TestReadStat(unittest.TestCase):
+    """Test stat parsing"""
+
+    def test_comm_with_spaces_and_parentheses(self):
+        with tempfile.TemporaryDirectory() as proc_root:
+            write_stat(proc_root, 42, "my (odd) proc", 7, ticks=12)
+            self.assertEqual(read_stat(42, proc_root), ("my (odd) proc", 7, 12, 100, 4096, 10))
+            self.assertIsNone(read_stat(43, proc_root))
+
+
+class TestProcfsScannerFallback(unittest.TestCase):
+    """Test subtree discovery without task children files"""
+
+    def test_scan_by_parent_pid(self):
+        with tempfile.TemporaryDirectory() as proc_root:
+            (Path(proc_root) / "meminfo").write_text("MemTotal: 1024 kB\n")
+            write_stat(proc_root, 10, "zsh", 1)
+            write_stat(proc_root, 11, "node", 10)
+            write_stat(proc_root, 12, "claude", 11)
+            write_stat(proc_root, 20, "claude", 1)  # Not under a pane
+            for pid in (10, 11, 12, 20):
+                (Path(proc_root) / str(pid) / "task" / str(pid)).mkdir(parents=True)
+                (Path(proc_root) / str(pid) / "cmdline").write_bytes(b"x\0")
+
+            scanner = ProcfsScanner(lambda comm, args: comm == "claude", proc_root=proc_root)
+            claude_processes, parents = scanner.scan([10])
+
+        self.assertEqual(list(claude_processes), [12])
+        self.assertEqual(parents, {10: 1, 11: 10, 12: 11})
+        self.assertEqual(claude_processes[12]["memory_info"].vms, 4096)
+
+
+@unittest.skipUnless(procfs_available(), "requires Linux /proc")
+class TestProcfsScanner(unittest.TestCase):
+    """Test scanning a real process tree"""
+
+    def setUp(self):
+        script = f'{sys.executable} -c "import time; time.sleep(30)" {MARKER} & wait'
+        self.pane = subprocess.Popen(["sh", "-c", script])
+        time.sleep(0.3)
+
+    def tearDown(self):
+        for child in psutil.Process(self.pane.pid).children(recursive=True):
+            child.kill()
+        self.pane.kill()
+        self.pane.wait()
+
+    def test_finds_descendants_and_caches_classification(self):
+        scanner = ProcfsScanner(lambda comm, args: comm.startswith("python") and MARKER in args)
+
+        claude_processes, parents = scanner.scan([self.pane.pid])
+        self.assertEqual(len(claude_processes), 1)
+        (pid, info), = claude_processes.items()
+        self.assertEqual(parents[pid], self.pane.pid)
+        self.assertEqual(info["cpu_percent"], 0.0)
+        self.assertGreater(info["memory_info"].rss, 0)
+
+        reads = scanner.cmdline_reads
+        claude_processes, _ = scanner.scan([self.pane.pid])
+        self.assertEqual(scanner.cmdline_reads, reads)
+        self.assertGreaterEqual(claude_processes[pid]["cpu_percent"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Unit tests for the incremental Claude transcript indexer
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from haconiwa.monitor.transcripts import (
+    TranscriptIndexer, find_task_dir, find_task_dirs, format_tokens, project_dir_name
+)
+
+
+def user_line(text):
+    return {"type": "user", "message": {"role": "user", "content": text}}
+
+
+def tool_result_line():
+    return {"type": "user", "message": {"role": "user", "content": [{"type": "tool_result", "content": "ok"}]}}
+
+
+def assistant_lines(message_id, blocks, input_tokens=100, output_tokens=20, cache_read=1000):
+    usage = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+             "cache_read_input_tokens": cache_read, "cache_creation_input_tokens": 0}
+    # Claude Code writes one line per content block, repeating message id and usage
+    return [{"type": "assistant", "message": {"id": message_id, "role": "assistant",
+                                               "content": [block], "usage": usage}} for block in blocks]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTranscriptIndexer(unittest.TestCase):
+    """Test offsets, attribution and persistence"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.task_dir = self.root / "company" / "tasks" / "feature" / "login"
+        (self.task_dir / ".haconiwa").mkdir(parents=True)
+        (self.task_dir / ".haconiwa" / "agent_assignment.json").write_text(json.dumps([
+            {"agent_id": "old-agent", "task_name": "feature/login", "space_session": "company"},
+            {"agent_id": "dev-1", "task_name": "feature/login", "space_session": "company"},
+        ]))
+        self.projects_dir = self.root / "projects"
+        self.transcript = self.projects_dir / project_dir_name(str(self.task_dir)) / "session.jsonl"
+        self.transcript.parent.mkdir(parents=True)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def append(self, *entries, partial=""):
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.write(partial)
+
+    def make_indexer(self, state_path=None):
+        return TranscriptIndexer(self.projects_dir, state_path, refresh_interval=0, clock=self.clock)
+
+    def test_counts_turns_tools_and_tokens_once_per_message(self):
+        self.append(user_line("ログイン画面を作って"),
+                    *assistant_lines("msg-1", [{"type": "text", "text": "了解"},
+                                               {"type": "tool_use", "name": "Read"},
+                                               {"type": "tool_use", "name": "Edit"}]),
+                    tool_result_line(),
+                    *assistant_lines("msg-2", [{"type": "text", "text": "完了"}], 50, 10, 0),
+                    {"type": "summary", "summary": "login"})
+
+        usage = self.make_indexer().usage_for_directory(str(self.task_dir))
+
+        self.assertEqual((usage.prompts, usage.turns, usage.tool_calls), (1, 2, 2))
+        self.assertEqual((usage.input_tokens, usage.output_tokens, usage.cache_read_tokens), (150, 30, 1000))
+
+    def test_reads_only_appended_complete_lines(self):
+        indexer = self.make_indexer()
+        partial = json.dumps(user_line("second"))
+        self.append(user_line("first"), partial=partial[:10])
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 1)
+        read_after_first = indexer.bytes_read
+
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write(partial[10:] + "\n")
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 2)
+        # Only the unfinished line is read again, never the first one
+        self.assertEqual(indexer.bytes_read - read_after_first, len(partial) + 1)
+
+        # Truncated (rewritten) transcripts are re-read from the start
+        self.transcript.write_text(json.dumps(user_line("fresh")) + "\n")
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 1)
+
+    def test_refresh_interval_caches_directory_totals(self):
+        indexer = TranscriptIndexer(self.projects_dir, refresh_interval=5, clock=self.clock)
+        self.append(user_line("first"))
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 1)
+        self.append(user_line("second"))
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 1)
+        self.clock.now = 5
+        self.assertEqual(indexer.usage_for_directory(str(self.task_dir)).prompts, 2)
+
+    def test_state_survives_restart(self):
+        state_path = self.root / "state" / "transcript-index.json"
+        self.append(*assistant_lines("msg-1", [{"type": "tool_use", "name": "Bash"}]))
+        indexer = self.make_indexer(state_path)
+        indexer.usage_for_directory(str(self.task_dir))
+        indexer.save()
+
+        restarted = self.make_indexer(state_path)
+        usage = restarted.usage_for_directory(str(self.task_dir))
+        self.assertEqual((usage.turns, usage.tool_calls), (1, 1))
+        self.assertEqual(restarted.bytes_read, 0)
+
+    def test_summary_and_pane_attribution(self):
+        self.append(user_line("hello"), *assistant_lines("msg-1", [{"type": "text", "text": "hi"}]))
+        indexer = self.make_indexer()
+
+        self.assertEqual(find_task_dirs(self.root / "company"), [self.task_dir])
+        self.assertEqual(find_task_dir(str(self.task_dir / "src" / "app")), self.task_dir)
+        rows = indexer.summarize([self.task_dir])
+        self.assertEqual((rows[0]["company"], rows[0]["agent"], rows[0]["task"]), ("company", "dev-1", "feature/login"))
+        self.assertEqual(rows[0]["total_tokens"], 1120)
+
+        panes = [{"window": 0, "index": 1, "current_path": str(self.task_dir / "src")}]
+        self.assertEqual(indexer.usage_for_panes(panes)[(0, 1)].turns, 1)
+        self.assertEqual(format_tokens(1234567), "1.2M")
+
+    def test_relative_task_dirs_are_resolved(self):
+        self.append(user_line("hello"), *assistant_lines("msg-1", [{"type": "text", "text": "hi"}]))
+        indexer = self.make_indexer()
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            task_dirs = find_task_dirs(Path("company"))
+            rows = indexer.summarize([Path("company/tasks/feature/login")])
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(task_dirs, [self.task_dir.resolve()])
+        self.assertEqual(rows[0]["task_directory"], str(self.task_dir.resolve()))
+        self.assertEqual(rows[0]["total_tokens"], 1120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for incremental organization updates
+"""
+
+import copy
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from haconiwa.organization.manager import OrganizationManager
+
+
+def make_config(base_path):
+    return {
+        "name": "test-org",
+        "company_name": "Test Company",
+        "industry": "Software",
+        "base_path": str(base_path),
+        "hierarchy": {"departments": [
+            {"id": "engineering", "name": "Engineering", "description": "Builds things", "roles": [
+                {"role_type": "management", "title": "CTO", "responsibilities": ["Strategy"]},
+                {"role_type": "engineering", "title": "Backend Engineer", "reports_to": "CTO"},
+            ]},
+            {"id": "sales", "name": "Sales", "roles": [
+                {"role_type": "sales", "title": "Account Manager"},
+            ], "legal_framework": {"enabled": True}},
+        ]},
+        "legal_framework": {"enabled": True},
+    }
+
+
+@patch.object(OrganizationManager, '_display_organization_structure')
+@patch.object(OrganizationManager, '_display_organization_changes')
+class TestIncrementalOrganization(unittest.TestCase):
+    """Test manifest-based change detection"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.temp_dir.name)
+        self.org_path = self.base_path / "organization"
+        self.config = make_config(self.base_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_first_create_writes_tree_and_manifest(self, mock_changes, mock_structure):
+        manager = OrganizationManager()
+        self.assertTrue(manager.create_organization(self.config))
+
+        self.assertTrue((self.org_path / "departments" / "engineering" / "roles" / "cto" / "role_definition.md").exists())
+        self.assertTrue((self.org_path / "departments" / "sales" / "law" / "department-rules.md").exists())
+        self.assertTrue((self.base_path / ".haconiwa" / "organizations" / "test-org.json").exists())
+        self.assertEqual(len(manager.last_changes["added"]), 7)
+        mock_structure.assert_called_once()
+        mock_changes.assert_not_called()
+
+    def test_reapply_without_changes_touches_nothing(self, mock_changes, mock_structure):
+        OrganizationManager().create_organization(self.config)
+        readme = self.org_path / "departments" / "engineering" / "README.md"
+        before = readme.stat().st_mtime_ns
+
+        manager = OrganizationManager()
+        with patch.object(manager, '_write_generated') as mock_write:
+            self.assertTrue(manager.create_organization(copy.deepcopy(self.config)))
+        mock_write.assert_not_called()
+
+        self.assertEqual(manager.last_changes["unchanged"], 7)
+        self.assertEqual(manager.last_changes["added"] + manager.last_changes["changed"] + manager.last_changes["removed"], [])
+        self.assertEqual(readme.stat().st_mtime_ns, before)
+        mock_changes.assert_called_once()
+
+    def test_reapply_applies_only_diff(self, mock_changes, mock_structure):
+        OrganizationManager().create_organization(self.config)
+        (self.org_path / "departments" / "engineering" / "roles" / "cto" / "role_definition.md").unlink()
+
+        config = copy.deepcopy(self.config)
+        engineering = config["hierarchy"]["departments"][0]
+        engineering["roles"][1]["responsibilities"] = ["APIs"]
+        engineering["roles"].append({"role_type": "engineering", "title": "Frontend Engineer"})
+        del config["hierarchy"]["departments"][1]
+
+        manager = OrganizationManager()
+        self.assertTrue(manager.create_organization(config))
+        changes = manager.last_changes
+
+        self.assertEqual(changes["added"], ["role/engineering/frontend-engineer"])
+        self.assertEqual(changes["changed"], [
+            "department/engineering", "role/engineering/cto", "role/engineering/backend-engineer"
+        ])
+        self.assertEqual(changes["removed"], ["department/sales", "role/sales/account-manager"])
+        self.assertFalse((self.org_path / "departments" / "sales").exists())
+        self.assertIn("APIs", (self.org_path / "departments" / "engineering" / "roles" / "backend-engineer" / "role_definition.md").read_text())
+
+    def test_same_size_edit_is_regenerated(self, mock_changes, mock_structure):
+        OrganizationManager().create_organization(self.config)
+        readme = self.org_path / "departments" / "engineering" / "README.md"
+        original = readme.read_text()
+        readme.write_text(original.replace("Engineering", "Engineerinx", 1))
+
+        manager = OrganizationManager()
+        self.assertTrue(manager.create_organization(copy.deepcopy(self.config)))
+
+        self.assertEqual(manager.last_changes["changed"], ["department/engineering"])
+        self.assertEqual(readme.read_text(), original)
+
+
+if __name__ == '__main__':
+    unittest.main()
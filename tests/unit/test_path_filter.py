@@ -0,0 +1,106 @@
+"""
+Unit tests for the compiled path filter
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from haconiwa.core.path_filter import PathFilter
+from haconiwa.resource.path_scanner import PathScanner
+from haconiwa.scan.scanner import ModelScanner
+
+
+class TestPathFilter(unittest.TestCase):
+    """Test gitignore-style matching"""
+
+    def setUp(self):
+        self.path_filter = PathFilter([
+            "# comment", "", "*.pyc", "node_modules", "/build", "logs/",
+            "docs/*.md", "a/**/b", "!keep.pyc",
+        ])
+
+    def test_basename_patterns_match_at_any_depth(self):
+        self.assertTrue(self.path_filter.excludes("x.pyc"))
+        self.assertTrue(self.path_filter.excludes("src/pkg/x.pyc"))
+        self.assertTrue(self.path_filter.excludes("web/node_modules", is_dir=True))
+        self.assertFalse(self.path_filter.excludes("src/x.py"))
+
+    def test_anchoring_and_directory_only(self):
+        self.assertTrue(self.path_filter.excludes("build", is_dir=True))
+        self.assertFalse(self.path_filter.excludes("src/build", is_dir=True))
+        self.assertTrue(self.path_filter.excludes("docs/index.md"))
+        self.assertFalse(self.path_filter.excludes("docs/api/index.md"))
+        self.assertTrue(self.path_filter.excludes("logs", is_dir=True))
+        self.assertFalse(self.path_filter.excludes("logs"))
+        self.assertTrue(self.path_filter.excludes("a/x/y/b"))
+
+    def test_negation_last_match_wins(self):
+        self.assertFalse(self.path_filter.excludes("src/keep.pyc"))
+        # Files under an ignored directory cannot be re-included
+        self.assertTrue(self.path_filter.excludes("logs/keep.pyc"))
+        reordered = PathFilter(["!keep.pyc", "*.pyc"])
+        self.assertTrue(reordered.excludes("keep.pyc"))
+
+    def test_include_rules_whitelist_files(self):
+        path_filter = PathFilter(["*.bin"], include=["*/openai/*", "README.md"])
+        self.assertFalse(path_filter.excludes("models/openai/gpt-4/config.json"))
+        self.assertTrue(path_filter.excludes("models/openai/gpt-4/weights.bin"))
+        self.assertTrue(path_filter.excludes("models/meta/llama/config.json"))
+        self.assertFalse(path_filter.excludes("README.md"))
+        # Directories are only pruned by ignore rules
+        self.assertFalse(path_filter.excludes("models/meta", is_dir=True))
+
+    def test_walk_prunes_ignored_directories(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for name in ["src/app.py", "src/app.pyc", "node_modules/lib/index.js", "build/out.txt", "README.md"]:
+                (root / name).parent.mkdir(parents=True, exist_ok=True)
+                (root / name).write_text("x")
+
+            visited = []
+            files = []
+            for dirpath, _, filenames in self.path_filter.walk(root):
+                visited.append(Path(dirpath).relative_to(root).as_posix())
+                files.extend(filenames)
+
+        self.assertEqual(sorted(visited), [".", "src"])
+        self.assertEqual(sorted(files), ["README.md", "app.py"])
+
+
+class TestScannersUsePathFilter(unittest.TestCase):
+    """Test PathScanner and ModelScanner filtering"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for name in ["src/main.py", "src/cache/tmp.py", "src/notes.txt", "tests/test_main.py", "dist/pkg.py"]:
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_text("x")
+        (self.root / ".gitignore").write_text("dist/\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_path_scanner_applies_include_exclude_and_gitignore(self):
+        PathScanner.register_config("python-files", {"include": ["*.py"], "exclude": ["cache/", "tests"]})
+        scanner = PathScanner()
+
+        self.assertEqual(scanner.scan("python-files", str(self.root)), ["src/main.py"])
+        parallel = scanner.scan_with_config(str(self.root), "python-files", parallel=True)
+        self.assertEqual(
+            sorted(Path(m.path).relative_to(self.root).as_posix() for m in parallel if not m.is_dir),
+            ["src/main.py"]
+        )
+
+    def test_model_scanner_prunes_before_descending(self):
+        scanner = ModelScanner(self.root, ignore_patterns=["cache", "dist/"], use_index=False)
+
+        files = sorted(path.relative_to(self.root).as_posix() for path, _ in scanner.index.iter_files())
+        self.assertNotIn("src/cache", scanner.index.directories)
+        self.assertEqual(files, [".gitignore", "src/main.py", "src/notes.txt", "tests/test_main.py"])
+        self.assertTrue(scanner._should_ignore(self.root / "src" / "cache" / "tmp.py"))
+
+
+if __name__ == '__main__':
+    unittest.main()
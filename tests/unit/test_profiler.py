@@ -0,0 +1,128 @@
+"""
+Unit tests for the apply profiler
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+from haconiwa.core import profiler
+from haconiwa.core.profiler import (
+    run_subprocess, span, start_profiling, stop_profiling, traced
+)
+
+
+class TestProfiler(unittest.TestCase):
+    """Test span collection and trace export"""
+
+    def tearDown(self):
+        stop_profiling()
+
+    def test_disabled_profiler_records_nothing(self):
+        @traced("noop")
+        def work():
+            return 42
+
+        with span("outer"):
+            self.assertEqual(work(), 42)
+        self.assertIsNone(profiler.get_profiler())
+
+    def test_spans_and_traced_functions(self):
+        active = start_profiling()
+
+        @traced("Worker.step")
+        def step():
+            return "done"
+
+        with span("phase", "apply", name="world"):
+            step()
+        with self.assertRaises(ValueError):
+            with span("broken"):
+                raise ValueError("boom")
+
+        names = [event["name"] for event in active.events]
+        self.assertEqual(names, ["Worker.step", "phase", "broken"])
+        self.assertEqual(active.events[1]["args"], {"name": "world"})
+        self.assertIn("ValueError", active.events[2]["args"]["error"])
+
+    @patch('subprocess.run')
+    def test_run_subprocess_records_argv(self, mock_run):
+        mock_run.return_value = Mock(returncode=1)
+        active = start_profiling()
+
+        result = run_subprocess(['git', '-C', '/tmp/repo', 'worktree', 'add', 'x'], capture_output=True)
+
+        self.assertEqual(result.returncode, 1)
+        mock_run.assert_called_once_with(['git', '-C', '/tmp/repo', 'worktree', 'add', 'x'], capture_output=True)
+        event = active.events[0]
+        self.assertEqual(event["name"], "git worktree")
+        self.assertEqual(event["cat"], "subprocess")
+        self.assertEqual(event["args"]["returncode"], 1)
+        self.assertEqual(event["args"]["argv"][0], "git")
+
+    def test_chrome_trace_and_summary(self):
+        active = start_profiling()
+
+        barrier = threading.Barrier(3)
+
+        def worker():
+            with span("tmux send-keys", "subprocess"):
+                barrier.wait(timeout=5)
+
+        threads = [threading.Thread(target=worker, name=f"apply-{i}") for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        active.record("git clone", "subprocess", active.started_at, 2.5)
+
+        summary = active.summary(top_n=5)
+        self.assertEqual(summary[0]["name"], "git clone")
+        self.assertEqual(summary[1]["count"], 3)
+        self.assertEqual(active.slowest(1)[0]["name"], "git clone")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_file = Path(temp_dir) / "trace.json"
+            active.write_chrome_trace(trace_file)
+            trace = json.loads(trace_file.read_text())
+
+        complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        thread_names = {event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        self.assertEqual(len(complete), 4)
+        self.assertTrue({"apply-0", "apply-1", "apply-2"} <= thread_names)
+
+    def test_summary_ranks_wrapper_spans_by_self_time(self):
+        from haconiwa.core.apply_graph import ApplyGraph
+        from haconiwa.core.crd.models import AgentCRD, AgentSpec, Metadata
+
+        active = start_profiling()
+        clock = {"now": 0.0}
+
+        def fake_clock():
+            return clock["now"]
+
+        def apply_fn(crd):
+            with span("tmux send-keys", "subprocess"):
+                clock["now"] += 1.0
+            return True
+
+        crds = [AgentCRD(apiVersion="haconiwa.dev/v1", kind="Agent", metadata=Metadata(name=f"agent-{i}"),
+                         spec=AgentSpec(role="worker", model="gpt-4o")) for i in range(2)]
+        with patch("haconiwa.core.profiler.time.perf_counter", fake_clock):
+            with span("CRDApplier.apply_multiple"):
+                clock["now"] += 0.5
+                ApplyGraph(crds).run(apply_fn, max_workers=1)
+
+        summary = {entry["name"]: entry for entry in active.summary()}
+        self.assertEqual(active.summary(1)[0]["name"], "tmux send-keys")
+        self.assertAlmostEqual(summary["CRDApplier.apply_multiple"]["total"], 2.5)
+        self.assertAlmostEqual(summary["CRDApplier.apply_multiple"]["self"], 0.5)
+        self.assertAlmostEqual(summary["tmux send-keys"]["self"], 2.0)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Unit tests for the indexed task registry
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from haconiwa.core.applier import CRDApplier
+from haconiwa.core.crd.parser import CRDParser
+from haconiwa.task.manager import TaskManager
+from haconiwa.task.registry import TaskRegistry
+
+
+def make_task(space_ref, assignee=None, branch=None):
+    return {"config": {"space_ref": space_ref, "assignee": assignee, "branch": branch}, "status": "created"}
+
+
+class TestTaskRegistry(unittest.TestCase):
+    """Test TaskRegistry index maintenance"""
+
+    def setUp(self):
+        self.registry = TaskRegistry({
+            "task-a": make_task("company-a", "agent-1", "feature/a"),
+            "task-b": make_task("company-b", "agent-2", "feature/b"),
+            "task-c": make_task("company-a", None, "feature/c"),
+        })
+
+    def test_indexes_on_insert(self):
+        self.assertEqual(self.registry.names_for_space("company-a"), ["task-a", "task-c"])
+        self.assertEqual(self.registry.names_for_assignee("agent-2"), ["task-b"])
+        self.assertEqual(self.registry.names_for_branch("feature/c"), ["task-c"])
+        self.assertEqual(self.registry.names_for_space("missing"), [])
+
+    def test_indexes_on_replace_and_delete(self):
+        self.registry["task-a"] = make_task("company-b", "agent-3", "feature/a2")
+        self.assertEqual(self.registry.names_for_space("company-a"), ["task-c"])
+        self.assertEqual(self.registry.names_for_space("company-b"), ["task-b", "task-a"])
+        self.assertEqual(self.registry.names_for_assignee("agent-1"), [])
+
+        del self.registry["task-b"]
+        self.registry.pop("task-c")
+        self.assertEqual(self.registry.names_for_space("company-b"), ["task-a"])
+        self.assertNotIn("company-a", self.registry.space_refs())
+
+        self.registry.clear()
+        self.assertEqual(self.registry.names_for_assignee("agent-3"), [])
+
+    def test_save_and_load_space(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry_file = Path(temp_dir) / ".haconiwa" / "task_registry.json"
+            self.registry.save_space("company-a", registry_file)
+
+            loaded = TaskRegistry()
+            self.assertEqual(loaded.load_space(registry_file), 2)
+            self.assertEqual(loaded.names_for_space("company-a"), ["task-a", "task-c"])
+            self.assertEqual(loaded.names_for_assignee("agent-1"), ["task-a"])
+            # Entries already in memory are kept
+            self.assertEqual(loaded.load_space(registry_file), 0)
+
+
+class TestTaskManagerRegistry(unittest.TestCase):
+    """Test TaskManager lookups backed by the registry"""
+
+    def setUp(self):
+        self.task_manager = TaskManager()
+        self.original_tasks = self.task_manager.tasks
+        self.task_manager.tasks = {
+            "task-a": make_task("company-a", "agent-1", "feature/a"),
+            "task-b": make_task("company-b", "agent-2", "feature/b"),
+        }
+
+    def tearDown(self):
+        self.task_manager.tasks = self.original_tasks
+        self.task_manager._dirty_spaces.clear()
+        self.task_manager._deleted_tasks.clear()
+
+    def test_plain_dict_assignment_is_indexed(self):
+        self.assertIsInstance(self.task_manager.tasks, TaskRegistry)
+        self.assertEqual(self.task_manager.get_agent_assignments("company-a"), {"agent-1": "tasks/task-a"})
+        self.assertEqual(self.task_manager.get_task_by_assignee("agent-2")["name"], "task-b")
+        self.assertEqual(self.task_manager.get_tasks_by_branch("feature/a"), ["task-a"])
+
+    def test_space_assignments_load_persisted_registry(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            self.task_manager.tasks["task-x"] = make_task("company-x", "agent-9", "feature/x")
+            self.task_manager._dirty_spaces.add("company-x")
+
+            with patch.object(self.task_manager, '_find_space_base_path', return_value=base_path):
+                self.assertEqual(self.task_manager.save_registry(), 1)
+            self.assertTrue((base_path / ".haconiwa" / "task_registry.json").exists())
+
+            del self.task_manager.tasks["task-x"]
+            assignments = self.task_manager.get_space_assignments("company-x", base_path)
+            self.assertEqual(list(assignments), ["agent-9"])
+            self.assertEqual(assignments["agent-9"]["worktree_path"], "tasks/task-x")
+
+    def test_save_merges_tasks_not_in_memory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            registry_file = base_path / ".haconiwa" / "task_registry.json"
+            TaskRegistry({
+                "task-x1": make_task("company-x", "agent-1", "feature/x1"),
+                "task-x2": make_task("company-x", "agent-2", "feature/x2"),
+            }).save_space("company-x", registry_file)
+
+            # Another process applies one more task and deletes one it loaded
+            self.task_manager.tasks["task-x3"] = make_task("company-x", "agent-3", "feature/x3")
+            self.task_manager._dirty_spaces.add("company-x")
+            with patch.object(self.task_manager, '_find_space_base_path', return_value=base_path):
+                self.assertEqual(self.task_manager.save_registry(), 1)
+            self.assertEqual(sorted(TaskRegistry._read_tasks(registry_file)), ["task-x1", "task-x2", "task-x3"])
+
+            self.task_manager.load_registry(base_path)
+            with patch.object(self.task_manager, '_find_space_base_path', return_value=base_path):
+                self.assertTrue(self.task_manager.delete_task("task-x1"))
+                self.assertNotIn("agent-1", self.task_manager.get_space_assignments("company-x", base_path))
+                self.task_manager.save_registry()
+            self.assertEqual(sorted(TaskRegistry._read_tasks(registry_file)), ["task-x2", "task-x3"])
+
+    def test_space_assignments_merge_persisted_tasks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            TaskRegistry({"task-y": make_task("company-x", "agent-8", "feature/y")}).save_space(
+                "company-x", base_path / ".haconiwa" / "task_registry.json"
+            )
+            self.task_manager.tasks["task-z"] = make_task("company-x", "agent-7", "feature/z")
+
+            assignments = self.task_manager.get_space_assignments("company-x", base_path)
+            self.assertEqual(sorted(assignments), ["agent-7", "agent-8"])
+
+    def test_assignment_logs_cover_tasks_missing_from_registry(self):
+        from haconiwa.space.manager import SpaceManager
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            (base_path / "tasks" / "task-r").mkdir(parents=True)
+            self.task_manager.tasks["task-r"] = make_task("company-x", "agent-1", "feature/r")
+            for task_name, agent_id in [("task-r", "agent-old"), ("task-l", "agent-2")]:
+                log_dir = base_path / "tasks" / task_name / ".haconiwa"
+                log_dir.mkdir(parents=True, exist_ok=True)
+                (log_dir / "agent_assignment.json").write_text(json.dumps(
+                    [{"agent_id": agent_id, "task_name": task_name, "status": "active"}]
+                ))
+
+            entries = SpaceManager()._collect_task_assignment_entries("company-x", base_path)
+
+            # Registry entry for task-r, assignment log only for the unknown task-l
+            self.assertEqual(sorted((task_dir.name, assignment["agent_id"]) for task_dir, assignment in entries),
+                             [("task-l", "agent-2"), ("task-r", "agent-1")])
+
+    def test_applier_reads_persisted_registry_of_space(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = Path(temp_dir)
+            TaskRegistry({"task-x": make_task("company-x", "agent-9", "feature/x")}).save_space(
+                "company-x", base_path / ".haconiwa" / "task_registry.json"
+            )
+            space = CRDParser().parse_yaml(f"""
+apiVersion: haconiwa.dev/v1
+kind: Space
+metadata:
+  name: world-x
+spec:
+  nations:
+  - id: jp
+    name: Japan
+    cities:
+    - id: tokyo
+      name: Tokyo
+      villages:
+      - id: v1
+        name: Village
+        companies:
+        - name: company-x
+          basePath: {temp_dir}
+""")
+            applier = CRDApplier()
+            applier.applied_resources["Space/world-x"] = space
+
+            with patch('haconiwa.space.manager.SpaceManager') as mock_space_manager:
+                applier._update_all_space_task_assignments([
+                    {"session_name": "company-x", "space_ref": "company-x"}
+                ])
+
+            assignments = mock_space_manager.return_value.set_task_assignments.call_args[0][0]
+            self.assertEqual(list(assignments), ["agent-9"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Unit tests for TmuxMonitor process lookup
+"""
+
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from haconiwa.monitor.collector import MonitorSnapshot, SnapshotCollector
+from haconiwa.monitor.sampler import ProcessSampler
+from haconiwa.monitor.tmux_monitor import TmuxMonitor
+
+
+def fake_proc(pid, ppid, name, cmdline=None):
+    proc = Mock()
+    proc.info = {"pid": pid, "ppid": ppid, "name": name, "cmdline": cmdline or [name]}
+    return proc
+
+
+class TestProcessIndex(unittest.TestCase):
+    """Test pid → ppid index used to match Claude processes to panes"""
+
+    def setUp(self):
+        with patch.object(TmuxMonitor, 'load_agent_mappings', return_value={}):
+            self.monitor = TmuxMonitor("test-company")
+
+    @patch('haconiwa.monitor.tmux_monitor.psutil.Process')
+    @patch('haconiwa.monitor.tmux_monitor.psutil.process_iter')
+    def test_single_scan_builds_index_and_matches_any_depth(self, mock_iter, mock_process):
+        mock_iter.return_value = [
+            fake_proc(1, 0, "systemd"),
+            fake_proc(100, 1, "zsh"),           # pane 0
+            fake_proc(101, 100, "node", ["node", "/usr/bin/claude"]),
+            fake_proc(200, 1, "zsh"),           # pane 1
+            fake_proc(201, 200, "bash"),
+            fake_proc(202, 201, "npx"),
+            fake_proc(203, 202, "claude"),      # three levels below pane 1
+            fake_proc(300, 1, "zsh"),           # pane 2 without Claude
+            fake_proc(400, 1, "claude"),        # Claude outside any pane
+        ]
+        mock_process.return_value.cpu_percent.return_value = 5.0
+        mock_process.return_value.memory_percent.return_value = 1.0
+
+        claude_processes = self.monitor.get_claude_processes()
+        panes = [{"pid": 100}, {"pid": 200}, {"pid": 300}]
+        pane_processes = self.monitor.map_claude_processes_to_panes(panes, claude_processes)
+
+        mock_iter.assert_called_once_with(['pid', 'ppid', 'name', 'cmdline'])
+        self.assertEqual(sorted(claude_processes), [101, 203, 400])
+        self.assertEqual(self.monitor.process_parents[203], 202)
+        self.assertIs(pane_processes[100], claude_processes[101])
+        self.assertIs(pane_processes[200], claude_processes[203])
+        self.assertNotIn(300, pane_processes)
+
+    @patch('haconiwa.monitor.tmux_monitor.psutil.Process')
+    def test_is_child_of_pane_uses_index(self, mock_process):
+        self.monitor.process_parents = {10: 1, 11: 10, 12: 11, 13: 12}
+        self.assertTrue(self.monitor.is_child_of_pane(13, 10))
+        self.assertFalse(self.monitor.is_child_of_pane(10, 13))
+        mock_process.assert_not_called()
+
+    def test_cyclic_index_terminates(self):
+        self.monitor.process_parents = {5: 6, 6: 5}
+        self.assertEqual(list(self.monitor.iter_ancestors(5)), [6, 5])
+
+
+class TestProcessSampler(unittest.TestCase):
+    """Test cached, non-blocking process sampling"""
+
+    def test_handles_are_reused_and_evicted(self):
+        sampler = ProcessSampler()
+        pid = os.getpid()
+
+        start = time.perf_counter()
+        first = sampler.sample(pid)
+        sum(range(200000))  # burn some CPU between frames
+        second = sampler.sample(pid)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(first['cpu_percent'], 0.0)
+        self.assertGreaterEqual(second['cpu_percent'], 0.0)
+        self.assertGreater(second['memory_info'].rss, 0)
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(len(sampler), 1)
+
+        sampler.evict([])
+        self.assertEqual(len(sampler), 0)
+
+    @patch('haconiwa.monitor.sampler.psutil.Process')
+    def test_reused_pid_gets_new_handle(self, mock_process):
+        stale = Mock()
+        stale.is_running.return_value = False
+        sampler = ProcessSampler()
+        sampler._handles[42] = stale
+
+        sampler.sample(42)
+
+        mock_process.assert_called_once_with(42)
+        stale.cpu_percent.assert_not_called()
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test single collection per frame and background collector"""
+
+    def setUp(self):
+        with patch.object(TmuxMonitor, 'load_agent_mappings', return_value={}):
+            self.monitor = TmuxMonitor("test-company")
+
+    def test_table_and_summary_share_one_collection(self):
+        memory_info = Mock(rss=100 * 1024 * 1024)
+        process = {"ppid": 10, "cpu_percent": 30.0, "memory_info": memory_info}
+        with patch.object(self.monitor, 'get_tmux_windows_info', return_value={0: "room"}) as mock_windows, \
+                patch.object(self.monitor, 'get_tmux_panes_info', return_value=[
+                    {"window": 0, "index": 0, "title": "t", "pid": 10, "current_path": "/w/tasks/task_a"}
+                ]) as mock_panes, \
+                patch.object(self.monitor, 'get_claude_processes', return_value={11: process}):
+            self.monitor.process_parents = {11: 10}
+            snapshot = self.monitor.collect_snapshot()
+            self.monitor.create_monitoring_table(snapshot)
+            self.monitor.create_summary_panel(snapshot)
+
+        mock_windows.assert_called_once()
+        mock_panes.assert_called_once()
+        self.assertEqual(snapshot.pane_processes[10]["cpu_percent"], 30.0)
+        self.assertEqual(snapshot.agents[(0, 0)], "agent-0:0")
+        with self.assertRaises(TypeError):
+            snapshot.panes[0]["pid"] = 99
+
+    def test_collector_publishes_latest_snapshot(self):
+        calls = []
+
+        def collect():
+            calls.append(1)
+            return MonitorSnapshot.create({}, [], {}, {}, {})
+
+        with SnapshotCollector(collect, interval=0.01) as collector:
+            generation = collector.wait_for_next(0, timeout=1)
+            generation = collector.wait_for_next(generation, timeout=1)
+
+        self.assertGreaterEqual(generation, 2)
+        self.assertIsNotNone(collector.latest)
+        self.assertGreaterEqual(len(calls), 2)
+
+    def test_collector_keeps_last_snapshot_on_error(self):
+        results = [MonitorSnapshot.create({0: "room"}, [], {}, {}, {}), RuntimeError("tmux gone")]
+
+        def collect():
+            result = results.pop(0) if results else RuntimeError("tmux gone")
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with SnapshotCollector(collect, interval=0.01) as collector:
+            collector.wait_for_next(1, timeout=1)
+
+        self.assertEqual(dict(collector.latest.windows), {0: "room"})
+        self.assertIsInstance(collector.error, RuntimeError)
+
+
+class TestRunMonitor(unittest.TestCase):
+    """Test status thresholds and shutdown order"""
+
+    def setUp(self):
+        with patch.object(TmuxMonitor, 'load_agent_mappings', return_value={}):
+            self.monitor = TmuxMonitor("test-company", record_path="samples.csv")
+
+    def test_status_text_follows_classify_cpu(self):
+        self.assertEqual(self.monitor.get_status_by_cpu(2.0), self.monitor.get_text('waiting_for_work'))
+        self.assertEqual(self.monitor.get_status_by_cpu(20.0), self.monitor.get_text('working'))
+        self.assertEqual(self.monitor.get_status_by_cpu(20.5), self.monitor.get_text('busy'))
+
+    @patch('haconiwa.monitor.tmux_monitor.Live')
+    @patch('haconiwa.monitor.tmux_monitor.MetricsRecorder')
+    def test_recorder_closed_after_collector_finishes(self, mock_recorder, mock_live):
+        events = []
+        started = threading.Event()
+
+        def collect():
+            started.set()
+            time.sleep(1.2)  # Longer than the collector's default join timeout
+            events.append("collected")
+            return MonitorSnapshot.create({}, [], {}, {}, {})
+
+        def interrupt(*args):
+            started.wait(1)
+            raise KeyboardInterrupt
+
+        mock_live.return_value.__enter__.side_effect = interrupt
+        mock_recorder.return_value.close.side_effect = lambda: events.append("closed")
+        self.monitor.collect_snapshot = collect
+        self.monitor.console = Mock()
+
+        self.monitor.run_monitor(refresh_rate=0.01)
+
+        self.assertEqual(events, ["collected", "closed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
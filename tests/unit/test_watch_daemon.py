@@ -0,0 +1,124 @@
+"""
+Unit tests for the watch daemon, sampling scheduler and alerts
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from haconiwa.watch.daemon import WatchClient, WatchDaemon, main
+from haconiwa.watch.monitor import AlertRule, Monitor, RollingStats, SamplingScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSamplingScheduler(unittest.TestCase):
+    """Test per-metric intervals"""
+
+    def test_each_metric_runs_at_its_interval(self):
+        clock = FakeClock()
+        calls = []
+        samplers = {"fast": lambda: calls.append("fast") or 1.0, "slow": lambda: calls.append("slow") or 2.0}
+        scheduler = SamplingScheduler({"fast": 1.0, "slow": 5.0, "unknown": 1.0}, samplers, clock)
+
+        self.assertEqual(dict(scheduler.run_due()), {"fast": 1.0, "slow": 2.0})
+        for step in range(1, 11):
+            clock.now = float(step)
+            scheduler.run_due()
+        self.assertEqual(calls.count("fast"), 11)
+        self.assertEqual(calls.count("slow"), 3)
+        self.assertEqual(scheduler.next_due(), 11.0)
+
+    def test_failing_sampler_is_rescheduled(self):
+        clock = FakeClock()
+        scheduler = SamplingScheduler({"bad": 1.0}, {"bad": lambda: 1 / 0}, clock)
+        self.assertEqual(scheduler.run_due(), [])
+        self.assertEqual(scheduler.next_due(), 1.0)
+
+
+class TestAggregatesAndAlerts(unittest.TestCase):
+    """Test rolling windows and hysteresis"""
+
+    def test_rolling_stats_drop_old_samples(self):
+        stats = RollingStats(window=10.0)
+        for t, value in [(0, 10.0), (5, 20.0), (12, 30.0)]:
+            stats.add(t, value)
+        self.assertEqual(stats.summary(), {"last": 30.0, "min": 20.0, "max": 30.0, "mean": 25.0, "count": 2})
+
+    def test_hysteresis_and_rate_limit(self):
+        rule = AlertRule("cpu", threshold=90.0, clear_threshold=75.0, min_interval=60.0)
+        events = [rule.evaluate(value, now) for now, value in
+                  [(0, 95), (1, 85), (2, 95), (3, 70), (10, 95), (11, 70), (70, 95)]]
+        # Staying between clear and fire thresholds does not flap; re-firing within 60 s is suppressed
+        self.assertEqual(events, ["fire", None, None, "clear", None, None, "fire"])
+
+    def test_failing_subscriber_does_not_stop_sampling(self):
+        clock = FakeClock()
+        monitor = Monitor({"thresholds": {"cpu": (90.0, 75.0)}})
+        monitor.scheduler = SamplingScheduler({"cpu": 1.0}, {"cpu": lambda: 95.0}, clock)
+        events = []
+        monitor.subscribers = [lambda event: 1 / 0, events.append]
+
+        with self.assertLogs("haconiwa.watch.monitor", level="ERROR"):
+            self.assertEqual(monitor.collect_metrics(), {"cpu": 95.0})
+        self.assertEqual([event["type"] for event in events], ["alert", "sample"])
+        self.assertEqual(monitor.summary()["cpu"]["count"], 1)
+
+class TestMetricsServer(unittest.TestCase):
+    """Test the Prometheus endpoint binding"""
+
+    @patch("haconiwa.watch.monitor.prometheus_client.start_http_server")
+    def test_binds_loopback_by_default(self, mock_server):
+        Monitor().start_metrics_server(9100)
+        self.assertEqual(mock_server.call_args.kwargs["addr"], "127.0.0.1")
+
+    @patch("haconiwa.watch.daemon.WatchDaemon")
+    @patch("haconiwa.watch.monitor.prometheus_client.start_http_server")
+    def test_daemon_metrics_addr_option(self, mock_server, mock_daemon):
+        main(["--metrics-port", "9100", "--metrics-addr", "0.0.0.0"])
+        mock_server.assert_called_once()
+        self.assertEqual(mock_server.call_args.args[0], 9100)
+        self.assertEqual(mock_server.call_args.kwargs["addr"], "0.0.0.0")
+        mock_daemon.return_value.serve_forever.assert_called_once()
+
+class TestWatchDaemon(unittest.TestCase):
+    """Test socket control of an in-process daemon"""
+
+    def test_status_tail_and_stop(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = Monitor({"intervals": {"cpu": 0.05, "memory": 0.05, "load": 0.05, "disk": 60,
+                                             "claude_processes": 60}})
+            daemon = WatchDaemon(Path(temp_dir), monitor)
+            thread = threading.Thread(target=daemon.serve_forever)
+            thread.start()
+            client = WatchClient(Path(temp_dir))
+            try:
+                self.assertTrue(client.wait_ready())
+                self.assertIsNotNone(client.running_pid())
+
+                samples = [event for event in client.stream(count=2) if event["type"] == "sample"]
+                self.assertEqual(len(samples), 2)
+                self.assertIn("cpu", samples[-1]["metrics"])
+
+                status = client.request("status")
+                self.assertTrue(status["ok"])
+                self.assertGreater(status["metrics"]["cpu"]["count"], 0)
+                self.assertFalse(client.request("bogus")["ok"])
+            finally:
+                client.request("stop")
+                thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(client.socket_path.exists())
+            self.assertFalse(client.pid_file.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()